@@ -22,9 +22,10 @@ class Beacon(object):
     '''
     This class is used to evaluate and execute on the beacon system
     '''
-    def __init__(self, opts, functions):
+    def __init__(self, opts, functions, running_jobs=None):
         self.opts = opts
         self.functions = functions
+        self.running_jobs = running_jobs
         self.beacons = salt.loader.beacons(opts, functions)
         self.interval_map = dict()
 
@@ -83,7 +84,10 @@ class Beacon(object):
                     log.trace('Evaluting if beacon %s should be skipped due to a state run.', mod)
                     b_config = self._trim_config(b_config, mod, 'disable_during_state_run')
                     is_running = False
-                    running_jobs = salt.utils.minion.running(self.opts)
+                    if self.running_jobs is not None:
+                        running_jobs = self.running_jobs.running()
+                    else:
+                        running_jobs = salt.utils.minion.running(self.opts)
                     for job in running_jobs:
                         if re.match('state.*', job['fun']):
                             is_running = True
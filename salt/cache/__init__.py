@@ -179,6 +179,84 @@ class Cache(object):
         fun = '{0}.fetch'.format(self.driver)
         return self.modules[fun](bank, key, **self._kwargs)
 
+    def fetch_many(self, bank_keys):
+        '''
+        Fetch several keys at once using the specified module
+
+        Drivers providing a ``fetch_many`` function get all the requested keys
+        in one call (a pipeline, a single query, ...), other drivers fall back
+        to calling ``fetch`` for each key.
+
+        :param bank_keys:
+            An iterable of ``(bank, key)`` tuples to fetch.
+
+        :return:
+            Return a dict mapping each requested ``(bank, key)`` tuple to the
+            python object fetched from the cache or an empty dict if the given
+            path or key not found.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        bank_keys = list(bank_keys)
+        if not bank_keys:
+            return {}
+        fun = '{0}.fetch_many'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](bank_keys, **self._kwargs)
+        fun = '{0}.fetch'.format(self.driver)
+        ret = {}
+        for bank, key in bank_keys:
+            ret[(bank, key)] = self.modules[fun](bank, key, **self._kwargs)
+        return ret
+
+    def store_many(self, data):
+        '''
+        Store several keys at once using the specified module
+
+        Drivers providing a ``store_many`` function store all the given keys
+        in one call, other drivers fall back to calling ``store`` for each key.
+
+        :param data:
+            A dict mapping ``(bank, key)`` tuples to the data which will be
+            stored in the cache.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        if not data:
+            return
+        fun = '{0}.store_many'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](data, **self._kwargs)
+        fun = '{0}.store'.format(self.driver)
+        for (bank, key), value in six.iteritems(data):
+            self.modules[fun](bank, key, value, **self._kwargs)
+
+    def flush_many(self, bank_keys):
+        '''
+        Remove several keys at once using the specified module. A ``None`` key
+        removes the entire bank, as with ``flush``.
+
+        :param bank_keys:
+            An iterable of ``(bank, key)`` tuples to remove.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        '''
+        bank_keys = list(bank_keys)
+        if not bank_keys:
+            return
+        fun = '{0}.flush_many'.format(self.driver)
+        if fun in self.modules:
+            return self.modules[fun](bank_keys, **self._kwargs)
+        fun = '{0}.flush'.format(self.driver)
+        for bank, key in bank_keys:
+            self.modules[fun](bank, key=key, **self._kwargs)
+
     def updated(self, bank, key):
         '''
         Get the last updated epoch for the specified key
@@ -342,16 +420,56 @@ class MemCache(Cache):
         self.storage[(bank, key)] = [now, data]
         return data
 
-    def store(self, bank, key, data):
-        self.storage.pop((bank, key), None)
-        super(MemCache, self).store(bank, key, data)
+    def _remember(self, bank, key, data, now):
         if len(self.storage) >= self.max:
             if self.cleanup:
                 MemCache.__cleanup(self.expire)
             if len(self.storage) >= self.max:
                 self.storage.popitem(last=False)
-        self.storage[(bank, key)] = [time.time(), data]
+        self.storage[(bank, key)] = [now, data]
+
+    def fetch_many(self, bank_keys):
+        now = time.time()
+        ret = {}
+        missing = []
+        for bank, key in bank_keys:
+            if self.debug:
+                self.call += 1
+            record = self.storage.pop((bank, key), None)
+            if record is not None and record[0] + self.expire >= now:
+                if self.debug:
+                    self.hit += 1
+                record[0] = now
+                self.storage[(bank, key)] = record
+                ret[(bank, key)] = record[1]
+            else:
+                missing.append((bank, key))
+        if missing:
+            fetched = super(MemCache, self).fetch_many(missing)
+            for (bank, key), data in six.iteritems(fetched):
+                self._remember(bank, key, data, now)
+                ret[(bank, key)] = data
+        return ret
+
+    def store(self, bank, key, data):
+        self.storage.pop((bank, key), None)
+        super(MemCache, self).store(bank, key, data)
+        self._remember(bank, key, data, time.time())
+
+    def store_many(self, data):
+        for bank_key in data:
+            self.storage.pop(bank_key, None)
+        super(MemCache, self).store_many(data)
+        now = time.time()
+        for (bank, key), value in six.iteritems(data):
+            self._remember(bank, key, value, now)
 
     def flush(self, bank, key=None):
         self.storage.pop((bank, key), None)
         super(MemCache, self).flush(bank, key)
+
+    def flush_many(self, bank_keys):
+        bank_keys = list(bank_keys)
+        for bank_key in bank_keys:
+            self.storage.pop(tuple(bank_key), None)
+        super(MemCache, self).flush_many(bank_keys)
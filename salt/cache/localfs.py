@@ -17,6 +17,7 @@ import os.path
 import errno
 import shutil
 import tempfile
+from multiprocessing.pool import ThreadPool
 
 from salt.exceptions import SaltCacheError
 import salt.utils.atomicfile
@@ -26,6 +27,9 @@ log = logging.getLogger(__name__)
 
 __func_alias__ = {'list_': 'list'}
 
+# Reader threads used by fetch_many, created on first use in each process
+_POOL = {}
+
 
 def __cachedir(kwargs=None):
     if kwargs and 'cachedir' in kwargs:
@@ -100,6 +104,32 @@ def fetch(bank, key, cachedir):
         )
 
 
+def _get_pool():
+    '''
+    Return the reader pool of the current process
+    '''
+    pid = os.getpid()
+    if _POOL.get('pid') != pid:
+        _POOL['pid'] = pid
+        _POOL['pool'] = ThreadPool(
+            max(1, int(__opts__.get('localfs_cache_threads', 8)))
+        )
+    return _POOL['pool']
+
+
+def fetch_many(bank_keys, cachedir):
+    '''
+    Fetch information from several files, reading them in parallel.
+    '''
+    def _fetch(bank_key):
+        return fetch(bank_key[0], bank_key[1], cachedir)
+
+    bank_keys = [tuple(bank_key) for bank_key in bank_keys]
+    if len(bank_keys) < 2:
+        return dict((bank_key, _fetch(bank_key)) for bank_key in bank_keys)
+    return dict(zip(bank_keys, _get_pool().map(_fetch, bank_keys)))
+
+
 def updated(bank, key, cachedir):
     '''
     Return the epoch of the mtime for this cache file
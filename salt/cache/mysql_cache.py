@@ -89,16 +89,16 @@ def __virtual__():
     return bool(MySQLdb), 'No python mysql client installed.' if MySQLdb is None else ''
 
 
-def run_query(conn, query, retries=3):
+def run_query(conn, query, retries=3, args=None):
     '''
-    Get a cursor and run a query. Reconnect up to `retries` times if
-    needed.
+    Get a cursor and run a query, passing ``args`` as the query parameters.
+    Reconnect up to `retries` times if needed.
     Returns: cursor, affected rows counter
     Raises: SaltCacheError, AttributeError, OperationalError
     '''
     try:
         cur = conn.cursor()
-        out = cur.execute(query)
+        out = cur.execute(query, args)
         return cur, out
     except (AttributeError, OperationalError) as e:
         if retries == 0:
@@ -111,7 +111,7 @@ def run_query(conn, query, retries=3):
             log.info("mysql_cache: recreating db connection due to: %r", e)
         global client
         client = MySQLdb.connect(**_mysql_kwargs)
-        return run_query(client, query, retries - 1)
+        return run_query(client, query, retries - 1, args)
     except Exception as e:
         if len(query) > 150:
             query = query[:150] + "<...>"
@@ -211,6 +211,72 @@ def fetch(bank, key):
     return __context__['serial'].loads(r[0])
 
 
+def _bank_keys_clause(bank_keys):
+    '''
+    Return the WHERE clause and its parameters matching a list of
+    ``(bank, key)`` tuples.
+    '''
+    clause = "(bank, etcd_key) IN ({0})".format(
+        ', '.join(['(%s, %s)'] * len(bank_keys)))
+    args = []
+    for bank, key in bank_keys:
+        args.extend((bank, key))
+    return clause, args
+
+
+def store_many(data):
+    '''
+    Store several key values in a single query.
+    '''
+    _init_client()
+    args = []
+    for (bank, key), value in data.items():
+        args.extend((bank, key, __context__['serial'].dumps(value)))
+    query = "REPLACE INTO {0} (bank, etcd_key, data) values {1}".format(
+        _table_name, ', '.join(['(%s, %s, %s)'] * len(data)))
+    cur, _ = run_query(client, query, args=args)
+    cur.close()
+
+
+def fetch_many(bank_keys):
+    '''
+    Fetch several key values in a single query.
+    '''
+    _init_client()
+    bank_keys = [tuple(bank_key) for bank_key in bank_keys]
+    clause, args = _bank_keys_clause(bank_keys)
+    query = "SELECT bank, etcd_key, data FROM {0} WHERE {1}".format(
+        _table_name, clause)
+    cur, _ = run_query(client, query, args=args)
+    rows = cur.fetchall()
+    cur.close()
+    ret = dict((bank_key, {}) for bank_key in bank_keys)
+    for bank, key, data in rows:
+        ret[(bank, key)] = __context__['serial'].loads(data)
+    return ret
+
+
+def flush_many(bank_keys):
+    '''
+    Remove several keys in a single query. Entries without a key remove the
+    whole bank.
+    '''
+    _init_client()
+    keyed = [tuple(bank_key) for bank_key in bank_keys if bank_key[1] is not None]
+    banks = [bank for bank, key in bank_keys if key is None]
+    clauses = []
+    args = []
+    if keyed:
+        clause, args = _bank_keys_clause(keyed)
+        clauses.append(clause)
+    if banks:
+        clauses.append("bank IN ({0})".format(', '.join(['%s'] * len(banks))))
+        args.extend(banks)
+    query = "DELETE FROM {0} WHERE {1}".format(_table_name, ' OR '.join(clauses))
+    cur, _ = run_query(client, query, args=args)
+    cur.close()
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content.
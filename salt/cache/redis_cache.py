@@ -157,6 +157,7 @@ except ImportError:
     HAS_REDIS_CLUSTER = False
 
 # Import salt
+from salt.ext import six
 from salt.ext.six.moves import range
 from salt.exceptions import SaltCacheError
 
@@ -376,6 +377,73 @@ def fetch(bank, key):
     return __context__['serial'].loads(redis_value)
 
 
+def store_many(data):
+    '''
+    Store several keys in a single Redis pipeline.
+    '''
+    redis_server = _get_redis_server()
+    redis_pipe = redis_server.pipeline()
+    try:
+        built = set()
+        for (bank, key), value in six.iteritems(data):
+            if bank not in built:
+                _build_bank_hier(bank, redis_pipe)
+                built.add(bank)
+            redis_pipe.set(_get_key_redis_key(bank, key),
+                           __context__['serial'].dumps(value))
+            redis_pipe.sadd(_get_bank_keys_redis_key(bank), key)
+        log.debug('Setting %d keys in a single pipeline', len(data))
+        redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot set the Redis cache keys: {rerr}'.format(rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+
+
+def fetch_many(bank_keys):
+    '''
+    Fetch several keys from the Redis cache in a single round trip.
+    '''
+    bank_keys = [tuple(bank_key) for bank_key in bank_keys]
+    redis_server = _get_redis_server()
+    redis_keys = [_get_key_redis_key(bank, key) for bank, key in bank_keys]
+    try:
+        redis_values = redis_server.mget(redis_keys)
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot fetch the Redis cache keys: {rerr}'.format(rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    ret = {}
+    for bank_key, redis_value in zip(bank_keys, redis_values):
+        if redis_value is None:
+            ret[bank_key] = {}
+        else:
+            ret[bank_key] = __context__['serial'].loads(redis_value)
+    return ret
+
+
+def flush_many(bank_keys):
+    '''
+    Remove several keys in a single Redis pipeline. Entries without a key
+    remove the whole bank using :py:func:`flush`.
+    '''
+    redis_server = _get_redis_server()
+    redis_pipe = redis_server.pipeline()
+    for bank, key in bank_keys:
+        if key is None:
+            flush(bank)
+            continue
+        redis_pipe.delete(_get_key_redis_key(bank, key))
+        redis_pipe.srem(_get_bank_keys_redis_key(bank), key)
+    try:
+        redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = 'Cannot flush the Redis cache keys: {rerr}'.format(rerr=rerr)
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    return True
+
+
 def flush(bank, key=None):
     '''
     Remove the key from the cache bank with all the key content. If no key is specified, remove
@@ -5,9 +5,9 @@ Execute batch runs
 
 # Import python libs
 
+import collections
 import math
 import time
-import copy
 from datetime import datetime, timedelta
 
 # Import salt libs
@@ -19,7 +19,6 @@ import salt.exceptions
 # Import 3rd-party libs
 # pylint: disable=import-error,no-name-in-module,redefined-builtin
 from salt.ext import six
-from salt.ext.six.moves import range
 # pylint: enable=import-error,no-name-in-module,redefined-builtin
 import logging
 
@@ -29,55 +28,49 @@ log = logging.getLogger(__name__)
 class Batch(object):
     '''
     Manage the execution of batch runs
+
+    The batch is driven by the returns read from a single subscription to the
+    job events: the targets are pinged once, every minion is sent the job as
+    soon as it answered the ping and a slot of the batch is free, and a slot is
+    freed as soon as a minion returns.
     '''
-    def __init__(self, opts, eauth=None, quiet=False, parser=None):
+    def __init__(self, opts, eauth=None, quiet=False, parser=None, local=None):
         self.opts = opts
         self.eauth = eauth if eauth else {}
         self.pub_kwargs = eauth if eauth else {}
         self.quiet = quiet
-        self.local = salt.client.get_local_client(opts['conf_file'])
-        self.minions, self.ping_gen, self.down_minions = self.__gather_minions()
+        if local is None:
+            local = salt.client.get_local_client(opts['conf_file'])
+        self.local = local
+        self.event = self.local.event
+        # Connect to the event bus before the first publish so that no return
+        # is missed, and leave it connected if the client was listening before
+        self._was_listening = self.event.cpub
+        self.event.connect_pub()
+        self.minions, self.ping_jid, self.down_minions = self.__gather_minions()
         self.options = parser
 
     def __gather_minions(self):
         '''
-        Return a list of minions to use for the batch run
+        Ping the targets of the batch run and return the minions which are
+        expected to answer. The answers are read along with the returns of
+        the batch jobs in :py:meth:`run`, the minions answering which were not
+        expected (behind a syndic) are added to the batch.
         '''
-        args = [self.opts['tgt'],
-                'test.ping',
-                [],
-                self.opts['timeout'],
-                ]
-
         selected_target_option = self.opts.get('selected_target_option', None)
-        if selected_target_option is not None:
-            args.append(selected_target_option)
-        else:
-            args.append(self.opts.get('tgt_type', 'glob'))
+        if selected_target_option is None:
+            selected_target_option = self.opts.get('tgt_type', 'glob')
 
-        self.pub_kwargs['yield_pub_data'] = True
-        ping_gen = self.local.cmd_iter(*args,
-                                       gather_job_timeout=self.opts['gather_job_timeout'],
-                                       **self.pub_kwargs)
-
-        # Broadcast to targets
-        fret = set()
-        nret = set()
-        for ret in ping_gen:
-            if ('minions' and 'jid') in ret:
-                for minion in ret['minions']:
-                    nret.add(minion)
-                continue
-            else:
-                try:
-                    m = next(six.iterkeys(ret))
-                except StopIteration:
-                    if not self.quiet:
-                        salt.utils.stringutils.print_cli('No minions matched the target.')
-                    break
-                if m is not None:
-                    fret.add(m)
-        return (list(fret), ping_gen, nret.difference(fret))
+        pub_data = self.local.run_job(
+            self.opts['tgt'],
+            'test.ping',
+            [],
+            selected_target_option,
+            timeout=self.opts['timeout'],
+            **self.pub_kwargs)
+        if not pub_data:
+            return [], None, set()
+        return list(pub_data.get('minions', [])), pub_data.get('jid'), set()
 
     def get_bnum(self):
         '''
@@ -106,148 +99,201 @@ class Batch(object):
         if i:
             del wait[:i]
 
+    def __format_return(self, raw):
+        '''
+        Return a job return event in the form returned by
+        :py:meth:`salt.client.LocalClient.get_iter_returns`
+        '''
+        if self.opts.get('raw'):
+            return raw
+        ret = {'ret': raw['data']['return']}
+        for key in ('out', 'retcode', 'jid'):
+            if key in raw['data']:
+                ret[key] = raw['data'][key]
+        return ret
+
+    def __publish(self, minions, fun, arg, timeout, show_jid=False, verbose=False):
+        '''
+        Publish a job to a list of minions without subscribing to its returns,
+        which are read from the batch's event subscription
+        '''
+        try:
+            pub_data = self.local.run_job(
+                minions,
+                fun,
+                arg,
+                'list',
+                ret=self.opts.get('return', self.opts.get('ret', '')),
+                timeout=timeout,
+                listen=False,
+                **self.eauth)
+        except salt.exceptions.SaltClientError as exc:
+            log.error('Failed to publish %s to %s: %s', fun, minions, exc)
+            return None
+        jid = pub_data.get('jid') if pub_data else None
+        if jid is not None and not self.quiet:
+            if verbose:
+                msg = 'Executing job with jid {0}'.format(jid)
+                salt.utils.stringutils.print_cli(msg)
+                salt.utils.stringutils.print_cli('-' * len(msg) + '\n')
+            elif show_jid:
+                salt.utils.stringutils.print_cli('jid: {0}'.format(jid))
+        return jid
+
     def run(self):
         '''
         Execute the batch run
         '''
-        args = [[],
-                self.opts['fun'],
-                self.opts['arg'],
-                self.opts['timeout'],
-                'list',
-                ]
+        try:
+            for ret in self._run():
+                yield ret
+        finally:
+            if not self._was_listening:
+                self.event.close_pub()
+
+    def _run(self):
         bnum = self.get_bnum()
         # No targets to run
-        if not self.minions:
+        if self.ping_jid is None:
+            if not self.quiet:
+                salt.utils.stringutils.print_cli('No minions matched the target.')
             return
-        to_run = copy.deepcopy(self.minions)
-        active = []
-        ret = {}
-        iters = []
-        # wait the specified time before decide a job is actually done
-        bwait = self.opts.get('batch_wait', 0)
-        wait = []
-
         if self.options:
             show_jid = self.options.show_jid
-            show_verbose = self.options.verbose
+            verbose = self.options.verbose
         else:
             show_jid = False
-            show_verbose = False
-
-        # the minion tracker keeps track of responses and iterators
-        # - it removes finished iterators from iters[]
-        # - if a previously detected minion does not respond, its
-        #   added with an empty answer to ret{} once the timeout is reached
-        # - unresponsive minions are removed from active[] to make
-        #   sure that the main while loop finishes even with unresp minions
-        minion_tracker = {}
-
-        if not self.quiet:
-            # We already know some minions didn't respond to the ping, so inform
-            # the user we won't be attempting to run a job on them
-            for down_minion in self.down_minions:
-                salt.utils.stringutils.print_cli('Minion {0} did not respond. No job will be sent.'.format(down_minion))
-
-        # Iterate while we still have things to execute
-        while len(ret) < len(self.minions):
-            next_ = []
-            if bwait and wait:
-                self.__update_wait(wait)
-            if len(to_run) <= bnum - len(wait) and not active:
-                # last bit of them, add them all to next iterator
-                while to_run:
-                    next_.append(to_run.pop())
-            else:
-                for i in range(bnum - len(active) - len(wait)):
-                    if to_run:
-                        minion_id = to_run.pop()
-                        if isinstance(minion_id, dict):
-                            next_.append(list(minion_id.keys())[0])
-                        else:
-                            next_.append(minion_id)
-
-            active += next_
-            args[0] = next_
+            verbose = False
+        # The master of masters does not know all the minions behind its
+        # syndics, wait for their answers to the ping until the timeout
+        expected_all = bool(self.minions) and not self.local.opts.get('order_masters')
+        timeout = self.opts['timeout']
+        gather_job_timeout = self.opts['gather_job_timeout']
+        # wait the specified time before decide a job is actually done
+        bwait = self.opts.get('batch_wait', 0)
+        wait = []
 
-            if next_:
-                if not self.quiet:
-                    salt.utils.stringutils.print_cli('\nExecuting run on {0}\n'.format(sorted(next_)))
-                # create a new iterator for this batch of minions
-                new_iter = self.local.cmd_iter_no_block(
-                                *args,
-                                raw=self.opts.get('raw', False),
-                                ret=self.opts.get('return', ''),
-                                show_jid=show_jid,
-                                verbose=show_verbose,
-                                gather_job_timeout=self.opts['gather_job_timeout'],
-                                **self.eauth)
-                # add it to our iterators and to the minion_tracker
-                iters.append(new_iter)
-                minion_tracker[new_iter] = {}
-                # every iterator added is 'active' and has its set of minions
-                minion_tracker[new_iter]['minions'] = next_
-                minion_tracker[new_iter]['active'] = True
+        # The minions which answered the ping and still have to run the job
+        to_run = collections.deque()
+        answered = set()
+        # The minions running the job, mapped to the jid of their job, the
+        # time at which they are checked on and the jid of the find_job
+        # checking on them
+        active = {}
+        jobs = set()
+        find_jobs = set()
+        # The minions which returned, timed out or did not answer the ping
+        done = set()
+        ret = {}
+        ping_timeout_at = time.time() + timeout
 
-            else:
-                time.sleep(0.02)
+        while ping_timeout_at is not None or len(done) < len(self.minions):
+            now = time.time()
             parts = {}
 
-            # see if we found more minions
-            for ping_ret in self.ping_gen:
-                if ping_ret is None:
-                    break
-                m = next(six.iterkeys(ping_ret))
-                if m not in self.minions:
-                    self.minions.append(m)
-                    to_run.append(m)
+            # Read all the events which arrived, waiting for the first one up
+            # to the next timeout
+            timeouts = [info[1] for info in six.itervalues(active)]
+            if ping_timeout_at is not None:
+                timeouts.append(ping_timeout_at)
+            if bwait and wait and to_run:
+                timeouts.append(time.mktime(wait[0].timetuple()) + wait[0].microsecond / 1e6)
+            next_wait = max(min(timeouts) - now, 0.01) if timeouts else 1
+            raw = self.event.get_event(
+                wait=next_wait,
+                tag='salt/job/',
+                match_type='startswith',
+                full=True,
+                auto_reconnect=self.local.auto_reconnect)
+            while raw is not None:
+                data = raw.get('data', {})
+                jid = data.get('jid')
+                id_ = data.get('id')
+                if 'return' in data and id_ is not None:
+                    if jid == self.ping_jid:
+                        if id_ not in answered and id_ not in done:
+                            answered.add(id_)
+                            if id_ not in self.minions:
+                                self.minions.append(id_)
+                                bnum = self.get_bnum()
+                            to_run.append(id_)
+                    elif jid in jobs:
+                        if id_ in active and active[id_][0] == jid:
+                            del active[id_]
+                            parts[id_] = self.__format_return(raw)
+                    elif jid in find_jobs:
+                        # The minion is still running the job
+                        if id_ in active and active[id_][2] == jid and data['return']:
+                            active[id_][1] = time.time() + timeout
+                            active[id_][2] = None
+                raw = self.event.get_event(
+                    tag='salt/job/',
+                    match_type='startswith',
+                    full=True,
+                    no_block=True,
+                    auto_reconnect=self.local.auto_reconnect)
 
-            for queue in iters:
-                try:
-                    # Gather returns until we get to the bottom
-                    ncnt = 0
-                    while True:
-                        part = next(queue)
-                        if part is None:
-                            time.sleep(0.01)
-                            ncnt += 1
-                            if ncnt > 5:
-                                break
-                            continue
-                        if self.opts.get('raw'):
-                            parts.update({part['data']['id']: part})
-                            if part['data']['id'] in minion_tracker[queue]['minions']:
-                                minion_tracker[queue]['minions'].remove(part['data']['id'])
-                            else:
-                                salt.utils.stringutils.print_cli('minion {0} was already deleted from tracker, probably a duplicate key'.format(part['id']))
-                        else:
-                            parts.update(part)
-                            for id in part:
-                                if id in minion_tracker[queue]['minions']:
-                                    minion_tracker[queue]['minions'].remove(id)
-                                else:
-                                    salt.utils.stringutils.print_cli('minion {0} was already deleted from tracker, probably a duplicate key'.format(id))
-                except StopIteration:
-                    # if a iterator is done:
-                    # - set it to inactive
-                    # - add minions that have not responded to parts{}
+            now = time.time()
+            if ping_timeout_at is not None and (
+                    now >= ping_timeout_at
+                    or (expected_all and answered.issuperset(self.minions))):
+                ping_timeout_at = None
+                if not self.minions:
+                    if not self.quiet:
+                        salt.utils.stringutils.print_cli('No minions matched the target.')
+                    return
+                for minion in self.minions:
+                    if minion not in answered:
+                        self.down_minions.add(minion)
+                        done.add(minion)
+                        if not self.quiet:
+                            salt.utils.stringutils.print_cli(
+                                'Minion {0} did not respond. No job will be sent.'.format(minion))
 
-                    # check if the tracker contains the iterator
-                    if queue in minion_tracker:
-                        minion_tracker[queue]['active'] = False
+            # Check on the minions which did not return in time, and give up
+            # on the ones which were checked on already
+            checks = {}
+            for minion, info in six.iteritems(active):
+                if info[1] > now:
+                    continue
+                if info[2] is None:
+                    checks.setdefault(info[0], []).append(minion)
+                else:
+                    parts[minion] = {'ret': {}}
+                    if show_jid or verbose:
+                        parts[minion]['jid'] = info[0]
+            for minion in parts:
+                active.pop(minion, None)
+            for jid, minions in six.iteritems(checks):
+                find_jid = self.__publish(minions, 'saltutil.find_job', [jid], gather_job_timeout)
+                for minion in minions:
+                    active[minion][1] = now + gather_job_timeout
+                    active[minion][2] = find_jid or ''
+                if find_jid:
+                    find_jobs.add(find_jid)
 
-                        # add all minions that belong to this iterator and
-                        # that have not responded to parts{} with an empty response
-                        for minion in minion_tracker[queue]['minions']:
-                            if minion not in parts:
-                                parts[minion] = {}
-                                parts[minion]['ret'] = {}
+            # Send the job to as many waiting minions as the batch allows
+            if bwait and wait:
+                self.__update_wait(wait)
+            if to_run and bnum - len(active) - len(wait) > 0:
+                next_ = [to_run.popleft()
+                         for _ in range(min(len(to_run), bnum - len(active) - len(wait)))]
+                if not self.quiet:
+                    salt.utils.stringutils.print_cli('\nExecuting run on {0}\n'.format(sorted(next_)))
+                jid = self.__publish(next_, self.opts['fun'], self.opts['arg'], timeout,
+                                     show_jid=show_jid, verbose=verbose)
+                for minion in next_:
+                    if jid is None:
+                        parts[minion] = {'ret': {}}
+                    else:
+                        active[minion] = [jid, time.time() + timeout, None]
+                if jid is not None:
+                    jobs.add(jid)
 
             for minion, data in six.iteritems(parts):
-                if minion in active:
-                    active.remove(minion)
-                    if bwait:
-                        wait.append(datetime.now() + timedelta(seconds=bwait))
+                done.add(minion)
+                if bwait:
+                    wait.append(datetime.now() + timedelta(seconds=bwait))
                 # Munge retcode into return data
                 failhard = False
                 if 'retcode' in data and isinstance(data['ret'], dict) and 'retcode' not in data['ret']:
@@ -255,7 +301,7 @@ class Batch(object):
                     if self.opts.get('failhard') and data['ret']['retcode'] > 0:
                         failhard = True
                 else:
-                    if self.opts.get('failhard') and data['retcode'] > 0:
+                    if self.opts.get('failhard') and data.get('retcode', 0) > 0:
                         failhard = True
 
                 if self.opts.get('raw'):
@@ -280,16 +326,4 @@ class Batch(object):
                         'Minion %s returned with non-zero exit code. '
                         'Batch run stopped due to failhard', minion
                     )
-                    raise StopIteration
-
-            # remove inactive iterators from the iters list
-            for queue in minion_tracker:
-                # only remove inactive queues
-                if not minion_tracker[queue]['active'] and queue in iters:
-                    iters.remove(queue)
-                    # also remove the iterator's minions from the active list
-                    for minion in minion_tracker[queue]['minions']:
-                        if minion in active:
-                            active.remove(minion)
-                            if bwait:
-                                wait.append(datetime.now() + timedelta(seconds=bwait))
+                    return
@@ -24,7 +24,7 @@ import os
 import time
 import random
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Import salt libs
 import salt.config
@@ -69,6 +69,8 @@ except ImportError:
 
 # Import tornado
 import tornado.gen  # pylint: disable=F0401
+import tornado.ioloop  # pylint: disable=F0401
+import tornado.queues  # pylint: disable=F0401
 
 log = logging.getLogger(__name__)
 
@@ -570,7 +572,7 @@ class LocalClient(object):
         for key, val in six.iteritems(self.opts):
             if key not in opts:
                 opts[key] = val
-        batch = salt.cli.batch.Batch(opts, eauth=eauth, quiet=True)
+        batch = salt.cli.batch.Batch(opts, eauth=eauth, quiet=True, local=self)
         for ret in batch.run():
             yield ret
 
@@ -1896,6 +1898,482 @@ class LocalClient(object):
         self.event.unsubscribe('salt/job/{0}'.format(job_id))
 
 
+class JobEventDemux(object):
+    '''
+    A single master event subscription shared by the asynchronous clients of
+    a process running on the same IOLoop. The job events are dispatched by
+    JID to the queue registered for the job, so each event is read and
+    unpacked once however many jobs are being waited on.
+
+    Use :py:meth:`JobEventDemux.get` rather than creating instances.
+    '''
+    # (sock_dir, io_loop) -> JobEventDemux
+    _instances = {}
+
+    def __init__(self, opts, io_loop):
+        self.io_loop = io_loop
+        self.event = salt.utils.event.get_event(
+                'master',
+                opts['sock_dir'],
+                opts['transport'],
+                opts=opts,
+                listen=True,
+                io_loop=io_loop)
+        # jid -> tornado.queues.Queue of (jid, event)
+        self.jobs = {}
+        self.event.set_event_handler(self._handle_event)
+
+    @classmethod
+    def get(cls, opts, io_loop):
+        '''
+        Return the demultiplexer of the master event bus for this IOLoop
+        '''
+        key = (opts['sock_dir'], io_loop)
+        if key not in cls._instances:
+            cls._instances[key] = cls(opts, io_loop)
+        return cls._instances[key]
+
+    @tornado.gen.coroutine
+    def connect(self, timeout=None):
+        '''
+        Wait for the event subscription to be connected, so that the events
+        of a job published afterwards can't be missed. Returns False if the
+        subscription isn't connected after ``timeout`` seconds.
+        '''
+        timeout_at = None if timeout is None else time.time() + timeout
+        while not self.event.subscriber.connected():
+            if timeout_at is not None and time.time() > timeout_at:
+                raise tornado.gen.Return(False)
+            yield tornado.gen.sleep(0.01)
+        raise tornado.gen.Return(True)
+
+    def register(self, jid, queue=None):
+        '''
+        Queue the events of ``jid`` on ``queue``, or on a new queue, and
+        return the queue
+        '''
+        if queue is None:
+            queue = tornado.queues.Queue()
+        self.jobs[jid] = queue
+        return queue
+
+    def unregister(self, jid):
+        '''
+        Stop queueing the events of ``jid``
+        '''
+        self.jobs.pop(jid, None)
+
+    def _handle_event(self, raw):
+        '''
+        Callback for the events on the event sub socket
+        '''
+        if not self.jobs:
+            return
+        mtag, data = self.event.unpack(raw, self.event.serial)
+        # salt/job/<jid>/... and syndic/<syndic>/.../<jid>/...
+        if mtag.startswith('salt/job/'):
+            parts = mtag.split('/')[2:3]
+        elif mtag.startswith('syndic/'):
+            parts = mtag.split('/')[2:]
+        else:
+            return
+        for jid in parts:
+            queue = self.jobs.get(jid)
+            if queue is not None:
+                queue.put_nowait((jid, {'tag': mtag, 'data': data}))
+                return
+
+
+class AsyncLocalClient(object):
+    '''
+    A non-blocking counterpart of the :py:class:`LocalClient`, whose methods
+    are Tornado coroutines. All the clients of a process on the same IOLoop
+    share a single subscription to the master event bus, demultiplexed by
+    JID, so any number of jobs can be waited on concurrently without a
+    thread per job.
+
+    .. versionadded:: Neon
+
+    .. code-block:: python
+
+        import salt.client
+        import tornado.gen
+
+        @tornado.gen.coroutine
+        def ping(tgt):
+            local = salt.client.AsyncLocalClient()
+            ret = yield local.cmd(tgt, 'test.ping')
+            raise tornado.gen.Return(ret)
+    '''
+    def __init__(self,
+                 c_path=os.path.join(syspaths.CONFIG_DIR, 'master'),
+                 mopts=None,
+                 skip_perm_errors=False,
+                 io_loop=None):
+        '''
+        :param IOLoop io_loop: io_loop the coroutines run on, defaults to the
+                               current IOLoop.
+        '''
+        self.io_loop = io_loop or tornado.ioloop.IOLoop.current()
+        self.local = LocalClient(c_path,
+                                 mopts=mopts,
+                                 skip_perm_errors=skip_perm_errors,
+                                 io_loop=self.io_loop,
+                                 keep_loop=True)
+        self.opts = self.local.opts
+        self.demux = JobEventDemux.get(self.opts, self.io_loop)
+
+    @tornado.gen.coroutine
+    def _run_job(self, queue, tgt, fun, arg=(), tgt_type='glob', ret='',
+                 timeout=None, jid='', kwarg=None, **kwargs):
+        '''
+        Publish a job whose events are queued on ``queue``, or not listened
+        to if ``queue`` is None
+        '''
+        if queue is not None:
+            if not jid:
+                # The events must be routed before the job is published
+                jid = salt.utils.jid.gen_jid(self.opts)
+            self.demux.register(jid, queue)
+            if not (yield self.demux.connect(timeout=self.local._get_timeout(timeout))):
+                self.demux.unregister(jid)
+                raise SaltClientError('Unable to connect to the master event bus')
+        try:
+            pub_data = yield self.local.run_job_async(tgt,
+                                                      fun,
+                                                      arg,
+                                                      tgt_type,
+                                                      ret,
+                                                      timeout,
+                                                      jid,
+                                                      kwarg=kwarg,
+                                                      listen=False,
+                                                      io_loop=self.io_loop,
+                                                      **kwargs)
+        except Exception:
+            self.demux.unregister(jid)
+            raise
+        if not pub_data:
+            self.demux.unregister(jid)
+        raise tornado.gen.Return(pub_data)
+
+    @tornado.gen.coroutine
+    def run_job(self,
+                tgt,
+                fun,
+                arg=(),
+                tgt_type='glob',
+                ret='',
+                timeout=None,
+                jid='',
+                kwarg=None,
+                listen=True,
+                **kwargs):
+        '''
+        Publish a command to the targeted minions, see
+        :py:meth:`LocalClient.run_job`.
+
+        When ``listen`` is True, the events of the job are queued until they
+        are consumed by :py:meth:`iter_returns`.
+
+        :return: A dictionary of (validated) ``pub_data`` or an empty
+            dictionary on failure.
+        '''
+        queue = tornado.queues.Queue() if listen else None
+        pub_data = yield self._run_job(queue, tgt, fun, arg, tgt_type, ret,
+                                       timeout, jid, kwarg, **kwargs)
+        raise tornado.gen.Return(pub_data)
+
+    @tornado.gen.coroutine
+    def _collect(self, jid, queue, minions, timeout):
+        '''
+        Return the returns of ``jid`` received within ``timeout`` seconds
+        '''
+        minions = set(minions)
+        ret = {}
+        timeout_at = time.time() + timeout
+        try:
+            while minions.difference(ret) and time.time() < timeout_at:
+                try:
+                    _, raw = yield queue.get(
+                        timeout=timedelta(seconds=timeout_at - time.time()))
+                except tornado.gen.TimeoutError:
+                    break
+                if 'return' in raw['data'] and 'id' in raw['data']:
+                    ret[raw['data']['id']] = raw['data']
+        finally:
+            self.demux.unregister(jid)
+        raise tornado.gen.Return(ret)
+
+    @tornado.gen.coroutine
+    def gather_job_info(self, jid, tgt, tgt_type, **kwargs):
+        '''
+        Ask the targeted minions whether they are still running ``jid``
+
+        :return: The ``saltutil.find_job`` returns of the minions still
+            running the job, keyed by minion ID.
+        '''
+        log.debug('Checking whether jid %s is still running', jid)
+        timeout = int(kwargs.get('gather_job_timeout', self.opts['gather_job_timeout']))
+        queue = tornado.queues.Queue()
+        pub_data = yield self._run_job(queue,
+                                       tgt,
+                                       'saltutil.find_job',
+                                       arg=[jid],
+                                       tgt_type=tgt_type,
+                                       timeout=timeout,
+                                       **kwargs)
+        if not pub_data:
+            raise tornado.gen.Return({})
+        rets = yield self._collect(pub_data['jid'], queue, pub_data['minions'], timeout)
+        raise tornado.gen.Return(
+            dict((id_, data['return']) for id_, data in six.iteritems(rets)
+                 if isinstance(data['return'], dict) and data['return']))
+
+    def iter_returns(self,
+                     jid,
+                     minions,
+                     timeout=None,
+                     tgt='*',
+                     tgt_type='glob',
+                     expect_minions=False,
+                     **kwargs):
+        '''
+        Watch the returns of a job published by :py:meth:`run_job`, with the
+        same rules as :py:meth:`LocalClient.get_iter_returns` to decide when
+        the minions are done. Returns a :py:class:`JobReturns` iterator, whose
+        ``next()`` coroutine returns the job returns as they come in:
+
+        .. code-block:: python
+
+            pub_data = yield local.run_job('*', 'test.ping')
+            returns = local.iter_returns(pub_data['jid'], pub_data['minions'])
+            while not returns.done():
+                ret = yield returns.next()
+        '''
+        returns = JobReturns()
+        self.io_loop.spawn_callback(self._watch_returns,
+                                    returns,
+                                    jid,
+                                    minions,
+                                    self.local._get_timeout(timeout),
+                                    expect_minions,
+                                    **kwargs)
+        return returns
+
+    @tornado.gen.coroutine
+    def _watch_returns(self, returns, jid, minions, timeout, expect_minions, **kwargs):
+        '''
+        Feed ``returns`` with the returns of ``jid``
+        '''
+        queue = self.demux.jobs.get(jid)
+        if queue is None:
+            queue = self.demux.register(jid)
+        minions = set(minions)
+        gather_job_timeout = int(kwargs.get('gather_job_timeout', self.opts['gather_job_timeout']))
+        found = set()
+        missing = set()
+        # timeouts per minion, id_ -> timeout time
+        minion_timeouts = {}
+        # jids of the saltutil.find_job jobs checking on this job
+        jinfo_jids = set()
+        timeout_at = time.time() + timeout
+        gather_syndic_wait = time.time() + self.opts['syndic_wait']
+        # are there still minions running the job out there
+        # start as True so that we ping at least once
+        minions_running = True
+        try:
+            while True:
+                if len(found.intersection(minions)) >= len(minions):
+                    if not self.opts['order_masters']:
+                        log.debug('jid %s found all minions %s', jid, found)
+                        break
+                    if found and time.time() > gather_syndic_wait:
+                        break
+
+                now = time.time()
+                for id_ in minions - found:
+                    if id_ not in minion_timeouts:
+                        minion_timeouts[id_] = now + timeout
+
+                # if the job has timed out and some minions are still running
+                # it, ask them again
+                if now > timeout_at and minions_running:
+                    jinfo = yield self._run_job(queue,
+                                                list(minions - found),
+                                                'saltutil.find_job',
+                                                arg=[jid],
+                                                tgt_type='list',
+                                                timeout=gather_job_timeout,
+                                                **kwargs)
+                    minions_running = False
+                    if 'jid' in jinfo:
+                        jinfo_jids.add(jinfo['jid'])
+                    timeout_at = time.time() + gather_job_timeout
+                    if self.opts['order_masters']:
+                        timeout_at += self.opts.get('syndic_wait', 1)
+                    now = time.time()
+
+                wake = [timeout_at] if now < timeout_at else []
+                if not minions_running:
+                    wake.extend(minion_timeouts[id_] for id_ in minions - found
+                                if minion_timeouts[id_] > now)
+                    if not wake:
+                        break
+                if self.opts['order_masters'] and now < gather_syndic_wait:
+                    wake.append(gather_syndic_wait)
+                try:
+                    event_jid, raw = yield queue.get(
+                        timeout=timedelta(seconds=max(min(wake) - now, 0)))
+                except tornado.gen.TimeoutError:
+                    continue
+
+                data = raw['data']
+                if event_jid == jid:
+                    if 'minions' in data:
+                        minions.update(data['minions'])
+                        missing.update(data.get('missing', ()))
+                        continue
+                    if 'return' not in data:
+                        continue
+                    found.add(data['id'])
+                    if kwargs.get('raw', False):
+                        returns.put(raw)
+                        continue
+                    ret = {data['id']: {'ret': data['return']}}
+                    for key in ('out', 'retcode', 'jid'):
+                        if key in data:
+                            ret[data['id']][key] = data[key]
+                    if kwargs.get('_cmd_meta', False):
+                        ret[data['id']].update(data)
+                    log.debug('jid %s return from %s', jid, data['id'])
+                    returns.put(ret)
+                    continue
+
+                # a saltutil.find_job event
+                if (data.get('retcode') or 0) > 0:
+                    log.error('saltutil returning errors on minion %s', data.get('id'))
+                    minions.discard(data.get('id'))
+                    continue
+                if 'minions' in data:
+                    minions.update(data['minions'])
+                    continue
+                if 'return' not in data:
+                    continue
+                # if the job isn't running there anymore... don't count
+                if not isinstance(data['return'], dict) or data['return'] == {}:
+                    continue
+                if data['return'].get('return') == {}:
+                    continue
+                minions.add(data['id'])
+                # update this minion's timeout, as long as the job is still running
+                minion_timeouts[data['id']] = time.time() + timeout
+                # a minion returned, so we know its running somewhere
+                minions_running = True
+
+            if expect_minions:
+                for minion in minions - found:
+                    returns.put({minion: {'failed': True}})
+            # Report on the missing minions for which no return was received
+            for minion in missing - found:
+                returns.put({minion: {'failed': True}})
+        except Exception as exc:
+            log.error('Failed to watch the returns of jid %s', jid, exc_info=True)
+            returns.fail(exc)
+        finally:
+            self.demux.unregister(jid)
+            for jinfo_jid in jinfo_jids:
+                self.demux.unregister(jinfo_jid)
+            returns.finish()
+
+    @tornado.gen.coroutine
+    def cmd(self,
+            tgt,
+            fun,
+            arg=(),
+            timeout=None,
+            tgt_type='glob',
+            ret='',
+            jid='',
+            full_return=False,
+            kwarg=None,
+            **kwargs):
+        '''
+        Execute a command on the targeted minions and return all of their
+        returns, see :py:meth:`LocalClient.cmd`
+        '''
+        pub_data = yield self.run_job(tgt,
+                                      fun,
+                                      arg,
+                                      tgt_type,
+                                      ret,
+                                      timeout,
+                                      jid,
+                                      kwarg=kwarg,
+                                      **kwargs)
+        if not pub_data:
+            raise tornado.gen.Return(pub_data)
+
+        ret = {}
+        returns = self.iter_returns(pub_data['jid'],
+                                    pub_data['minions'],
+                                    timeout,
+                                    tgt,
+                                    tgt_type,
+                                    **kwargs)
+        while not returns.done():
+            fn_ret = yield returns.next()
+            if fn_ret:
+                for mid, data in six.iteritems(fn_ret):
+                    ret[mid] = (data if full_return
+                                else data.get('ret', {}))
+        for failed in list(set(pub_data['minions']) - set(ret)):
+            ret[failed] = False
+        raise tornado.gen.Return(ret)
+
+
+class JobReturns(object):
+    '''
+    The returns of a job, as given by :py:meth:`AsyncLocalClient.iter_returns`
+    '''
+    _END = object()
+
+    def __init__(self):
+        self._queue = tornado.queues.Queue()
+        self._done = False
+        self._error = None
+
+    def put(self, ret):
+        self._queue.put_nowait(ret)
+
+    def fail(self, exc):
+        self._error = exc
+
+    def finish(self):
+        self._queue.put_nowait(self._END)
+
+    def done(self):
+        '''
+        Return True once all the returns have been consumed
+        '''
+        return self._done
+
+    @tornado.gen.coroutine
+    def next(self):
+        '''
+        Return the next job return, or None when there are no more returns
+        '''
+        if self._done:
+            raise tornado.gen.Return(None)
+        ret = yield self._queue.get()
+        if ret is self._END:
+            self._done = True
+            if self._error is not None:
+                raise self._error
+            raise tornado.gen.Return(None)
+        raise tornado.gen.Return(ret)
+
+
 class FunctionWrapper(dict):
     '''
     Create a function wrapper that looks like the functions dict on the minion
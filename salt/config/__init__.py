@@ -188,6 +188,13 @@ VALID_OPTS = {
     # '': Disable the key cache [default]
     'key_cache': six.string_types,
 
+    # How each master process keeps its in-memory list of accepted minion keys up to date.
+    # Available types:
+    # 'poll': Reuse the list until the mtime of the key directory changes [default]
+    # 'inotify': Update the list from inotify events, requires pyinotify
+    # '': Disable the in-memory list and list the key directory on every lookup
+    'accepted_key_cache': six.string_types,
+
     # The user under which the daemon should run
     'user': six.string_types,
 
@@ -316,6 +323,10 @@ VALID_OPTS = {
     # Order of preference for optimized .pyc files (PY3 only)
     'optimization_order': list,
 
+    # Cache the file mappings of the loaders and the modules rejected by
+    # __virtual__ functions which declare __virtual_cache__
+    'loader_cache': bool,
+
     # Refuse to load these modules
     'disable_modules': list,
 
@@ -380,6 +391,12 @@ VALID_OPTS = {
     # The chunk size to use when streaming files with the file server
     'file_buffer_size': int,
 
+    # The number of file chunk requests the fileclient keeps in flight
+    'file_transfer_window': int,
+
+    # Only fetch the changed blocks of files the fileclient has a copy of
+    'file_delta_sync': bool,
+
     # The TCP port on which minion events should be published if ipc_mode is TCP
     'tcp_pub_port': int,
 
@@ -438,6 +455,12 @@ VALID_OPTS = {
     # If an event is above this size, it will be trimmed before putting it on the event bus
     'max_event_size': int,
 
+    # Share a single event bus connection between the event listeners of a process
+    'event_multiplexer': bool,
+
+    # The number of events queued for each listener of the event multiplexer
+    'event_multiplexer_queue_size': int,
+
     # Enable old style events to be sent on minion_startup. Change default to False in Sodium release
     'enable_legacy_startup_events': bool,
 
@@ -480,6 +503,12 @@ VALID_OPTS = {
     # Fire events as state chunks are processed by the state compiler
     'state_events': bool,
 
+    # Reuse the rendered data of SLS files whose file, pillar and grains didn't change
+    'state_compile_cache': bool,
+
+    # The number of states run at the same time, following the requisites of the states
+    'state_concurrency': int,
+
     # The number of seconds a minion should wait before retry when attempting authentication
     'acceptance_wait_time': float,
 
@@ -608,6 +637,10 @@ VALID_OPTS = {
     # the number of connected minions increases.
     'worker_threads': int,
 
+    # A dict of pools of MWorkers, by name, each handling the requests of the
+    # commands in its 'commands' list with its 'worker_threads' workers
+    'worker_pools': dict,
+
     # The port for the master to listen to returns on. The minion needs to connect to this port
     # to send returns.
     'ret_port': int,
@@ -729,6 +762,13 @@ VALID_OPTS = {
     # Specify a list of external pillar systems to use
     'ext_pillar': list,
 
+    # The number of threads the ext_pillar sources in ext_pillar_sources run in
+    'ext_pillar_workers': int,
+
+    # The ext_pillar sources which don't use the pillar data compiled before them, by name,
+    # with the 'ttl' their results are cached for and the 'inputs' their results depend on
+    'ext_pillar_sources': dict,
+
     # Reserved for future use to version the pillar structure
     'pillar_version': int,
 
@@ -794,6 +834,13 @@ VALID_OPTS = {
     'fileserver_followsymlinks': bool,
     'fileserver_ignoresymlinks': bool,
     'fileserver_limit_traversal': bool,
+
+    # Keep a per-saltenv index of the files in the roots fileserver backend
+    'fileserver_roots_index': bool,
+
+    # Cache the gzipped chunks served by the roots fileserver backend
+    'fileserver_chunk_cache': bool,
+    'fileserver_chunk_cache_expire': int,
     'fileserver_verify_config': bool,
 
     # Optionally apply '*' permissioins to any user. By default '*' is a fallback case that is
@@ -851,9 +898,20 @@ VALID_OPTS = {
     # reply from executions.
     'minion_data_cache': bool,
 
+    # Keep an in-memory inverted index of the minion data cache in each master process, used to
+    # resolve grain, pillar and ipcidr targets without reading the cached data of every minion.
+    'minion_data_index': bool,
+
+    # The number of seconds between reconciliations of the minion data index with the cache
+    'minion_data_index_interval': int,
+
     # The number of seconds between AES key rotations on the master
     'publish_session': int,
 
+    # The number of seconds a minion can resume its auth session with the
+    # master without a full sign in, 0 to disable auth sessions
+    'auth_session_ttl': int,
+
     # Defines a salt reactor. See http://docs.saltstack.com/en/latest/topics/reactor/
     'reactor': list,
 
@@ -866,6 +924,10 @@ VALID_OPTS = {
     # The queue size for workers in the reactor
     'reactor_worker_hwm': int,
 
+    # The number of processes compiling and running reactions, 0 to process
+    # them in the reactor process itself
+    'reactor_worker_processes': int,
+
     # Defines engines. See https://docs.saltstack.com/en/latest/topics/engines/
     'engines': list,
 
@@ -928,6 +990,19 @@ VALID_OPTS = {
     # The number of minutes between the minion refreshing its cache of grains
     'grains_refresh_every': int,
 
+    # The number of threads running the grains functions at the same time
+    'grains_workers': int,
+
+    # The number of seconds after which the grains of a grains function still
+    # running are left out
+    'grains_timeout': float,
+
+    # The grains functions whose returns are cached, and their TTL in seconds
+    'grains_function_cache': dict,
+
+    # Save the time each grains function took in the cachedir
+    'grains_profile': bool,
+
     # Use lspci to gather system data for grains on a minion
     'enable_lspci': bool,
 
@@ -941,6 +1016,9 @@ VALID_OPTS = {
     # Set Jinja environment options for sls templates
     'jinja_sls_env': dict,
 
+    # Keep the compiled Jinja templates in the cachedir
+    'jinja_bytecode_cache': bool,
+
     # If this is set to True leading spaces and tabs are stripped from the start
     # of a line to a block.
     'jinja_lstrip_blocks': bool,
@@ -996,6 +1074,17 @@ VALID_OPTS = {
     # The length that the syndic event queue must hit before events are popped off and forwarded
     'syndic_jid_forward_cache_hwm': int,
 
+    # The number of job returns, and their size in bytes, gathered by a syndic which makes it
+    # forward them without waiting for the syndic_event_forward_timeout
+    'syndic_forward_max_returns': int,
+    'syndic_forward_max_bytes': int,
+
+    # Compress the job returns a syndic forwards to its masters
+    'syndic_forward_compress': bool,
+
+    # The number of events a syndic keeps waiting to be forwarded before dropping the oldest
+    'syndic_event_forward_hwm': int,
+
     # Salt SSH configuration
     'ssh_passwd': six.string_types,
     'ssh_port': six.string_types,
@@ -1055,6 +1144,9 @@ VALID_OPTS = {
     # Use zmq.SUSCRIBE to limit listening sockets to only process messages bound for them
     'zmq_filtering': bool,
 
+    # Only send the publishes of the TCP transport to the minions matched master side
+    'tcp_filtering': bool,
+
     # Connection caching. Can greatly speed up salt performance.
     'con_cache': bool,
     'rotate_aes_key': bool,
@@ -1124,6 +1216,8 @@ VALID_OPTS = {
     'memcache_full_cleanup': bool,
     # Enable collecting the memcache stats and log it on `debug` log level.
     'memcache_debug': bool,
+    # Number of threads used by the localfs cache driver to read keys in bulk.
+    'localfs_cache_threads': int,
 
     # Thin and minimal Salt extra modules
     'thin_extra_mods': six.string_types,
@@ -1255,11 +1349,16 @@ DEFAULT_MINION_OPTS = {
     'grains_cache': False,
     'grains_cache_expiration': 300,
     'grains_deep_merge': False,
+    'grains_workers': 1,
+    'grains_timeout': 0,
+    'grains_function_cache': {},
+    'grains_profile': False,
     'conf_file': os.path.join(salt.syspaths.CONFIG_DIR, 'minion'),
     'sock_dir': os.path.join(salt.syspaths.SOCK_DIR, 'minion'),
     'sock_pool_size': 1,
     'backup_mode': '',
     'renderer': 'jinja|yaml',
+    'jinja_bytecode_cache': True,
     'renderer_whitelist': [],
     'renderer_blacklist': [],
     'random_startup_delay': 0,
@@ -1301,6 +1400,9 @@ DEFAULT_MINION_OPTS = {
     'env_order': [],
     'default_top': 'base',
     'fileserver_limit_traversal': False,
+    'fileserver_roots_index': False,
+    'fileserver_chunk_cache': False,
+    'fileserver_chunk_cache_expire': 86400,
     'file_recv': False,
     'file_recv_max_size': 100,
     'file_ignore_regex': [],
@@ -1364,6 +1466,7 @@ DEFAULT_MINION_OPTS = {
     'unique_jid': False,
     'hash_type': 'sha256',
     'optimization_order': [0, 1, 2],
+    'loader_cache': True,
     'disable_modules': [],
     'disable_returners': [],
     'whitelist_modules': [],
@@ -1390,6 +1493,8 @@ DEFAULT_MINION_OPTS = {
     'ipc_write_buffer': _DFLT_IPC_WBUFFER,
     'ipv6': None,
     'file_buffer_size': 262144,
+    'file_transfer_window': 1,
+    'file_delta_sync': False,
     'tcp_pub_port': 4510,
     'tcp_pull_port': 4511,
     'tcp_authentication_retries': 5,
@@ -1405,6 +1510,8 @@ DEFAULT_MINION_OPTS = {
     'log_rotate_max_bytes': 0,
     'log_rotate_backup_count': 0,
     'max_event_size': 1048576,
+    'event_multiplexer': False,
+    'event_multiplexer_queue_size': 10000,
     'enable_legacy_startup_events': True,
     'test': False,
     'ext_job_cache': '',
@@ -1416,6 +1523,8 @@ DEFAULT_MINION_OPTS = {
     'state_output_diff': False,
     'state_auto_order': True,
     'state_events': False,
+    'state_compile_cache': False,
+    'state_concurrency': 0,
     'state_aggregate': False,
     'snapper_states': False,
     'snapper_states_config': 'root',
@@ -1460,6 +1569,7 @@ DEFAULT_MINION_OPTS = {
     'reactor_refresh_interval': 60,
     'reactor_worker_threads': 10,
     'reactor_worker_hwm': 10000,
+    'reactor_worker_processes': 0,
     'engines': [],
     'tcp_keepalive': True,
     'tcp_keepalive_idle': 300,
@@ -1540,6 +1650,7 @@ DEFAULT_MASTER_OPTS = {
     'auth_mode': 1,
     'user': _MASTER_USER,
     'worker_threads': 5,
+    'worker_pools': {},
     'sock_dir': os.path.join(salt.syspaths.SOCK_DIR, 'master'),
     'sock_pool_size': 1,
     'ret_port': 4506,
@@ -1549,6 +1660,7 @@ DEFAULT_MASTER_OPTS = {
     'root_dir': salt.syspaths.ROOT_DIR,
     'pki_dir': os.path.join(salt.syspaths.CONFIG_DIR, 'pki', 'master'),
     'key_cache': '',
+    'accepted_key_cache': 'poll',
     'cachedir': os.path.join(salt.syspaths.CACHE_DIR, 'master'),
     'file_roots': {
         'base': [salt.syspaths.BASE_FILE_ROOTS_DIR,
@@ -1648,6 +1760,8 @@ DEFAULT_MASTER_OPTS = {
     'svnfs_saltenv_whitelist': [],
     'svnfs_saltenv_blacklist': [],
     'max_event_size': 1048576,
+    'event_multiplexer': False,
+    'event_multiplexer_queue_size': 10000,
     'master_stats': False,
     'master_stats_event_iter': 60,
     'minionfs_env': 'base',
@@ -1655,6 +1769,8 @@ DEFAULT_MASTER_OPTS = {
     'minionfs_whitelist': [],
     'minionfs_blacklist': [],
     'ext_pillar': [],
+    'ext_pillar_workers': 1,
+    'ext_pillar_sources': {},
     'pillar_version': 2,
     'pillar_opts': False,
     'pillar_safe_render_error': True,
@@ -1691,20 +1807,27 @@ DEFAULT_MASTER_OPTS = {
     'file_recv': False,
     'file_recv_max_size': 100,
     'file_buffer_size': 1048576,
+    'file_transfer_window': 1,
+    'file_delta_sync': False,
     'file_ignore_regex': [],
     'file_ignore_glob': [],
     'fileserver_backend': ['roots'],
     'fileserver_followsymlinks': True,
     'fileserver_ignoresymlinks': False,
     'fileserver_limit_traversal': False,
+    'fileserver_roots_index': False,
+    'fileserver_chunk_cache': False,
+    'fileserver_chunk_cache_expire': 86400,
     'fileserver_verify_config': True,
     'max_open_files': 100000,
     'hash_type': 'sha256',
     'optimization_order': [0, 1, 2],
+    'loader_cache': True,
     'conf_file': os.path.join(salt.syspaths.CONFIG_DIR, 'master'),
     'open_mode': False,
     'auto_accept': False,
     'renderer': 'jinja|yaml',
+    'jinja_bytecode_cache': True,
     'renderer_whitelist': [],
     'renderer_blacklist': [],
     'failhard': False,
@@ -1718,6 +1841,8 @@ DEFAULT_MASTER_OPTS = {
     'master_job_cache': 'local_cache',
     'job_cache_store_endtime': False,
     'minion_data_cache': True,
+    'minion_data_index': False,
+    'minion_data_index_interval': 10,
     'enforce_mine_cache': False,
     'ipc_mode': _DFLT_IPC_MODE,
     'ipc_write_buffer': _DFLT_IPC_WBUFFER,
@@ -1739,11 +1864,13 @@ DEFAULT_MASTER_OPTS = {
     'log_rotate_backup_count': 0,
     'pidfile': os.path.join(salt.syspaths.PIDFILE_DIR, 'salt-master.pid'),
     'publish_session': 86400,
+    'auth_session_ttl': 0,
     'range_server': 'range:80',
     'reactor': [],
     'reactor_refresh_interval': 60,
     'reactor_worker_threads': 10,
     'reactor_worker_hwm': 10000,
+    'reactor_worker_processes': 0,
     'engines': [],
     'event_return': '',
     'event_return_queue': 0,
@@ -1758,6 +1885,8 @@ DEFAULT_MASTER_OPTS = {
     'state_output_diff': False,
     'state_auto_order': True,
     'state_events': False,
+    'state_compile_cache': False,
+    'state_concurrency': 0,
     'state_aggregate': False,
     'search': '',
     'loop_interval': 60,
@@ -1802,6 +1931,10 @@ DEFAULT_MASTER_OPTS = {
     'gather_job_timeout': 10,
     'syndic_event_forward_timeout': 0.5,
     'syndic_jid_forward_cache_hwm': 100,
+    'syndic_forward_max_returns': 0,
+    'syndic_forward_max_bytes': 0,
+    'syndic_forward_compress': False,
+    'syndic_event_forward_hwm': 10000,
     'regen_thin': False,
     'ssh_passwd': '',
     'ssh_priv_passwd': '',
@@ -1841,6 +1974,7 @@ DEFAULT_MASTER_OPTS = {
     'master_pubkey_signature': 'master_pubkey_signature',
     'master_use_pubkey_signature': False,
     'zmq_filtering': False,
+    'tcp_filtering': False,
     'zmq_monitor': False,
     'con_cache': False,
     'rotate_aes_key': True,
@@ -1856,6 +1990,7 @@ DEFAULT_MASTER_OPTS = {
     'memcache_max_items': 1024,
     'memcache_full_cleanup': False,
     'memcache_debug': False,
+    'localfs_cache_threads': 8,
     'thin_extra_mods': '',
     'min_extra_mods': '',
     'ssl': None,
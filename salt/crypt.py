@@ -62,6 +62,7 @@ import salt.defaults.exitcodes
 import salt.payload
 import salt.transport.client
 import salt.transport.frame
+import salt.utils.atomicfile
 import salt.utils.crypt
 import salt.utils.decorators
 import salt.utils.event
@@ -222,6 +223,14 @@ def sign_message(privkey_path, message, passphrase=None):
     Use Crypto.Signature.PKCS1_v1_5 to sign a message. Returns the signature.
     '''
     key = get_rsa_key(privkey_path, passphrase)
+    return sign_message_with_key(key, message)
+
+
+def sign_message_with_key(key, message):
+    '''
+    Sign a message with an already loaded private key, see
+    :py:func:`get_rsa_key`. Returns the signature.
+    '''
     log.debug('salt.crypt.sign_message: Signing message.')
     if HAS_M2:
         md = EVP.MessageDigest('sha1')
@@ -500,6 +509,9 @@ class AsyncAuth(object):
         self.serial = salt.payload.Serial(self.opts)
         self.pub_path = os.path.join(self.opts['pki_dir'], 'minion.pub')
         self.rsa_path = os.path.join(self.opts['pki_dir'], 'minion.pem')
+        # The auth session started by the master on the last full sign in
+        self._session = None
+        self._session_nonce = None
         if self.opts['__role'] == 'syndic':
             self.mpub = 'syndic_master.pub'
         else:
@@ -757,6 +769,12 @@ class AsyncAuth(object):
                         self.opts['acceptance_wait_time']
                     )
                     raise tornado.gen.Return('retry')
+        if 'session_aes' in payload:
+            auth['aes'] = self.resume_session(payload)
+            if not auth['aes']:
+                raise tornado.gen.Return('retry')
+            auth['publish_port'] = payload['publish_port']
+            raise tornado.gen.Return(auth)
         auth['aes'] = self.verify_master(payload, master_pub='token' in sign_in_payload)
         if not auth['aes']:
             log.critical(
@@ -778,6 +796,7 @@ class AsyncAuth(object):
             if self.opts.get('master_finger', False):
                 if salt.utils.crypt.pem_finger(m_pub_fn, sum_type=self.opts['hash_type']) != self.opts['master_finger']:
                     self._finger_fail(self.opts['master_finger'], m_pub_fn)
+        self.store_session(payload, master_pub='token' in sign_in_payload)
         auth['publish_port'] = payload['publish_port']
         raise tornado.gen.Return(auth)
 
@@ -842,8 +861,48 @@ class AsyncAuth(object):
             pass
         with salt.utils.files.fopen(self.pub_path) as f:
             payload['pub'] = f.read()
+        session = self._session
+        if session is not None and session['expires'] > time.time():
+            # Ask the master to resume the session, proving that we know its
+            # key with a nonce the master has to send back
+            self._session_nonce = salt.utils.stringutils.to_str(binascii.hexlify(os.urandom(16)))
+            payload['session'] = session['id']
+            payload['session_proof'] = Crypticle(self.opts, session['key']).dumps(
+                {'id': self.opts['id'], 'nonce': self._session_nonce})
         return payload
 
+    def resume_session(self, payload):
+        '''
+        Return the AES key the master sent for a resumed auth session, or
+        None if the reply does not belong to the session
+        '''
+        session = self._session
+        self._session = None
+        if session is None or payload.get('session') != session['id']:
+            return None
+        try:
+            load = Crypticle(self.opts, session['key']).loads(payload['session_aes'])
+        except AuthenticationError:
+            load = None
+        if not isinstance(load, dict) or load.get('nonce') != self._session_nonce:
+            log.error('The Salt Master sent an invalid auth session reply')
+            return None
+        self._session = session
+        log.debug('Resumed the auth session with the master')
+        return load['aes']
+
+    def store_session(self, payload, master_pub=True):
+        '''
+        Keep the auth session the master started on a full sign in
+        '''
+        session = payload.get('session')
+        if not master_pub or not isinstance(session, dict):
+            self._session = None
+            return
+        self._session = {'id': session['id'],
+                         'key': session_key(self.token, session['id']),
+                         'expires': session['expires']}
+
     def decrypt_aes(self, payload, master_pub=True):
         '''
         This function is used to decrypt the AES seed phrase returned from
@@ -1190,6 +1249,9 @@ class SAuth(AsyncAuth):
         self.serial = salt.payload.Serial(self.opts)
         self.pub_path = os.path.join(self.opts['pki_dir'], 'minion.pub')
         self.rsa_path = os.path.join(self.opts['pki_dir'], 'minion.pem')
+        # The auth session started by the master on the last full sign in
+        self._session = None
+        self._session_nonce = None
         if 'syndic_master' in self.opts:
             self.mpub = 'syndic_master.pub'
         elif 'alert_master' in self.opts:
@@ -1342,6 +1404,12 @@ class SAuth(AsyncAuth):
                         self.opts['id'], self.opts['acceptance_wait_time']
                     )
                     return 'retry'
+        if 'session_aes' in payload:
+            auth['aes'] = self.resume_session(payload)
+            if not auth['aes']:
+                return 'retry'
+            auth['publish_port'] = payload['publish_port']
+            return auth
         auth['aes'] = self.verify_master(payload, master_pub='token' in sign_in_payload)
         if not auth['aes']:
             log.critical(
@@ -1363,6 +1431,7 @@ class SAuth(AsyncAuth):
             if self.opts.get('master_finger', False):
                 if salt.utils.crypt.pem_finger(m_pub_fn, sum_type=self.opts['hash_type']) != self.opts['master_finger']:
                     self._finger_fail(self.opts['master_finger'], m_pub_fn)
+        self.store_session(payload, master_pub='token' in sign_in_payload)
         auth['publish_port'] = payload['publish_port']
         return auth
 
@@ -1479,3 +1548,111 @@ class Crypticle(object):
             return {}
         load = self.serial.loads(data[len(self.PICKLE_PAD):], raw=raw)
         return load
+
+
+def session_key(token, session_id):
+    '''
+    Derive the Crypticle key of an auth session from the token a minion sent
+    encrypted with the master public key and the session id assigned by the
+    master. Only the minion and the master know the token.
+    '''
+    key = hashlib.sha512(
+        b'salt-auth-session' +
+        salt.utils.stringutils.to_bytes(token) +
+        salt.utils.stringutils.to_bytes(session_id)).digest()
+    key = base64.b64encode(key[:192 // 8 + Crypticle.SIG_SIZE])
+    return salt.utils.stringutils.to_str(key)
+
+
+class AuthSessions(object):
+    '''
+    The auth sessions of the minions, which let a minion which signed in
+    less than ``auth_session_ttl`` seconds ago get the current AES key
+    without the RSA operations of a full sign in.
+
+    The sessions are shared by the MWorkers and kept across restarts of the
+    master in the cachedir, encrypted with a key kept in the pki_dir.
+    '''
+    def __init__(self, opts):
+        self.opts = opts
+        self.ttl = opts['auth_session_ttl']
+        self.path = os.path.join(opts['cachedir'], 'auth_sessions')
+        self.key_path = os.path.join(opts['pki_dir'], 'auth_session.key')
+        self._crypticle = None
+
+    def setup_key(self):
+        '''
+        Create the key the sessions are encrypted with if it is missing. This
+        is done before the MWorkers are started.
+        '''
+        if not os.path.isfile(self.key_path):
+            with salt.utils.files.set_umask(0o277):
+                with salt.utils.files.fopen(self.key_path, 'w+') as fp_:
+                    fp_.write(Crypticle.generate_key_string())
+
+    @property
+    def crypticle(self):
+        if self._crypticle is None:
+            with salt.utils.files.fopen(self.key_path, 'r') as fp_:
+                self._crypticle = Crypticle(self.opts, fp_.read().strip())
+        return self._crypticle
+
+    @staticmethod
+    def _pub_hash(pub):
+        return hashlib.sha256(salt.utils.stringutils.to_bytes(pub.strip())).hexdigest()
+
+    def create(self, minion_id, token, pub):
+        '''
+        Start a session for a minion which signed in with ``token`` and the
+        public key ``pub``, and return the session id and expiry time to send
+        to the minion
+        '''
+        session_id = salt.utils.stringutils.to_str(binascii.hexlify(os.urandom(16)))
+        expires = int(time.time()) + self.ttl
+        session = {'id': session_id,
+                   'key': session_key(token, session_id),
+                   'expires': expires,
+                   'pub': self._pub_hash(pub)}
+        if not os.path.isdir(self.path):
+            try:
+                os.makedirs(self.path, 0o700)
+            except OSError:
+                # Another MWorker created it
+                pass
+        try:
+            with salt.utils.atomicfile.atomic_open(os.path.join(self.path, minion_id), 'wb') as fp_:
+                fp_.write(self.crypticle.dumps(session))
+        except (IOError, OSError) as exc:
+            log.error('Failed to store the auth session of %s: %s', minion_id, exc)
+            return None
+        return {'id': session_id, 'expires': expires}
+
+    def get(self, minion_id, session_id, pub):
+        '''
+        Return the key of a minion's session if it is the current session of
+        the minion, it has not expired and the minion's key did not change
+        '''
+        path = os.path.join(self.path, minion_id)
+        try:
+            with salt.utils.files.fopen(path, 'rb') as fp_:
+                session = self.crypticle.loads(fp_.read())
+        except (IOError, OSError):
+            return None
+        except AuthenticationError:
+            log.warning('Discarding the unreadable auth session of %s', minion_id)
+            session = None
+        if not isinstance(session, dict) or session.get('expires', 0) < time.time():
+            self.delete(minion_id)
+            return None
+        if session['id'] != session_id or session['pub'] != self._pub_hash(pub):
+            return None
+        return session['key']
+
+    def delete(self, minion_id):
+        '''
+        End the session of a minion
+        '''
+        try:
+            os.remove(os.path.join(self.path, minion_id))
+        except OSError:
+            pass
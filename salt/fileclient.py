@@ -7,24 +7,28 @@ Classes that manage file clients
 # Import python libs
 import contextlib
 import errno
+import hashlib
 import logging
 import os
 import string
 import shutil
 import ftplib
+import tornado.gen
 from tornado.httputil import parse_response_start_line, HTTPHeaders, HTTPInputError
 import salt.utils.atomicfile
 
 # Import salt libs
 from salt.exceptions import (
-    CommandExecutionError, MinionError
+    CommandExecutionError, MinionError, SaltClientError, SaltReqTimeoutError
 )
 import salt.client
 import salt.loader
 import salt.payload
 import salt.transport.client
 import salt.fileserver
+import salt.utils.asynchronous
 import salt.utils.data
+import salt.utils.delta
 import salt.utils.files
 import salt.utils.gzip_util
 import salt.utils.hashutils
@@ -1013,6 +1017,7 @@ class RemoteClient(Client):
             self.auth = self.channel.auth
         else:
             self.auth = ''
+        self._transfer_channel = None
 
     def _refresh_channel(self):
         '''
@@ -1036,6 +1041,94 @@ class RemoteClient(Client):
             pass
         if channel is not None:
             channel.close()
+        transfer_channel = getattr(self, '_transfer_channel', None)
+        if transfer_channel is not None:
+            transfer_channel.close()
+            self._transfer_channel = None
+
+    def _fetch_chunks(self, load, fn_, size, chunk_size):
+        '''
+        Fetch the chunks of a file from fn_.tell() up to ``size`` from the
+        master, keeping up to :conf_minion:`file_transfer_window` requests in
+        flight, and write them to ``fn_`` in order. Stops early if a chunk
+        shorter than ``chunk_size`` is received, in which case the caller
+        carries on chunk by chunk from fn_.tell().
+        '''
+        window = self.opts['file_transfer_window']
+        if self._transfer_channel is None:
+            # One socket per request in flight
+            self._transfer_channel = salt.utils.asynchronous.SyncWrapper(
+                salt.transport.client.AsyncReqChannel.factory,
+                (dict(self.opts, sock_pool_size=window),)
+            )
+        channel = self._transfer_channel.asynchronous
+
+        @tornado.gen.coroutine
+        def _fetch():
+            pending = {}
+            loc = fn_.tell()
+            while loc < size or pending:
+                while loc < size and len(pending) < window:
+                    pending[loc] = channel.send(dict(load, loc=loc), raw=True)
+                    loc += chunk_size
+                data = yield pending.pop(min(pending))
+                if six.PY3:
+                    data = decode_dict_keys_to_str(data)
+                if data.get('gzip', None):
+                    data = salt.utils.gzip_util.uncompress(data['data'])
+                else:
+                    data = data['data']
+                if six.PY3 and isinstance(data, str):
+                    data = data.encode()
+                fn_.write(data)
+                if len(data) != chunk_size:
+                    # Last chunk, or the file changed on the master
+                    break
+
+        io_loop = self._transfer_channel.io_loop
+        with salt.utils.asynchronous.current_ioloop(io_loop):
+            io_loop.run_sync(_fetch)
+
+    def _get_file_delta(self, path, saltenv, dest, hash_server):
+        '''
+        Bring ``dest``, an outdated copy of a file on the master, up to date
+        by fetching only the blocks of the file which differ from it. See
+        :mod:`salt.utils.delta`.
+        '''
+        bsize = salt.utils.delta.block_size(os.path.getsize(dest))
+        with salt.utils.files.fopen(dest, 'rb') as fp_:
+            signatures = salt.utils.delta.signatures(fp_, bsize)
+        load = {'path': path,
+                'saltenv': saltenv,
+                'cmd': '_serve_file_delta',
+                'block_size': bsize,
+                'signatures': signatures,
+                'loc': 0}
+        hasher = hashlib.new(hash_server['hash_type'])
+        received = 0
+        with salt.utils.files.fopen(dest, 'rb') as basis, \
+                salt.utils.atomicfile.atomic_open(dest, 'wb') as fn_:
+            while load['loc'] is not None:
+                data = self.channel.send(load, raw=True)
+                if six.PY3 and isinstance(data, dict):
+                    data = decode_dict_keys_to_str(data)
+                if not isinstance(data, dict) or 'ops' not in data:
+                    raise MinionError(
+                        'The master does not support delta transfers')
+                for chunk in salt.utils.delta.patch(basis, data['ops'], bsize):
+                    fn_.write(chunk)
+                    hasher.update(chunk)
+                received += sum(len(op) for op in data['ops']
+                                if not isinstance(op, six.integer_types))
+                load['loc'] = data['loc']
+            if hasher.hexdigest() != hash_server['hsum']:
+                raise MinionError(
+                    'Checksum mismatch after applying the delta')
+        log.debug(
+            'Fetched %d bytes of changes to \'%s\' in saltenv \'%s\'',
+            received, path, saltenv
+        )
+        return dest
 
     def get_file(self,
                  path,
@@ -1054,10 +1147,12 @@ class RemoteClient(Client):
         if senv:
             saltenv = senv
 
+        size_server = None
         if not salt.utils.platform.is_windows():
             hash_server, stat_server = self.hash_and_stat_file(path, saltenv)
             try:
                 mode_server = stat_server[0]
+                size_server = stat_server[6]
             except (IndexError, TypeError):
                 mode_server = None
         else:
@@ -1116,6 +1211,18 @@ class RemoteClient(Client):
             if hash_local == hash_server:
                 return dest2check
 
+            if self.opts.get('file_delta_sync', False) \
+                    and not isinstance(self.channel, salt.fileserver.FSChan):
+                try:
+                    return self._get_file_delta(
+                        self._check_proto(path), saltenv, dest2check, hash_server)
+                except (MinionError, SaltClientError, SaltReqTimeoutError,
+                        IOError, OSError) as exc:
+                    log.warning(
+                        'Delta transfer of \'%s\' failed, fetching the whole '
+                        'file: %s', path, exc
+                    )
+
         log.debug(
             'Fetching file from saltenv \'%s\', ** attempting ** \'%s\'',
             saltenv, path
@@ -1148,6 +1255,12 @@ class RemoteClient(Client):
         else:
             log.debug('No dest file found')
 
+        # Keep several chunk requests in flight once the chunk size is known
+        # from the first chunk
+        pipeline = self.opts.get('file_transfer_window', 1) > 1 \
+            and size_server is not None \
+            and not isinstance(self.channel, salt.fileserver.FSChan)
+
         while True:
             if not fn_:
                 load['loc'] = 0
@@ -1202,6 +1315,15 @@ class RemoteClient(Client):
                 if six.PY3 and isinstance(data, str):
                     data = data.encode()
                 fn_.write(data)
+                if pipeline and data and fn_.tell() < size_server:
+                    pipeline = False
+                    try:
+                        self._fetch_chunks(load, fn_, size_server, len(data))
+                    except Exception as exc:  # pylint: disable=broad-except
+                        log.warning(
+                            'Pipelined transfer of \'%s\' failed, fetching '
+                            'the rest chunk by chunk: %s', path, exc
+                        )
             except (TypeError, KeyError) as exc:
                 try:
                     data_type = type(data).__name__
@@ -17,6 +17,7 @@ import time
 # Import salt libs
 import salt.loader
 import salt.utils.data
+import salt.utils.delta
 import salt.utils.files
 import salt.utils.path
 import salt.utils.url
@@ -202,14 +203,15 @@ def check_env_cache(opts, env_cache):
     return None
 
 
-def generate_mtime_map(opts, path_map):
+def generate_mtime_map(opts, path_map, followlinks=False):
     '''
     Generate a dict of filename -> mtime
     '''
     file_map = {}
     for saltenv, path_list in six.iteritems(path_map):
         for path in path_list:
-            for directory, _, filenames in salt.utils.path.os_walk(path):
+            for directory, _, filenames in salt.utils.path.os_walk(
+                    path, followlinks=followlinks):
                 for item in filenames:
                     try:
                         file_path = os.path.join(directory, item)
@@ -650,6 +652,42 @@ class Fileserver(object):
             return self.servers[fstr](load, fnd)
         return ret
 
+    def serve_file_delta(self, load):
+        '''
+        Describe a file as a delta against the copy a minion already has,
+        from the block signatures of that copy. See :mod:`salt.utils.delta`.
+        '''
+        ret = {'ops': [],
+               'loc': None}
+
+        if 'env' in load:
+            # "env" is not supported; Use "saltenv".
+            load.pop('env')
+
+        if 'path' not in load or 'loc' not in load or 'saltenv' not in load \
+                or 'block_size' not in load or 'signatures' not in load:
+            return {}
+        if not isinstance(load['block_size'], six.integer_types) \
+                or not 0 < load['block_size'] <= salt.utils.delta.MAX_BLOCK_SIZE \
+                or not isinstance(load['signatures'], list):
+            return {}
+        if not isinstance(load['saltenv'], six.string_types):
+            load['saltenv'] = six.text_type(load['saltenv'])
+
+        fnd = self.find_file(load['path'], load['saltenv'])
+        if not fnd.get('back') \
+                or '{0}.serve_file'.format(fnd['back']) not in self.servers \
+                or not os.path.isfile(fnd.get('path', '')):
+            return {}
+        with salt.utils.files.fopen(fnd['path'], 'rb') as fp_:
+            ret['ops'], ret['loc'] = salt.utils.delta.delta(
+                fp_,
+                load['signatures'],
+                load['block_size'],
+                loc=load['loc'],
+                max_literal=self.opts['file_buffer_size'])
+        return ret
+
     def __file_hash_and_stat(self, load):
         '''
         Common code for hashing and stating files
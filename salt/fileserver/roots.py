@@ -14,6 +14,11 @@ be in the :conf_master:`fileserver_backend` list to enable this backend.
 
 Fileserver environments are defined using the :conf_master:`file_roots`
 configuration option.
+
+When :conf_master:`fileserver_roots_index` is enabled, the periodic fileserver
+update keeps an sqlite index of the files in each environment (path, size,
+mtime, mode and hash), which is used to find, hash and list files without
+walking the ``file_roots`` or keeping a hash cache file per served file.
 '''
 
 
@@ -21,9 +26,12 @@ configuration option.
 import os
 import errno
 import logging
+import sqlite3
+import time
 
 # Import salt libs
 import salt.fileserver
+import salt.utils.atomicfile
 import salt.utils.event
 import salt.utils.files
 import salt.utils.gzip_util
@@ -36,6 +44,9 @@ from salt.ext import six
 
 log = logging.getLogger(__name__)
 
+# Connections to the index databases, keyed by (pid, database path)
+_INDEX_CONNS = {}
+
 
 def find_file(path, saltenv='base', **kwargs):
     '''
@@ -97,6 +108,18 @@ def find_file(path, saltenv='base', **kwargs):
             fnd['rel'] = path
             return _add_file_stat(fnd)
         return fnd
+    if __opts__.get('fileserver_roots_index', False):
+        entry = _index_lookup(saltenv, path)
+        if entry is not None:
+            fnd['path'] = entry[0]
+            fnd['rel'] = path
+            try:
+                fnd['stat'] = list(os.stat(fnd['path']))
+                return fnd
+            except OSError:
+                # Removed since the last update, search the roots
+                fnd = {'path': '',
+                       'rel': ''}
     for root in __opts__['file_roots'][saltenv]:
         full = os.path.join(root, path)
         if os.path.isfile(full) and not salt.fileserver.is_file_ignored(__opts__, full):
@@ -106,6 +129,170 @@ def find_file(path, saltenv='base', **kwargs):
     return fnd
 
 
+def _index_path(saltenv):
+    '''
+    Return the path to the index database of a saltenv
+    '''
+    return os.path.join(
+        __opts__['cachedir'],
+        'roots',
+        'index',
+        '{0}.db'.format(salt.utils.files.safe_filename_leaf(saltenv)))
+
+
+def _index_conn(saltenv, create=False):
+    '''
+    Return a connection to the index database of a saltenv, or None if it has
+    not been created by an update yet (unless ``create`` is True)
+    '''
+    db_path = _index_path(saltenv)
+    key = (os.getpid(), db_path)
+    conn = _INDEX_CONNS.get(key)
+    if conn is not None:
+        return conn
+    if not os.path.isfile(db_path):
+        if not create:
+            return None
+        db_dir = os.path.dirname(db_path)
+        if not os.path.isdir(db_dir):
+            try:
+                os.makedirs(db_dir)
+            except OSError as err:
+                if err.errno != errno.EEXIST:
+                    raise
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.text_factory = six.text_type
+    # Let the fileserver workers read while the index is being updated
+    conn.execute('PRAGMA journal_mode=WAL')
+    with conn:
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'rel TEXT PRIMARY KEY, path TEXT, size INTEGER, mtime REAL, '
+            'mode INTEGER, link INTEGER, hsum TEXT)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+    _INDEX_CONNS[key] = conn
+    return conn
+
+
+def _index_lookup(saltenv, rel):
+    '''
+    Return the ``(path, size, mtime, mode, link, hsum)`` index entry for a
+    relative path, or None if it is not indexed
+    '''
+    try:
+        conn = _index_conn(saltenv)
+        if conn is None:
+            return None
+        return conn.execute(
+            'SELECT path, size, mtime, mode, link, hsum FROM files '
+            'WHERE rel = ? AND hsum IS NOT NULL '
+            'AND (SELECT value FROM meta WHERE key = \'hash_type\') = ?',
+            (rel, __opts__['hash_type'])).fetchone()
+    except sqlite3.Error as exc:
+        log.debug('Unable to read the roots fileserver index: %s', exc)
+        return None
+
+
+def _index_file_list(saltenv):
+    '''
+    Return the sorted list of indexed files of a saltenv, or None if it has
+    not been indexed yet or was not updated for longer than
+    ``roots_update_interval`` plus ``fileserver_list_cache_time`` seconds
+    '''
+    max_age = __opts__.get('roots_update_interval', 60) \
+        + __opts__.get('fileserver_list_cache_time', 20)
+    try:
+        conn = _index_conn(saltenv)
+        if conn is None:
+            return None
+        row = conn.execute(
+            'SELECT value FROM meta WHERE key = \'updated\'').fetchone()
+        if row is None or not 0 <= time.time() - float(row[0]) < max_age:
+            log.debug(
+                'roots: The index of saltenv \'%s\' is out of date, walking '
+                'the file_roots', saltenv
+            )
+            return None
+        query = 'SELECT rel FROM files'
+        if __opts__['fileserver_ignoresymlinks']:
+            query += ' WHERE link = 0'
+        files = [row[0] for row in conn.execute(query)]
+    except (sqlite3.Error, ValueError) as exc:
+        log.debug('Unable to read the roots fileserver index: %s', exc)
+        return None
+    if os.path.sep == '\\':
+        files = [item.replace('\\', '/') for item in files]
+    # The mtime map ignores the files matching file_ignore_regex and
+    # file_ignore_glob by their full path, the file list by their relative
+    # path
+    return sorted(rel for rel in files
+                  if not salt.fileserver.is_file_ignored(__opts__, rel))
+
+
+def _update_index(saltenv, mtime_map):
+    '''
+    Bring the index of a saltenv in line with the mtime map generated by
+    :py:func:`update`. Only the files which were added or whose mtime changed
+    since the last update are hashed.
+    '''
+    # The first root containing a relative path is the one find_file serves
+    found = {}
+    for root in __opts__['file_roots'][saltenv]:
+        prefix = os.path.join(root, '')
+        for file_path, mtime in six.iteritems(mtime_map):
+            if not file_path.startswith(prefix):
+                continue
+            rel = os.path.relpath(file_path, root)
+            if rel not in found:
+                found[rel] = (file_path, mtime)
+
+    conn = _index_conn(saltenv, create=True)
+    hash_type = __opts__['hash_type']
+    row = conn.execute(
+        'SELECT value FROM meta WHERE key = \'hash_type\'').fetchone()
+    if row is None or row[0] != hash_type:
+        indexed = {}
+    else:
+        indexed = dict(
+            (rel, (file_path, mtime))
+            for rel, file_path, mtime in conn.execute(
+                'SELECT rel, path, mtime FROM files WHERE hsum IS NOT NULL'))
+
+    changed = []
+    for rel, (file_path, mtime) in six.iteritems(found):
+        if indexed.get(rel) == (file_path, mtime):
+            continue
+        try:
+            stat = os.stat(file_path)
+            hsum = salt.utils.hashutils.get_hash(file_path, hash_type)
+        except (IOError, OSError):
+            # Removed while the index was being updated
+            continue
+        changed.append((rel, file_path, stat.st_size, mtime, stat.st_mode,
+                        int(salt.utils.path.islink(file_path)), hsum))
+    removed = [(rel,) for rel in indexed if rel not in found]
+
+    with conn:
+        if not indexed:
+            conn.execute('DELETE FROM files')
+            conn.execute(
+                'INSERT OR REPLACE INTO meta (key, value) '
+                'VALUES (\'hash_type\', ?)', (hash_type,))
+        conn.executemany('DELETE FROM files WHERE rel = ?', removed)
+        conn.executemany(
+            'INSERT OR REPLACE INTO files '
+            '(rel, path, size, mtime, mode, link, hsum) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)', changed)
+        conn.execute(
+            'INSERT OR REPLACE INTO meta (key, value) '
+            'VALUES (\'updated\', ?)', (six.text_type(time.time()),))
+    log.trace(
+        'roots: Updated the index of saltenv \'%s\', %d changed and %d '
+        'removed files', saltenv, len(changed), len(removed)
+    )
+
+
 def envs():
     '''
     Return the file server environments
@@ -129,6 +316,13 @@ def serve_file(load, fnd):
         return ret
     ret['dest'] = fnd['rel']
     gzip = load.get('gzip', None)
+    if gzip and __opts__.get('fileserver_chunk_cache', False):
+        data = _cached_chunk(load, fnd, gzip)
+        if data is not None:
+            if data:
+                ret['gzip'] = gzip
+            ret['data'] = data
+            return ret
     fpath = os.path.normpath(fnd['path'])
     with salt.utils.files.fopen(fpath, 'rb') as fp_:
         fp_.seek(load['loc'])
@@ -140,6 +334,74 @@ def serve_file(load, fnd):
     return ret
 
 
+def _cached_chunk(load, fnd, gzip):
+    '''
+    Return the gzipped chunk of a file at ``load['loc']`` from the chunk
+    cache, compressing and caching it on a miss. The cache is keyed by the
+    hash of the file contents, so a file served to many minions is only read
+    and compressed once. Returns None if the file could not be hashed.
+    '''
+    hsum = file_hash(load, fnd).get('hsum')
+    if not hsum:
+        return None
+    chunk_path = os.path.join(
+        __opts__['cachedir'],
+        'roots',
+        'chunks',
+        __opts__['hash_type'],
+        hsum,
+        '{0}-{1}-{2}'.format(__opts__['file_buffer_size'], gzip, load['loc']))
+    try:
+        with salt.utils.files.fopen(chunk_path, 'rb') as fp_:
+            return fp_.read()
+    except (IOError, OSError):
+        pass
+
+    with salt.utils.files.fopen(os.path.normpath(fnd['path']), 'rb') as fp_:
+        fp_.seek(load['loc'])
+        data = fp_.read(__opts__['file_buffer_size'])
+    if not data:
+        return data
+    data = salt.utils.gzip_util.compress(data, gzip)
+    if file_hash(load, fnd).get('hsum') != hsum:
+        # The file changed while the chunk was read, don't cache it under the
+        # previous hash
+        return data
+    try:
+        chunk_dir = os.path.dirname(chunk_path)
+        if not os.path.isdir(chunk_dir):
+            try:
+                os.makedirs(chunk_dir)
+            except OSError as err:
+                if err.errno != errno.EEXIST:
+                    raise
+        with salt.utils.atomicfile.atomic_open(chunk_path, 'wb') as fp_:
+            fp_.write(data)
+    except (IOError, OSError) as exc:
+        log.debug('Unable to cache chunk %s: %s', chunk_path, exc)
+    return data
+
+
+def _reap_chunk_cache():
+    '''
+    Remove the cached chunks of file contents which were first cached longer
+    than :conf_master:`fileserver_chunk_cache_expire` seconds ago
+    '''
+    chunk_base = os.path.join(__opts__['cachedir'], 'roots', 'chunks')
+    expire = __opts__.get('fileserver_chunk_cache_expire', 86400)
+    now = time.time()
+    for hash_type in os.listdir(chunk_base):
+        hash_dir = os.path.join(chunk_base, hash_type)
+        for hsum in os.listdir(hash_dir):
+            chunk_dir = os.path.join(hash_dir, hsum)
+            try:
+                if now - os.path.getmtime(chunk_dir) > expire:
+                    salt.utils.files.rm_rf(chunk_dir)
+            except OSError:
+                # Reaped concurrently
+                pass
+
+
 def update():
     '''
     When we are asked to update (regular interval) lets reap the cache
@@ -153,6 +415,12 @@ def update():
         # Hash file won't exist if no files have yet been served up
         pass
 
+    try:
+        _reap_chunk_cache()
+    except (IOError, OSError):
+        # No chunks have been cached yet
+        pass
+
     mtime_map_path = os.path.join(__opts__['cachedir'], 'roots', 'mtime_map')
     # data to send on event
     data = {'changed': False,
@@ -160,7 +428,11 @@ def update():
             'backend': 'roots'}
 
     # generate the new map
-    new_mtime_map = salt.fileserver.generate_mtime_map(__opts__, __opts__['file_roots'])
+    use_index = __opts__.get('fileserver_roots_index', False)
+    new_mtime_map = salt.fileserver.generate_mtime_map(
+        __opts__,
+        __opts__['file_roots'],
+        followlinks=use_index and __opts__['fileserver_followsymlinks'])
 
     old_mtime_map = {}
     # if you have an old map, load that
@@ -201,6 +473,16 @@ def update():
                 )
             )
 
+    if use_index:
+        for saltenv in __opts__['file_roots']:
+            try:
+                _update_index(saltenv, new_mtime_map)
+            except (sqlite3.Error, IOError, OSError) as exc:
+                log.error(
+                    'Unable to update the roots fileserver index for '
+                    'saltenv \'%s\': %s', saltenv, exc
+                )
+
     if __opts__.get('fileserver_events', False):
         # if there is a change, fire an event
         event = salt.utils.event.get_event(
@@ -236,6 +518,17 @@ def file_hash(load, fnd):
     # set the hash_type as it is determined by config-- so mechanism won't change that
     ret['hash_type'] = __opts__['hash_type']
 
+    if __opts__.get('fileserver_roots_index', False):
+        entry = _index_lookup(saltenv, fnd['rel'])
+        if entry is not None and entry[0] == path \
+                and entry[2] == os.path.getmtime(path):
+            ret['hsum'] = entry[5]
+        else:
+            # Not indexed yet or changed since the last update, the next
+            # update will index it
+            ret['hsum'] = salt.utils.hashutils.get_hash(path, __opts__['hash_type'])
+        return ret
+
     # check if the hash is cached
     # cache file's contents should be "hash:mtime"
     cache_path = os.path.join(__opts__['cachedir'],
@@ -308,6 +601,11 @@ def _file_lists(load, form):
         else:
             return []
 
+    if form == 'files' and __opts__.get('fileserver_roots_index', False):
+        files = _index_file_list(saltenv)
+        if files is not None:
+            return files
+
     list_cachedir = os.path.join(__opts__['cachedir'], 'file_lists', 'roots')
     if not os.path.isdir(list_cachedir):
         try:
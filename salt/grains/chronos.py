@@ -14,6 +14,7 @@ import salt.utils.http
 import salt.utils.platform
 __proxyenabled__ = ['chronos']
 __virtualname__ = 'chronos'
+__virtual_cache__ = True
 
 
 def __virtual__():
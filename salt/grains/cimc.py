@@ -14,6 +14,7 @@ import salt.proxy.cimc
 
 __proxyenabled__ = ['cimc']
 __virtualname__ = 'cimc'
+__virtual_cache__ = True
 
 log = logging.getLogger(__file__)
 
@@ -17,6 +17,7 @@ import salt.modules.vsphere
 
 __proxyenabled__ = ['esxi']
 __virtualname__ = 'esxi'
+__virtual_cache__ = True
 
 log = logging.getLogger(__file__)
 
@@ -16,6 +16,7 @@ import salt.utils.platform
 __proxyenabled__ = ['fx2']
 
 __virtualname__ = 'fx2'
+__virtual_cache__ = True
 
 logger = logging.getLogger(__file__)
 
@@ -15,6 +15,7 @@ from salt.ext import six
 
 __proxyenabled__ = ['junos']
 __virtualname__ = 'junos'
+__virtual_cache__ = True
 
 # Get looging started
 log = logging.getLogger(__name__)
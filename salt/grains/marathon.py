@@ -11,6 +11,7 @@ import salt.utils.http
 import salt.utils.platform
 __proxyenabled__ = ['marathon']
 __virtualname__ = 'marathon'
+__virtual_cache__ = True
 
 
 def __virtual__():
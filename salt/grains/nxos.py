@@ -19,6 +19,7 @@ log = logging.getLogger(__name__)
 
 __proxyenabled__ = ['nxos']
 __virtualname__ = 'nxos'
+__virtual_cache__ = True
 
 
 def __virtual__():
@@ -14,6 +14,7 @@ import salt.proxy.panos
 
 __proxyenabled__ = ['panos']
 __virtualname__ = 'panos'
+__virtual_cache__ = True
 
 log = logging.getLogger(__file__)
 
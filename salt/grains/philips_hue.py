@@ -23,6 +23,7 @@ Static grains for the Philips HUE lamps
 __proxyenabled__ = ['philips_hue']
 
 __virtualname__ = 'hue'
+__virtual_cache__ = True
 
 
 def __virtual__():
@@ -8,6 +8,7 @@ import salt.utils.platform
 __proxyenabled__ = ['rest_sample']
 
 __virtualname__ = 'rest_sample'
+__virtual_cache__ = True
 
 
 def __virtual__():
@@ -8,6 +8,7 @@ import salt.utils.platform
 __proxyenabled__ = ['ssh_sample']
 
 __virtualname__ = 'ssh_sample'
+__virtual_cache__ = True
 
 
 def __virtual__():
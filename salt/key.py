@@ -29,6 +29,7 @@ import salt.utils.files
 import salt.utils.json
 import salt.utils.kinds
 import salt.utils.master
+import salt.utils.minions
 import salt.utils.sdb
 import salt.utils.stringutils
 import salt.utils.user
@@ -391,6 +392,14 @@ class Key(object):
 
         self.passphrase = salt.utils.sdb.sdb_get(self.opts.get('signing_key_pass'), self.opts)
 
+    def _fire_key_event(self, eload):
+        '''
+        Fire a key event and apply it to the accepted key cache of this
+        process
+        '''
+        self.event.fire_event(eload, salt.utils.event.tagify(prefix='key'))
+        salt.utils.minions.key_event(self.opts, eload, acc=self.ACC)
+
     def _check_minions_directories(self):
         '''
         Return the minion keys directory paths
@@ -727,8 +736,7 @@ class Key(object):
                     eload = {'result': True,
                              'act': 'accept',
                              'id': key}
-                    self.event.fire_event(eload,
-                                          salt.utils.event.tagify(prefix='key'))
+                    self._fire_key_event(eload)
                 except (IOError, OSError):
                     pass
         return (
@@ -756,8 +764,7 @@ class Key(object):
                 eload = {'result': True,
                          'act': 'accept',
                          'id': key}
-                self.event.fire_event(eload,
-                                      salt.utils.event.tagify(prefix='key'))
+                self._fire_key_event(eload)
             except (IOError, OSError):
                 pass
         return self.list_keys()
@@ -799,8 +806,7 @@ class Key(object):
                     eload = {'result': True,
                              'act': 'delete',
                              'id': key}
-                    self.event.fire_event(eload,
-                                          salt.utils.event.tagify(prefix='key'))
+                    self._fire_key_event(eload)
                 except (OSError, IOError):
                     pass
         if self.opts.get('preserve_minions') is True:
@@ -826,8 +832,7 @@ class Key(object):
                     eload = {'result': True,
                              'act': 'delete',
                              'id': key}
-                    self.event.fire_event(eload,
-                                          salt.utils.event.tagify(prefix='key'))
+                    self._fire_key_event(eload)
                 except (OSError, IOError):
                     pass
         self.check_minion_cache()
@@ -844,8 +849,7 @@ class Key(object):
                     eload = {'result': True,
                              'act': 'delete',
                              'id': key}
-                    self.event.fire_event(eload,
-                                          salt.utils.event.tagify(prefix='key'))
+                    self._fire_key_event(eload)
                 except (OSError, IOError):
                     pass
         self.check_minion_cache()
@@ -885,8 +889,7 @@ class Key(object):
                     eload = {'result': True,
                              'act': 'reject',
                              'id': key}
-                    self.event.fire_event(eload,
-                                          salt.utils.event.tagify(prefix='key'))
+                    self._fire_key_event(eload)
                 except (IOError, OSError):
                     pass
         self.check_minion_cache()
@@ -917,8 +920,7 @@ class Key(object):
                 eload = {'result': True,
                          'act': 'reject',
                          'id': key}
-                self.event.fire_event(eload,
-                                      salt.utils.event.tagify(prefix='key'))
+                self._fire_key_event(eload)
             except (IOError, OSError):
                 pass
         self.check_minion_cache()
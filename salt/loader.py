@@ -15,9 +15,11 @@ import logging
 import inspect
 import tempfile
 import functools
+import hashlib
 import threading
 import traceback
 import types
+import collections
 from zipimport import zipimporter
 
 # Import salt libs
@@ -25,6 +27,7 @@ import salt.config
 import salt.defaults.exitcodes
 import salt.syspaths
 import salt.utils.args
+import salt.utils.atomicfile
 import salt.utils.context
 import salt.utils.data
 import salt.utils.dictupdate
@@ -33,7 +36,9 @@ import salt.utils.files
 import salt.utils.lazy
 import salt.utils.odict
 import salt.utils.platform
+import salt.utils.stringutils
 import salt.utils.versions
+import salt.version
 from salt.exceptions import LoaderError
 from salt.template import check_render_pipe_str
 from salt.utils.decorators import Depends
@@ -105,6 +110,25 @@ LIBCLOUD_FUNCS_NOT_SUPPORTED = (
 # Will be set to pyximport module at runtime if cython is enabled in config.
 pyximport = None
 
+# The file mappings and __virtual__ rejections of the loaders of this process,
+# by loader cache key, see LazyLoader._loader_cache_entry
+_LOADER_CACHE = {}
+
+# Files and directories modified less than this many seconds ago can still be
+# modified again without their mtime changing, they are not cached
+_LOADER_CACHE_RACY = 2
+
+
+def _stat_key(path):
+    '''
+    Return the mtime and size of a path, or None if it does not exist
+    '''
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime, stat.st_size]
+
 
 def static_loader(
         opts,
@@ -713,6 +737,200 @@ def _load_cached_grains(opts, cfn):
         return None
 
 
+def _call_grain(func, kwargs):
+    '''
+    Call a grains function, returning its return or the info of the exception
+    it raised, and the time it took
+    '''
+    start = time.time()
+    try:
+        ret, exc_info = func(**kwargs), None
+    except Exception:
+        ret, exc_info = None, sys.exc_info()
+    return ret, exc_info, time.time() - start
+
+
+class _GrainCall(object):
+    '''
+    A grains function queued for the threads of a _GrainsRunner
+    '''
+    def __init__(self, func, kwargs):
+        self.func = func
+        self.kwargs = kwargs
+        self.start = None
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.result = None
+        # Set when the function timed out and its thread was replaced
+        self.abandoned = False
+
+
+class _GrainsRunner(object):
+    '''
+    Run the grains functions, ``grains_workers`` at a time, timing them and
+    giving up on the functions running longer than ``grains_timeout``. The
+    returns of the functions in ``grains_function_cache`` are reused until
+    their TTL expires.
+
+    A thread running a function which timed out no longer counts against
+    ``grains_workers``, another thread runs the next functions.
+    '''
+    def __init__(self, opts):
+        self.opts = opts
+        self.workers = max(int(opts.get('grains_workers', 1)), 1)
+        self.timeout = opts.get('grains_timeout', 0)
+        self.threaded = self.workers > 1 or bool(self.timeout)
+        self.queue = collections.deque()
+        self.lock = threading.Lock()
+        self.threads = 0
+        self.pending = []
+        # {function: {'duration': seconds, 'status': status}}
+        self.profile = {}
+        self.ttl = opts.get('grains_function_cache') or {}
+        self.cache = {}
+        self.cache_updated = False
+        if self.ttl:
+            self.cache = _load_grains_function_cache(opts)
+
+    def submit(self, key, func, kwargs=None):
+        '''
+        Queue a grains function, or run it when there are no threads
+        '''
+        if key in self.cache:
+            if time.time() - self.cache[key][0] < self.ttl.get(key, 0):
+                self.pending.append((key, None))
+                return
+            self.cache.pop(key)
+        if not self.threaded:
+            self.pending.append((key, _call_grain(func, kwargs or {})))
+            return
+        call = _GrainCall(func, kwargs or {})
+        with self.lock:
+            self.queue.append(call)
+            self._start_thread()
+        self.pending.append((key, call))
+
+    def _start_thread(self):
+        '''
+        Start a thread running the queued functions, unless ``grains_workers``
+        threads already run. Called with the lock held.
+        '''
+        if self.threads >= self.workers or not self.queue:
+            return
+        self.threads += 1
+        thread = threading.Thread(target=self._run, name='GrainsRunner')
+        thread.daemon = True
+        thread.start()
+
+    def _run(self):
+        '''
+        Run the queued functions until the queue is empty
+        '''
+        while True:
+            with self.lock:
+                if not self.queue:
+                    self.threads -= 1
+                    return
+                call = self.queue.popleft()
+            call.start = time.time()
+            call.started.set()
+            result = _call_grain(call.func, call.kwargs)
+            with self.lock:
+                call.result = result
+                call.done.set()
+                if call.abandoned:
+                    # Another thread took over the queue
+                    return
+
+    def results(self):
+        '''
+        Wait for the started grains functions and yield the key, return and
+        exception info of each of them, in the order they were started. The
+        return of the functions which timed out is None.
+        '''
+        pending, self.pending = self.pending, []
+        for key, result in pending:
+            if result is None:
+                self.profile[key] = {'duration': 0.0, 'status': 'cached'}
+                yield key, self.cache[key][1], None
+                continue
+            if not self.threaded:
+                ret, exc_info, duration = result
+                status = None
+            else:
+                ret, exc_info, duration, status = self._wait(key, result)
+            if status is None:
+                status = 'error' if exc_info else 'ok'
+                if key in self.ttl and not exc_info:
+                    self.cache[key] = [time.time(), ret]
+                    self.cache_updated = True
+            self.profile[key] = {'duration': duration, 'status': status}
+            yield key, ret, exc_info
+
+    def _wait(self, key, call):
+        if not self.timeout:
+            call.done.wait()
+            return call.result + (None,)
+        # The time spent in the queue does not count
+        call.started.wait()
+        call.done.wait(max(call.start + self.timeout - time.time(), 0))
+        with self.lock:
+            if call.done.is_set():
+                return call.result + (None,)
+            call.abandoned = True
+            self.threads -= 1
+            self._start_thread()
+        log.error(
+            'Grains function %s did not return within grains_timeout '
+            '(%s seconds), its grains are not set', key, self.timeout
+        )
+        return None, None, time.time() - call.start, 'timeout'
+
+    def close(self):
+        '''
+        Write the function cache and the profile, the threads exit once the
+        functions still running returned
+        '''
+        if self.cache_updated:
+            _write_grains_file(self.opts, 'grains.functions.cache.p', self.cache)
+        if self.opts.get('grains_profile', False):
+            _write_grains_file(self.opts, 'grains.profile.p', self.profile)
+            for key, prof in sorted(six.iteritems(self.profile),
+                                    key=lambda item: -item[1]['duration'])[:10]:
+                log.debug('Grains function %s: %s, %.3f seconds',
+                          key, prof['status'], prof['duration'])
+
+
+def _load_grains_function_cache(opts):
+    '''
+    Return the cached returns of the functions in grains_function_cache:
+    {function: [time, return]}
+    '''
+    cfn = os.path.join(opts['cachedir'], 'grains.functions.cache.p')
+    try:
+        with salt.utils.files.fopen(cfn, 'rb') as fp_:
+            cache = salt.payload.Serial(opts).load(fp_)
+        return salt.utils.data.decode(cache, preserve_tuples=True)
+    except (IOError, OSError):
+        return {}
+    except Exception as exc:
+        log.debug('Discarding the grains function cache %s: %s', cfn, exc)
+        return {}
+
+
+def _write_grains_file(opts, name, data):
+    '''
+    Write the grains function cache or profile in the cachedir
+    '''
+    path = os.path.join(opts['cachedir'], name)
+    try:
+        with salt.utils.files.set_umask(0o077):
+            with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                salt.payload.Serial(opts).dump(data, fp_)
+    except Exception as exc:
+        log.error('Unable to write %s: %s', path, exc)
+
+
 def grains(opts, force_refresh=False, proxy=None):
     '''
     Return the functions for the dynamic grains and the values for the static
@@ -776,24 +994,45 @@ def grains(opts, force_refresh=False, proxy=None):
     funcs = grain_funcs(opts, proxy=proxy)
     if force_refresh:  # if we refresh, lets reload grain modules
         funcs.clear()
-    # Run core grains
-    for key in funcs:
-        if not key.startswith('core.'):
-            continue
-        log.trace('Loading %s grain', key)
-        ret = funcs[key]()
+
+    def _merge(ret):
         if not isinstance(ret, dict):
-            continue
+            return
         if grains_deep_merge:
             salt.utils.dictupdate.update(grains_data, ret)
         else:
             grains_data.update(ret)
 
-    # Run the rest of the grains
-    for key in funcs:
-        if key.startswith('core.') or key == '_errors':
-            continue
-        try:
+    def _merge_results():
+        for key, ret, exc_info in runner.results():
+            if exc_info:
+                if salt.utils.platform.is_proxy():
+                    log.info('The following CRITICAL message may not be an error; the proxy may not be completely established yet.')
+                log.critical(
+                    'Failed to load grains defined in grain file %s in '
+                    'function %s, error:\n', key, funcs[key],
+                    exc_info=exc_info
+                )
+                continue
+            _merge(ret)
+
+    runner = _GrainsRunner(opts)
+    try:
+        # Run core grains, they don't depend on each other
+        for key in funcs:
+            if not key.startswith('core.'):
+                continue
+            log.trace('Loading %s grain', key)
+            runner.submit(key, funcs[key])
+        for key, ret, exc_info in runner.results():
+            if exc_info:
+                six.reraise(*exc_info)
+            _merge(ret)
+
+        # Run the rest of the grains
+        for key in funcs:
+            if key.startswith('core.') or key == '_errors':
+                continue
             # Grains are loaded too early to take advantage of the injected
             # __proxy__ variable.  Pass an instance of that LazyLoader
             # here instead to grains functions if the grains functions take
@@ -801,28 +1040,31 @@ def grains(opts, force_refresh=False, proxy=None):
             # proxymodule for retrieving information from the connected
             # device.
             log.trace('Loading %s grain', key)
-            parameters = salt.utils.args.get_function_argspec(funcs[key]).args
+            try:
+                parameters = salt.utils.args.get_function_argspec(funcs[key]).args
+            except Exception:
+                log.critical(
+                    'Failed to load grains defined in grain file %s in '
+                    'function %s, error:\n', key, funcs[key],
+                    exc_info=True
+                )
+                continue
             kwargs = {}
             if 'proxy' in parameters:
                 kwargs['proxy'] = proxy
             if 'grains' in parameters:
                 kwargs['grains'] = grains_data
-            ret = funcs[key](**kwargs)
-        except Exception:
-            if salt.utils.platform.is_proxy():
-                log.info('The following CRITICAL message may not be an error; the proxy may not be completely established yet.')
-            log.critical(
-                'Failed to load grains defined in grain file %s in '
-                'function %s, error:\n', key, funcs[key],
-                exc_info=True
-            )
-            continue
-        if not isinstance(ret, dict):
-            continue
-        if grains_deep_merge:
-            salt.utils.dictupdate.update(grains_data, ret)
-        else:
-            grains_data.update(ret)
+            if kwargs:
+                # Run the functions taking the grains or the proxymodule
+                # alone, after the functions before them
+                _merge_results()
+                runner.submit(key, funcs[key], kwargs)
+                _merge_results()
+            else:
+                runner.submit(key, funcs[key])
+        _merge_results()
+    finally:
+        runner.close()
 
     if opts.get('proxy_merge_grains_in_module', True) and proxy:
         try:
@@ -1191,7 +1433,8 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             self.suffix_order.append(suffix)
 
         self._lock = threading.RLock()
-        self._refresh_file_mapping()
+        self._loader_cache_key = None
+        self._loader_cache_dirty = False
 
         super(LazyLoader, self).__init__()  # late init the lazy loader
         # create all of the import namespaces
@@ -1282,6 +1525,16 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         else:
             self.suffix_map[''] = ('', '', imp.PKG_DIRECTORY)
 
+        # the mapping only changes when a file is added to or removed from
+        # one of the directories it was built from
+        entry = self._loader_cache_entry()
+        if entry is not None and entry['mapping'] is not None and \
+                all(_stat_key(path) == stat for path, stat in six.iteritems(entry['dirs'])):
+            self.file_mapping = salt.utils.odict.OrderedDict(
+                (item[0], tuple(item[1:])) for item in entry['mapping'])
+            return
+        dirs = {}
+
         # create mapping of filename (without suffix) to (path, suffix)
         # The files are added in order of priority, so order *must* be retained.
         self.file_mapping = salt.utils.odict.OrderedDict()
@@ -1299,6 +1552,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             return ''
 
         for mod_dir in self.module_dirs:
+            dirs[mod_dir] = _stat_key(mod_dir)
             try:
                 # Make sure we have a sorted listdir in order to have
                 # expectable override results
@@ -1308,10 +1562,12 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             except OSError:
                 continue  # Next mod_dir
             if six.PY3:
+                pycache_dir = os.path.join(mod_dir, '__pycache__')
+                dirs[pycache_dir] = _stat_key(pycache_dir)
                 try:
                     pycache_files = [
                         os.path.join('__pycache__', x) for x in
-                        sorted(os.listdir(os.path.join(mod_dir, '__pycache__')))
+                        sorted(os.listdir(pycache_dir))
                     ]
                 except OSError:
                     pass
@@ -1363,6 +1619,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # if its a directory, lets allow us to load that
                     if ext == '':
                         # is there something __init__?
+                        dirs[fpath] = _stat_key(fpath)
                         subfiles = os.listdir(fpath)
                         for suffix in self.suffix_order:
                             if '' == suffix:
@@ -1412,6 +1669,103 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             f_noext = smod.split('.')[-1]
             self.file_mapping[f_noext] = (smod, '.o', 0)
 
+        racy = time.time() - _LOADER_CACHE_RACY
+        if entry is not None and all(stat is None or stat[0] < racy for stat in six.itervalues(dirs)):
+            entry['dirs'] = dirs
+            entry['mapping'] = [
+                [name] + list(val) for name, val in six.iteritems(self.file_mapping)
+            ]
+            self._save_loader_cache()
+
+    def _loader_cache_entry(self):
+        '''
+        Return the cached file mapping and __virtual__ rejections of this
+        loader, read from the cachedir the first time, or None if the
+        loader_cache option is disabled
+        '''
+        if not self.opts.get('loader_cache', True):
+            return None
+        if self._loader_cache_key is None:
+            # everything the mapping and the rejections depend on, other than
+            # the files themselves
+            proxy = self.opts.get('proxy')
+            key = (
+                salt.version.__version__, sys.version_info[:2], sys.platform,
+                self.tag, list(self.module_dirs), sorted(self.suffix_map),
+                self.suffix_order, sorted(self.disabled),
+                self.opts.get('optimization_order'), list(self.static_modules),
+                salt.utils.platform.is_proxy(), 'proxy' in self.opts,
+                proxy.get('proxytype') if isinstance(proxy, dict) else None,
+            )
+            self._loader_cache_key = hashlib.sha1(
+                salt.utils.stringutils.to_bytes(repr(key))).hexdigest()
+        entry = _LOADER_CACHE.get(self._loader_cache_key)
+        if entry is None:
+            entry = {'dirs': {}, 'mapping': None, 'rejected': {}}
+            path = self._loader_cache_path()
+            if path is not None:
+                try:
+                    with salt.utils.files.fopen(path, 'rb') as fp_:
+                        cached = salt.utils.data.decode(
+                            salt.payload.Serial(self.opts).load(fp_))
+                    if isinstance(cached, dict) and set(cached) == set(entry):
+                        entry.update(cached)
+                except (IOError, OSError):
+                    pass
+                except Exception as exc:
+                    log.debug('Discarding the loader cache %s: %s', path, exc)
+            _LOADER_CACHE[self._loader_cache_key] = entry
+        return entry
+
+    def _loader_cache_path(self):
+        '''
+        Return the path of the loader cache file in the cachedir
+        '''
+        if not self.opts.get('cachedir'):
+            return None
+        return os.path.join(
+            self.opts['cachedir'],
+            'loader',
+            '{0}-{1}.p'.format(self.tag, self._loader_cache_key))
+
+    def _save_loader_cache(self):
+        '''
+        Write the cached file mapping and __virtual__ rejections of this
+        loader in the cachedir
+        '''
+        self._loader_cache_dirty = False
+        path = self._loader_cache_path()
+        if path is None:
+            return
+        try:
+            with salt.utils.files.set_umask(0o077):
+                if not os.path.isdir(os.path.dirname(path)):
+                    os.makedirs(os.path.dirname(path))
+                with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                    salt.payload.Serial(self.opts).dump(
+                        _LOADER_CACHE[self._loader_cache_key], fp_)
+        except Exception as exc:
+            log.debug('Unable to write the loader cache %s: %s', path, exc)
+
+    def _cache_rejection(self, name, module_name, reason):
+        '''
+        Remember that a module was rejected, so it is not imported again until
+        its file changes. Only for rejections which do not depend on anything
+        but the file and the loader cache key.
+        '''
+        entry = self._loader_cache_entry()
+        fpath, suffix = self.file_mapping[name][:2]
+        if entry is None or suffix in ('', '.o'):
+            # packages can change without their directory changing
+            return
+        stat = _stat_key(fpath)
+        if stat is None or stat[0] >= time.time() - _LOADER_CACHE_RACY:
+            return
+        if reason is not None:
+            reason = six.text_type(reason)
+        entry['rejected'][name] = [fpath, stat, module_name, reason]
+        self._loader_cache_dirty = True
+
     def clear(self):
         '''
         Clear the dict
@@ -1481,6 +1835,14 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         mod = None
         fpath, suffix = self.file_mapping[name][:2]
         self.loaded_files.add(name)
+        entry = self._loader_cache_entry()
+        rejected = entry['rejected'].get(name) if entry is not None else None
+        if rejected is not None and rejected[2] not in self.missing_modules and \
+                rejected[:2] == [fpath, _stat_key(fpath)]:
+            # Rejected before, without importing it again
+            self.missing_modules[rejected[2]] = rejected[3]
+            self.missing_modules[name] = rejected[3]
+            return False
         fpath_dirname = os.path.dirname(fpath)
         try:
             sys.path.append(fpath_dirname)
@@ -1653,6 +2015,8 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # If a module has information about why it could not be loaded, record it
                     self.missing_modules[module_name] = virtual_err
                     self.missing_modules[name] = virtual_err
+                    if getattr(mod, '__virtual_cache__', False) is True:
+                        self._cache_rejection(name, module_name, virtual_err)
                     return False
         else:
             virtual_aliases = ()
@@ -1670,6 +2034,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     err_string = 'not a proxy_minion enabled module'
                     self.missing_modules[module_name] = err_string
                     self.missing_modules[name] = err_string
+                    self._cache_rejection(name, module_name, err_string)
                     return False
 
         if getattr(mod, '__load__', False) is not False:
@@ -1780,6 +2145,8 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                         reloaded = True
                     continue
 
+            if self._loader_cache_dirty:
+                self._save_loader_cache()
         return ret
 
     def _load_all(self):
@@ -1793,6 +2160,8 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                 self._load_module(name)
 
             self.loaded = True
+            if self._loader_cache_dirty:
+                self._save_loader_cache()
 
     def reload_modules(self):
         with self._lock:
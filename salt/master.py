@@ -901,12 +901,15 @@ class ReqServer(salt.utils.process.SignalHandlingMultiprocessingProcess):
 
         req_channels = []
         tcp_only = True
+        zeromq_only = True
         for transport, opts in iter_transport_opts(self.opts):
             chan = salt.transport.server.ReqServerChannel.factory(opts)
             chan.pre_fork(self.process_manager)
             req_channels.append(chan)
             if transport != 'tcp':
                 tcp_only = False
+            if transport not in ('zeromq', 'zmq'):
+                zeromq_only = False
 
         kwargs = {}
         if salt.utils.platform.is_windows():
@@ -923,17 +926,31 @@ class ReqServer(salt.utils.process.SignalHandlingMultiprocessingProcess):
         # Reset signals to default ones before adding processes to the process
         # manager. We don't want the processes being started to inherit those
         # signal handlers
+        # The MWorkers of the default pool handle the requests of the
+        # commands which no pool in worker_pools handles
+        pools = [(None, self.opts['worker_threads'])]
+        worker_pools = self.opts.get('worker_pools') or {}
+        for pool in sorted(worker_pools):
+            pools.append((pool, worker_pools[pool].get('worker_threads', 1)))
+        if worker_pools and not zeromq_only:
+            log.warning('worker_pools are only supported by the ZeroMQ transport, '
+                        'the MWorkers of all pools will handle every request')
+
         with salt.utils.process.default_signals(signal.SIGINT, signal.SIGTERM):
-            for ind in range(int(self.opts['worker_threads'])):
-                name = 'MWorker-{0}'.format(ind)
-                self.process_manager.add_process(MWorker,
-                                                 args=(self.opts,
-                                                       self.master_key,
-                                                       self.key,
-                                                       req_channels,
-                                                       name),
-                                                 kwargs=kwargs,
-                                                 name=name)
+            for pool, worker_threads in pools:
+                for ind in range(int(worker_threads)):
+                    if pool is None:
+                        name = 'MWorker-{0}'.format(ind)
+                    else:
+                        name = 'MWorker-{0}-{1}'.format(pool, ind)
+                    self.process_manager.add_process(MWorker,
+                                                     args=(self.opts,
+                                                           self.master_key,
+                                                           self.key,
+                                                           req_channels,
+                                                           name),
+                                                     kwargs=dict(kwargs, pool=pool),
+                                                     name=name)
         self.process_manager.run()
 
     def run(self):
@@ -963,6 +980,7 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
                  key,
                  req_channels,
                  name,
+                 pool=None,
                  **kwargs):
         '''
         Create a salt master worker process
@@ -970,6 +988,8 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
         :param dict opts: The salt options
         :param dict mkey: The user running the salt master and the AES key
         :param dict key: The user running the salt master and the RSA key
+        :param str pool: The pool of ``worker_pools`` the worker is part of,
+            None for the default pool
 
         :rtype: MWorker
         :return: Master worker
@@ -979,6 +999,7 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
         super(MWorker, self).__init__(**kwargs)
         self.opts = opts
         self.req_channels = req_channels
+        self.pool = pool
 
         self.mkey = mkey
         self.key = key
@@ -999,6 +1020,7 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
         )
         self.opts = state['opts']
         self.req_channels = state['req_channels']
+        self.pool = state['pool']
         self.mkey = state['mkey']
         self.key = state['key']
         self.k_mtime = state['k_mtime']
@@ -1008,6 +1030,7 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
         return {
             'opts': self.opts,
             'req_channels': self.req_channels,
+            'pool': self.pool,
             'mkey': self.mkey,
             'key': self.key,
             'k_mtime': self.k_mtime,
@@ -1030,6 +1053,7 @@ class MWorker(salt.utils.process.SignalHandlingMultiprocessingProcess):
         self.io_loop = ZMQDefaultLoop()
         self.io_loop.make_current()
         for req_channel in self.req_channels:
+            req_channel.worker_pool = self.pool
             req_channel.post_fork(self._handle_payload, io_loop=self.io_loop)  # TODO: cleaner? Maybe lazily?
         try:
             self.io_loop.start()
@@ -1178,8 +1202,8 @@ class AESFuncs(TransportMethods):
         '_mine_get', '_mine', '_mine_delete', '_mine_flush', '_file_recv',
         '_pillar', '_minion_event', '_handle_minion_event', '_return',
         '_syndic_return', 'minion_runner', 'pub_ret', 'minion_pub',
-        'minion_publish', 'revoke_auth', '_serve_file', '_file_find',
-        '_file_hash', '_file_hash_and_stat', '_file_list',
+        'minion_publish', 'revoke_auth', '_serve_file', '_serve_file_delta',
+        '_file_find', '_file_hash', '_file_hash_and_stat', '_file_list',
         '_file_list_emptydirs', '_dir_list', '_symlink_list', '_file_envs',
     )
 
@@ -1216,6 +1240,7 @@ class AESFuncs(TransportMethods):
         import salt.fileserver
         self.fs_ = salt.fileserver.Fileserver(self.opts)
         self._serve_file = self.fs_.serve_file
+        self._serve_file_delta = self.fs_.serve_file_delta
         self._file_find = self.fs_._find_file
         self._file_hash = self.fs_.file_hash
         self._file_hash_and_stat = self.fs_.file_hash_and_stat
@@ -1577,10 +1602,13 @@ class AESFuncs(TransportMethods):
         data = pillar.compile_pillar()
         self.fs_.update_opts()
         if self.opts.get('minion_data_cache', False):
+            mdata = {'grains': load['grains'], 'pillar': data}
             self.masterapi.cache.store('minions/{0}'.format(load['id']),
                                        'data',
-                                       {'grains': load['grains'],
-                                        'pillar': data})
+                                       mdata)
+            index = salt.utils.minions.get_minion_data_index(self.opts)
+            if index is not None:
+                index.update(load['id'], mdata)
             if self.opts.get('minion_data_cache_events') is True:
                 self.event.fire_event({'Minion data cache refresh': load['id']}, tagify(load['id'], 'refresh', 'minion'))
         return data
@@ -1679,7 +1707,11 @@ class AESFuncs(TransportMethods):
 
         :param dict load: The minion payload
         '''
-        loads = load.get('load')
+        if 'zload' in load:
+            # The returns were compressed by the syndic
+            loads = self.serial.loads(salt.utils.gzip_util.uncompress(load['zload']))
+        else:
+            loads = load.get('load')
         if not isinstance(loads, list):
             loads = [load]  # support old syndics not aggregating returns
         for load in loads:
@@ -2233,12 +2265,23 @@ class ClearFuncs(TransportMethods):
             return {'error': msg}
         return jid
 
+    def _get_pub_channels(self):
+        '''
+        Return the publish channels of the configured transports, created
+        once and kept so their connection to the publisher daemons is reused
+        '''
+        if not hasattr(self, '_pub_channels'):
+            self._pub_channels = [
+                salt.transport.server.PubServerChannel.factory(opts)
+                for transport, opts in iter_transport_opts(self.opts)
+            ]
+        return self._pub_channels
+
     def _send_pub(self, load):
         '''
         Take a load and send it across the network to connected minions
         '''
-        for transport, opts in iter_transport_opts(self.opts):
-            chan = salt.transport.server.PubServerChannel.factory(opts)
+        for chan in self._get_pub_channels():
             chan.publish(load)
 
     @property
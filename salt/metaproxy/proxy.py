@@ -29,7 +29,6 @@ import salt.utils.error
 import salt.utils.event
 import salt.utils.files
 import salt.utils.jid
-import salt.utils.minion
 import salt.utils.minions
 import salt.utils.network
 import salt.utils.platform
@@ -164,7 +163,7 @@ def post_master_init(self, master):
     self.serial = salt.payload.Serial(self.opts)
     self.mod_opts = self._prep_mod_opts()
     self.matchers = salt.loader.matchers(self.opts)
-    self.beacons = salt.beacons.Beacon(self.opts, self.functions)
+    self.beacons = salt.beacons.Beacon(self.opts, self.functions, running_jobs=self.running_jobs)
     uid = salt.utils.user.get_uid(user=self.opts.get('user', None))
     self.proc_dir = salt.minion.get_proc_dir(self.opts['cachedir'], uid=uid)
 
@@ -182,7 +181,8 @@ def post_master_init(self, master):
             self.functions,
             self.returners,
             cleanup=[salt.minion.master_event(type='alive')],
-            proxy=self.proxy)
+            proxy=self.proxy,
+            running_jobs=self.running_jobs)
 
     # add default scheduling jobs to the minions scheduler
     if self.opts['mine_enabled'] and 'mine.update' in self.functions:
@@ -707,11 +707,11 @@ def handle_decoded_payload(self, data):
 
     process_count_max = self.opts.get('process_count_max')
     if process_count_max > 0:
-        process_count = len(salt.utils.minion.running(self.opts))
+        process_count = len(self.running_jobs.running())
         while process_count >= process_count_max:
             log.warning("Maximum number of processes reached while executing jid {0}, waiting...".format(data['jid']))
             yield tornado.gen.sleep(10)
-            process_count = len(salt.utils.minion.running(self.opts))
+            process_count = len(self.running_jobs.running())
 
     # We stash an instance references to allow for the socket
     # communication in Windows. You can't pickle functions, and thus
@@ -743,6 +743,7 @@ def handle_decoded_payload(self, data):
     else:
         process.start()
     process.name = '{}-Job-{}'.format(process.name, data['jid'])
+    self.running_jobs.add(data, process)
     self.subprocess_list.add(process)
 
 
@@ -79,6 +79,7 @@ import salt.utils.data
 import salt.utils.error
 import salt.utils.event
 import salt.utils.files
+import salt.utils.gzip_util
 import salt.utils.jid
 import salt.utils.minion
 import salt.utils.minions
@@ -939,6 +940,9 @@ class MinionManager(MinionBase):
         self.max_auth_wait = self.opts['acceptance_wait_time_max']
         self.minions = []
         self.jid_queue = []
+        self.running_jobs = salt.utils.minion.RunningJobs(self.opts)
+        # Let saltutil.running ask this process for the running jobs
+        self.opts['__running_jobs'] = True
 
         install_zmq()
         self.io_loop = ZMQDefaultLoop.current()
@@ -960,12 +964,18 @@ class MinionManager(MinionBase):
 
     @tornado.gen.coroutine
     def handle_event(self, package):
+        tag, _ = salt.utils.event.SaltEvent.unpack(package)
+        if tag.startswith('minion_running_jobs'):
+            # The jobs of all the minions, asked for by saltutil.running
+            self.event.fire_event({'complete': True, 'jobs': self.running_jobs.running()},
+                                  tag='/salt/minion/minion_running_jobs_complete')
+            return
         for minion in self.minions:
             minion.handle_event(package)
 
     def _create_minion_object(self, opts, timeout, safe,
                               io_loop=None, loaded_base_name=None,
-                              jid_queue=None):
+                              jid_queue=None, running_jobs=None):
         '''
         Helper function to return the correct type of object
         '''
@@ -974,7 +984,8 @@ class MinionManager(MinionBase):
                       safe,
                       io_loop=io_loop,
                       loaded_base_name=loaded_base_name,
-                      jid_queue=jid_queue)
+                      jid_queue=jid_queue,
+                      running_jobs=running_jobs)
 
     def _check_minions(self):
         '''
@@ -1006,7 +1017,8 @@ class MinionManager(MinionBase):
                                                 False,
                                                 io_loop=self.io_loop,
                                                 loaded_base_name='salt.loader.{0}'.format(s_opts['master']),
-                                                jid_queue=self.jid_queue)
+                                                jid_queue=self.jid_queue,
+                                                running_jobs=self.running_jobs)
             self.io_loop.spawn_callback(self._connect_minion, minion)
         self.io_loop.call_later(timeout, self._check_minions)
 
@@ -1092,7 +1104,8 @@ class Minion(MinionBase):
     This class instantiates a minion, runs connections for a minion,
     and loads all of the functions into the minion
     '''
-    def __init__(self, opts, timeout=60, safe=True, loaded_base_name=None, io_loop=None, jid_queue=None):  # pylint: disable=W0231
+    def __init__(self, opts, timeout=60, safe=True, loaded_base_name=None, io_loop=None, jid_queue=None,
+                 running_jobs=None):  # pylint: disable=W0231
         '''
         Pass in the options dict
         '''
@@ -1111,6 +1124,9 @@ class Minion(MinionBase):
         # True means the Minion is fully functional and ready to handle events.
         self.ready = False
         self.jid_queue = [] if jid_queue is None else jid_queue
+        if running_jobs is None:
+            running_jobs = salt.utils.minion.RunningJobs(self.opts)
+        self.running_jobs = running_jobs
         self.periodic_callbacks = {}
 
         if io_loop is None:
@@ -1270,7 +1286,8 @@ class Minion(MinionBase):
                 self.opts,
                 self.functions,
                 self.returners,
-                cleanup=[master_event(type='alive')])
+                cleanup=[master_event(type='alive')],
+                running_jobs=self.running_jobs)
 
         # add default scheduling jobs to the minions scheduler
         if self.opts['mine_enabled'] and 'mine.update' in self.functions:
@@ -1506,11 +1523,11 @@ class Minion(MinionBase):
 
         process_count_max = self.opts.get('process_count_max')
         if process_count_max > 0:
-            process_count = len(salt.utils.minion.running(self.opts))
+            process_count = len(self.running_jobs.running())
             while process_count >= process_count_max:
                 log.warning("Maximum number of processes reached while executing jid %s, waiting...", data['jid'])
                 yield tornado.gen.sleep(10)
-                process_count = len(salt.utils.minion.running(self.opts))
+                process_count = len(self.running_jobs.running())
 
         # We stash an instance references to allow for the socket
         # communication in Windows. You can't pickle functions, and thus
@@ -1542,6 +1559,7 @@ class Minion(MinionBase):
         else:
             process.start()
         process.name = '{}-Job-{}'.format(process.name, data['jid'])
+        self.running_jobs.add(data, process)
         self.subprocess_list.add(process)
 
     def ctx(self):
@@ -2068,6 +2086,11 @@ class Minion(MinionBase):
 
         load = {'cmd': ret_cmd,
                 'load': list(six.itervalues(jids))}
+        if ret_cmd == '_syndic_return' and self.opts.get('syndic_forward_compress'):
+            load = {'cmd': ret_cmd,
+                    'id': self.opts['id'],
+                    'zload': salt.utils.gzip_util.compress(
+                        salt.payload.Serial(self.opts).dumps(load['load']))}
 
         def timeout_handler(*_):
             log.warning(
@@ -2171,7 +2194,7 @@ class Minion(MinionBase):
         if not self.beacons_leader:
             return
         log.debug('Refreshing beacons.')
-        self.beacons = salt.beacons.Beacon(self.opts, self.functions)
+        self.beacons = salt.beacons.Beacon(self.opts, self.functions, running_jobs=self.running_jobs)
 
     def matchers_refresh(self):
         '''
@@ -2567,7 +2590,7 @@ class Minion(MinionBase):
 #            self.matcher = Matcher(self.opts, self.functions)
             self.matchers = salt.loader.matchers(self.opts)
             if self.beacons_leader:
-                self.beacons = salt.beacons.Beacon(self.opts, self.functions)
+                self.beacons = salt.beacons.Beacon(self.opts, self.functions, running_jobs=self.running_jobs)
             uid = salt.utils.user.get_uid(user=self.opts.get('user', None))
             self.proc_dir = get_proc_dir(self.opts['cachedir'], uid=uid)
             self.grains_cache = self.opts['grains']
@@ -2585,7 +2608,7 @@ class Minion(MinionBase):
         self._setup_core()
         loop_interval = self.opts['loop_interval']
         if 'beacons' not in self.periodic_callbacks:
-            self.beacons = salt.beacons.Beacon(self.opts, self.functions)
+            self.beacons = salt.beacons.Beacon(self.opts, self.functions, running_jobs=self.running_jobs)
 
             def handle_beacons():
                 # Process Beacons
@@ -2625,7 +2648,8 @@ class Minion(MinionBase):
                     self.functions,
                     self.returners,
                     utils=self.utils,
-                    cleanup=[master_event(type='alive')])
+                    cleanup=[master_event(type='alive')],
+                    running_jobs=self.running_jobs)
 
             try:
                 if self.opts['grains_refresh_every']:  # In minutes, not seconds!
@@ -3006,6 +3030,12 @@ class SyndicManager(MinionBase):
         self.delayed = []
         # Active pub futures: {master_id: (future, [job_ret, ...]), ...}
         self.pub_futures = {}
+        # Number and size in bytes of the minion returns in job_rets:
+        # {master_id: [count, size], ...}
+        self.job_ret_sizes = {}
+        # Counters fired with the queue sizes in salt/syndic/<id>/stats events
+        self.stats = {'forwarded': 0, 'size_flushes': 0, 'dropped_events': 0}
+        self.stat_clock = time.time()
 
     def _spawn_syndics(self):
         '''
@@ -3177,6 +3207,7 @@ class SyndicManager(MinionBase):
 
     def _reset_event_aggregation(self):
         self.job_rets = {}
+        self.job_ret_sizes = {}
         self.raw_events = []
 
     def reconnect_event_bus(self, something):
@@ -3257,6 +3288,21 @@ class SyndicManager(MinionBase):
                 if key in data:
                     ret[key] = data[key]
             jdict[data['id']] = ret
+
+            # Forward the returns without waiting for the next forward
+            # interval once enough of them were gathered, unless the
+            # previous returns are still being sent to the master, in which
+            # case the returns keep being gathered into a single send
+            size = self.job_ret_sizes.setdefault(master, [0, 0])
+            size[0] += 1
+            size[1] += len(raw)
+            max_returns = self.opts.get('syndic_forward_max_returns')
+            max_bytes = self.opts.get('syndic_forward_max_bytes')
+            if (max_returns and size[0] >= max_returns) or \
+                    (max_bytes and size[1] >= max_bytes):
+                future = self.pub_futures.get(master, (None, None))[0]
+                if (future is None or future.done()) and self._forward_returns(master):
+                    self.stats['size_flushes'] += 1
         else:
             # TODO: config to forward these? If so we'll have to keep track of who
             # has seen them
@@ -3265,9 +3311,51 @@ class SyndicManager(MinionBase):
                 # Add generic event aggregation here
                 if 'retcode' not in data:
                     self.raw_events.append({'data': data, 'tag': mtag})
+                    hwm = self.opts.get('syndic_event_forward_hwm')
+                    if hwm and len(self.raw_events) > hwm:
+                        # Drop the oldest events rather than the job returns
+                        # when the events can't be forwarded fast enough
+                        dropped = len(self.raw_events) - hwm
+                        del self.raw_events[:dropped]
+                        self.stats['dropped_events'] += dropped
+
+    def _forward_returns(self, master):
+        '''
+        Forward the returns gathered for a master, returns False when they
+        could not be sent yet
+        '''
+        values = list(six.itervalues(self.job_rets[master]))
+        if not self._return_pub_syndic(values, master_id=master):
+            return False
+        del self.job_rets[master]
+        self.stats['forwarded'] += self.job_ret_sizes.pop(master, [0, 0])[0]
+        return True
+
+    def _fire_stats(self):
+        '''
+        Fire an event with the size of the queues of returns and events
+        waiting to be forwarded to the masters
+        '''
+        now = time.time()
+        pending = {}
+        for master, (count, size) in six.iteritems(self.job_ret_sizes):
+            pending[str(master)] = {'returns': count, 'bytes': size}
+        data = {'time': now - self.stat_clock,
+                'pending': pending,
+                'sending': [master for master, (future, _) in six.iteritems(self.pub_futures)
+                            if not future.done()],
+                'delayed': len(self.delayed),
+                'events': len(self.raw_events)}
+        data.update(self.stats)
+        self.local.event.fire_event(data, tagify([self.opts['id'], 'stats'], 'syndic'))
+        self.stats = dict.fromkeys(self.stats, 0)
+        self.stat_clock = now
 
     def _forward_events(self):
         log.trace('Forwarding events')  # pylint: disable=no-member
+        if self.opts.get('master_stats') and \
+                time.time() - self.stat_clock > self.opts['master_stats_event_iter']:
+            self._fire_stats()
         if self.raw_events:
             events = self.raw_events
             self.raw_events = []
@@ -3283,10 +3371,7 @@ class SyndicManager(MinionBase):
             if res:
                 self.delayed = []
         for master in list(six.iterkeys(self.job_rets)):
-            values = list(six.itervalues(self.job_rets[master]))
-            res = self._return_pub_syndic(values, master_id=master)
-            if res:
-                del self.job_rets[master]
+            self._forward_returns(master)
 
 
 class ProxyMinionManager(MinionManager):
@@ -3295,7 +3380,7 @@ class ProxyMinionManager(MinionManager):
     '''
     def _create_minion_object(self, opts, timeout, safe,
                               io_loop=None, loaded_base_name=None,
-                              jid_queue=None):
+                              jid_queue=None, running_jobs=None):
         '''
         Helper function to return the correct type of object
         '''
@@ -3304,7 +3389,8 @@ class ProxyMinionManager(MinionManager):
                            safe,
                            io_loop=io_loop,
                            loaded_base_name=loaded_base_name,
-                           jid_queue=jid_queue)
+                           jid_queue=jid_queue,
+                           running_jobs=running_jobs)
 
 
 def _metaproxy_call(opts, fn_name):
@@ -22,6 +22,7 @@ from functools import reduce  # pylint: disable=redefined-builtin
 
 # Import Salt libs
 from salt.ext import six
+import salt.payload
 import salt.utils.compat
 import salt.utils.data
 import salt.utils.files
@@ -29,7 +30,7 @@ import salt.utils.json
 import salt.utils.platform
 import salt.utils.yaml
 from salt.defaults import DEFAULT_TARGET_DELIM
-from salt.exceptions import SaltException
+from salt.exceptions import CommandExecutionError, SaltException
 from salt.ext.six.moves import range
 
 __proxyenabled__ = ['*']
@@ -489,6 +490,36 @@ def ls():  # pylint: disable=C0103
     return sorted(__grains__)
 
 
+def profile():
+    '''
+    .. versionadded:: Neon
+
+    Return the time the grains functions took to run the last time the grains
+    were loaded, slowest first, and whether they returned (``ok``), raised an
+    exception (``error``), timed out (``timeout``) or were cached
+    (``cached``). Requires :conf_minion:`grains_profile` to be set.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt '*' grains.profile
+    '''
+    path = os.path.join(__opts__['cachedir'], 'grains.profile.p')
+    try:
+        with salt.utils.files.fopen(path, 'rb') as fp_:
+            ret = salt.payload.Serial(__opts__).load(fp_)
+    except (IOError, OSError):
+        raise CommandExecutionError(
+            'No grains profile found, set grains_profile to True in the '
+            'minion config and refresh the grains'
+        )
+    ret = salt.utils.data.decode(ret)
+    return collections.OrderedDict(
+        sorted(six.iteritems(ret), key=lambda item: item[1]['duration'], reverse=True)
+    )
+
+
 def filter_by(lookup_dict, grain='os_family', merge=None, default='default', base=None):
     '''
     .. versionadded:: 0.17.0
@@ -15,6 +15,7 @@ import logging
 import os
 import signal
 import sys
+import threading
 import time
 import shutil
 
@@ -1112,6 +1113,32 @@ def is_running(fun):
     return ret
 
 
+def _minion_running_jobs():
+    '''
+    Return the running jobs kept in memory by the minion process, except the
+    current job, or None if the minion process did not answer
+    '''
+    jobs = None
+    try:
+        eventer = salt.utils.event.get_event('minion', opts=__opts__, listen=True)
+        res = __salt__['event.fire']({}, 'minion_running_jobs')
+        if res:
+            event_ret = eventer.get_event(
+                tag='/salt/minion/minion_running_jobs_complete', wait=5)
+            if event_ret and event_ret['complete']:
+                jobs = event_ret['jobs']
+    except KeyError:
+        # No event system, read the proc files
+        return None
+    if jobs is None:
+        return None
+    if __opts__.get('multiprocessing'):
+        pid = os.getpid()
+        return [job for job in jobs if job.get('pid') != pid]
+    current_thread = threading.current_thread().name
+    return [job for job in jobs if job.get('jid') != current_thread]
+
+
 def running():
     '''
     Return the data on all running salt processes on the minion
@@ -1122,6 +1149,12 @@ def running():
 
         salt '*' saltutil.running
     '''
+    if __opts__.get('__running_jobs'):
+        # Running in a job of the minion process, which keeps track of the
+        # running jobs
+        jobs = _minion_running_jobs()
+        if jobs is not None:
+            return jobs
     return salt.utils.minion.running(__opts__)
 
 
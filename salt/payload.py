@@ -10,7 +10,9 @@ in here
 # import sys  # Use if sys is commented out below
 import logging
 import gc
+import re
 import datetime
+import threading
 
 # Import salt libs
 import salt.log
@@ -74,6 +76,114 @@ if HAS_MSGPACK and not hasattr(msgpack, 'exceptions'):
     msgpack.exceptions = exceptions()
 
 
+def _ext_type_encoder(obj):
+    '''
+    Convert the types msgpack can't handle natively
+    '''
+    if isinstance(obj, six.integer_types):
+        # msgpack can't handle the very long Python longs for jids
+        # Convert any very long longs to strings
+        return six.text_type(obj)
+    elif isinstance(obj, (datetime.datetime, datetime.date)):
+        # msgpack doesn't support datetime.datetime and datetime.date datatypes.
+        # So here we have converted these types to custom datatype
+        # This is msgpack Extended types numbered 78
+        return msgpack.ExtType(78, salt.utils.stringutils.to_bytes(
+            obj.strftime('%Y%m%dT%H:%M:%S.%f')))
+    # The same for immutable types
+    elif isinstance(obj, immutabletypes.ImmutableDict):
+        return dict(obj)
+    elif isinstance(obj, immutabletypes.ImmutableList):
+        return list(obj)
+    elif isinstance(obj, (set, immutabletypes.ImmutableSet)):
+        # msgpack can't handle set so translate it to tuple
+        return tuple(obj)
+    elif isinstance(obj, CaseInsensitiveDict):
+        return dict(obj)
+    # Nothing known exceptions found. Let msgpack raise it's own.
+    return obj
+
+
+def _ext_type_decoder(code, data):
+    '''
+    Restore the datetime objects packed by _ext_type_encoder
+    '''
+    if code == 78:
+        data = salt.utils.stringutils.to_unicode(data)
+        return datetime.datetime.strptime(data, '%Y%m%dT%H:%M:%S.%f')
+    return data
+
+
+# Packers are not thread safe, keep one per thread (and use_bin_type value)
+# instead of allocating a new one, and its buffer, for every message.
+_PACKERS = threading.local()
+
+
+def _get_packer(use_bin_type):
+    '''
+    Return the msgpack Packer of the current thread, or None if the msgpack
+    library in use doesn't provide reusable packers
+    '''
+    if not HAS_MSGPACK or msgpack.version < (0, 4, 0) \
+            or not hasattr(msgpack, 'Packer'):
+        return None
+    packers = getattr(_PACKERS, 'packers', None)
+    if packers is None:
+        packers = _PACKERS.packers = {}
+    packer = packers.get(use_bin_type)
+    if packer is None:
+        packer = packers[use_bin_type] = msgpack.Packer(
+            default=_ext_type_encoder, use_bin_type=use_bin_type)
+    return packer
+
+
+# Unpacking straight to str needs the 'raw' and 'max_bin_len' arguments
+_FAST_LOADS = six.PY3 and HAS_MSGPACK and msgpack.version >= (0, 6, 0)
+# Returned by _fast_loads when the payload can't take the fast path
+_NOT_CLEAN = object()
+# An empty bin 8 object. Any payload holding one contains these bytes.
+_EMPTY_BIN = re.compile(b'\xc4\x00')
+
+
+def _fast_ext_type_decoder(code, data):
+    '''
+    Decode unknown extension types to str like the post-decode walk does
+    '''
+    data = _ext_type_decoder(code, data)
+    if isinstance(data, bytes):
+        try:
+            data = data.decode()
+        except UnicodeError:
+            pass
+    return data
+
+
+def _fast_loads(msg):
+    '''
+    Unpack ``msg`` directly to str objects, giving the same result as
+    unpacking raw bytes and walking the result with
+    ``salt.transport.frame.decode_embedded_strs`` without the walk. Any
+    object supporting the buffer protocol (memoryview, zmq frame buffers) is
+    unpacked without being copied.
+
+    Return _NOT_CLEAN when the payload holds strings which aren't valid
+    UTF-8 or bin objects, the slow path handles these.
+    '''
+    try:
+        ret = msgpack.loads(msg,
+                            use_list=True,
+                            ext_hook=_fast_ext_type_decoder,
+                            raw=False,
+                            max_bin_len=0)
+    except (UnicodeDecodeError, ValueError):
+        return _NOT_CLEAN
+    if _EMPTY_BIN.search(msg) is not None:
+        # max_bin_len lets empty bin objects through, the walk turns them
+        # into empty strings
+        ret = salt.transport.frame.decode_embedded_strs(ret)
+    return ret
+
+
 def package(payload):
     '''
     This method for now just wraps msgpack.dumps, but it is here so that
@@ -133,15 +243,13 @@ class Serial(object):
                          the contents cannot be converted.
         '''
         try:
-            def ext_type_decoder(code, data):
-                if code == 78:
-                    data = salt.utils.stringutils.to_unicode(data)
-                    return datetime.datetime.strptime(data, '%Y%m%dT%H:%M:%S.%f')
-                return data
-
             gc.disable()  # performance optimization for msgpack
+            if _FAST_LOADS and encoding is None and not raw:
+                ret = _fast_loads(msg)
+                if ret is not _NOT_CLEAN:
+                    return ret
             loads_kwargs = {'use_list': True,
-                            'ext_hook': ext_type_decoder}
+                            'ext_hook': _ext_type_decoder}
             if msgpack.version >= (0, 4, 0):
                 # msgpack only supports 'encoding' starting in 0.4.0.
                 # Due to this, if we don't need it, don't pass it at all so
@@ -207,39 +315,18 @@ class Serial(object):
                              Since this changes the wire protocol, this
                              option should not be used outside of IPC.
         '''
-        def ext_type_encoder(obj):
-            if isinstance(obj, six.integer_types):
-                # msgpack can't handle the very long Python longs for jids
-                # Convert any very long longs to strings
-                return six.text_type(obj)
-            elif isinstance(obj, (datetime.datetime, datetime.date)):
-                # msgpack doesn't support datetime.datetime and datetime.date datatypes.
-                # So here we have converted these types to custom datatype
-                # This is msgpack Extended types numbered 78
-                return msgpack.ExtType(78, salt.utils.stringutils.to_bytes(
-                    obj.strftime('%Y%m%dT%H:%M:%S.%f')))
-            # The same for immutable types
-            elif isinstance(obj, immutabletypes.ImmutableDict):
-                return dict(obj)
-            elif isinstance(obj, immutabletypes.ImmutableList):
-                return list(obj)
-            elif isinstance(obj, (set, immutabletypes.ImmutableSet)):
-                # msgpack can't handle set so translate it to tuple
-                return tuple(obj)
-            elif isinstance(obj, CaseInsensitiveDict):
-                return dict(obj)
-            # Nothing known exceptions found. Let msgpack raise it's own.
-            return obj
-
         try:
+            packer = _get_packer(use_bin_type)
+            if packer is not None:
+                return packer.pack(msg)
             if msgpack.version >= (0, 4, 0):
                 # msgpack only supports 'use_bin_type' starting in 0.4.0.
                 # Due to this, if we don't need it, don't pass it at all so
                 # that under Python 2 we can still work with older versions
                 # of msgpack.
-                return msgpack.dumps(msg, default=ext_type_encoder, use_bin_type=use_bin_type)
+                return msgpack.dumps(msg, default=_ext_type_encoder, use_bin_type=use_bin_type)
             else:
-                return msgpack.dumps(msg, default=ext_type_encoder)
+                return msgpack.dumps(msg, default=_ext_type_encoder)
         except (OverflowError, msgpack.exceptions.PackValueError):
             # msgpack<=0.4.6 don't call ext encoder on very long integers raising the error instead.
             # Convert any very long longs to strings and call dumps again.
@@ -262,9 +349,9 @@ class Serial(object):
 
             msg = verylong_encoder(msg)
             if msgpack.version >= (0, 4, 0):
-                return msgpack.dumps(msg, default=ext_type_encoder, use_bin_type=use_bin_type)
+                return msgpack.dumps(msg, default=_ext_type_encoder, use_bin_type=use_bin_type)
             else:
-                return msgpack.dumps(msg, default=ext_type_encoder)
+                return msgpack.dumps(msg, default=_ext_type_encoder)
 
     def dump(self, msg, fn_):
         '''
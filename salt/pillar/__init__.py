@@ -12,8 +12,10 @@ import collections
 import logging
 import tornado.gen
 import sys
+import time
 import traceback
 import inspect
+from multiprocessing.pool import ThreadPool
 
 # Import salt libs
 import salt.loader
@@ -40,6 +42,22 @@ from salt.ext import six
 
 log = logging.getLogger(__name__)
 
+# The ext_pillar results cached for the sources with a ttl in
+# ext_pillar_sources: {source: CacheDict}
+_EXT_PILLAR_CACHE = {}
+_POOL = {}
+
+
+def _get_pool(opts):
+    '''
+    Return the pool of threads running the ext_pillars of the current process
+    '''
+    pid = os.getpid()
+    if _POOL.get('pid') != pid:
+        _POOL['pid'] = pid
+        _POOL['pool'] = ThreadPool(int(opts['ext_pillar_workers']))
+    return _POOL['pool']
+
 
 def get_pillar(opts, grains, minion_id, saltenv=None, ext=None, funcs=None,
                pillar_override=None, pillarenv=None, extra_minion_data=None):
@@ -958,6 +976,7 @@ class Pillar(object):
                 self.opts.get('renderer', 'yaml'),
                 self.opts.get('pillar_merge_lists', False))
 
+        runs = []
         for run in self.opts['ext_pillar']:
             if not isinstance(run, dict):
                 errors.append('The "ext_pillar" option is malformed')
@@ -965,6 +984,7 @@ class Pillar(object):
                 return {}, errors
             if next(six.iterkeys(run)) in self.opts.get('exclude_ext_pillar', []):
                 continue
+            calls = []
             for key, val in six.iteritems(run):
                 if key not in self.ext_pillars:
                     log.critical(
@@ -972,21 +992,55 @@ class Pillar(object):
                         key
                     )
                     continue
-                try:
-                    ext = self._external_pillar_data(pillar,
-                                                     val,
-                                                     key)
-                except Exception as exc:
-                    errors.append(
-                        'Failed to load ext_pillar {0}: {1}'.format(
-                            key,
-                            exc.__str__(),
-                        )
-                    )
-                    log.error(
-                        'Exception caught loading ext_pillar \'%s\':\n%s',
-                        key, ''.join(traceback.format_tb(sys.exc_info()[2]))
-                    )
+                calls.append((key, val))
+            runs.append(calls)
+
+        # The sources in ext_pillar_sources don't use the data of the sources
+        # before them, they are all compiled against the pillar data we
+        # started with. Their results are taken from the cache or run in the
+        # thread pool ahead of the other sources.
+        sources = self.opts.get('ext_pillar_sources') or {}
+        base = pillar
+        results = {}
+        pool = None
+        if int(self.opts.get('ext_pillar_workers', 1)) > 1:
+            pool = _get_pool(self.opts)
+        for idx, calls in enumerate(runs):
+            for key, val in calls:
+                if key not in sources:
+                    continue
+                cache, cache_key = self._ext_pillar_cache(key, val, sources[key])
+                if cache is not None and cache_key in cache:
+                    results[(idx, key)] = copy.deepcopy(cache[cache_key]), None, None
+                elif pool is not None:
+                    results[(idx, key)] = pool.apply_async(
+                        self._ext_pillar_source, (base, val, key))
+
+        self.ext_pillar_timing = OrderedDict()
+        for idx, calls in enumerate(runs):
+            for key, val in calls:
+                ret = results.get((idx, key))
+                if ret is None:
+                    ret = self._ext_pillar_source(base if key in sources else pillar, val, key)
+                elif not isinstance(ret, tuple):
+                    ret = ret.get()
+                data, error, duration = ret
+                if duration is None:
+                    log.debug('ext_pillar \'%s\' for %s served from the cache',
+                              key, self.minion_id)
+                else:
+                    log.debug('ext_pillar \'%s\' for %s compiled in %.3fs',
+                              key, self.minion_id, duration)
+                    self.ext_pillar_timing[key] = \
+                        self.ext_pillar_timing.get(key, 0) + duration
+                if error is not None:
+                    errors.append(error)
+                    continue
+                ext = data
+                if duration is not None and key in sources:
+                    cache, cache_key = self._ext_pillar_cache(key, val, sources[key])
+                    if cache is not None:
+                        cache[cache_key] = copy.deepcopy(data)
             if ext:
                 pillar = merge(
                     pillar,
@@ -997,6 +1051,45 @@ class Pillar(object):
                 ext = None
         return pillar, errors
 
+    def _ext_pillar_source(self, pillar, val, key):
+        '''
+        Run an ext_pillar, returns its data, the error message it failed with
+        and the time it took
+        '''
+        start = time.time()
+        try:
+            return self._external_pillar_data(pillar, val, key), None, time.time() - start
+        except Exception as exc:
+            log.error(
+                'Exception caught loading ext_pillar \'%s\':\n%s',
+                key, ''.join(traceback.format_tb(sys.exc_info()[2]))
+            )
+            return None, 'Failed to load ext_pillar {0}: {1}'.format(
+                key,
+                exc.__str__(),
+            ), time.time() - start
+
+    def _ext_pillar_cache(self, key, val, source):
+        '''
+        Return the cache of an ext_pillar source and the key of its results
+        for this minion, the cache is None when the source isn't cached
+        '''
+        if not isinstance(source, dict) or not source.get('ttl'):
+            return None, None
+        cache = _EXT_PILLAR_CACHE.get(key)
+        if cache is None or cache._ttl != source['ttl']:
+            cache = _EXT_PILLAR_CACHE[key] = salt.utils.cache.CacheDict(source['ttl'])
+        inputs = []
+        for name in source.get('inputs', ['minion_id']):
+            if name == 'minion_id':
+                inputs.append(self.minion_id)
+            elif name.startswith('grains:'):
+                inputs.append(salt.utils.data.traverse_dict_and_list(
+                    self.opts.get('grains', {}), name[7:]))
+            else:
+                inputs.append(self.opts.get(name))
+        return cache, repr((val, inputs, self.extra_minion_data))
+
     def compile_pillar(self, ext=True):
         '''
         Render the pillar data and return
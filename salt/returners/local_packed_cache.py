@@ -0,0 +1,531 @@
+# -*- coding: utf-8 -*-
+'''
+Return data to a packed local job cache
+
+.. versionadded:: Neon
+
+The default :mod:`local_cache <salt.returners.local_cache>` job cache creates
+a directory per job and a directory plus a file for every minion return,
+which adds up to a very large number of inodes on busy masters and makes
+``clean_old_jobs`` walk all of them.
+
+This job cache appends the loads, minion lists and returns of all the jobs
+started within the same hour to a single segment file, and records the
+offset of every record in an index file next to it. Writes are sequential
+appends, lookups only read the records of the requested job, and cleaning up
+old jobs unlinks whole segments.
+
+To use it as the master job cache, set the following in the master config:
+
+.. code-block:: yaml
+
+    master_job_cache: local_packed_cache
+
+Jobs cached by :mod:`local_cache <salt.returners.local_cache>` are not
+migrated, they are not visible to this job cache.
+'''
+
+
+# Import python libs
+import bisect
+import datetime
+import errno
+import logging
+import os
+import struct
+import time
+
+# Import salt libs
+import salt.payload
+import salt.utils.files
+import salt.utils.jid
+import salt.utils.minions
+import salt.exceptions
+
+log = logging.getLogger(__name__)
+
+# Segment holding the records
+SEGMENT_EXT = '.seg'
+# Offset index of the records in the segment
+INDEX_EXT = '.idx'
+# Bucket holding the jobs whose jid is not time based
+OTHER_BUCKET = 'other'
+# Length prefix of each index entry
+ENTRY_HEADER = struct.Struct('>I')
+
+# Record kinds
+JID = 'jid'
+LOAD = 'load'
+MINIONS = 'minions'
+RETURN = 'return'
+ENDTIME = 'endtime'
+
+# Parsed bucket indexes of this process, keyed on the index path
+_INDEXES = {}
+
+
+def _job_dir():
+    '''
+    Return root of the packed jobs cache directory
+    '''
+    return os.path.join(__opts__['cachedir'], 'packed_jobs')
+
+
+def _bucket(jid):
+    '''
+    Return the name of the bucket holding the records of the given jid, which
+    is the hour the job was started in
+    '''
+    if salt.utils.jid.is_jid(jid):
+        return jid[:10]
+    return OTHER_BUCKET
+
+
+def _bucket_paths(bucket):
+    '''
+    Return the segment and index paths of a bucket
+    '''
+    base = os.path.join(_job_dir(), bucket)
+    return base + SEGMENT_EXT, base + INDEX_EXT
+
+
+class _BucketIndex(object):
+    '''
+    Offset index of a bucket, read incrementally from its index file
+    '''
+    def __init__(self):
+        self.inode = None
+        self.pos = 0
+        # {jid: [(kind, key, offset, length), ...]}
+        self.jobs = {}
+
+    def reset(self, inode):
+        '''
+        Forget all the entries read so far
+        '''
+        self.inode = inode
+        self.pos = 0
+        self.jobs = {}
+
+    def update(self, fh_, serial):
+        '''
+        Read the entries appended to the index file since the last update
+        '''
+        stat = os.fstat(fh_.fileno())
+        if stat.st_ino != self.inode or stat.st_size < self.pos:
+            # The bucket was removed and created again
+            self.reset(stat.st_ino)
+        if stat.st_size == self.pos:
+            return
+        fh_.seek(self.pos)
+        data = fh_.read(stat.st_size - self.pos)
+        pos = 0
+        while pos + ENTRY_HEADER.size <= len(data):
+            size, = ENTRY_HEADER.unpack_from(data, pos)
+            end = pos + ENTRY_HEADER.size + size
+            if end > len(data):
+                break
+            jid, kind, key, offset, length = serial.loads(
+                data[pos + ENTRY_HEADER.size:end])
+            self.jobs.setdefault(jid, []).append((kind, key, offset, length))
+            pos = end
+        self.pos += pos
+
+    def has(self, jid, kind, key=None):
+        '''
+        Return True if the job has a record of the given kind and key
+        '''
+        return any(entry[0] == kind and entry[1] == key
+                   for entry in self.jobs.get(jid, ()))
+
+
+def _read_index(bucket, serial):
+    '''
+    Return the up to date index of a bucket, or None if it does not exist
+    '''
+    _, idx_path = _bucket_paths(bucket)
+    try:
+        with salt.utils.files.flopen(idx_path, 'rb') as fh_:
+            index = _INDEXES.setdefault(idx_path, _BucketIndex())
+            index.update(fh_, serial)
+    except (IOError, OSError) as exc:
+        if exc.errno != errno.ENOENT:
+            raise
+        _INDEXES.pop(idx_path, None)
+        return None
+    return index
+
+
+def _append(jid, kind, data, key=None, unique=False, serial=None):
+    '''
+    Append a record to the bucket of the given jid. If ``unique`` is True the
+    record is not written if the job already has a record of the same kind
+    and key, and False is returned.
+    '''
+    if serial is None:
+        serial = salt.payload.Serial(__opts__)
+    seg_path, idx_path = _bucket_paths(_bucket(jid))
+    try:
+        os.makedirs(_job_dir())
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            raise
+    payload = serial.dumps(data)
+    while True:
+        # The index file lock serializes the writers of the bucket
+        with salt.utils.files.flopen(idx_path, 'ab+') as idx_fh:
+            if not _is_current(idx_fh, idx_path):
+                # The bucket was removed while waiting for the lock
+                continue
+            index = _INDEXES.setdefault(idx_path, _BucketIndex())
+            index.update(idx_fh, serial)
+            if unique and index.has(jid, kind, key):
+                return False
+            with salt.utils.files.fopen(seg_path, 'ab') as seg_fh:
+                seg_fh.seek(0, os.SEEK_END)
+                offset = seg_fh.tell()
+                seg_fh.write(payload)
+            entry = serial.dumps([jid, kind, key, offset, len(payload)])
+            idx_fh.seek(0, os.SEEK_END)
+            idx_fh.write(ENTRY_HEADER.pack(len(entry)) + entry)
+            idx_fh.flush()
+            index.update(idx_fh, serial)
+        return True
+
+
+def _is_current(fh_, path):
+    '''
+    Return True if the open file is still the file at path
+    '''
+    try:
+        return os.stat(path).st_ino == os.fstat(fh_.fileno()).st_ino
+    except OSError as exc:
+        if exc.errno != errno.ENOENT:
+            raise
+        return False
+
+
+def _read_records(jid, kinds, serial=None):
+    '''
+    Return the ``(kind, key, data)`` records of a job, in write order
+    '''
+    if serial is None:
+        serial = salt.payload.Serial(__opts__)
+    bucket = _bucket(jid)
+    index = _read_index(bucket, serial)
+    if index is None:
+        return []
+    entries = [entry for entry in index.jobs.get(jid, ()) if entry[0] in kinds]
+    if not entries:
+        return []
+    seg_path, _ = _bucket_paths(bucket)
+    ret = []
+    with salt.utils.files.fopen(seg_path, 'rb') as fh_:
+        for kind, key, offset, length in entries:
+            fh_.seek(offset)
+            ret.append((kind, key, serial.loads(fh_.read(length))))
+    return ret
+
+
+def _walk_loads():
+    '''
+    Walk through the buckets and yield the jid and load of every job
+    '''
+    serial = salt.payload.Serial(__opts__)
+    job_dir = _job_dir()
+    if not os.path.isdir(job_dir):
+        return
+    for fn_ in sorted(os.listdir(job_dir)):
+        if not fn_.endswith(INDEX_EXT):
+            continue
+        bucket = fn_[:-len(INDEX_EXT)]
+        index = _read_index(bucket, serial)
+        if index is None:
+            continue
+        loads = {}
+        for jid, entries in index.jobs.items():
+            for entry in entries:
+                if entry[0] == LOAD:
+                    loads[jid] = entry
+        if not loads:
+            continue
+        seg_path, _ = _bucket_paths(bucket)
+        with salt.utils.files.fopen(seg_path, 'rb') as fh_:
+            for jid in sorted(loads):
+                _, _, offset, length = loads[jid]
+                fh_.seek(offset)
+                try:
+                    job = serial.loads(fh_.read(length))
+                except Exception:
+                    log.exception('Failed to deserialize the load of job %s', jid)
+                    continue
+                if not job:
+                    continue
+                yield jid, job
+
+
+def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
+    '''
+    Return a job id and record it in the job cache.
+
+    This is the function responsible for making sure jids don't collide (unless
+    it is passed a jid).
+    '''
+    if recurse_count >= 5:
+        err = 'prep_jid could not store a jid after {0} tries.'.format(recurse_count)
+        log.error(err)
+        raise salt.exceptions.SaltCacheError(err)
+    if passed_jid is None:  # this can be a None or an empty string.
+        jid = salt.utils.jid.gen_jid(__opts__)
+    else:
+        jid = passed_jid
+
+    try:
+        stored = _append(jid, JID, {'nocache': nocache}, unique=True)
+    except (IOError, OSError) as exc:
+        log.warning(
+            'Could not write out jid record for job %s: %s. Retrying.', jid, exc)
+        time.sleep(0.1)
+        return prep_jid(passed_jid=jid, nocache=nocache,
+                        recurse_count=recurse_count+1)
+    if not stored and passed_jid is None:
+        # Someone else is using this jid, we need a new one
+        return prep_jid(nocache=nocache, recurse_count=recurse_count+1)
+    return jid
+
+
+def returner(load):
+    '''
+    Return data to the packed job cache
+    '''
+    serial = salt.payload.Serial(__opts__)
+
+    # if a minion is returning a standalone job, get a jobid
+    if load['jid'] == 'req':
+        load['jid'] = prep_jid(nocache=load.get('nocache', False))
+
+    for _, _, data in _read_records(load['jid'], (JID,), serial=serial):
+        if data.get('nocache'):
+            return
+
+    ret = dict((key, load[key]) for key in ['return', 'retcode', 'success', 'out'] if key in load)
+    if not _append(load['jid'], RETURN, ret, key=load['id'], unique=True, serial=serial):
+        # Minion has already returned this jid and it should be dropped
+        log.error(
+            'An extra return was detected from minion %s, please verify '
+            'the minion, this could be a replay attack', load['id']
+        )
+        return False
+
+
+def save_load(jid, clear_load, minions=None, recurse_count=0):
+    '''
+    Save the load to the specified jid
+
+    minions argument is to provide a pre-computed list of matched minions for
+    the job, for cases when this function can't compute that list itself (such
+    as for salt-ssh)
+    '''
+    if recurse_count >= 5:
+        err = ('save_load could not write job cache file after {0} retries.'
+               .format(recurse_count))
+        log.error(err)
+        raise salt.exceptions.SaltCacheError(err)
+
+    try:
+        _append(jid, LOAD, clear_load)
+    except (IOError, OSError) as exc:
+        log.warning(
+            'Could not write job invocation cache record: %s', exc
+        )
+        time.sleep(0.1)
+        return save_load(jid=jid, clear_load=clear_load, minions=minions,
+                         recurse_count=recurse_count+1)
+
+    # if you have a tgt, save that for the UI etc
+    if 'tgt' in clear_load and clear_load['tgt'] != '':
+        if minions is None:
+            ckminions = salt.utils.minions.CkMinions(__opts__)
+            # Retrieve the minions list
+            _res = ckminions.check_minions(
+                    clear_load['tgt'],
+                    clear_load.get('tgt_type', 'glob')
+                    )
+            minions = _res['minions']
+        # save the minions to a cache so we can see in the UI
+        save_minions(jid, minions)
+
+
+def save_minions(jid, minions, syndic_id=None):
+    '''
+    Save/update the list of minions for a given job
+    '''
+    # Ensure we have a list for Python 3 compatability
+    minions = list(minions)
+
+    log.debug(
+        'Adding minions for job %s%s: %s',
+        jid,
+        ' from syndic master \'{0}\''.format(syndic_id) if syndic_id else '',
+        minions
+    )
+    try:
+        _append(jid, MINIONS, minions, key=syndic_id)
+    except (IOError, OSError) as exc:
+        log.error(
+            'Failed to write minion list %s for job %s: %s',
+            minions, jid, exc
+        )
+
+
+def get_load(jid):
+    '''
+    Return the load data that marks a specified jid
+    '''
+    ret = {}
+    all_minions = set()
+    for kind, _, data in _read_records(jid, (LOAD, MINIONS)):
+        if kind == LOAD:
+            ret = data or {}
+        else:
+            all_minions.update(data)
+    if ret and all_minions:
+        ret['Minions'] = sorted(all_minions)
+    return ret
+
+
+def get_jid(jid):
+    '''
+    Return the information returned when the specified job id was executed
+    '''
+    ret = {}
+    for _, minion_id, data in _read_records(jid, (RETURN,)):
+        ret[minion_id] = data
+    return ret
+
+
+def get_jids():
+    '''
+    Return a dict mapping all job ids to job information
+    '''
+    ret = {}
+    for jid, job in _walk_loads():
+        ret[jid] = salt.utils.jid.format_jid_instance(jid, job)
+
+        if __opts__.get('job_cache_store_endtime'):
+            endtime = get_endtime(jid)
+            if endtime:
+                ret[jid]['EndTime'] = endtime
+
+    return ret
+
+
+def get_jids_filter(count, filter_find_job=True):
+    '''
+    Return a list of all jobs information filtered by the given criteria.
+    :param int count: show not more than the count of most recent jobs
+    :param bool filter_find_jobs: filter out 'saltutil.find_job' jobs
+    '''
+    keys = []
+    ret = []
+    for jid, job in _walk_loads():
+        job = salt.utils.jid.format_jid_instance_ext(jid, job)
+        if filter_find_job and job['Function'] == 'saltutil.find_job':
+            continue
+        i = bisect.bisect(keys, jid)
+        if len(keys) == count and i == 0:
+            continue
+        keys.insert(i, jid)
+        ret.insert(i, job)
+        if len(keys) > count:
+            del keys[0]
+            del ret[0]
+    return ret
+
+
+def clean_old_jobs():
+    '''
+    Clean out the old jobs from the job cache by removing whole buckets
+    '''
+    if __opts__['keep_jobs'] != 0:
+        job_dir = _job_dir()
+
+        if not os.path.exists(job_dir):
+            return
+
+        # The buckets are named after the time in the jids
+        if __opts__.get('utc_jid', False):
+            now = datetime.datetime.utcnow()
+        else:
+            now = datetime.datetime.now()
+        cutoff = now - datetime.timedelta(hours=__opts__['keep_jobs'])
+        # All the jobs of a bucket started before the end of its hour
+        cutoff_bucket = '{0:%Y%m%d%H}'.format(cutoff)
+
+        buckets = set()
+        for fn_ in os.listdir(job_dir):
+            bucket, ext = os.path.splitext(fn_)
+            if ext in (SEGMENT_EXT, INDEX_EXT):
+                buckets.add(bucket)
+
+        for bucket in buckets:
+            if bucket == OTHER_BUCKET:
+                mtimes = []
+                for path in _bucket_paths(bucket):
+                    try:
+                        mtimes.append(os.stat(path).st_mtime)
+                    except OSError:
+                        pass
+                if not mtimes:
+                    continue
+                hours_difference = (time.time() - max(mtimes)) / 3600.0
+                if hours_difference <= __opts__['keep_jobs']:
+                    continue
+            elif bucket >= cutoff_bucket:
+                continue
+            _remove_bucket(bucket)
+
+
+def _remove_bucket(bucket):
+    '''
+    Remove the files of a bucket, holding the index file lock the writers of
+    the bucket hold
+    '''
+    seg_path, idx_path = _bucket_paths(bucket)
+    try:
+        with salt.utils.files.flopen(idx_path, 'ab') as idx_fh:
+            if not _is_current(idx_fh, idx_path):
+                # Removed by another process while waiting for the lock
+                return
+            # The index goes last, its lock serializes the writers
+            for path in (seg_path, idx_path):
+                try:
+                    os.remove(path)
+                except OSError as err:
+                    if err.errno != errno.ENOENT:
+                        log.error('Unable to remove %s: %s', path, err)
+    except (IOError, OSError) as exc:
+        log.error('Unable to remove the bucket %s: %s', bucket, exc)
+    _INDEXES.pop(idx_path, None)
+
+
+def update_endtime(jid, time):
+    '''
+    Update (or store) the end time for a given job
+    '''
+    try:
+        _append(jid, ENDTIME, time)
+    except (IOError, OSError) as exc:
+        log.warning('Could not write job end time record: %s', exc)
+
+
+def get_endtime(jid):
+    '''
+    Retrieve the stored endtime for a given job
+
+    Returns False if no endtime is present
+    '''
+    records = _read_records(jid, (ENDTIME,))
+    if not records:
+        return False
+    return records[-1][2]
@@ -115,6 +115,7 @@ def execute(tgt,
             ret='',
             jid='',
             kwarg=None,
+            batch=None,
             **kwargs):
     '''
     .. versionadded:: 2017.7.0
@@ -146,8 +147,35 @@ def execute(tgt,
                     tgt_type: nodegroup
                 days: 1
                 returner: redis
+
+    .. versionchanged:: Neon
+        The ``batch`` argument runs ``fun`` on at most that many minions (or
+        that percentage of the minions) at a time, like the ``-b`` option of
+        the ``salt`` command.
+
+    .. code-block:: bash
+
+        salt-run salt.execute '*' state.apply batch=10%
     '''
     client = salt.client.get_local_client(__opts__['conf_file'])
+    if batch:
+        returns = {}
+        try:
+            for minion_ret in client.cmd_batch(tgt,
+                                               fun,
+                                               arg=arg,
+                                               tgt_type=tgt_type,
+                                               ret=ret,
+                                               kwarg=kwarg,
+                                               batch=batch,
+                                               timeout=timeout or __opts__['timeout'],
+                                               **kwargs):
+                returns.update(minion_ret)
+        except SaltClientError as client_error:
+            log.error('Error while executing %s on %s (%s)', fun, tgt, tgt_type)
+            log.error(client_error)
+            return {}
+        return returns
     try:
         ret = client.cmd(tgt,
                          fun,
@@ -25,6 +25,7 @@ import traceback
 import re
 import time
 import random
+import multiprocessing
 
 # Import salt libs
 import salt.loader
@@ -32,6 +33,7 @@ import salt.minion
 import salt.pillar
 import salt.fileclient
 import salt.utils.args
+import salt.utils.atomicfile
 import salt.utils.crypt
 import salt.utils.data
 import salt.utils.decorators.state
@@ -45,6 +47,7 @@ import salt.utils.process
 import salt.utils.url
 import salt.syspaths as syspaths
 import salt.transport.client
+from salt.serializers import DeserializationError, SerializationError
 from salt.serializers.msgpack import serialize as msgpack_serialize, deserialize as msgpack_deserialize
 from salt.template import compile_template, compile_template_str
 from salt.exceptions import (
@@ -81,6 +84,9 @@ STATE_REQUISITE_KEYWORDS = frozenset([
     'require_any',
     'listen',
     ])
+# The characters making a requisite a glob matched with fnmatch
+_GLOB_CHARS = frozenset('*?[')
+
 STATE_REQUISITE_IN_KEYWORDS = frozenset([
     'onchanges_in',
     'onfail_in',
@@ -227,21 +233,63 @@ def state_args(id_, state, high):
     return args
 
 
-def find_name(name, state, high):
+def index_high(high):
+    '''
+    Index the high data once for the lookups of find_name and find_sls_ids:
+    the ids of each sls, the ids and state declarations having an argument set
+    to a given value and the ids and state declarations of each name
+    '''
+    index = {'sls': {}, 'arg': {}, 'name': {}}
+    for nid, item in six.iteritems(high):
+        if not isinstance(item, dict):
+            continue
+        index['sls'].setdefault(item.get('__sls__'), []).append(nid)
+        for state, run in six.iteritems(item):
+            if state.startswith('__') or not isinstance(run, list):
+                continue
+            for arg in run:
+                if not isinstance(arg, dict):
+                    continue
+                if 'name' in arg:
+                    try:
+                        index['name'].setdefault(arg['name'], []).append((nid, state))
+                    except TypeError:
+                        # Unhashable, can't be referenced
+                        pass
+                if len(arg) != 1:
+                    continue
+                try:
+                    index['arg'].setdefault((state, arg[next(iter(arg))]), []).append(nid)
+                except TypeError:
+                    pass
+    return index
+
+
+def find_name(name, state, high, index=None):
     '''
     Scan high data for the id referencing the given name and return a list of (IDs, state) tuples that match
 
     Note: if `state` is sls, then we are looking for all IDs that match the given SLS
+
+    Pass the ``index`` of the high data returned by index_high to look the
+    name up instead of scanning the high data
     '''
     ext_id = []
     if name in high:
         ext_id.append((name, state))
     # if we are requiring an entire SLS, then we need to add ourselves to everything in that SLS
     elif state == 'sls':
+        if index is not None:
+            return [(nid, next(iter(high[nid]))) for nid in index['sls'].get(name, [])]
         for nid, item in six.iteritems(high):
             if item['__sls__'] == name:
                 ext_id.append((nid, next(iter(item))))
     # otherwise we are requiring a single state, lets find it
+    elif index is not None:
+        try:
+            return [(nid, state) for nid in index['arg'].get((state, name), [])]
+        except TypeError:
+            return []
     else:
         # We need to scan for the name
         for nid in high:
@@ -257,11 +305,21 @@ def find_name(name, state, high):
     return ext_id
 
 
-def find_sls_ids(sls, high):
+def find_sls_ids(sls, high, index=None):
     '''
     Scan for all ids in the given sls and return them in a dict; {name: state}
+
+    Pass the ``index`` of the high data returned by index_high to look the sls
+    up instead of scanning the high data
     '''
     ret = []
+    if index is not None:
+        for nid in index['sls'].get(sls, []):
+            for st_ in high[nid]:
+                if st_.startswith('__'):
+                    continue
+                ret.append((nid, st_))
+        return ret
     for nid, item in six.iteritems(high):
         try:
             sls_tgt = item['__sls__']
@@ -753,6 +811,7 @@ class State(object):
         self.active = set()
         self.mod_init = set()
         self.pre = {}
+        self._chunk_index = None
         self.__run_num = 0
         self.jid = jid
         self.instance_id = six.text_type(id(self))
@@ -1417,6 +1476,9 @@ class State(object):
         if '__extend__' not in high:
             return high, errors
         ext = high.pop('__extend__')
+        # Built when a name is first looked up, and again after the arguments
+        # it indexes were extended
+        index = None
         for ext_chunk in ext:
             for name, body in six.iteritems(ext_chunk):
                 if name not in high:
@@ -1424,7 +1486,9 @@ class State(object):
                         x for x in body if not x.startswith('__')
                     )
                     # Check for a matching 'name' override in high data
-                    ids = find_name(name, state_type, high)
+                    if index is None:
+                        index = index_high(high)
+                    ids = find_name(name, state_type, high, index)
                     if len(ids) != 1:
                         errors.append(
                             'Cannot extend ID \'{0}\' in \'{1}:{2}\'. It is not '
@@ -1446,9 +1510,13 @@ class State(object):
                         continue
                     if state not in high[name]:
                         high[name][state] = run
+                        index = None
                         continue
                     # high[name][state] is extended by run, both are lists
                     for arg in run:
+                        if isinstance(arg, dict) and \
+                                next(iter(arg), None) not in STATE_REQUISITE_KEYWORDS:
+                            index = None
                         update = False
                         for hind in range(len(high[name][state])):
                             if isinstance(arg, six.string_types) and isinstance(high[name][state][hind], six.string_types):
@@ -1525,6 +1593,9 @@ class State(object):
         req_in_all = req_in.union({'require', 'watch', 'onfail', 'onfail_stop', 'onchanges'})
         extend = {}
         errors = []
+        # Look the requisites up in an index of the high data rather than
+        # scanning it for each of them
+        index = index_high(high)
         for id_, body in six.iteritems(high):
             if not isinstance(body, dict):
                 continue
@@ -1598,25 +1669,21 @@ class State(object):
                                                      if not x.startswith('__')]
                                         ind = {_ind_high[0]: ind}
                                     else:
-                                        found = False
-                                        for _id in iter(high):
-                                            for state in [state for state
-                                                          in iter(high[_id])
-                                                          if not state.startswith('__')]:
-                                                for j in iter(high[_id][state]):
-                                                    if isinstance(j, dict) and 'name' in j:
-                                                        if j['name'] == ind:
-                                                            ind = {state: _id}
-                                                            found = True
-                                        if not found:
+                                        try:
+                                            named = index['name'].get(ind)
+                                        except TypeError:
+                                            named = None
+                                        if not named:
                                             continue
+                                        _id, _ind_state = named[0]
+                                        ind = {_ind_state: _id}
                                 if len(ind) < 1:
                                     continue
                                 pstate = next(iter(ind))
                                 pname = ind[pstate]
                                 if pstate == 'sls':
                                     # Expand hinges here
-                                    hinges = find_sls_ids(pname, high)
+                                    hinges = find_sls_ids(pname, high, index)
                                 else:
                                     hinges.append((pname, pstate))
                                 if '.' in pstate:
@@ -1646,7 +1713,7 @@ class State(object):
                                                 )
                                     if key == 'prereq':
                                         # Add prerequired to prereqs
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = find_name(name, _state, high, index)
                                         for ext_id, _req_state in ext_ids:
                                             if ext_id not in extend:
                                                 extend[ext_id] = OrderedDict()
@@ -1659,7 +1726,7 @@ class State(object):
                                     if key == 'use_in':
                                         # Add the running states args to the
                                         # use_in states
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = find_name(name, _state, high, index)
                                         for ext_id, _req_state in ext_ids:
                                             if not ext_id:
                                                 continue
@@ -1686,7 +1753,7 @@ class State(object):
                                     if key == 'use':
                                         # Add the use state's args to the
                                         # running state
-                                        ext_ids = find_name(name, _state, high)
+                                        ext_ids = find_name(name, _state, high, index)
                                         for ext_id, _req_state in ext_ids:
                                             if not ext_id:
                                                 continue
@@ -1738,7 +1805,7 @@ class State(object):
         errors.extend(req_in_errors)
         return req_in_high, errors
 
-    def _call_parallel_target(self, name, cdata, low):
+    def _call_parallel_target(self, name, cdata, low, conn):
         '''
         The target function to call that will create the parallel thread/process
         '''
@@ -1746,7 +1813,6 @@ class State(object):
         # correctly calculate further down the chain
         utc_start_time = datetime.datetime.utcnow()
 
-        tag = _gen_tag(low)
         try:
             ret = self.states[cdata['full']](*cdata['args'],
                                              **cdata['kwargs'])
@@ -1767,19 +1833,9 @@ class State(object):
         duration = (delta.seconds * 1000000 + delta.microseconds) / 1000.0
         ret['duration'] = duration
 
-        troot = os.path.join(self.opts['cachedir'], self.jid)
-        tfile = os.path.join(
-            troot,
-            salt.utils.hashutils.sha1_digest(tag))
-        if not os.path.isdir(troot):
-            try:
-                os.makedirs(troot)
-            except OSError:
-                # Looks like the directory was created between the check
-                # and the attempt, we are safe to pass
-                pass
-        with salt.utils.files.fopen(tfile, 'wb+') as fp_:
-            fp_.write(msgpack_serialize(ret))
+        # Hand the return to the process running the states
+        conn.send_bytes(msgpack_serialize(ret))
+        conn.close()
 
     def call_parallel(self, cdata, low):
         '''
@@ -1794,10 +1850,14 @@ class State(object):
         if not name:
             name = low.get('name', low.get('__id__'))
 
+        recv_conn, send_conn = multiprocessing.Pipe(duplex=False)
         proc = salt.utils.process.MultiprocessingProcess(
                 target=self._call_parallel_target,
-                args=(name, cdata, low))
+                args=(name, cdata, low, send_conn))
         proc.start()
+        send_conn.close()
+        # The return of the state is read from the pipe by reconcile_procs
+        proc.ret_conn = recv_conn
         ret = {'name': name,
                 'result': None,
                 'changes': {},
@@ -2137,6 +2197,9 @@ class State(object):
                         self.__run_num += 1
                         chunks.remove(low)
                         break
+        if self.opts.get('state_concurrency', 0) > 1:
+            running = self.call_chunks_concurrent(chunks)
+            return dict(list(disabled.items()) + list(running.items()))
         running = {}
         for low in chunks:
             if '__FAILHARD__' in running:
@@ -2159,6 +2222,153 @@ class State(object):
         ret = dict(list(disabled.items()) + list(running.items()))
         return ret
 
+    def _requisite_graph(self, chunks):
+        '''
+        Return the tags of the chunks each chunk requires to have run before
+        it
+        '''
+        graph = {}
+        for low in chunks:
+            deps = set()
+            for r_state in ('require', 'require_any', 'watch', 'watch_any',
+                            'onfail', 'onfail_any', 'onchanges', 'onchanges_any'):
+                for req in low.get(r_state) or []:
+                    if isinstance(req, six.string_types):
+                        req = {'id': req}
+                    req = trim_req(req)
+                    req_key = next(iter(req))
+                    req_val = req[req_key]
+                    if not isinstance(req_val, six.string_types):
+                        # Reported by call_chunk
+                        continue
+                    for chunk in self._find_chunks(req_key, req_val, chunks):
+                        deps.add(_gen_tag(chunk))
+            tag = _gen_tag(low)
+            deps.discard(tag)
+            graph[tag] = deps
+        return graph
+
+    def _concurrency_mode(self, low):
+        '''
+        Return how call_chunks_concurrent runs a chunk: ``barrier`` chunks
+        run alone once all the chunks ordered before them ran, ``inline``
+        chunks run in this process and ``parallel`` chunks in a separate
+        process
+        '''
+        if low.get('prereq') or low.get('prerequired'):
+            return 'barrier'
+        if not self.opts.get('test', False) and low.get('failhard', self.opts['failhard']):
+            return 'barrier'
+        if low.get('order') == 0 or low.get('order', 0) >= 1000000:
+            # order: first and order: last
+            return 'barrier'
+        if low.get('parallel') is False or 'retry' in low:
+            return 'inline'
+        for key in ('reload_modules', 'reload_grains', 'reload_pillar',
+                    'force_reload_modules'):
+            if low.get(key):
+                return 'inline'
+        if (low.get('watch') or low.get('watch_any')) \
+                and '{0}.mod_watch'.format(low['state']) in self.states:
+            return 'inline'
+        if '{0}.mod_aggregate'.format(low['state']) in self.states \
+                and low.get('aggregate', self.opts.get('state_aggregate')):
+            return 'inline'
+        return 'parallel'
+
+    @staticmethod
+    def _order_group(low):
+        '''
+        Return the order group of a chunk for call_chunks_concurrent. The
+        chunks with an order set below the auto order base (10000) only run
+        after the chunks of the lower orders returned, and before the chunks
+        of the higher orders start.
+        '''
+        order = low.get('order', 10000)
+        if not isinstance(order, (int, float)) or order >= 10000:
+            return 10000
+        # The names of a state share its order
+        return int(order)
+
+    def call_chunks_concurrent(self, chunks):
+        '''
+        Call the chunks as soon as the chunks they require ran, running up to
+        ``state_concurrency`` chunks at a time in separate processes
+        '''
+        limit = self.opts['state_concurrency']
+        graph = self._requisite_graph(chunks)
+        modes = dict((_gen_tag(low), self._concurrency_mode(low)) for low in chunks)
+        groups = dict((_gen_tag(low), self._order_group(low)) for low in chunks)
+        running = {}
+        pending = list(chunks)
+        inflight = {}
+        stop = False
+        while inflight or (pending and not stop):
+            self.reconcile_procs(running)
+            for tag in [tag for tag in inflight if 'proc' not in running[tag]]:
+                # Refresh the modules in this process, the state ran in a
+                # separate one
+                self.check_refresh(inflight.pop(tag), running[tag])
+            idx = 0
+            dispatched = False
+            while not stop and idx < len(pending):
+                low = pending[idx]
+                tag = _gen_tag(low)
+                if tag in running:
+                    # Ran as a requisite of another chunk
+                    pending.pop(idx)
+                    continue
+                mode = modes[tag]
+                group = groups[tag]
+                if group != groups[_gen_tag(pending[0])] \
+                        or any(groups[itag] != group for itag in inflight):
+                    # The chunks of a lower order did not all return
+                    break
+                if mode == 'barrier':
+                    if idx or inflight:
+                        break
+                elif mode == 'parallel' and len(inflight) >= limit:
+                    break
+                elif any(dep not in running or 'proc' in running[dep]
+                         for dep in graph[tag]):
+                    idx += 1
+                    continue
+                pending.pop(idx)
+                dispatched = True
+                if self.check_pause(low) == 'kill':
+                    stop = True
+                    break
+                if mode == 'parallel':
+                    low['parallel'] = True
+                running = self.call_chunk(low, running, chunks)
+                self.active = set()
+                if '__FAILHARD__' in running:
+                    running.pop('__FAILHARD__')
+                    stop = True
+                elif tag in running and 'proc' in running[tag]:
+                    inflight[tag] = low
+                elif self.check_failhard(low, running):
+                    stop = True
+                if mode != 'parallel':
+                    # Let the states which became ready run first
+                    break
+            if dispatched:
+                continue
+            if pending and not inflight and not stop:
+                # The remaining chunks wait on each other, let call_chunk
+                # run them or report the requisite errors
+                low = pending.pop(0)
+                running = self.call_chunk(low, running, chunks)
+                self.active = set()
+                if '__FAILHARD__' in running:
+                    running.pop('__FAILHARD__')
+                    stop = True
+                elif self.check_failhard(low, running):
+                    stop = True
+                continue
+            time.sleep(0.01)
+        return running
+
     def check_failhard(self, low, running):
         '''
         Check if the low data chunk should send a failhard signal
@@ -2225,30 +2435,66 @@ class State(object):
         for tag in running:
             proc = running[tag].get('proc')
             if proc:
-                if not proc.is_alive():
-                    ret_cache = os.path.join(
-                        self.opts['cachedir'],
-                        self.jid,
-                        salt.utils.hashutils.sha1_digest(tag))
-                    if not os.path.isfile(ret_cache):
-                        ret = {'result': False,
-                               'comment': 'Parallel process failed to return',
-                               'name': running[tag]['name'],
-                               'changes': {}}
+                # Read the return before joining, a process can't exit until
+                # a large return was read from the pipe
+                if proc.ret_conn.poll():
                     try:
-                        with salt.utils.files.fopen(ret_cache, 'rb') as fp_:
-                            ret = msgpack_deserialize(fp_.read())
-                    except (OSError, IOError):
+                        ret = msgpack_deserialize(proc.ret_conn.recv_bytes())
+                    except (EOFError, OSError, IOError):
                         ret = {'result': False,
-                               'comment': 'Parallel cache failure',
+                               'comment': 'Parallel process failed to return',
                                'name': running[tag]['name'],
                                'changes': {}}
+                    proc.ret_conn.close()
+                    proc.join()
                     running[tag].update(ret)
                     running[tag].pop('proc')
                 else:
                     retset.add(False)
         return False not in retset
 
+    def _index_chunks(self, chunks):
+        '''
+        Return the chunks indexed by sls, id and name, built once for a list of
+        chunks
+        '''
+        if self._chunk_index is None \
+                or self._chunk_index[0] is not chunks \
+                or self._chunk_index[1] != len(chunks):
+            index = {'__sls__': {}, '__id__': {}, 'name': {}, 'pos': {}}
+            for pos, chunk in enumerate(chunks):
+                index['pos'][id(chunk)] = pos
+                for key in ('__sls__', '__id__', 'name'):
+                    try:
+                        index[key].setdefault(chunk[key], []).append(chunk)
+                    except TypeError:
+                        # Unhashable, can't be referenced
+                        pass
+            self._chunk_index = (chunks, len(chunks), index)
+        return self._chunk_index[2]
+
+    def _find_chunks(self, req_key, req_val, chunks):
+        '''
+        Return the chunks matching a requisite, in the order of the chunks.
+        A requisite on a state matches the chunks of that state whose name or
+        id match the glob ``req_val``, a requisite on an sls or id matches
+        all the chunks of the sls or with the name or id.
+        '''
+        index = self._index_chunks(chunks)
+        found = {}
+        for key in ('__sls__',) if req_key == 'sls' else ('name', '__id__'):
+            if _GLOB_CHARS.intersection(req_val) or salt.utils.platform.is_windows():
+                # fnmatch ignores the case on Windows
+                matches = [chunk for val, lows in six.iteritems(index[key])
+                           if isinstance(val, six.string_types) and fnmatch.fnmatch(val, req_val)
+                           for chunk in lows]
+            else:
+                matches = index[key].get(req_val, [])
+            for chunk in matches:
+                if req_key in ('sls', 'id') or chunk['state'] == req_key:
+                    found[id(chunk)] = chunk
+        return sorted(six.itervalues(found), key=lambda chunk: index['pos'][id(chunk)])
+
     def check_requisite(self, low, running, chunks, pre=False):
         '''
         Look into the running data to check the status of all requisite
@@ -2290,7 +2536,6 @@ class State(object):
             present = True
         if not present:
             return 'met', ()
-        self.reconcile_procs(running)
         reqs = {
                 'require': [],
                 'require_any': [],
@@ -2309,40 +2554,18 @@ class State(object):
                     if isinstance(req, six.string_types):
                         req = {'id': req}
                     req = trim_req(req)
-                    found = False
-                    for chunk in chunks:
-                        req_key = next(iter(req))
-                        req_val = req[req_key]
-                        if req_val is None:
-                            continue
-                        if req_key == 'sls':
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk['__sls__'], req_val):
-                                found = True
-                                reqs[r_state].append(chunk)
-                            continue
-                        try:
-                            if isinstance(req_val, six.string_types):
-                                if (fnmatch.fnmatch(chunk['name'], req_val) or
-                                    fnmatch.fnmatch(chunk['__id__'], req_val)):
-                                    if req_key == 'id' or chunk['state'] == req_key:
-                                        found = True
-                                        reqs[r_state].append(chunk)
-                            else:
-                                raise KeyError
-                        except KeyError as exc:
-                            raise SaltRenderError(
-                                'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
-                                    req_key, chunk['name']))
-                        except TypeError:
-                            # On Python 2, the above req_val, being an OrderedDict, will raise a KeyError,
-                            # however on Python 3 it will raise a TypeError
-                            # This was found when running tests.unit.test_state.StateCompilerTestCase.test_render_error_on_invalid_requisite
-                            raise SaltRenderError(
-                                'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
-                                    req_key, chunk['name']))
+                    req_key = next(iter(req))
+                    req_val = req[req_key]
+                    if req_val is None:
+                        return 'unmet', ()
+                    if not isinstance(req_val, six.string_types):
+                        raise SaltRenderError(
+                            'Could not locate requisite of [{0}] present in state with name [{1}]'.format(
+                                req_key, chunks[0]['name']))
+                    found = self._find_chunks(req_key, req_val, chunks)
                     if not found:
                         return 'unmet', ()
+                    reqs[r_state].extend(found)
         fun_stats = set()
         for r_state, chunks in six.iteritems(reqs):
             req_stats = set()
@@ -2351,8 +2574,11 @@ class State(object):
             else:
                 run_dict = running
 
+            # Only wait for the parallel processes of the requisites
+            req_running = dict((_gen_tag(chunk), run_dict[_gen_tag(chunk)])
+                               for chunk in chunks if _gen_tag(chunk) in run_dict)
             while True:
-                if self.reconcile_procs(run_dict):
+                if self.reconcile_procs(req_running):
                     break
                 time.sleep(0.01)
 
@@ -2495,29 +2721,17 @@ class State(object):
                     if isinstance(req, six.string_types):
                         req = {'id': req}
                     req = trim_req(req)
-                    found = False
                     req_key = next(iter(req))
                     req_val = req[req_key]
-                    for chunk in chunks:
-                        if req_val is None:
-                            continue
-                        if req_key == 'sls':
-                            # Allow requisite tracking of entire sls files
-                            if fnmatch.fnmatch(chunk['__sls__'], req_val):
-                                if requisite == 'prereq':
-                                    chunk['__prereq__'] = True
-                                reqs.append(chunk)
-                                found = True
-                            continue
-                        if (fnmatch.fnmatch(chunk['name'], req_val) or
-                            fnmatch.fnmatch(chunk['__id__'], req_val)):
-                            if req_key == 'id' or chunk['state'] == req_key:
-                                if requisite == 'prereq':
-                                    chunk['__prereq__'] = True
-                                elif requisite == 'prerequired':
-                                    chunk['__prerequired__'] = True
-                                reqs.append(chunk)
-                                found = True
+                    found = False
+                    if req_val is not None:
+                        for chunk in self._find_chunks(req_key, req_val, chunks):
+                            if requisite == 'prereq':
+                                chunk['__prereq__'] = True
+                            elif requisite == 'prerequired' and req_key != 'sls':
+                                chunk['__prerequired__'] = True
+                            reqs.append(chunk)
+                            found = True
                     if not found:
                         lost[requisite].append(req)
             if lost['require'] or lost['watch'] or lost['prereq'] \
@@ -2937,6 +3151,8 @@ class BaseHighState(object):
         self.avail = self.__gather_avail()
         self.serial = salt.payload.Serial(self.opts)
         self.building_highstate = OrderedDict()
+        # The pillar and grains hashes keying the compiled state cache
+        self._compile_cache_inputs = None
 
     def __gather_avail(self):
         '''
@@ -3470,16 +3686,23 @@ class BaseHighState(object):
                 'fileserver'.format(sls, saltenv)
             )
         else:
+            cache_key = None
+            if self.opts.get('state_compile_cache', False):
+                cache_key = self._compiled_state_key(fn_, saltenv, sls)
+                state = self._load_compiled_state(cache_key, saltenv, sls)
             try:
-                state = compile_template(fn_,
-                                         self.state.rend,
-                                         self.state.opts['renderer'],
-                                         self.state.opts['renderer_blacklist'],
-                                         self.state.opts['renderer_whitelist'],
-                                         saltenv,
-                                         sls,
-                                         rendered_sls=mods
-                                         )
+                if state is None:
+                    state = compile_template(fn_,
+                                             self.state.rend,
+                                             self.state.opts['renderer'],
+                                             self.state.opts['renderer_blacklist'],
+                                             self.state.opts['renderer_whitelist'],
+                                             saltenv,
+                                             sls,
+                                             rendered_sls=mods
+                                             )
+                    if cache_key is not None:
+                        self._store_compiled_state(cache_key, saltenv, sls, state)
             except SaltRenderError as exc:
                 msg = 'Rendering SLS \'{0}:{1}\' failed: {2}'.format(
                     saltenv, sls, exc
@@ -3632,6 +3855,70 @@ class BaseHighState(object):
             state = {}
         return state, errors
 
+    def _compiled_state_path(self, saltenv, sls):
+        '''
+        Return the path of the compiled state cache file of an SLS
+        '''
+        return os.path.join(
+            self.opts['cachedir'],
+            'state_compile_cache',
+            salt.utils.hashutils.sha256_digest('{0}:{1}'.format(saltenv, sls)) + '.p')
+
+    def _compiled_state_key(self, fn_, saltenv, sls):
+        '''
+        Return the key of the compiled state cache for an SLS file, a hash
+        of the SLS, saltenv, renderer, pillar, grains and SLS file contents.
+        Returns None if the key can't be computed.
+        '''
+        try:
+            if self._compile_cache_inputs is None:
+                self._compile_cache_inputs = [
+                    salt.utils.hashutils.sha256_digest(
+                        msgpack_serialize(self.state.opts.get('pillar', {}))),
+                    salt.utils.hashutils.sha256_digest(
+                        msgpack_serialize(self.opts.get('grains', {}))),
+                ]
+            file_hash = salt.utils.hashutils.get_hash(fn_, 'sha256')
+        except (SerializationError, IOError, OSError) as exc:
+            log.debug('Not caching the compiled SLS %s: %s', sls, exc)
+            return None
+        return salt.utils.hashutils.sha256_digest(msgpack_serialize(
+            [sls, saltenv, self.state.opts['renderer'], file_hash] + self._compile_cache_inputs))
+
+    def _load_compiled_state(self, cache_key, saltenv, sls):
+        '''
+        Return the rendered data of an SLS from the compiled state cache, or
+        None when it isn't cached for ``cache_key``
+        '''
+        if cache_key is None:
+            return None
+        path = self._compiled_state_path(saltenv, sls)
+        try:
+            with salt.utils.files.fopen(path, 'rb') as fp_:
+                cached = msgpack_deserialize(fp_.read(), object_pairs_hook=OrderedDict)
+        except (IOError, OSError, DeserializationError):
+            return None
+        if cached.get('key') != cache_key:
+            return None
+        log.debug('Using the compiled state cache for SLS %s:%s', saltenv, sls)
+        return cached['state']
+
+    def _store_compiled_state(self, cache_key, saltenv, sls, state):
+        '''
+        Store the rendered data of an SLS in the compiled state cache
+        '''
+        if not isinstance(state, dict):
+            return
+        path = self._compiled_state_path(saltenv, sls)
+        try:
+            data = msgpack_serialize({'key': cache_key, 'state': state})
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with salt.utils.atomicfile.atomic_open(path, 'wb') as fp_:
+                fp_.write(data)
+        except (IOError, OSError, SerializationError) as exc:
+            log.debug('Failed to cache the compiled SLS %s:%s: %s', saltenv, sls, exc)
+
     def _handle_iorder(self, state):
         '''
         Take a state and apply the iorder system
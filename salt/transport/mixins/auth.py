@@ -66,6 +66,54 @@ class AESPubClientMixin(object):
         raise tornado.gen.Return(payload)
 
 
+class AESPubServerMixin(object):
+    '''
+    Mixin to house the master-side publish crypto. The Crypticle and the
+    master signing key are kept loaded in the process between publishes
+    instead of being set up again for every payload.
+    '''
+    # Shared by all the publish channels of the process
+    _pub_crypticle = None
+    _pub_signing_keys = {}
+
+    def _get_pub_crypticle(self):
+        '''
+        Return the Crypticle for the current AES key, re-created only when
+        the key has been rotated
+        '''
+        key_string = salt.master.SMaster.secrets['aes']['secret'].value
+        crypticle = AESPubServerMixin._pub_crypticle
+        if crypticle is None or crypticle.key_string != key_string:
+            crypticle = salt.crypt.Crypticle(self.opts, key_string)
+            AESPubServerMixin._pub_crypticle = crypticle
+        return crypticle
+
+    def _get_pub_signing_key(self):
+        '''
+        Return the master private key used to sign publishes, read from
+        disk once per process
+        '''
+        master_pem_path = os.path.join(self.opts['pki_dir'], 'master.pem')
+        key = AESPubServerMixin._pub_signing_keys.get(master_pem_path)
+        if key is None:
+            key = salt.crypt.get_rsa_key(master_pem_path, None)
+            AESPubServerMixin._pub_signing_keys[master_pem_path] = key
+        return key
+
+    def _encrypt_pub(self, load):
+        '''
+        Encrypt, and sign if sign_pub_messages is set, a publish load once.
+        Returns the serialized payload sent to every minion.
+        '''
+        payload = {'enc': 'aes'}
+        payload['load'] = self._get_pub_crypticle().dumps(load)
+        if self.opts['sign_pub_messages']:
+            log.debug("Signing data packet")
+            payload['sig'] = salt.crypt.sign_message_with_key(
+                self._get_pub_signing_key(), payload['load'])
+        return self.serial.dumps(payload)
+
+
 # TODO: rename?
 class AESReqServerMixin(object):
     '''
@@ -87,6 +135,8 @@ class AESReqServerMixin(object):
                 ),
                 'reload': salt.crypt.Crypticle.generate_key_string
             }
+        if self.opts.get('auth_session_ttl'):
+            salt.crypt.AuthSessions(self.opts).setup_key()
 
     def post_fork(self, _, __):
         self.serial = salt.payload.Serial(self.opts)
@@ -106,6 +156,10 @@ class AESReqServerMixin(object):
             self.ckminions = salt.utils.minions.CkMinions(self.opts)
 
         self.master_key = salt.crypt.MasterKeys(self.opts)
+        if self.opts.get('auth_session_ttl'):
+            self.auth_sessions = salt.crypt.AuthSessions(self.opts)
+        else:
+            self.auth_sessions = None
 
     def _encrypt_private(self, ret, dictkey, target):
         '''
@@ -161,6 +215,35 @@ class AESReqServerMixin(object):
                 payload['load'] = self.crypticle.loads(payload['load'])
         return payload
 
+    def _resume_session(self, load):
+        '''
+        Resume the auth session of a minion which signed in less than
+        auth_session_ttl seconds ago, sending it the current AES key
+        encrypted with the session key instead of its RSA public key.
+
+        Returns None if the session can not be resumed, in which case the
+        minion is sent the reply to a full sign in.
+        '''
+        key = self.auth_sessions.get(load['id'], load['session'], load['pub'])
+        if key is None:
+            return None
+        crypticle = salt.crypt.Crypticle(self.opts, key)
+        try:
+            proof = crypticle.loads(load.get('session_proof', b''))
+        except salt.crypt.AuthenticationError:
+            proof = None
+        if not isinstance(proof, dict) or proof.get('id') != load['id']:
+            log.warning('Invalid auth session proof from %s', load['id'])
+            return None
+        log.debug('Resuming the auth session of %s', load['id'])
+        return {'enc': 'pub',
+                'session': load['session'],
+                'session_aes': crypticle.dumps({
+                    'aes': salt.utils.stringutils.to_str(
+                        salt.master.SMaster.secrets['aes']['secret'].value),
+                    'nonce': proof.get('nonce')}),
+                'publish_port': self.opts['publish_port']}
+
     def _auth(self, load):
         '''
         Authenticate the client, use the sent public key to encrypt the AES key
@@ -410,6 +493,7 @@ class AESReqServerMixin(object):
         if not os.path.isfile(pubfn) and not self.opts['open_mode']:
             with salt.utils.files.fopen(pubfn, 'w+') as fp_:
                 fp_.write(load['pub'])
+            salt.utils.minions.key_event(self.opts, {'act': 'accept', 'id': load['id']})
         elif self.opts['open_mode']:
             disk_key = ''
             if os.path.isfile(pubfn):
@@ -430,6 +514,17 @@ class AESReqServerMixin(object):
         if self.cache_cli:
             self.cache_cli.put_cache([load['id']])
 
+        if 'session' in load and getattr(self, 'auth_sessions', None) is not None:
+            ret = self._resume_session(load)
+            if ret is not None:
+                eload = {'result': True,
+                         'act': 'accept',
+                         'id': load['id'],
+                         'pub': load['pub']}
+                if self.opts.get('auth_events') is True:
+                    self.event.fire_event(eload, salt.utils.event.tagify(prefix='auth'))
+                return ret
+
         # The key payload may sometimes be corrupt when using auto-accept
         # and an empty request comes in
         try:
@@ -465,6 +560,7 @@ class AESReqServerMixin(object):
                                                    ret['pub_key'], key_pass)
                 ret.update({'pub_sig': binascii.b2a_base64(pub_sign)})
 
+        mtoken = None
         if not HAS_M2:
             mcipher = PKCS1_OAEP.new(self.master_key.key)
         if self.opts['auth_mode'] >= 2:
@@ -511,6 +607,10 @@ class AESReqServerMixin(object):
         # Be aggressive about the signature
         digest = salt.utils.stringutils.to_bytes(hashlib.sha256(aes).hexdigest())
         ret['sig'] = salt.crypt.private_encrypt(self.master_key.key, digest)
+        if mtoken and getattr(self, 'auth_sessions', None) is not None:
+            session = self.auth_sessions.create(load['id'], mtoken, load['pub'])
+            if session is not None:
+                ret['session'] = session
         eload = {'result': True,
                  'act': 'accept',
                  'id': load['id'],
@@ -22,6 +22,7 @@ import salt.crypt
 import salt.utils.asynchronous
 import salt.utils.event
 import salt.utils.files
+import salt.utils.minions
 import salt.utils.platform
 import salt.utils.process
 import salt.utils.verify
@@ -34,6 +35,7 @@ import salt.transport.server
 import salt.transport.mixins.auth
 from salt.ext import six
 from salt.ext.six.moves import queue  # pylint: disable=import-error
+from salt.defaults import DEFAULT_TARGET_DELIM
 from salt.exceptions import SaltReqTimeoutError, SaltClientError
 from salt.transport import iter_transport_opts
 
@@ -1421,7 +1423,8 @@ class PubServer(tornado.tcpserver.TCPServer, object):
         log.trace('TCP PubServer finished publishing payload')
 
 
-class TCPPubServerChannel(salt.transport.server.PubServerChannel):
+class TCPPubServerChannel(salt.transport.mixins.auth.AESPubServerMixin,
+                          salt.transport.server.PubServerChannel):
     # TODO: opts!
     # Based on default used in tornado.netutil.bind_sockets()
     backlog = 128
@@ -1431,6 +1434,7 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         self.serial = salt.payload.Serial(self.opts)  # TODO: in init?
         self.ckminions = salt.utils.minions.CkMinions(opts)
         self.io_loop = None
+        self.pub_sock = None
 
     def __setstate__(self, state):
         salt.master.SMaster.secrets = state['secrets']
@@ -1500,35 +1504,45 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
         '''
         process_manager.add_process(self._publish_daemon, kwargs=kwargs)
 
-    def publish(self, load):
+    def _pub_connect(self):
         '''
-        Publish "load" to minions
+        Connect to the publisher daemon, the connection is kept for the next
+        publishes of this channel
         '''
-        payload = {'enc': 'aes'}
-
-        crypticle = salt.crypt.Crypticle(self.opts, salt.master.SMaster.secrets['aes']['secret'].value)
-        payload['load'] = crypticle.dumps(load)
-        if self.opts['sign_pub_messages']:
-            master_pem_path = os.path.join(self.opts['pki_dir'], 'master.pem')
-            log.debug("Signing data packet")
-            payload['sig'] = salt.crypt.sign_message(master_pem_path, payload['load'])
-        # Use the Salt IPC server
-        if self.opts.get('ipc_mode', '') == 'tcp':
-            pull_uri = int(self.opts.get('tcp_master_publish_pull', 4514))
-        else:
-            pull_uri = os.path.join(self.opts['sock_dir'], 'publish_pull.ipc')
-        # TODO: switch to the actual asynchronous interface
-        #pub_sock = salt.transport.ipc.IPCMessageClient(self.opts, io_loop=self.io_loop)
-        pub_sock = salt.utils.asynchronous.SyncWrapper(
-            salt.transport.ipc.IPCMessageClient,
-            (pull_uri,)
-        )
-        pub_sock.connect()
-
-        int_payload = {'payload': self.serial.dumps(payload)}
+        if self.pub_sock is None:
+            # Use the Salt IPC server
+            if self.opts.get('ipc_mode', '') == 'tcp':
+                pull_uri = int(self.opts.get('tcp_master_publish_pull', 4514))
+            else:
+                pull_uri = os.path.join(self.opts['sock_dir'], 'publish_pull.ipc')
+            # TODO: switch to the actual asynchronous interface
+            #pub_sock = salt.transport.ipc.IPCMessageClient(self.opts, io_loop=self.io_loop)
+            self.pub_sock = salt.utils.asynchronous.SyncWrapper(
+                salt.transport.ipc.IPCMessageClient,
+                (pull_uri,)
+            )
+            self.pub_sock.connect()
+        return self.pub_sock
 
-        # add some targeting stuff for lists only (for now)
-        if load['tgt_type'] == 'list':
+    def _pub_payload(self, load):
+        '''
+        Build the message sent to the publisher daemon for "load"
+        '''
+        int_payload = {'payload': self._encrypt_pub(load)}
+
+        if self.opts.get('tcp_filtering') and not self.opts.get('order_masters'):
+            # Resolve every target type master side, None means broadcast.
+            # Syndics don't connect with the ids of their minions, so they
+            # always get the broadcast.
+            match_ids = self.ckminions.pub_minions(
+                load['tgt'],
+                tgt_type=load['tgt_type'],
+                delimiter=load.get('delimiter', DEFAULT_TARGET_DELIM))
+            if match_ids is not None:
+                log.debug("Publish Side Match: %s", match_ids)
+                int_payload['topic_lst'] = match_ids
+        # add some targeting stuff for lists only
+        elif load['tgt_type'] == 'list':
             if isinstance(load['tgt'], six.string_types):
                 # Fetch a list of minions that match
                 _res = self.ckminions.check_minions(load['tgt'],
@@ -1540,5 +1554,27 @@ class TCPPubServerChannel(salt.transport.server.PubServerChannel):
                 int_payload['topic_lst'] = match_ids
             else:
                 int_payload['topic_lst'] = load['tgt']
+        return int_payload
+
+    def publish(self, load):
+        '''
+        Publish "load" to minions
+        '''
+        int_payload = self._pub_payload(load)
         # Send it over IPC!
-        pub_sock.send(int_payload)
+        try:
+            self._pub_connect().send(int_payload)
+        except tornado.iostream.StreamClosedError:
+            # The publisher daemon went away since the last publish, connect
+            # again
+            log.debug('Publisher connection closed, reconnecting')
+            self.pub_close()
+            self._pub_connect().send(int_payload)
+
+    def pub_close(self):
+        '''
+        Close the connection to the publisher daemon
+        '''
+        if self.pub_sock is not None:
+            self.pub_sock.close()
+            self.pub_sock = None
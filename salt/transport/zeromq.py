@@ -15,6 +15,7 @@ import hashlib
 import logging
 import weakref
 import threading
+import time
 from random import randint
 
 # Import Salt Libs
@@ -34,6 +35,7 @@ import salt.transport.client
 import salt.transport.server
 import salt.transport.mixins.auth
 from salt.ext import six
+from salt.defaults import DEFAULT_TARGET_DELIM
 from salt.exceptions import SaltReqTimeoutError, SaltException
 from salt._compat import ipaddress
 
@@ -273,11 +275,16 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
         # if we've reached here something is very abnormal
         raise SaltException('ReqChannel: missing master_uri/master_ip in self.opts')
 
-    def _package_load(self, load):
-        return {
+    def _package_load(self, load, cmd=None):
+        payload = {
             'enc': self.crypt,
             'load': load,
         }
+        if cmd:
+            # The command of an encrypted load is sent in the clear so that
+            # the master can hand the request to the MWorker pool for it
+            payload['cmd'] = cmd
+        return payload
 
     @tornado.gen.coroutine
     def crypted_transfer_decode_dictentry(self, load, dictkey=None, tries=3, timeout=60):
@@ -286,7 +293,7 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
             yield self.auth.authenticate()
         # Return control to the caller. When send() completes, resume by populating ret with the Future.result
         ret = yield self.message_client.send(
-            self._package_load(self.auth.crypticle.dumps(load)),
+            self._package_load(self.auth.crypticle.dumps(load), load.get('cmd')),
             timeout=timeout,
             tries=tries,
         )
@@ -295,7 +302,7 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
             # Reauth in the case our key is deleted on the master side.
             yield self.auth.authenticate()
             ret = yield self.message_client.send(
-                self._package_load(self.auth.crypticle.dumps(load)),
+                self._package_load(self.auth.crypticle.dumps(load), load.get('cmd')),
                 timeout=timeout,
                 tries=tries,
             )
@@ -330,7 +337,7 @@ class AsyncZeroMQReqChannel(salt.transport.client.ReqChannel):
         def _do_transfer():
             # Yield control to the caller. When send() completes, resume by populating data with the Future.result
             data = yield self.message_client.send(
-                self._package_load(self.auth.crypticle.dumps(load)),
+                self._package_load(self.auth.crypticle.dumps(load), load.get('cmd')),
                 timeout=timeout,
                 tries=tries,
             )
@@ -578,6 +585,104 @@ class ZeroMQReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin,
     def __init__(self, opts):
         salt.transport.server.ReqServerChannel.__init__(self, opts)
         self._closing = False
+        # The pool of the MWorker using this channel, see worker_pools
+        self.worker_pool = None
+
+    def _worker_uri(self, pool=None):
+        '''
+        Return the uri of the socket the MWorkers of a pool connect to
+        '''
+        pools = sorted(self.opts.get('worker_pools') or {})
+        if self.opts.get('ipc_mode', '') == 'tcp':
+            port = self.opts.get('tcp_master_workers', 4515)
+            if pool in pools:
+                port += pools.index(pool) + 1
+            return 'tcp://127.0.0.1:{0}'.format(port)
+        if pool in pools:
+            name = 'workers-{0}.ipc'.format(pool)
+        else:
+            name = 'workers.ipc'
+        return 'ipc://{0}'.format(os.path.join(self.opts['sock_dir'], name))
+
+    def _worker_pool(self, routes, message):
+        '''
+        Return the pool of MWorkers which handles a request, None for the
+        default pool
+        '''
+        try:
+            payload = self.serial.loads(message)
+        except Exception:
+            return None
+        if not isinstance(payload, dict):
+            return None
+        if payload.get('enc') == 'clear':
+            load = payload.get('load')
+            cmd = load.get('cmd') if isinstance(load, dict) else None
+        else:
+            cmd = payload.get('cmd')
+        return routes.get(cmd)
+
+    def _route_pools(self, pools):
+        '''
+        Hand the requests of the clients to the MWorker pools of their
+        commands and the replies back to the clients, keeping track of the
+        number of requests each pool has queued or in progress
+        '''
+        self.serial = salt.payload.Serial(self.opts)
+        routes = {}
+        for pool, conf in six.iteritems(pools):
+            for cmd in conf.get('commands', ()):
+                routes[cmd] = pool
+        backends = {None: self.workers}
+        for pool in pools:
+            backends[pool] = self.context.socket(zmq.DEALER)
+            backends[pool].bind(self._worker_uri(pool))
+        sockets = dict((sock, pool) for pool, sock in six.iteritems(backends))
+        poller = zmq.Poller()
+        poller.register(self.clients, zmq.POLLIN)
+        for sock in sockets:
+            poller.register(sock, zmq.POLLIN)
+
+        stats = dict((pool, {'depth': 0, 'max_depth': 0, 'requests': 0}) for pool in backends)
+        event = None
+        stat_clock = time.time()
+        while not self._closing:
+            try:
+                ready = dict(poller.poll(1000))
+            except zmq.ZMQError as exc:
+                if exc.errno == errno.EINTR:
+                    continue
+                raise exc
+            except (KeyboardInterrupt, SystemExit):
+                break
+            if ready.get(self.clients) == zmq.POLLIN:
+                message = self.clients.recv_multipart()
+                pool = self._worker_pool(routes, message[-1])
+                backends[pool].send_multipart(message)
+                stats[pool]['requests'] += 1
+                stats[pool]['depth'] += 1
+                stats[pool]['max_depth'] = max(stats[pool]['max_depth'], stats[pool]['depth'])
+            for sock, pool in six.iteritems(sockets):
+                if ready.get(sock) == zmq.POLLIN:
+                    self.clients.send_multipart(sock.recv_multipart())
+                    stats[pool]['depth'] = max(stats[pool]['depth'] - 1, 0)
+            if self.opts.get('master_stats') and \
+                    time.time() - stat_clock > self.opts['master_stats_event_iter']:
+                if event is None:
+                    event = salt.utils.event.get_master_event(
+                        self.opts, self.opts['sock_dir'], listen=False)
+                now = time.time()
+                event.fire_event(
+                    {'time': now - stat_clock,
+                     'pools': dict((pool or 'default', data) for pool, data in six.iteritems(stats))},
+                    salt.utils.event.tagify('MWorkerQueue', 'stats'))
+                for data in six.itervalues(stats):
+                    data['max_depth'] = data['depth']
+                    data['requests'] = 0
+                stat_clock = now
+        for pool, sock in six.iteritems(backends):
+            if pool is not None:
+                sock.close()
 
     def zmq_device(self):
         '''
@@ -595,20 +700,16 @@ class ZeroMQReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin,
         self.clients.setsockopt(zmq.BACKLOG, self.opts.get('zmq_backlog', 1000))
         self._start_zmq_monitor()
         self.workers = self.context.socket(zmq.DEALER)
-
-        if self.opts.get('ipc_mode', '') == 'tcp':
-            self.w_uri = 'tcp://127.0.0.1:{0}'.format(
-                self.opts.get('tcp_master_workers', 4515)
-                )
-        else:
-            self.w_uri = 'ipc://{0}'.format(
-                os.path.join(self.opts['sock_dir'], 'workers.ipc')
-                )
+        self.w_uri = self._worker_uri()
 
         log.info('Setting up the master communication server')
         self.clients.bind(self.uri)
         self.workers.bind(self.w_uri)
 
+        if self.opts.get('worker_pools'):
+            self._route_pools(self.opts['worker_pools'])
+            return
+
         while True:
             if self.clients.closed or self.workers.closed:
                 break
@@ -688,14 +789,7 @@ class ZeroMQReqServerChannel(salt.transport.mixins.auth.AESReqServerMixin,
         self._socket = self.context.socket(zmq.REP)
         self._start_zmq_monitor()
 
-        if self.opts.get('ipc_mode', '') == 'tcp':
-            self.w_uri = 'tcp://127.0.0.1:{0}'.format(
-                self.opts.get('tcp_master_workers', 4515)
-                )
-        else:
-            self.w_uri = 'ipc://{0}'.format(
-                os.path.join(self.opts['sock_dir'], 'workers.ipc')
-                )
+        self.w_uri = self._worker_uri(self.worker_pool)
         log.info('Worker binding to socket %s', self.w_uri)
         self._socket.connect(self.w_uri)
 
@@ -829,7 +923,8 @@ def _set_tcp_keepalive(zmq_socket, opts):
             )
 
 
-class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
+class ZeroMQPubServerChannel(salt.transport.mixins.auth.AESPubServerMixin,
+                             salt.transport.server.PubServerChannel):
     '''
     Encapsulate synchronous operations for a publisher channel
     '''
@@ -1008,46 +1103,48 @@ class ZeroMQPubServerChannel(salt.transport.server.PubServerChannel):
             self._sock_data.sock.close()
             delattr(self._sock_data, 'sock')
 
-    def publish(self, load):
+    def _pub_payload(self, load):
         '''
-        Publish "load" to minions. This send the load to the publisher daemon
-        process with does the actual sending to minions.
-
-        :param dict load: A load to be sent across the wire to minions
+        Build the message sent to the publisher daemon for "load"
         '''
-        payload = {'enc': 'aes'}
-        crypticle = salt.crypt.Crypticle(self.opts, salt.master.SMaster.secrets['aes']['secret'].value)
-        payload['load'] = crypticle.dumps(load)
-        if self.opts['sign_pub_messages']:
-            master_pem_path = os.path.join(self.opts['pki_dir'], 'master.pem')
-            log.debug("Signing data packet")
-            payload['sig'] = salt.crypt.sign_message(master_pem_path, payload['load'])
-        int_payload = {'payload': self.serial.dumps(payload)}
+        int_payload = {'payload': self._encrypt_pub(load)}
 
         # add some targeting stuff for lists only (for now)
         if load['tgt_type'] == 'list':
             int_payload['topic_lst'] = load['tgt']
 
         # If zmq_filtering is enabled, target matching has to happen master side
-        match_targets = ["pcre", "glob", "list"]
-        if self.opts['zmq_filtering'] and load['tgt_type'] in match_targets:
-            # Fetch a list of minions that match
-            _res = self.ckminions.check_minions(load['tgt'],
-                                                tgt_type=load['tgt_type'])
-            match_ids = _res['minions']
-
-            log.debug("Publish Side Match: %s", match_ids)
-            # Send list of miions thru so zmq can target them
-            int_payload['topic_lst'] = match_ids
+        if self.opts['zmq_filtering']:
+            # Fetch a list of minions that match, None means broadcast
+            match_ids = self.ckminions.pub_minions(
+                load['tgt'],
+                tgt_type=load['tgt_type'],
+                delimiter=load.get('delimiter', DEFAULT_TARGET_DELIM))
+            if match_ids is None:
+                log.debug("Publish Side Match: broadcast")
+                int_payload.pop('topic_lst', None)
+            else:
+                log.debug("Publish Side Match: %s", match_ids)
+                # Send list of miions thru so zmq can target them
+                int_payload['topic_lst'] = match_ids
         payload = self.serial.dumps(int_payload)
         log.debug(
             'Sending payload to publish daemon. jid=%s size=%d',
             load.get('jid', None), len(payload),
         )
+        return payload
+
+    def publish(self, load):
+        '''
+        Publish "load" to minions. This send the load to the publisher daemon
+        process with does the actual sending to minions.
+
+        :param dict load: A load to be sent across the wire to minions
+        '''
+        payload = self._pub_payload(load)
         if not self.pub_sock:
             self.pub_connect()
         self.pub_sock.send(payload)
-        log.debug('Sent payload to publish daemon.')
 
 
 class AsyncReqMessageClientPool(salt.transport.MessageClientPool):
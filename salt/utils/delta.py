@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+'''
+Block checksum deltas between two copies of a file, used to transfer only the
+changed parts of a file which a minion already has an older copy of.
+
+The minion sends the :func:`signatures` of the blocks of its copy, the master
+describes its copy with :func:`delta` as references to those blocks and
+literal data, and the minion rebuilds the master's copy with :func:`patch`.
+
+Blocks are matched with a weak adler32 checksum, which can be rolled along the
+master's copy one byte at a time, confirmed with a strong md5 checksum.
+'''
+
+# Import Python libs
+import hashlib
+import zlib
+
+# Import 3rd-party libs
+from salt.ext import six
+
+ADLER_MOD = 65521
+
+# The block size bounds and the number of blocks in the signatures of files
+# using a block size between them
+MIN_BLOCK_SIZE = 2048
+MAX_BLOCK_SIZE = 16777216
+MAX_BLOCKS = 2048
+
+# The number of blocks in a row which are searched for a match one byte at a
+# time before only looking for matches at block boundaries, which bounds the
+# time spent on files which changed entirely
+SEARCH_BLOCKS = 4
+
+
+def block_size(size):
+    '''
+    Return the block size to use for a file of ``size`` bytes
+    '''
+    return min(MAX_BLOCK_SIZE, max(MIN_BLOCK_SIZE, -(-size // MAX_BLOCKS)))
+
+
+def _strong(data):
+    return hashlib.md5(data).hexdigest()
+
+
+def signatures(fp_, bsize):
+    '''
+    Return the ``[weak, strong]`` checksums of the full blocks of ``bsize``
+    bytes of a file object
+    '''
+    ret = []
+    while True:
+        data = fp_.read(bsize)
+        if len(data) < bsize:
+            return ret
+        ret.append([zlib.adler32(data) & 0xffffffff, _strong(data)])
+
+
+def delta(fp_, sigs, bsize, loc=0, max_literal=1048576):
+    '''
+    Describe the contents of a file object from ``loc`` as a list of
+    operations on a copy with the block signatures ``sigs``: an integer is the
+    index of a block of that copy, bytes are literal data.
+
+    Returns the operations and the position to request the next operations
+    from, or None when the end of the file was reached. The operations stop
+    once more than ``max_literal`` bytes of literal data were gathered.
+    '''
+    table = {}
+    for idx, (weak, strong) in enumerate(sigs):
+        table.setdefault(weak, {}).setdefault(strong, idx)
+
+    def _match(weak, data):
+        strongs = table.get(weak)
+        if strongs is None:
+            return None
+        return strongs.get(_strong(bytes(data)))
+
+    ops = []
+    literal = bytearray()
+    fp_.seek(loc)
+    buf = bytearray()
+    buf_start = loc
+    off = 0
+    eof = False
+    search = SEARCH_BLOCKS
+    while True:
+        if not eof and len(buf) - off < 2 * bsize:
+            more = fp_.read(max(2 * bsize, 65536))
+            if not more:
+                eof = True
+            buf = buf[off:] + bytearray(more)
+            buf_start += off
+            off = 0
+            continue
+        window = buf[off:off + bsize]
+        if len(window) < bsize:
+            literal += window
+            break
+        weak = zlib.adler32(bytes(window)) & 0xffffffff
+        idx = _match(weak, window)
+        if idx is not None:
+            if literal:
+                ops.append(bytes(literal))
+                literal = bytearray()
+            ops.append(idx)
+            off += bsize
+            search = SEARCH_BLOCKS
+            continue
+        step = 0
+        if search:
+            # Roll the window along the next block looking for a match
+            search -= 1
+            low, high = weak & 0xffff, weak >> 16
+            for step in range(1, min(bsize, len(buf) - off - bsize + 1)):
+                out, in_ = buf[off + step - 1], buf[off + step + bsize - 1]
+                low = (low - out + in_) % ADLER_MOD
+                high = (high - bsize * out + low - 1) % ADLER_MOD
+                if (high << 16 | low) in table and _match(
+                        high << 16 | low, buf[off + step:off + step + bsize]) is not None:
+                    break
+            else:
+                step = 0
+        if step:
+            literal += buf[off:off + step]
+            off += step
+        else:
+            literal += window
+            off += bsize
+        if len(literal) >= max_literal:
+            ops.append(bytes(literal))
+            return ops, buf_start + off
+    if literal:
+        ops.append(bytes(literal))
+    return ops, None
+
+
+def patch(fp_, ops, bsize):
+    '''
+    Yield the data described by the operations returned by :func:`delta`,
+    reading the referenced blocks from the file object they were computed
+    against
+    '''
+    for op in ops:
+        if isinstance(op, six.integer_types):
+            fp_.seek(op * bsize)
+            yield fp_.read(bsize)
+        else:
+            yield op
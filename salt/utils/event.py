@@ -59,6 +59,8 @@ import fnmatch
 import hashlib
 import logging
 import datetime
+import threading
+import collections
 
 try:
     from collections.abc import MutableMapping
@@ -70,8 +72,10 @@ from salt.ext.six.moves import range
 
 # Import third party libs
 from salt.ext import six
+import tornado.gen
 import tornado.ioloop
 import tornado.iostream
+import tornado.concurrent
 
 # Import salt libs
 import salt.config
@@ -96,6 +100,7 @@ log = logging.getLogger(__name__)
 SUB_EVENT = ('state.highstate', 'state.sls')
 
 TAGEND = str('\n\n')  # long tag delimiter
+_TAGEND_BYTES = salt.utils.stringutils.to_bytes(TAGEND)
 TAGPARTER = str('/')  # name spaced tag delimiter
 SALT = 'salt'  # base prefix for all salt/ events
 # dict map of namespaced base tag prefixes for salt events
@@ -212,6 +217,244 @@ def tagify(suffix='', prefix='', base=SALT):
     return TAGPARTER.join([part for part in parts if part])
 
 
+class TagTrie(object):
+    '''
+    Map event tag prefixes to subscribers. All the subscribers of the
+    prefixes of a tag are found in a single walk of the tag.
+    '''
+    def __init__(self):
+        # A node is a (children, subscribers) tuple
+        self.root = ({}, set())
+
+    def add(self, prefix, subscriber):
+        node = self.root
+        for char in prefix:
+            node = node[0].setdefault(char, ({}, set()))
+        node[1].add(subscriber)
+
+    def remove(self, prefix, subscriber):
+        path = [self.root]
+        for char in prefix:
+            node = path[-1][0].get(char)
+            if node is None:
+                return
+            path.append(node)
+        path[-1][1].discard(subscriber)
+        # Prune the nodes left without subscribers
+        for idx in range(len(prefix), 0, -1):
+            if path[idx][0] or path[idx][1]:
+                break
+            del path[idx - 1][0][prefix[idx - 1]]
+
+    def match(self, tag):
+        '''
+        Return the subscribers of every prefix of ``tag``
+        '''
+        node = self.root
+        ret = set(node[1])
+        for char in tag:
+            node = node[0].get(char)
+            if node is None:
+                break
+            ret.update(node[1])
+        return ret
+
+
+class MultiplexedSubscriber(object):
+    '''
+    A subscriber of the event publisher whose events are read by the
+    process' EventMultiplexer. It stands in for the IPCMessageSubscriber of a
+    SaltEvent and keeps at most ``queue_size`` events, dropping the oldest
+    ones when the consumer falls behind.
+    '''
+    def __init__(self, mux, queue_size, io_loop=None):
+        self.mux = mux
+        self.io_loop = io_loop
+        self.prefixes = None
+        self._queue = collections.deque(maxlen=queue_size)
+        self._cond = threading.Condition()
+        self._callback = None
+        self._drain_scheduled = False
+        self._dropped = 0
+        self._closed_future = None
+
+    def connected(self):
+        return self.mux.connected.is_set()
+
+    def connect(self, timeout=None):
+        '''
+        Wait for the multiplexer to be connected to the event publisher
+        '''
+        return self.mux.connected.wait(timeout)
+
+    def set_prefixes(self, prefixes):
+        '''
+        Only receive the events whose tag starts with one of ``prefixes``,
+        or every event if ``prefixes`` is None
+        '''
+        self.mux.set_prefixes(self, prefixes)
+
+    def put(self, raw):
+        '''
+        Queue an event, called from the multiplexer thread
+        '''
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self._dropped += 1
+                if self._dropped == 1 or self._dropped % 1000 == 0:
+                    log.warning('Event subscriber queue is full, %d events dropped',
+                                self._dropped)
+            self._queue.append(raw)
+            if self._callback is None:
+                self._cond.notify()
+                return
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        self.io_loop.add_callback(self._drain)
+
+    def _drain(self):
+        with self._cond:
+            events = list(self._queue)
+            self._queue.clear()
+            self._drain_scheduled = False
+        for raw in events:
+            self._callback(raw)
+
+    def read_sync(self, timeout=None):
+        '''
+        Return the next event, or None if none was received within
+        ``timeout`` seconds
+        '''
+        with self._cond:
+            if not self._queue and timeout != 0:
+                if timeout is None:
+                    while not self._queue:
+                        self._cond.wait()
+                else:
+                    timeout_at = time.time() + timeout
+                    while not self._queue:
+                        remaining = timeout_at - time.time()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+            if self._queue:
+                return self._queue.popleft()
+        return None
+
+    def read_async(self, callback):
+        '''
+        Invoke ``callback`` on the IOLoop of the subscriber for each event.
+        Returns a future resolved when the subscriber is closed.
+        '''
+        with self._cond:
+            self._callback = callback
+            if self._queue and not self._drain_scheduled:
+                self._drain_scheduled = True
+                self.io_loop.add_callback(self._drain)
+        self._closed_future = tornado.concurrent.Future()
+        return self._closed_future
+
+    def close(self):
+        self.mux.remove(self)
+        if self._closed_future is not None and not self._closed_future.done():
+            self._closed_future.set_result(None)
+
+
+class EventMultiplexer(object):
+    '''
+    Hold a single connection of the process to an event publisher and
+    dispatch the events to the MultiplexedSubscribers by tag prefix, so that
+    the event consumers of the process don't each receive the full event
+    stream over their own connection.
+
+    Enabled with the ``event_multiplexer`` option, use
+    :py:meth:`EventMultiplexer.get` rather than creating instances.
+    '''
+    # (pid, puburi) -> EventMultiplexer
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, puburi):
+        self.puburi = puburi
+        self.connected = threading.Event()
+        self.trie = TagTrie()
+        self.subscribers = {}
+        self.lock = threading.Lock()
+        self.io_loop = tornado.ioloop.IOLoop()
+        self.subscriber = None
+        self.thread = threading.Thread(target=self._run, name='EventMultiplexer')
+        self.thread.daemon = True
+        self.thread.start()
+
+    @classmethod
+    def get(cls, puburi):
+        '''
+        Return the multiplexer of this process for the publisher at ``puburi``
+        '''
+        key = (os.getpid(), puburi)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(puburi)
+            return cls._instances[key]
+
+    def add(self, queue_size, io_loop=None):
+        '''
+        Return a new subscriber, receiving every event until its prefixes are
+        set
+        '''
+        subscriber = MultiplexedSubscriber(self, queue_size, io_loop=io_loop)
+        self.set_prefixes(subscriber, None)
+        return subscriber
+
+    def set_prefixes(self, subscriber, prefixes):
+        prefixes = frozenset(['']) if prefixes is None else frozenset(prefixes)
+        with self.lock:
+            old = self.subscribers.get(subscriber, frozenset())
+            for prefix in old - prefixes:
+                self.trie.remove(prefix, subscriber)
+            for prefix in prefixes - old:
+                self.trie.add(prefix, subscriber)
+            self.subscribers[subscriber] = prefixes
+
+    def remove(self, subscriber):
+        with self.lock:
+            for prefix in self.subscribers.pop(subscriber, ()):
+                self.trie.remove(prefix, subscriber)
+
+    def _run(self):
+        with salt.utils.asynchronous.current_ioloop(self.io_loop):
+            self.subscriber = salt.transport.ipc.IPCMessageSubscriber(
+                self.puburi,
+                io_loop=self.io_loop
+            )
+            self.io_loop.add_callback(self._read)
+            self.io_loop.start()
+
+    @tornado.gen.coroutine
+    def _read(self):
+        while True:
+            while not self.subscriber.connected():
+                try:
+                    yield self.subscriber.connect(timeout=5)
+                except Exception as exc:
+                    log.trace('EventMultiplexer failed to connect to %s: %s', self.puburi, exc)
+                    yield tornado.gen.sleep(1)
+            self.connected.set()
+            try:
+                yield self.subscriber.read_async(self._dispatch)
+            except Exception as exc:
+                log.trace('EventMultiplexer disconnected from %s: %s', self.puburi, exc)
+            self.connected.clear()
+
+    def _dispatch(self, raw):
+        tag = salt.utils.stringutils.to_str(raw.partition(_TAGEND_BYTES)[0])
+        with self.lock:
+            subscribers = self.trie.match(tag)
+        for subscriber in subscribers:
+            subscriber.put(raw)
+
+
 class SaltEvent(object):
     '''
     Warning! Use the get_event function or the code will not be
@@ -264,6 +507,8 @@ class SaltEvent(object):
         self.puburi, self.pulluri = self.__load_uri(sock_dir, node)
         self.pending_tags = []
         self.pending_events = []
+        # The tag and match function of the last get_event() call
+        self._last_tag = None
         self.__load_cache_regex()
         if listen and not self.cpub:
             # Only connect to the publisher at initialization time if
@@ -337,6 +582,7 @@ class SaltEvent(object):
             return
         match_func = self._get_match_func(match_type)
         self.pending_tags.append([tag, match_func])
+        self._set_subscriber_prefixes()
 
     def unsubscribe(self, tag, match_type=None):
         '''
@@ -347,6 +593,7 @@ class SaltEvent(object):
         match_func = self._get_match_func(match_type)
 
         self.pending_tags.remove([tag, match_func])
+        self._set_subscriber_prefixes()
 
         old_events = self.pending_events
         self.pending_events = []
@@ -361,6 +608,19 @@ class SaltEvent(object):
         if self.cpub:
             return True
 
+        if self.opts.get('event_multiplexer', False):
+            if self.subscriber is None:
+                self.subscriber = EventMultiplexer.get(self.puburi).add(
+                    self.opts.get('event_multiplexer_queue_size', 10000),
+                    io_loop=None if self._run_io_loop_sync else self.io_loop
+                )
+                self._set_subscriber_prefixes()
+            if self._run_io_loop_sync:
+                self.cpub = self.subscriber.connect(timeout=timeout)
+            else:
+                self.cpub = True
+            return self.cpub
+
         if self._run_io_loop_sync:
             with salt.utils.asynchronous.current_ioloop(self.io_loop):
                 if self.subscriber is None:
@@ -444,6 +704,27 @@ class SaltEvent(object):
             data = serial.loads(mdata, encoding='utf-8')
         return mtag, data
 
+    def _set_subscriber_prefixes(self):
+        '''
+        Only have the events which can be returned by get_event() dispatched
+        to the multiplexed subscriber: those matching a subscribed tag or the
+        tag of the last get_event() call. Every event is dispatched until
+        get_event() is first called, or when a subscription doesn't match
+        on the tag prefix.
+        '''
+        if not isinstance(self.subscriber, MultiplexedSubscriber):
+            return
+        if self._last_tag is None:
+            self.subscriber.set_prefixes(None)
+            return
+        prefixes = set()
+        for tag, match_func in self.pending_tags + [self._last_tag]:
+            if match_func is not self._match_tag_startswith:
+                self.subscriber.set_prefixes(None)
+                return
+            prefixes.add(tag)
+        self.subscriber.set_prefixes(prefixes)
+
     def _get_match_func(self, match_type=None):
         if match_type is None:
             match_type = self.opts['event_match_type']
@@ -627,6 +908,9 @@ class SaltEvent(object):
         assert self._run_io_loop_sync
 
         match_func = self._get_match_func(match_type)
+        if self._last_tag != (tag, match_func):
+            self._last_tag = (tag, match_func)
+            self._set_subscriber_prefixes()
 
         ret = self._check_pending(tag, match_func)
         if ret is None:
@@ -7,6 +7,7 @@ Jinja loading utils to enable a more powerful backend for jinja templates
 
 import atexit
 import collections
+import hashlib
 import logging
 import os.path
 import pipes
@@ -20,7 +21,8 @@ from xml.etree.ElementTree import Element, SubElement, tostring
 # Import third party libs
 import jinja2
 from salt.ext import six
-from jinja2 import BaseLoader, Markup, TemplateNotFound, nodes
+from jinja2 import BaseLoader, BytecodeCache, Markup, TemplateNotFound, nodes
+from jinja2.bccache import Bucket
 from jinja2.environment import TemplateModule
 from jinja2.exceptions import TemplateRuntimeError
 from jinja2.ext import Extension
@@ -28,6 +30,7 @@ from jinja2.ext import Extension
 # Import salt libs
 from salt.exceptions import TemplateError
 import salt.fileclient
+import salt.utils.atomicfile
 import salt.utils.data
 import salt.utils.files
 import salt.utils.json
@@ -40,6 +43,7 @@ from salt.utils.odict import OrderedDict
 log = logging.getLogger(__name__)
 
 __all__ = [
+    'SaltBytecodeCache',
     'SaltCacheLoader',
     'SerializerExtension'
 ]
@@ -196,6 +200,90 @@ class SaltCacheLoader(BaseLoader):
 atexit.register(SaltCacheLoader.shutdown)
 
 
+class SaltBytecodeCache(BytecodeCache):
+    '''
+    A jinja bytecode cache keeping the compiled templates in a directory
+    shared by all the salt processes. Jinja only uses the compiled code of a
+    template while the checksum of its source matches.
+
+    The files are replaced atomically, and unreadable files are compiled
+    again, since several processes write to the same directory.
+
+    The key of a template includes the settings of the environment changing
+    the compiled code (delimiters, whitespace handling, extensions), so the
+    code compiled with other settings is not reused.
+    '''
+    # The Environment attributes used by the lexer and the code generator
+    _COMPILE_SETTINGS = (
+        'block_start_string', 'block_end_string',
+        'variable_start_string', 'variable_end_string',
+        'comment_start_string', 'comment_end_string',
+        'line_statement_prefix', 'line_comment_prefix',
+        'trim_blocks', 'lstrip_blocks', 'newline_sequence',
+        'keep_trailing_newline', 'optimized', 'autoescape',
+    )
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _settings_key(self, environment):
+        '''
+        Return a digest of the settings of the environment changing the
+        compiled code of the templates
+        '''
+        settings = []
+        for name in self._COMPILE_SETTINGS:
+            value = getattr(environment, name, None)
+            if callable(value):
+                # The repr of a function changes with every process
+                value = '{0}.{1}'.format(getattr(value, '__module__', None),
+                                         getattr(value, '__name__', None))
+            settings.append((name, repr(value)))
+        settings.append(('extensions', repr(sorted(environment.extensions))))
+        return hashlib.sha1(
+            salt.utils.stringutils.to_bytes(repr(settings))).hexdigest()
+
+    def get_bucket(self, environment, name, filename, source):
+        key = '{0}-{1}'.format(self.get_cache_key(name, filename),
+                               self._settings_key(environment))
+        bucket = Bucket(environment, key, self.get_source_checksum(source))
+        self.load_bytecode(bucket)
+        return bucket
+
+    def _path(self, bucket):
+        return os.path.join(self.directory, '{0}.cache'.format(bucket.key))
+
+    def load_bytecode(self, bucket):
+        try:
+            with salt.utils.files.fopen(self._path(bucket), 'rb') as ifile:
+                bucket.load_bytecode(ifile)
+        except (IOError, OSError):
+            pass
+        except Exception as exc:
+            log.debug('Discarding the compiled template %s: %s', self._path(bucket), exc)
+            bucket.reset()
+
+    def dump_bytecode(self, bucket):
+        try:
+            if not os.path.isdir(self.directory):
+                with salt.utils.files.set_umask(0o077):
+                    os.makedirs(self.directory)
+            with salt.utils.atomicfile.atomic_open(self._path(bucket), 'wb') as ofile:
+                bucket.write_bytecode(ofile)
+        except (IOError, OSError) as exc:
+            log.debug('Unable to cache the compiled template %s: %s', self._path(bucket), exc)
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith('.cache'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
 class PrintableDict(OrderedDict):
     '''
     Ensures that dict str() and repr() are YAML friendly.
@@ -103,7 +103,7 @@ def store_job(opts, load, event=None, mminion=None):
         log.error(emsg)
         raise KeyError(emsg)
 
-    if job_cache != 'local_cache':
+    if job_cache not in ('local_cache', 'local_packed_cache'):
         try:
             mminion.returners[savefstr](load['jid'], load)
         except KeyError as e:
@@ -8,6 +8,7 @@ Utility functions for minions
 import os
 import logging
 import threading
+import time
 
 # Import Salt Libs
 import salt.payload
@@ -15,8 +16,16 @@ import salt.utils.files
 import salt.utils.platform
 import salt.utils.process
 
+# Import 3rd-party libs
+from salt.ext import six
+
 log = logging.getLogger(__name__)
 
+# Only list the proc directory again when its mtime changed, unless it changed
+# less than this many seconds ago, since it can change again without its mtime
+# changing
+PROC_DIR_RACY = 1
+
 
 def running(opts):
     '''
@@ -41,6 +50,100 @@ def running(opts):
     return ret
 
 
+class RunningJobs(object):
+    '''
+    The running jobs, tracked in memory by the process starting them: the
+    minion process, or the process running the scheduler of the master.
+
+    The jobs still write their proc files, as a journal of the jobs which
+    outlive this process. The proc files of the jobs this process did not
+    start, left by a previous minion process or written by salt-call, are
+    only read when the proc directory changed.
+    '''
+    def __init__(self, opts, read_proc_file=None):
+        self.opts = opts
+        self.proc_dir = os.path.join(opts['cachedir'], 'proc')
+        self.read_proc_file = read_proc_file or _read_proc_file
+        # jid -> [job data, process or thread running the job]
+        self.jobs = {}
+        # proc file name -> job data, or None if it is not a running job
+        self.journal = {}
+        self.journal_mtime = None
+        self.lock = threading.RLock()
+
+    def add(self, data, process):
+        '''
+        Add a job started by this process in ``process``, a process or a thread
+        '''
+        job = {'pid': getattr(process, 'pid', None) or os.getpid()}
+        job.update(data)
+        with self.lock:
+            self.jobs[six.text_type(job['jid'])] = [job, process]
+
+    def running(self):
+        '''
+        Return the data of the running jobs
+        '''
+        ret = []
+        with self.lock:
+            self._read_journal()
+            for jid, (job, process) in list(six.iteritems(self.jobs)):
+                if process.is_alive():
+                    ret.append(job)
+                    continue
+                del self.jobs[jid]
+                self._remove(jid)
+            for name, job in list(six.iteritems(self.journal)):
+                if job is None or name in self.jobs:
+                    continue
+                if salt.utils.process.os_is_running(job['pid']) and _check_cmdline(job):
+                    ret.append(job)
+                    continue
+                self.journal[name] = None
+                self._remove(name)
+        return ret
+
+    def _read_journal(self):
+        '''
+        Read the proc files which were added since the proc directory was last
+        listed, except those of the jobs started by this process
+        '''
+        try:
+            mtime = os.stat(self.proc_dir).st_mtime
+        except OSError:
+            self.journal = {}
+            return
+        if mtime == self.journal_mtime:
+            return
+        try:
+            names = set(os.listdir(self.proc_dir))
+        except OSError:
+            return
+        self.journal_mtime = mtime if mtime < time.time() - PROC_DIR_RACY else None
+        for name in list(self.journal):
+            if name not in names:
+                del self.journal[name]
+        for name in names:
+            if name in self.journal or name in self.jobs:
+                continue
+            try:
+                self.journal[name] = self.read_proc_file(
+                    os.path.join(self.proc_dir, name), self.opts)
+            except (IOError, OSError):
+                # proc files may be removed at any time by the process
+                # running the job
+                pass
+
+    def _remove(self, name):
+        '''
+        Remove the proc file left by a job which is no longer running
+        '''
+        try:
+            os.remove(os.path.join(self.proc_dir, name))
+        except OSError:
+            pass
+
+
 def cache_jobs(opts, jid, ret):
     '''
     Write job information to cache
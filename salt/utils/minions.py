@@ -8,7 +8,9 @@ expected to return
 
 import os
 import fnmatch
+import collections
 import re
+import time
 import logging
 
 # Import salt libs
@@ -34,6 +36,13 @@ try:
 except ImportError:
     pass
 
+HAS_PYINOTIFY = False
+try:
+    import pyinotify  # pylint: disable=import-error
+    HAS_PYINOTIFY = True
+except ImportError:
+    pass
+
 log = logging.getLogger(__name__)
 
 TARGET_REX = re.compile(
@@ -95,6 +104,40 @@ def parse_target(target_expression):
     return ret
 
 
+# Number of minion cache keys requested at once by iter_minion_cache
+_FETCH_CHUNK_SIZE = 1000
+
+
+def iter_minion_cache(cache, minion_ids, key='data', ignore_errors=False):
+    '''
+    Yield ``(minion_id, data)`` for the ``key`` cached for each of the given
+    minions, fetching them in chunks of ``_FETCH_CHUNK_SIZE`` keys so cache
+    drivers supporting bulk reads need a few round trips instead of one per
+    minion.
+
+    With ``ignore_errors``, a chunk failing with a ``SaltCacheError`` is
+    fetched again key by key and the minions which still fail are skipped.
+    '''
+    minion_ids = list(minion_ids)
+    for idx in range(0, len(minion_ids), _FETCH_CHUNK_SIZE):
+        chunk = minion_ids[idx:idx + _FETCH_CHUNK_SIZE]
+        bank_keys = [('minions/{0}'.format(id_), key) for id_ in chunk]
+        try:
+            fetched = cache.fetch_many(bank_keys)
+        except SaltCacheError:
+            if not ignore_errors:
+                raise
+            fetched = {}
+            for bank_key in bank_keys:
+                try:
+                    fetched[bank_key] = cache.fetch(*bank_key)
+                except SaltCacheError:
+                    continue
+        for id_, bank_key in zip(chunk, bank_keys):
+            if bank_key in fetched:
+                yield id_, fetched[bank_key]
+
+
 def get_minion_data(minion, opts):
     '''
     Get the grains/pillar for a specific minion.  If minion is None, it
@@ -190,6 +233,402 @@ def nodegroup_comp(nodegroup, nodegroups, skip=None, first_call=True):
         return ret
 
 
+# Per-process registry of minion data indexes, keyed on the cache storage so
+# that every CkMinions instance in a process shares the same index.
+_MINION_DATA_INDEXES = {}
+
+
+def _index_text(value):
+    '''
+    Normalize a value the same way ``salt.utils.data.subdict_match`` does
+    before comparing it to a target pattern.
+    '''
+    try:
+        return six.text_type(value).lower()
+    except UnicodeDecodeError:
+        return salt.utils.stringutils.to_unicode(value).lower()
+
+
+def get_minion_data_index(opts, cache=None):
+    '''
+    Return the in-memory minion data index for this process, or ``None`` if
+    :conf_master:`minion_data_index` is disabled.
+    '''
+    if not opts.get('minion_data_cache', False) \
+            or not opts.get('minion_data_index', False):
+        return None
+    storage_id = (opts.get('cache', 'localfs'),
+                  opts.get('cachedir'))
+    if storage_id not in _MINION_DATA_INDEXES:
+        if cache is None:
+            cache = salt.cache.factory(opts)
+        _MINION_DATA_INDEXES[storage_id] = MinionDataIndex(opts, cache)
+    return _MINION_DATA_INDEXES[storage_id]
+
+
+class MinionDataIndex(object):
+    '''
+    Inverted index over the grains and pillar stored in the minion data cache
+
+    Every grain and pillar value is flattened into ``(path, value)`` pairs,
+    where ``path`` is the tuple of keys leading to the value, and each pair
+    maps to the set of minion IDs holding it. This turns the per-minion
+    ``subdict_match`` scan done by CkMinions into set lookups. The index
+    mirrors the semantics of ``subdict_match``; target expressions it cannot
+    answer exactly (``*`` key wildcards, custom delimiters, negative list
+    indexes) make :py:meth:`match` return ``None`` so that the caller falls
+    back to scanning the cache.
+
+    The index is updated in place when the master stores minion data in this
+    process, and is reconciled against the cache every
+    :conf_master:`minion_data_index_interval` seconds to pick up writes done
+    by other processes.
+    '''
+    SEARCH_TYPES = ('grains', 'pillar')
+
+    def __init__(self, opts, cache):
+        self.opts = opts
+        self.cache = cache
+        self.interval = opts.get('minion_data_index_interval', 10)
+        # {search_type: {path: {value: set(ids)}}}
+        self._values = dict((stype, {}) for stype in self.SEARCH_TYPES)
+        # {search_type: {path: {key: set(ids)}}}
+        self._keys = dict((stype, {}) for stype in self.SEARCH_TYPES)
+        # {search_type: {path: set(ids)}}, paths holding a dict
+        self._dicts = dict((stype, {}) for stype in self.SEARCH_TYPES)
+        # {id: [(table, search_type, path, item), ...]}, used for removal
+        self._entries = {}
+        # {id: epoch the data was loaded at}
+        self._loaded = {}
+        # Minions present in the cache, but without a data entry
+        self.missing = set()
+        self._last_refresh = 0
+
+    @property
+    def ids(self):
+        '''
+        The set of minion IDs which have data in the index
+        '''
+        return set(self._entries)
+
+    def _add(self, minion_id, table, search_type, path, item):
+        if table == 'dict':
+            self._dicts[search_type].setdefault(path, set()).add(minion_id)
+        else:
+            tables = self._values if table == 'value' else self._keys
+            tables[search_type].setdefault(path, {}).setdefault(
+                item, set()).add(minion_id)
+        self._entries[minion_id].append((table, search_type, path, item))
+
+    def _walk(self, minion_id, search_type, obj, path, member=False):
+        '''
+        Flatten ``obj`` into index entries below ``path``
+        '''
+        if isinstance(obj, dict):
+            # subdict_match skips empty dicts found by traversal, but still
+            # matches empty dicts which are members of a list
+            if obj or member:
+                self._add(minion_id, 'dict', search_type, path, None)
+            for key, val in six.iteritems(obj):
+                self._add(minion_id, 'key', search_type, path, key)
+                self._walk(minion_id, search_type, val, path + (key,))
+        elif isinstance(obj, (list, tuple)):
+            for idx, item in enumerate(obj):
+                if isinstance(item, dict):
+                    self._walk(minion_id, search_type, item, path, member=True)
+                self._add(minion_id, 'value', search_type, path, _index_text(item))
+                self._walk(minion_id, search_type, item, path + (six.text_type(idx),))
+        elif path:
+            self._add(minion_id, 'value', search_type, path, _index_text(obj))
+
+    def remove(self, minion_id):
+        '''
+        Drop all the index entries of a minion
+        '''
+        self.missing.discard(minion_id)
+        self._loaded.pop(minion_id, None)
+        for table, search_type, path, item in self._entries.pop(minion_id, []):
+            if table == 'dict':
+                ids = self._dicts[search_type].get(path)
+                if ids is not None:
+                    ids.discard(minion_id)
+                    if not ids:
+                        del self._dicts[search_type][path]
+                continue
+            tables = self._values if table == 'value' else self._keys
+            items = tables[search_type].get(path)
+            if items is None or item not in items:
+                continue
+            items[item].discard(minion_id)
+            if not items[item]:
+                del items[item]
+                if not items:
+                    del tables[search_type][path]
+
+    def update(self, minion_id, data):
+        '''
+        Replace the index entries of a minion with the given cache data, a
+        dict with ``grains`` and ``pillar`` keys. ``None`` marks the minion as
+        having no data.
+        '''
+        self.remove(minion_id)
+        self._loaded[minion_id] = time.time()
+        if data is None:
+            self.missing.add(minion_id)
+            return
+        self._entries[minion_id] = []
+        for search_type in self.SEARCH_TYPES:
+            self._walk(minion_id, search_type, data.get(search_type), ())
+
+    def refresh(self, force=False):
+        '''
+        Reconcile the index with the minion data cache. Only the minions whose
+        data changed since they were loaded are fetched again.
+        '''
+        now = time.time()
+        if not force and now - self._last_refresh < self.interval:
+            return
+        self._last_refresh = now
+        cached = set(self.cache.list('minions') or [])
+        for minion_id in set(self._loaded) - cached:
+            self.remove(minion_id)
+        stale = []
+        for minion_id in cached:
+            loaded = self._loaded.get(minion_id)
+            if loaded is not None:
+                updated = self.cache.updated('minions/{0}'.format(minion_id), 'data')
+                # updated() has one second granularity, reload anything that
+                # may have been written during the second it was loaded in
+                if updated is not None and updated < int(loaded):
+                    continue
+            stale.append(minion_id)
+        for minion_id, mdata in iter_minion_cache(self.cache, stale, ignore_errors=True):
+            self.update(minion_id, mdata)
+
+    def match(self,
+              search_type,
+              expr,
+              delimiter=DEFAULT_TARGET_DELIM,
+              regex_match=False,
+              exact_match=False):
+        '''
+        Return the set of minion IDs whose ``search_type`` data matches
+        ``expr`` as ``salt.utils.data.subdict_match`` would, or ``None`` if
+        the expression cannot be resolved from the index.
+        '''
+        if delimiter != DEFAULT_TARGET_DELIM or '*' + delimiter in expr:
+            return None
+        splits = expr.split(delimiter)
+        if len(splits) == 1:
+            return set()
+        if splits[0] == '*':
+            return None
+        for comp in splits[:-1]:
+            # traverse_dict_and_list accepts anything int() does as a list
+            # index, only the canonical non-negative form is indexed
+            try:
+                if int(comp) < 0 or six.text_type(int(comp)) != comp:
+                    return None
+            except ValueError:
+                pass
+
+        plain = not regex_match and (exact_match or not any(
+            char in expr for char in ('*', '?', '[')))
+        values = self._values[search_type]
+        keys = self._keys[search_type]
+        ret = set()
+        for idx in range(1, len(splits)):
+            path = tuple(splits[:idx])
+            matchstr = delimiter.join(splits[idx:])
+            if matchstr == '*':
+                ret.update(self._dicts[search_type].get(path, ()))
+            ret.update(keys.get(path, {}).get(matchstr, ()))
+            path_values = values.get(path)
+            if not path_values:
+                continue
+            pattern = _index_text(matchstr)
+            if plain:
+                ret.update(path_values.get(pattern, ()))
+                continue
+            for value, ids in six.iteritems(path_values):
+                if regex_match:
+                    try:
+                        matched = re.match(pattern, value)
+                    except Exception:
+                        log.error('Invalid regex \'%s\' in match', pattern)
+                        return ret
+                else:
+                    matched = fnmatch.fnmatch(value, pattern)
+                if matched:
+                    ret.update(ids)
+        return ret
+
+    def match_ipcidr(self, tgt):
+        '''
+        Return the set of minion IDs which have an address matching ``tgt``,
+        an ``ipaddress`` address or network object.
+        '''
+        path_values = self._values['grains'].get(('ipv{0}'.format(tgt.version),), {})
+        if isinstance(tgt, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+            return set(path_values.get(six.text_type(tgt), ()))
+        ret = set()
+        for addr, ids in six.iteritems(path_values):
+            if salt.utils.network.in_subnet(tgt, addr):
+                ret.update(ids)
+        return ret
+
+
+# Per-process registry of accepted key caches, keyed on the key directory
+_ACCEPTED_KEYS = {}
+
+
+def get_accepted_keys(opts, acc='minions'):
+    '''
+    Return the accepted key cache of this process for the ``acc`` key
+    directory, or ``None`` if :conf_master:`accepted_key_cache` is disabled.
+    '''
+    mode = opts.get('accepted_key_cache', 'poll')
+    if not mode:
+        return None
+    path = os.path.join(opts['pki_dir'], acc)
+    if path not in _ACCEPTED_KEYS:
+        _ACCEPTED_KEYS[path] = AcceptedKeys(path, mode=mode)
+    return _ACCEPTED_KEYS[path]
+
+
+def key_event(opts, data, acc='minions'):
+    '''
+    Apply a key event, as fired by ``salt.key`` under the ``salt/key`` tag,
+    to the accepted key cache of this process.
+    '''
+    accepted = _ACCEPTED_KEYS.get(os.path.join(opts['pki_dir'], acc))
+    if accepted is not None and data.get('id'):
+        accepted.refresh_minion(data['id'])
+
+
+class AcceptedKeys(object):
+    '''
+    Incrementally maintained set of the IDs of the minions with an accepted key
+
+    In ``poll`` mode the cached listing of the key directory is reused as long
+    as the mtime of the directory does not change, so that the common case
+    costs a single ``stat()`` instead of a listing plus one ``stat()`` per key.
+    In ``inotify`` mode the set is updated from the inotify events of the
+    directory and the directory is not touched at all, falling back to
+    ``poll`` mode if pyinotify is not available.
+    '''
+    # A listing taken less than this many seconds after the last modification
+    # of the directory may have missed a change made within the same mtime
+    # tick, it is not trusted until it is old enough.
+    RACY_WINDOW = 1
+
+    def __init__(self, path, mode='poll'):
+        self.path = path
+        self._minions = None
+        self._sorted = None
+        self._mtime = None
+        self._listed = 0
+        self._notifier = None
+        self._events = collections.deque()
+        if mode == 'inotify':
+            if HAS_PYINOTIFY:
+                self._watch()
+            else:
+                log.warning(
+                    'pyinotify is not available, polling %s for key changes',
+                    self.path
+                )
+
+    def _watch(self):
+        '''
+        Set up an inotify watch on the key directory
+        '''
+        wm = pyinotify.WatchManager()
+        mask = pyinotify.IN_CREATE | pyinotify.IN_DELETE \
+            | pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO \
+            | pyinotify.IN_DELETE_SELF | pyinotify.IN_MOVE_SELF
+        wdd = wm.add_watch(self.path, mask)
+        if wdd.get(self.path, -1) < 0:
+            log.warning('Unable to watch %s, polling it for key changes', self.path)
+            return
+        self._notifier = pyinotify.Notifier(wm, self._events.append)
+
+    def _scan(self):
+        '''
+        List the key directory
+        '''
+        mtime = os.stat(self.path).st_mtime
+        listed = time.time()
+        minions = set()
+        for fn_ in os.listdir(self.path):
+            if not fn_.startswith('.') and os.path.isfile(os.path.join(self.path, fn_)):
+                minions.add(fn_)
+        self._minions = minions
+        self._sorted = None
+        self._mtime = mtime
+        self._listed = listed
+
+    def _process_events(self):
+        '''
+        Apply the pending inotify events, return False if the set can no
+        longer be maintained from them and the directory must be listed
+        '''
+        if self._notifier.check_events(timeout=0):
+            self._notifier.read_events()
+            self._notifier.process_events()
+        ret = True
+        while self._events:
+            event = self._events.popleft()
+            if event.mask & pyinotify.IN_Q_OVERFLOW:
+                ret = False
+            elif event.mask & (pyinotify.IN_IGNORED
+                               | pyinotify.IN_DELETE_SELF
+                               | pyinotify.IN_MOVE_SELF):
+                # The watched directory is gone, poll it from now on
+                self._notifier.stop()
+                self._notifier = None
+                self._events.clear()
+                return False
+            elif event.name and not event.mask & pyinotify.IN_ISDIR:
+                self.refresh_minion(event.name)
+        return ret
+
+    def _stale(self):
+        '''
+        Return True if the cached set cannot be trusted
+        '''
+        if self._minions is None:
+            return True
+        if self._notifier is not None:
+            return not self._process_events()
+        mtime = os.stat(self.path).st_mtime
+        return mtime != self._mtime or self._listed - mtime < self.RACY_WINDOW
+
+    def refresh_minion(self, minion_id):
+        '''
+        Check the key of a single minion and update the set accordingly
+        '''
+        if self._minions is None or minion_id.startswith('.'):
+            return
+        if os.path.isfile(os.path.join(self.path, minion_id)):
+            if minion_id not in self._minions:
+                self._minions.add(minion_id)
+                self._sorted = None
+        elif minion_id in self._minions:
+            self._minions.discard(minion_id)
+            self._sorted = None
+
+    def minions(self):
+        '''
+        Return the sorted list of the IDs of the minions with an accepted key
+        '''
+        if self._stale():
+            self._scan()
+        if self._sorted is None:
+            self._sorted = salt.utils.data.sorted_ignorecase(self._minions)
+        return list(self._sorted)
+
+
 class CkMinions(object):
     '''
     Used to check what minions should respond from a target
@@ -263,9 +702,7 @@ class CkMinions(object):
                     with salt.utils.files.fopen(pki_cache_fn, mode='rb') as fn_:
                         return self.serial.load(fn_)
             else:
-                for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-                    if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                        minions.append(fn_)
+                minions = self._accepted_minions()
             return minions
         except OSError as exc:
             log.error(
@@ -274,6 +711,20 @@ class CkMinions(object):
             )
             return minions
 
+    def _accepted_minions(self):
+        '''
+        Return the sorted list of minions with an accepted key, from the
+        accepted key cache of this process if it is enabled
+        '''
+        accepted = get_accepted_keys(self.opts, self.acc)
+        if accepted is not None:
+            return accepted.minions()
+        minions = []
+        for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
+            if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
+                minions.append(fn_)
+        return minions
+
     def _check_cache_minions(self,
                              expr,
                              delimiter,
@@ -293,10 +744,7 @@ class CkMinions(object):
             return self.cache.list('minions')
 
         if greedy:
-            minions = []
-            for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-                if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                    minions.append(fn_)
+            minions = self._accepted_minions()
         elif cache_enabled:
             minions = list_cached_minions()
         else:
@@ -311,11 +759,20 @@ class CkMinions(object):
             if not cminions:
                 return {'minions': minions,
                         'missing': []}
+            index = self._minion_data_index()
+            if index is not None:
+                matched = index.match(search_type,
+                                      expr,
+                                      delimiter=delimiter,
+                                      regex_match=regex_match,
+                                      exact_match=exact_match)
+                if matched is not None:
+                    return {'minions': self._index_minions(index, minions, matched, greedy),
+                            'missing': []}
             minions = set(minions)
-            for id_ in cminions:
-                if greedy and id_ not in minions:
-                    continue
-                mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
+            if greedy:
+                cminions = [id_ for id_ in cminions if id_ in minions]
+            for id_, mdata in iter_minion_cache(self.cache, cminions):
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -331,6 +788,27 @@ class CkMinions(object):
         return {'minions': minions,
                 'missing': []}
 
+    def _minion_data_index(self):
+        '''
+        Return the refreshed minion data index of this process, or ``None``
+        if it is disabled
+        '''
+        index = get_minion_data_index(self.opts, self.cache)
+        if index is not None:
+            index.refresh()
+        return index
+
+    def _index_minions(self, index, minions, matched, greedy):
+        '''
+        Apply the set of minions matched in the minion data index to the
+        candidate minions, the same way the cache scan does. If 'greedy',
+        minions without cache data are kept.
+        '''
+        minions = set(minions)
+        if greedy:
+            return list(minions - (index.ids - matched))
+        return list(minions & matched)
+
     def _check_grain_minions(self, expr, delimiter, greedy):
         '''
         Return the minions found by looking via grains
@@ -410,9 +888,16 @@ class CkMinions(object):
                             'missing': []}
             proto = 'ipv{0}'.format(tgt.version)
 
+            index = self._minion_data_index()
+            if index is not None:
+                return {'minions': self._index_minions(index,
+                                                       minions,
+                                                       index.match_ipcidr(tgt),
+                                                       greedy),
+                        'missing': []}
+
             minions = set(minions)
-            for id_ in cminions:
-                mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
+            for id_, mdata in iter_minion_cache(self.cache, cminions):
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -450,11 +935,7 @@ class CkMinions(object):
             )
             cache_enabled = self.opts.get('minion_data_cache', False)
             if greedy:
-                mlist = []
-                for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-                    if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                        mlist.append(fn_)
-                return {'minions': mlist,
+                return {'minions': self._accepted_minions(),
                         'missing': []}
             elif cache_enabled:
                 return {'minions': self.cache.list('minions'),
@@ -663,15 +1144,11 @@ class CkMinions(object):
                 addrs.update(set(salt.utils.network.ip_addrs6(include_loopback=False)))
             if subset:
                 search = subset
-            for id_ in search:
-                try:
-                    mdata = self.cache.fetch('minions/{0}'.format(id_), 'data')
-                except SaltCacheError:
-                    # If a SaltCacheError is explicitly raised during the fetch operation,
-                    # permission was denied to open the cached data.p file. Continue on as
-                    # in the releases <= 2016.3. (An explicit error raise was added in PR
-                    # #35388. See issue #36867 for more information.
-                    continue
+            # If a SaltCacheError is explicitly raised during the fetch operation,
+            # permission was denied to open the cached data.p file. Continue on as
+            # in the releases <= 2016.3. (An explicit error raise was added in PR
+            # #35388. See issue #36867 for more information.
+            for id_, mdata in iter_minion_cache(self.cache, search, ignore_errors=True):
                 if mdata is None:
                     continue
                 grains = mdata.get('grains', {})
@@ -695,11 +1172,7 @@ class CkMinions(object):
         '''
         Return a list of all minions that have auth'd
         '''
-        mlist = []
-        for fn_ in salt.utils.data.sorted_ignorecase(os.listdir(os.path.join(self.opts['pki_dir'], self.acc))):
-            if not fn_.startswith('.') and os.path.isfile(os.path.join(self.opts['pki_dir'], self.acc, fn_)):
-                mlist.append(fn_)
-        return {'minions': mlist, 'missing': []}
+        return {'minions': self._accepted_minions(), 'missing': []}
 
     def check_minions(self,
                       expr,
@@ -741,6 +1214,37 @@ class CkMinions(object):
             _res = {'minions': [], 'missing': []}
         return _res
 
+    def pub_minions(self,
+                    expr,
+                    tgt_type='glob',
+                    delimiter=DEFAULT_TARGET_DELIM):
+        '''
+        Return the list of minion ids a publish for this target has to be
+        sent to, or None when it has to be broadcast to every minion.
+
+        Targets matched on the minion ids are resolved exactly. Targets
+        matched on minion data resolve to the minions matched in the minion
+        data cache plus every accepted minion without cached data, which
+        evaluate the target themselves. Without the minion data cache, or for
+        target types which can't be resolved on the master, None is returned.
+        '''
+        if tgt_type in ('glob', 'pcre', 'list'):
+            return self.check_minions(expr, tgt_type)['minions']
+        if not self.opts.get('minion_data_cache', False):
+            return None
+        if getattr(self, '_check_{0}_minions'.format(tgt_type), None) is None:
+            return None
+        try:
+            unknown = set(self._accepted_minions()).difference(self.cache.list('minions'))
+        except Exception:
+            log.exception('Failed to list the minion data cache')
+            return None
+        minions = set(self.check_minions(expr,
+                                         tgt_type,
+                                         delimiter=delimiter,
+                                         greedy=False)['minions'])
+        return list(minions | unknown)
+
     def validate_tgt(self, valid, expr, tgt_type, minions=None, expr_form=None):
         '''
         Return a Bool. This function returns if the expression sent in is
@@ -1151,8 +1655,7 @@ def mine_get(tgt, fun, tgt_type='glob', opts=None):
             tgt_type)
     minions = _res['minions']
     cache = salt.cache.factory(opts)
-    for minion in minions:
-        mdata = cache.fetch('minions/{0}'.format(minion), 'mine')
+    for minion, mdata in iter_minion_cache(cache, minions, 'mine'):
         if mdata is None:
             continue
         fdata = mdata.get(fun)
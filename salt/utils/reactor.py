@@ -6,14 +6,20 @@ Functions which implement running reactor jobs
 
 # Import python libs
 
+import codecs
 import fnmatch
 import glob
 import logging
+import multiprocessing
+import os
+import re
+import time
 
 # Import salt libs
 import salt.client
 import salt.runner
 import salt.state
+import salt.template
 import salt.utils.args
 import salt.utils.cache
 import salt.utils.data
@@ -39,6 +45,55 @@ REACTOR_INTERNAL_KEYWORDS = frozenset([
 ])
 
 
+class ReactorRouter(object):
+    '''
+    The reactor map compiled for matching event tags. Tags without glob
+    characters are looked up in a dict, globs which only end in ``*`` in a
+    prefix trie and only the remaining globs are matched one by one.
+    '''
+    def __init__(self, react_map):
+        self.routes = []
+        self.exact = {}
+        self.prefixes = salt.utils.event.TagTrie()
+        self.patterns = []
+        for ropt in react_map or []:
+            if not isinstance(ropt, dict):
+                continue
+            if len(ropt) != 1:
+                continue
+            key = next(six.iterkeys(ropt))
+            val = ropt[key]
+            if isinstance(val, six.string_types):
+                val = [val]
+            elif not isinstance(val, list):
+                continue
+            key = six.text_type(key)
+            idx = len(self.routes)
+            self.routes.append(val)
+            prefix = key[:-1] if key.endswith('*') else None
+            if not any(char in key for char in '*?['):
+                self.exact.setdefault(key, []).append(idx)
+            elif prefix is not None and not any(char in prefix for char in '*?['):
+                self.prefixes.add(prefix, idx)
+            else:
+                self.patterns.append((re.compile(fnmatch.translate(key)), idx))
+
+    def match(self, tag):
+        '''
+        Return the reactors of all the entries of the map matching ``tag``, in
+        the order of the map
+        '''
+        matched = set(self.exact.get(tag, ()))
+        matched.update(self.prefixes.match(tag))
+        for regex, idx in self.patterns:
+            if regex.match(tag):
+                matched.add(idx)
+        reactors = []
+        for idx in sorted(matched):
+            reactors.extend(self.routes[idx])
+        return reactors
+
+
 class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.state.Compiler):
     '''
     Read in the reactor configuration variable and compare it to events
@@ -56,6 +111,12 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
         local_minion_opts['file_client'] = 'local'
         self.minion = salt.minion.MasterMinion(local_minion_opts)
         salt.state.Compiler.__init__(self, opts, self.minion.rend)
+        self._router = None
+        self._router_mtime = None
+        # The files matched by the reactor refs and the text of the reactor
+        # files, so that they are not fetched and read again for every event
+        self._globbed = salt.utils.cache.CacheDict(opts['reactor_refresh_interval'])
+        self._sources = {}
 
     # We need __setstate__ and __getstate__ to avoid pickling errors since
     # 'self.rend' (from salt.state.Compiler) contains a function reference
@@ -77,6 +138,27 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
             'log_queue_level': self.log_queue_level
         }
 
+    def _source(self, fn_):
+        '''
+        Return the text of a reactor file, read again only when its mtime
+        changed, or None when it can not be read
+        '''
+        try:
+            mtime = os.stat(fn_).st_mtime
+        except OSError:
+            self._sources.pop(fn_, None)
+            return None
+        cached = self._sources.get(fn_)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            with codecs.open(fn_, encoding=salt.template.SLS_ENCODING) as ifile:
+                text = ifile.read()
+        except (OSError, IOError):
+            return None
+        self._sources[fn_] = (mtime, text)
+        return text
+
     def render_reaction(self, glob_ref, tag, data):
         '''
         Execute the render system against a single reaction file and return
@@ -84,17 +166,32 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
         '''
         react = {}
 
-        if glob_ref.startswith('salt://'):
-            glob_ref = self.minion.functions['cp.cache_file'](glob_ref) or ''
-        globbed_ref = glob.glob(glob_ref)
-        if not globbed_ref:
-            log.error('Can not render SLS %s for tag %s. File missing or not found.', glob_ref, tag)
+        globbed_ref = self._globbed.get(glob_ref)
+        if globbed_ref is None:
+            ref = glob_ref
+            if ref.startswith('salt://'):
+                ref = self.minion.functions['cp.cache_file'](ref) or ''
+            globbed_ref = glob.glob(ref)
+            if not globbed_ref:
+                log.error('Can not render SLS %s for tag %s. File missing or not found.', ref, tag)
+            else:
+                self._globbed[glob_ref] = globbed_ref
         for fn_ in globbed_ref:
             try:
-                res = self.render_template(
-                    fn_,
-                    tag=tag,
-                    data=data)
+                text = self._source(fn_)
+                if text and text.strip():
+                    res = self.render_template(
+                        ':string:',
+                        input_data=text,
+                        tmplpath=fn_,
+                        tag=tag,
+                        data=data)
+                else:
+                    # Let the renderer report the missing or empty file
+                    res = self.render_template(
+                        fn_,
+                        tag=tag,
+                        data=data)
 
                 # for #20841, inject the sls name here since verify_high()
                 # assumes it exists in case there are any errors
@@ -106,36 +203,43 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
                 log.exception('Failed to render "%s": ', fn_)
         return react
 
+    def _read_map(self):
+        '''
+        Read the reactor map from the file configured in ``reactor``
+        '''
+        try:
+            with salt.utils.files.fopen(self.opts['reactor']) as fp_:
+                return salt.utils.yaml.safe_load(fp_) or []
+        except (OSError, IOError):
+            log.error('Failed to read reactor map: "%s"', self.opts['reactor'])
+        except Exception:
+            log.error('Failed to parse YAML in reactor map: "%s"', self.opts['reactor'])
+        return []
+
+    def _get_router(self):
+        '''
+        Return the compiled reactor map, compiling it again when the map file
+        changed
+        '''
+        if isinstance(self.opts['reactor'], six.string_types):
+            try:
+                mtime = os.stat(self.opts['reactor']).st_mtime
+            except OSError:
+                mtime = None
+            if self._router is None or mtime is None or mtime != self._router_mtime:
+                self._router = ReactorRouter(self._read_map())
+                self._router_mtime = mtime
+        elif self._router is None:
+            self._router = ReactorRouter(self.opts['reactor'])
+        return self._router
+
     def list_reactors(self, tag):
         '''
         Take in the tag from an event and return a list of the reactors to
         process
         '''
         log.debug('Gathering reactors for tag %s', tag)
-        reactors = []
-        if isinstance(self.opts['reactor'], six.string_types):
-            try:
-                with salt.utils.files.fopen(self.opts['reactor']) as fp_:
-                    react_map = salt.utils.yaml.safe_load(fp_)
-            except (OSError, IOError):
-                log.error('Failed to read reactor map: "%s"', self.opts['reactor'])
-            except Exception:
-                log.error('Failed to parse YAML in reactor map: "%s"', self.opts['reactor'])
-        else:
-            react_map = self.opts['reactor']
-        for ropt in react_map:
-            if not isinstance(ropt, dict):
-                continue
-            if len(ropt) != 1:
-                continue
-            key = next(six.iterkeys(ropt))
-            val = ropt[key]
-            if fnmatch.fnmatch(tag, key):
-                if isinstance(val, six.string_types):
-                    reactors.append(val)
-                elif isinstance(val, list):
-                    reactors.extend(val)
-        return reactors
+        return self._get_router().match(tag)
 
     def list_all(self):
         '''
@@ -169,6 +273,7 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
                 return {'status': False, 'comment': 'Reactor already exists.'}
 
         self.minion.opts['reactor'].append({tag: reaction})
+        self._router = None
         return {'status': True, 'comment': 'Reactor added.'}
 
     def delete_reactor(self, tag):
@@ -180,6 +285,7 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
             _tag = next(six.iterkeys(reactor))
             if _tag == tag:
                 self.minion.opts['reactor'].remove(reactor)
+                self._router = None
                 return {'status': True, 'comment': 'Reactor deleted.'}
 
         return {'status': False, 'comment': 'Reactor does not exists.'}
@@ -227,6 +333,17 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
         for chunk in chunks:
             self.wrap.run(chunk)
 
+    def react(self, tag, data, reactors):
+        '''
+        Compile and execute the reactions of the reactors matching an event
+        '''
+        chunks = self.reactions(tag, data, reactors)
+        if chunks:
+            try:
+                self.call_reactions(chunks)
+            except SystemExit:
+                log.warning('Exit ignored by reactor')
+
     def run(self):
         '''
         Enter into the server loop
@@ -242,35 +359,96 @@ class Reactor(salt.utils.process.SignalHandlingMultiprocessingProcess, salt.stat
                 listen=True)
         self.wrap = ReactWrap(self.opts)
 
-        for data in self.event.iter_events(full=True):
-            # skip all events fired by ourselves
-            if data['data'].get('user') == self.wrap.event_user:
-                continue
-            if data['tag'].endswith('salt/reactors/manage/add'):
-                _data = data['data']
-                res = self.add_reactor(_data['event'], _data['reactors'])
-                self.event.fire_event({'reactors': self.list_all(),
-                                       'result': res},
-                                      'salt/reactors/manage/add-complete')
-            elif data['tag'].endswith('salt/reactors/manage/delete'):
-                _data = data['data']
-                res = self.delete_reactor(_data['event'])
-                self.event.fire_event({'reactors': self.list_all(),
-                                       'result': res},
-                                      'salt/reactors/manage/delete-complete')
-            elif data['tag'].endswith('salt/reactors/manage/list'):
-                self.event.fire_event({'reactors': self.list_all()},
-                                      'salt/reactors/manage/list-results')
-            else:
-                reactors = self.list_reactors(data['tag'])
-                if not reactors:
+        queue = None
+        process_manager = None
+        if self.opts.get('reactor_worker_processes', 0) > 0:
+            queue = multiprocessing.Queue(self.opts['reactor_worker_hwm'])
+            process_manager = salt.utils.process.ProcessManager(name='ReactorWorkers')
+            for idx in range(self.opts['reactor_worker_processes']):
+                process_manager.add_process(
+                    ReactorWorker,
+                    args=(self.opts, queue),
+                    name='ReactorWorker-{0}'.format(idx))
+        last_check = time.time()
+
+        try:
+            for data in self.event.iter_events(full=True):
+                if process_manager is not None and time.time() - last_check > 10:
+                    # Restart the workers which died
+                    process_manager.check_children()
+                    last_check = time.time()
+                # skip all events fired by ourselves
+                if data['data'].get('user') == self.wrap.event_user:
                     continue
-                chunks = self.reactions(data['tag'], data['data'], reactors)
-                if chunks:
+                if data['tag'].endswith('salt/reactors/manage/add'):
+                    _data = data['data']
+                    res = self.add_reactor(_data['event'], _data['reactors'])
+                    self.event.fire_event({'reactors': self.list_all(),
+                                           'result': res},
+                                          'salt/reactors/manage/add-complete')
+                elif data['tag'].endswith('salt/reactors/manage/delete'):
+                    _data = data['data']
+                    res = self.delete_reactor(_data['event'])
+                    self.event.fire_event({'reactors': self.list_all(),
+                                           'result': res},
+                                          'salt/reactors/manage/delete-complete')
+                elif data['tag'].endswith('salt/reactors/manage/list'):
+                    self.event.fire_event({'reactors': self.list_all()},
+                                          'salt/reactors/manage/list-results')
+                else:
+                    reactors = self.list_reactors(data['tag'])
+                    if not reactors:
+                        continue
+                    if queue is None:
+                        self.react(data['tag'], data['data'], reactors)
+                        continue
                     try:
-                        self.call_reactions(chunks)
-                    except SystemExit:
-                        log.warning('Exit ignored by reactor')
+                        queue.put_nowait((data['tag'], data['data'], reactors))
+                    except six.moves.queue.Full:
+                        log.error(
+                            'Reactor workers are %s events behind, dropping '
+                            'the reactions to %s',
+                            self.opts['reactor_worker_hwm'], data['tag']
+                        )
+        finally:
+            if process_manager is not None:
+                process_manager.kill_children()
+
+
+class ReactorWorker(Reactor):
+    '''
+    A process compiling and executing the reactions to the events matched by
+    the reactor
+    '''
+    def __init__(self, opts, queue, **kwargs):
+        super(ReactorWorker, self).__init__(opts, **kwargs)
+        self.queue = queue
+
+    def __setstate__(self, state):
+        self._is_child = True
+        ReactorWorker.__init__(
+            self, state['opts'], state['queue'],
+            log_queue=state['log_queue'],
+            log_queue_level=state['log_queue_level']
+        )
+
+    def __getstate__(self):
+        return {
+            'opts': self.opts,
+            'queue': self.queue,
+            'log_queue': self.log_queue,
+            'log_queue_level': self.log_queue_level
+        }
+
+    def run(self):
+        '''
+        Execute the reactions handed over by the reactor
+        '''
+        salt.utils.process.appendproctitle(self.__class__.__name__)
+        self.wrap = ReactWrap(self.opts)
+        while True:
+            tag, data, reactors = self.queue.get()
+            self.react(tag, data, reactors)
 
 
 class ReactWrap(object):
@@ -86,7 +86,8 @@ class Schedule(object):
                 proxy=None,
                 standalone=False,
                 new_instance=False,
-                utils=None):
+                utils=None,
+                running_jobs=None):
         '''
         Only create one instance of Schedule
         '''
@@ -102,7 +103,8 @@ class Schedule(object):
                                         cleanup=cleanup,
                                         proxy=proxy,
                                         standalone=standalone,
-                                        utils=utils)
+                                        utils=utils,
+                                        running_jobs=running_jobs)
             if new_instance is True:
                 return instance
             cls.instance = instance
@@ -118,7 +120,8 @@ class Schedule(object):
                  proxy=None,
                  standalone=False,
                  new_instance=False,
-                 utils=None):
+                 utils=None,
+                 running_jobs=None):
         pass
 
     # an init for the singleton instance to call
@@ -130,7 +133,8 @@ class Schedule(object):
                            proxy=None,
                            standalone=False,
                            utils=None,
-                           _subprocess_list=None):
+                           _subprocess_list=None,
+                           running_jobs=None):
         self.opts = opts
         self.proxy = proxy
         self.functions = functions
@@ -162,6 +166,13 @@ class Schedule(object):
             self._subprocess_list = salt.utils.process.SubprocessList()
         else:
             self._subprocess_list = _subprocess_list
+        if running_jobs is None:
+            if self.opts.get('__role') == 'master':
+                running_jobs = salt.utils.minion.RunningJobs(
+                    opts, read_proc_file=salt.utils.master._read_proc_file)
+            else:
+                running_jobs = salt.utils.minion.RunningJobs(opts)
+        self.running_jobs = running_jobs
 
     def __getnewargs__(self):
         return self.opts, self.functions, self.returners, self.intervals, None
@@ -218,11 +229,7 @@ class Schedule(object):
             return data
         if 'jid_include' not in data or data['jid_include']:
             jobcount = 0
-            if self.opts['__role'] == 'master':
-                current_jobs = salt.utils.master.get_running_jobs(self.opts)
-            else:
-                current_jobs = salt.utils.minion.running(self.opts)
-            for job in current_jobs:
+            for job in self.running_jobs.running():
                 if 'schedule' in job:
                     log.debug(
                         'schedule.handle_func: Checking job against fun '
@@ -618,7 +625,7 @@ class Schedule(object):
         schedule = self._get_schedule()
         return schedule.get(name, {})
 
-    def handle_func(self, multiprocessing_enabled, func, data):
+    def handle_func(self, multiprocessing_enabled, func, data, jid=None):
         '''
         Execute this method in a multiprocess or thread
         '''
@@ -639,7 +646,7 @@ class Schedule(object):
                'fun': func,
                'fun_args': [],
                'schedule': data['name'],
-               'jid': salt.utils.jid.gen_jid(self.opts)}
+               'jid': jid or salt.utils.jid.gen_jid(self.opts)}
 
         if 'metadata' in data:
             if isinstance(data['metadata'], dict):
@@ -1676,7 +1683,11 @@ class Schedule(object):
             self.returners = {}
             utils = self.utils
             self.utils = {}
+            running_jobs = self.running_jobs
+            self.running_jobs = None
 
+        # The jid is chosen here to keep track of the running job
+        jid = salt.utils.jid.gen_jid(self.opts)
         try:
             if multiprocessing_enabled:
                 thread_cls = salt.utils.process.SignalHandlingMultiprocessingProcess
@@ -1685,14 +1696,14 @@ class Schedule(object):
 
             if multiprocessing_enabled:
                 with salt.utils.process.default_signals(signal.SIGINT, signal.SIGTERM):
-                    proc = thread_cls(target=self.handle_func, args=(multiprocessing_enabled, func, data))
+                    proc = thread_cls(target=self.handle_func, args=(multiprocessing_enabled, func, data, jid))
                     # Reset current signals before starting the process in
                     # order not to inherit the current signal handlers
                     proc.start()
                     proc.name = '{}-Schedule-{}'.format(proc.name, data['name'])
                     self._subprocess_list.add(proc)
             else:
-                proc = thread_cls(target=self.handle_func, args=(multiprocessing_enabled, func, data))
+                proc = thread_cls(target=self.handle_func, args=(multiprocessing_enabled, func, data, jid))
                 proc.start()
                 proc.name = '{}-Schedule-{}'.format(proc.name, data['name'])
                 self._subprocess_list.add(proc)
@@ -1702,6 +1713,17 @@ class Schedule(object):
                 self.functions = functions
                 self.returners = returners
                 self.utils = utils
+                self.running_jobs = running_jobs
+
+        if not self.standalone and data.get('jid_include', True):
+            fun_args = list(data.get('args', []))
+            if 'kwargs' in data:
+                fun_args.append(copy.deepcopy(data['kwargs']))
+            self.running_jobs.add({'id': self.opts.get('id', 'master'),
+                                   'fun': func,
+                                   'fun_args': fun_args,
+                                   'schedule': data['name'],
+                                   'jid': jid}, proc)
 
     def cleanup_subprocesses(self):
         self._subprocess_list.cleanup()
@@ -287,6 +287,27 @@ def _get_jinja_error(trace, context=None):
     return line, out
 
 
+def _jinja_from_string(jinja_env, tmplstr, tmplpath=None):
+    '''
+    Load a template from a string like ``Environment.from_string``, using the
+    bytecode cache of the environment to skip compiling it
+    '''
+    bcc = jinja_env.bytecode_cache
+    if bcc is None:
+        return jinja_env.from_string(tmplstr)
+    if tmplpath:
+        # The compiled code is replaced when the file changes
+        name = tmplpath
+    else:
+        name = salt.utils.hashutils.sha256_digest(tmplstr)
+    bucket = bcc.get_bucket(jinja_env, name, None, tmplstr)
+    if bucket.code is None:
+        bucket.code = jinja_env.compile(tmplstr)
+        bcc.set_bucket(bucket)
+    return jinja_env.template_class.from_code(
+        jinja_env, bucket.code, jinja_env.make_globals(None))
+
+
 def render_jinja_tmpl(tmplstr, context, tmplpath=None):
     opts = context['opts']
     saltenv = context['saltenv']
@@ -353,11 +374,13 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
     else:
         opt_jinja_env_helper(opt_jinja_env, 'jinja_env')
 
-    if opts.get('allow_undefined', False):
-        jinja_env = jinja2.Environment(**env_args)
-    else:
-        jinja_env = jinja2.Environment(undefined=jinja2.StrictUndefined,
-                                       **env_args)
+    if not opts.get('allow_undefined', False):
+        env_args['undefined'] = jinja2.StrictUndefined
+    if opts.get('jinja_bytecode_cache', False) and opts.get('cachedir'):
+        env_args['bytecode_cache'] = salt.utils.jinja.SaltBytecodeCache(
+            os.path.join(opts['cachedir'], 'jinja'))
+
+    jinja_env = jinja2.Environment(**env_args)
 
     tojson_filter = jinja_env.filters.get('tojson')
     jinja_env.tests.update(JinjaTest.salt_jinja_tests)
@@ -389,7 +412,7 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
             decoded_context[key] = salt.utils.data.decode(value)
 
     try:
-        template = jinja_env.from_string(tmplstr)
+        template = _jinja_from_string(jinja_env, tmplstr, tmplpath)
         template.globals.update(decoded_context)
         output = template.render(**decoded_context)
     except jinja2.exceptions.UndefinedError as exc:
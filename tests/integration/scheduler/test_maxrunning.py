@@ -88,8 +88,8 @@ class SchedulerMaxRunningTest(ModuleCase, SaltReturnAssertsMixin):
 
         run_time = dateutil_parser.parse('11/29/2017 4:00pm')
 
-        with patch('salt.utils.minion.running',
-                   MagicMock(return_value=running_data)):
+        with patch.object(self.schedule.running_jobs, 'running',
+                          MagicMock(return_value=running_data)):
             with patch('salt.utils.process.os_is_running',
                        MagicMock(return_value=True)):
                 ret = self.schedule._check_max_running('test.ping',
@@ -137,8 +137,8 @@ class SchedulerMaxRunningTest(ModuleCase, SaltReturnAssertsMixin):
 
         run_time = dateutil_parser.parse('11/29/2017 4:00pm')
 
-        with patch('salt.utils.master.get_running_jobs',
-                   MagicMock(return_value=running_data)):
+        with patch.object(self.schedule.running_jobs, 'running',
+                          MagicMock(return_value=running_data)):
             with patch('salt.utils.process.os_is_running',
                        MagicMock(return_value=True)):
                 ret = self.schedule._check_max_running('state.orch',
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+'''
+Measure the number of minion sign ins (auths/sec) the master handles in
+``AESReqServerMixin._auth``, for full sign ins and for sign ins resuming an
+auth session (``auth_session_ttl``), which skip the RSA operations.
+
+Usage::
+
+    python tests/perf/auth_bench.py [--minions 20] [--rounds 10]
+'''
+
+# Import system libs
+from __future__ import absolute_import, print_function
+import argparse
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# Import salt libs
+import salt.config
+import salt.crypt
+import salt.master
+import salt.transport.mixins.auth
+import salt.utils.stringutils
+from tests.support.mock import MagicMock, patch
+
+
+def setup(tmpdir, minions):
+    '''
+    Return a master auth server with accepted keys for ``minions`` minions
+    and the SAuth of every minion
+    '''
+    master_opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+    master_opts.update({
+        'pki_dir': os.path.join(tmpdir, 'master'),
+        'cachedir': os.path.join(tmpdir, 'cache'),
+        'sock_dir': tmpdir,
+        'auth_session_ttl': 3600,
+    })
+    for path in ('minions', 'minions_pre', 'minions_rejected', 'minions_denied'):
+        os.makedirs(os.path.join(master_opts['pki_dir'], path))
+    salt.crypt.gen_keys(master_opts['pki_dir'], 'master', 2048)
+
+    server = salt.transport.mixins.auth.AESReqServerMixin()
+    server.opts = master_opts
+    with patch('salt.utils.event.get_master_event', MagicMock()):
+        server.pre_fork(None)
+        server.post_fork(None, None)
+
+    auths = []
+    for idx in range(minions):
+        minion_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        minion_opts.update({
+            'id': 'minion{0}'.format(idx),
+            'pki_dir': os.path.join(tmpdir, 'minion{0}'.format(idx)),
+            'master_uri': 'tcp://127.0.0.1:4506',
+            '__role': 'minion',
+        })
+        os.makedirs(minion_opts['pki_dir'])
+        salt.crypt.gen_keys(minion_opts['pki_dir'], 'minion', 2048)
+        shutil.copy(os.path.join(master_opts['pki_dir'], 'master.pub'),
+                    os.path.join(minion_opts['pki_dir'], 'minion_master.pub'))
+        shutil.copy(os.path.join(minion_opts['pki_dir'], 'minion.pub'),
+                    os.path.join(master_opts['pki_dir'], 'minions', minion_opts['id']))
+        auths.append(salt.crypt.SAuth(minion_opts))
+    return server, auths
+
+
+def run(label, server, loads, rounds):
+    '''
+    Authenticate every load ``rounds`` times and print the throughput
+    '''
+    start = time.time()
+    for _ in range(rounds):
+        for load in loads:
+            ret = server._auth(load)
+            assert ret.get('enc') == 'pub', ret
+    elapsed = time.time() - start
+    print('{0:<24} {1:>10.1f} auths/s'.format(label, len(loads) * rounds / elapsed))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--minions', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+    # Don't measure the records kept by the temporary logging handler
+    logging.getLogger('salt').setLevel(logging.WARNING)
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        server, auths = setup(tmpdir, args.minions)
+        sessions = server.auth_sessions
+
+        # Full sign ins, as with auth_session_ttl set to 0
+        server.auth_sessions = None
+        full = run('full sign in', server,
+                   [auth.minion_sign_in_payload() for auth in auths], args.rounds)
+
+        # Sign in once to start the sessions, then sign in again after the
+        # AES key was rotated
+        server.auth_sessions = sessions
+        channel = MagicMock()
+        channel.send.side_effect = lambda load, **kwargs: server._auth(load)
+        for auth in auths:
+            auth.sign_in(channel=channel)
+        salt.master.SMaster.secrets['aes']['secret'].value = salt.utils.stringutils.to_bytes(
+            salt.crypt.Crypticle.generate_key_string())
+        resumed = run('resumed session', server,
+                      [auth.minion_sign_in_payload() for auth in auths], args.rounds)
+        print('speedup: {0:.2f}x'.format(full / resumed))
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
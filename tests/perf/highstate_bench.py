@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+'''
+Measure the time the state system spends resolving requisites in a synthetic
+large highstate: the ``require_in``/``watch_in`` expansion of ``requisite_in``,
+the compilation of the low chunks and the requisite checks of ``call_chunks``.
+The state functions themselves are not run.
+
+The time per state should stay about the same as the number of states grows.
+
+Usage::
+
+    python tests/perf/highstate_bench.py [--sls 50] [--states 20,50,100]
+'''
+
+# Import system libs
+from __future__ import absolute_import, print_function
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# Import salt libs
+import salt.state
+from salt.utils.odict import OrderedDict
+from tests.support.mock import MagicMock, patch
+
+
+def highstate(sls_count, states):
+    '''
+    Return the high data of ``sls_count`` SLS files of ``states`` file states
+    each, which are ``require_in`` the package and ``watch_in`` the service of
+    their SLS file. Each service requires the SLS file before it.
+    '''
+    high = OrderedDict()
+    for sls_idx in range(sls_count):
+        sls = 'app{0}'.format(sls_idx)
+        common = {'__sls__': sls, '__env__': 'base'}
+        high['{0}-pkg'.format(sls)] = dict(common, pkg=['installed', {'name': sls}])
+        for idx in range(states):
+            name = '/etc/{0}/conf.d/{1}.conf'.format(sls, idx)
+            high[name] = dict(common, file=[
+                'managed',
+                {'require_in': [{'pkg': sls}]},
+                {'watch_in': [{'service': '{0}-service'.format(sls)}]},
+            ])
+        require = [{'pkg': '{0}-pkg'.format(sls)}]
+        if sls_idx:
+            require.append({'sls': 'app{0}'.format(sls_idx - 1)})
+        high['{0}-service'.format(sls)] = dict(common, service=['running', {'require': require}])
+    return high
+
+
+def state_obj():
+    '''
+    Return a State which is only used to compile and check requisites
+    '''
+    state = salt.state.State.__new__(salt.state.State)
+    state.opts = {'failhard': False, 'test': False, 'local': True, 'grains': {},
+                  'state_auto_order': True, 'state_concurrency': 0}
+    state.jid = None
+    state.states = {}
+    state.functions = {'config.option': MagicMock(return_value=False)}
+    state.mod_init = set()
+    state.active = set()
+    state.pre = {}
+    state._chunk_index = None
+    state._State__run_num = 0
+    return state
+
+
+def call(low, chunks=None, running=None):
+    return {'name': low['name'], 'result': True, 'changes': {}, 'comment': '',
+            '__run_num__': 0, '__sls__': low['__sls__']}
+
+
+def run(sls_count, states):
+    '''
+    Compile and check the requisites of a highstate and print the times
+    '''
+    high = highstate(sls_count, states)
+    total = len(high)
+    state = state_obj()
+
+    start = time.time()
+    high, errors = state.requisite_in(high)
+    assert not errors, errors
+    chunks = state.compile_high_data(high)
+    compiled = time.time() - start
+
+    start = time.time()
+    with patch.object(salt.state.State, 'call', staticmethod(call)):
+        ret = state.call_chunks(chunks)
+    checked = time.time() - start
+    assert len(ret) == total and all(val['result'] for val in ret.values())
+
+    print('{0:>8} states  compile {1:>8.3f}s ({2:>6.1f} us/state)  '
+          'requisites {3:>8.3f}s ({4:>6.1f} us/state)'.format(
+              total, compiled, compiled / total * 1e6, checked, checked / total * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sls', type=int, default=50)
+    parser.add_argument('--states', default='20,50,100',
+                        help='Comma separated numbers of states per SLS file')
+    args = parser.parse_args()
+    logging.getLogger('salt').setLevel(logging.WARNING)
+
+    for states in args.states.split(','):
+        run(args.sls, int(states))
+
+
+if __name__ == '__main__':
+    main()
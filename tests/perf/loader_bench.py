@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+'''
+Measure the startup time of ``salt-call --local test.ping``, with the loader
+cache (``loader_cache``) disabled and with a warm loader cache, which skips
+listing the module directories and importing the grains modules rejected by a
+``__virtual__`` function declaring ``__virtual_cache__``.
+
+Every run is a new process, so nothing is kept loaded between runs.
+
+Usage::
+
+    python tests/perf/loader_bench.py [--rounds 5]
+'''
+
+# Import system libs
+from __future__ import absolute_import, print_function
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def write_config(tmpdir, loader_cache):
+    '''
+    Write the minion config of a masterless minion keeping everything in
+    ``tmpdir``
+    '''
+    with open(os.path.join(tmpdir, 'minion'), 'w') as fp_:
+        fp_.write('\n'.join((
+            'id: bench',
+            'file_client: local',
+            'root_dir: {0}'.format(tmpdir),
+            'cachedir: {0}'.format(os.path.join(tmpdir, 'cache')),
+            'pki_dir: {0}'.format(os.path.join(tmpdir, 'pki')),
+            'sock_dir: {0}'.format(os.path.join(tmpdir, 'sock')),
+            'log_file: {0}'.format(os.path.join(tmpdir, 'log')),
+            'loader_cache: {0}'.format(loader_cache),
+            '',
+        )))
+
+
+def salt_call(tmpdir):
+    '''
+    Run test.ping and return how long it took
+    '''
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    with open(os.devnull, 'w') as devnull:
+        start = time.time()
+        out = subprocess.check_output(
+            [sys.executable, os.path.join(ROOT, 'scripts', 'salt-call'),
+             '--local', '-c', tmpdir, '--out', 'json', 'test.ping'],
+            env=env, stderr=devnull)
+        elapsed = time.time() - start
+    assert b'true' in out, out
+    return elapsed
+
+
+def run(label, tmpdir, loader_cache, rounds):
+    '''
+    Print the best startup time over ``rounds`` runs, after a first run
+    warming the loader cache and the bytecode caches
+    '''
+    write_config(tmpdir, loader_cache)
+    salt_call(tmpdir)
+    best = min(salt_call(tmpdir) for _ in range(rounds))
+    print('{0:<24} {1:>8.3f}s'.format(label, best))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        old = run('loader_cache: False', tmpdir, False, args.rounds)
+        new = run('loader_cache: True', tmpdir, True, args.rounds)
+        print('speedup: {0:.2f}x'.format(old / new))
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
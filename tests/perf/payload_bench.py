@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+'''
+Compare the throughput of ``salt.payload.Serial`` against the implementation
+it replaced (a new msgpack packer per message and a recursive walk decoding
+every unpacked string) on highstate return payloads.
+
+Usage::
+
+    python tests/perf/payload_bench.py [--states 200] [--minions 50] [--rounds 5]
+'''
+
+# Import system libs
+from __future__ import absolute_import, print_function
+import argparse
+import datetime
+import gc
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# Import salt libs
+import salt.payload
+import salt.transport.frame
+
+msgpack = salt.payload.msgpack
+
+
+def highstate_return(minion, states):
+    '''
+    Build the return load a minion sends for a highstate run
+    '''
+    ret = {}
+    for idx in range(states):
+        name = '/etc/app/conf.d/{0}.conf'.format(idx)
+        ret['file_|-{0}_|-{0}_|-managed'.format(name)] = {
+            'name': name,
+            'result': True,
+            'comment': 'File {0} is in the correct state'.format(name),
+            'changes': {} if idx % 10 else {'diff': '--- \n+++ \n@@ -1 +1 @@\n-old\n+new\n'},
+            '__sls__': 'app.config',
+            '__run_num__': idx,
+            'start_time': '12:00:00.{0:06d}'.format(idx),
+            'duration': 1.234,
+            '__id__': name,
+        }
+    return {
+        'cmd': '_return',
+        'id': minion,
+        'jid': '20190101120000123456',
+        'fun': 'state.highstate',
+        'fun_args': [],
+        'retcode': 0,
+        'success': True,
+        'return': ret,
+        '_stamp': datetime.datetime(2019, 1, 1, 12, 0, 0, 123456),
+    }
+
+
+def legacy_dumps(msg):
+    return msgpack.dumps(msg, default=salt.payload._ext_type_encoder, use_bin_type=False)
+
+
+def legacy_loads(msg):
+    gc.disable()
+    try:
+        ret = msgpack.loads(msg, use_list=True, ext_hook=salt.payload._ext_type_decoder, raw=True)
+        return salt.transport.frame.decode_embedded_strs(ret)
+    finally:
+        gc.enable()
+
+
+def bench(label, func, payloads, size, rounds):
+    '''
+    Print the best throughput of ``func`` over ``payloads`` and return its time
+    '''
+    best = min(timeit.repeat(lambda: [func(load) for load in payloads], number=1, repeat=rounds))
+    print('{0:<16} {1:>10.1f} msgs/s  {2:>8.1f} MB/s'.format(
+        label, len(payloads) / best, size / best / 1024 / 1024))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--states', type=int, default=200)
+    parser.add_argument('--minions', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    serial = salt.payload.Serial('msgpack')
+    loads = [highstate_return('minion{0}'.format(idx), args.states) for idx in range(args.minions)]
+    packed = [serial.dumps(load) for load in loads]
+    assert [legacy_loads(msg) for msg in packed] == [serial.loads(msg) for msg in packed]
+
+    size = sum(len(msg) for msg in packed)
+
+    print('{0} highstate returns of {1} states, {2} bytes each'.format(
+        args.minions, args.states, len(packed[0])))
+    old = bench('legacy dumps', legacy_dumps, loads, size, args.rounds)
+    new = bench('Serial.dumps', serial.dumps, loads, size, args.rounds)
+    print('dumps speedup: {0:.2f}x'.format(old / new))
+    old = bench('legacy loads', legacy_loads, packed, size, args.rounds)
+    new = bench('Serial.loads', serial.loads, packed, size, args.rounds)
+    print('loads speedup: {0:.2f}x'.format(old / new))
+
+
+if __name__ == '__main__':
+    main()
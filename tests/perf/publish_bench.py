@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+'''
+Measure the master publish throughput (jobs/sec) of the ZeroMQ publish
+channel, from the job load to the message handed to the publisher daemon.
+
+The channel is compared with the previous publish path, which created a new
+channel, built a new Crypticle and went through ``salt.crypt.sign_message``
+(a stat and a memoized key lookup) for every job.
+The RSA signature itself is still computed for every job since minions verify
+each payload.
+
+Usage::
+
+    python tests/perf/publish_bench.py [--jobs 2000] [--no-sign]
+'''
+
+# Import system libs
+from __future__ import absolute_import, print_function
+import argparse
+import ctypes
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+# Import 3rd-party libs
+import zmq
+
+# Import salt libs
+import salt.crypt
+import salt.master
+import salt.payload
+import salt.transport.zeromq
+
+
+def legacy_publish(channel, load):
+    '''
+    The publish path before the Crypticle and signing key were kept loaded.
+    The master also created a new channel for every publish.
+    '''
+    channel = salt.transport.zeromq.ZeroMQPubServerChannel(channel.opts)
+    payload = {'enc': 'aes'}
+    crypticle = salt.crypt.Crypticle(channel.opts, salt.master.SMaster.secrets['aes']['secret'].value)
+    payload['load'] = crypticle.dumps(load)
+    if channel.opts['sign_pub_messages']:
+        master_pem_path = os.path.join(channel.opts['pki_dir'], 'master.pem')
+        payload['sig'] = salt.crypt.sign_message(master_pem_path, payload['load'])
+    int_payload = {'payload': channel.serial.dumps(payload)}
+    if not channel.pub_sock:
+        channel.pub_connect()
+    channel.pub_sock.send(channel.serial.dumps(int_payload))
+
+
+def run(label, jobs, send):
+    '''
+    Publish ``jobs`` loads with ``send`` and print the throughput
+    '''
+    loads = [{'tgt_type': 'glob', 'tgt': '*', 'fun': 'test.ping', 'arg': [],
+              'jid': '2019010112000{0:07d}'.format(idx), 'user': 'root', 'ret': ''}
+             for idx in range(jobs)]
+    start = time.time()
+    send(loads)
+    elapsed = time.time() - start
+    print('{0:<24} {1:>10.1f} jobs/s'.format(label, jobs / elapsed))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--no-sign', action='store_true')
+    args = parser.parse_args()
+    # Don't measure the records kept by the temporary logging handler
+    logging.getLogger('salt').setLevel(logging.WARNING)
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        salt.crypt.gen_keys(tmpdir, 'master', 2048)
+        salt.master.SMaster.secrets['aes'] = {
+            'secret': multiprocessing.Array(
+                ctypes.c_char,
+                salt.utils.stringutils.to_bytes(salt.crypt.Crypticle.generate_key_string())),
+        }
+        opts = {'pki_dir': tmpdir,
+                'sock_dir': tmpdir,
+                'cachedir': tmpdir,
+                'ipc_mode': 'ipc',
+                'zmq_filtering': False,
+                'sign_pub_messages': not args.no_sign}
+
+        # Stand in for the publisher daemon, draining the published messages
+        bound = threading.Event()
+
+        def drain():
+            pull = zmq.Context.instance().socket(zmq.PULL)
+            pull.setsockopt(zmq.RCVHWM, 0)
+            pull.bind('ipc://{0}'.format(os.path.join(tmpdir, 'publish_pull.ipc')))
+            bound.set()
+            while True:
+                pull.recv()
+        drainer = threading.Thread(target=drain)
+        drainer.daemon = True
+        drainer.start()
+        bound.wait()
+
+        channel = salt.transport.zeromq.ZeroMQPubServerChannel(opts)
+        channel.pub_connect()
+        channel.pub_sock.setsockopt(zmq.SNDHWM, 0)
+
+        print('{0} jobs, sign_pub_messages={1}'.format(args.jobs, opts['sign_pub_messages']))
+        old = run('legacy publish', args.jobs,
+                  lambda loads: [legacy_publish(channel, load) for load in loads])
+        new = run('publish', args.jobs,
+                  lambda loads: [channel.publish(load) for load in loads])
+        print('publish speedup: {0:.2f}x'.format(old / new))
+
+        channel.pub_close()
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
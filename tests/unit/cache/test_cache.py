@@ -10,6 +10,7 @@ unit tests for salt.cache
 # import integration
 from tests.support.unit import skipIf, TestCase
 from tests.support.mock import (
+    MagicMock,
     NO_MOCK,
     NO_MOCK_REASON,
     patch,
@@ -41,6 +42,70 @@ class CacheFunctionsTest(TestCase):
         self.assertIsInstance(ret, salt.cache.MemCache)
 
 
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class CacheBulkTest(TestCase):
+    '''
+    Validate the bulk methods of the Cache class
+    '''
+    def setUp(self):
+        self.opts = {'cache': 'fake_driver'}
+        self.cache = salt.cache.Cache(self.opts)
+        self.data = {('bank1', 'key1'): 'data11', ('bank2', 'key1'): 'data21'}
+
+    def _modules(self, **extra):
+        modules = {
+            'fake_driver.fetch': MagicMock(
+                side_effect=lambda bank, key, **kw: self.data.get((bank, key), {})),
+            'fake_driver.store': MagicMock(),
+            'fake_driver.flush': MagicMock(),
+        }
+        modules.update(('fake_driver.{0}'.format(name), fun)
+                       for name, fun in extra.items())
+        return modules
+
+    def test_fetch_many_fallback(self):
+        modules = self._modules()
+        with patch('salt.loader.cache', return_value=modules):
+            ret = self.cache.fetch_many([('bank1', 'key1'), ('bank3', 'key1')])
+        self.assertEqual(ret, {('bank1', 'key1'): 'data11', ('bank3', 'key1'): {}})
+        self.assertEqual(modules['fake_driver.fetch'].call_count, 2)
+
+    def test_fetch_many_native(self):
+        modules = self._modules(fetch_many=MagicMock(return_value=self.data))
+        with patch('salt.loader.cache', return_value=modules):
+            ret = self.cache.fetch_many(list(self.data))
+        self.assertEqual(ret, self.data)
+        modules['fake_driver.fetch_many'].assert_called_once_with(list(self.data))
+        modules['fake_driver.fetch'].assert_not_called()
+
+    def test_fetch_many_empty(self):
+        with patch('salt.loader.cache', return_value=self._modules()) as loader_mock:
+            self.assertEqual(self.cache.fetch_many([]), {})
+        loader_mock.assert_not_called()
+
+    def test_store_many_fallback(self):
+        modules = self._modules()
+        with patch('salt.loader.cache', return_value=modules):
+            self.cache.store_many(self.data)
+        self.assertEqual(
+            sorted(call[0] for call in modules['fake_driver.store'].call_args_list),
+            [('bank1', 'key1', 'data11'), ('bank2', 'key1', 'data21')])
+
+    def test_flush_many_fallback(self):
+        modules = self._modules()
+        with patch('salt.loader.cache', return_value=modules):
+            self.cache.flush_many([('bank1', 'key1'), ('bank2', None)])
+        modules['fake_driver.flush'].assert_any_call('bank1', key='key1')
+        modules['fake_driver.flush'].assert_any_call('bank2', key=None)
+
+    def test_flush_many_native(self):
+        modules = self._modules(flush_many=MagicMock())
+        with patch('salt.loader.cache', return_value=modules):
+            self.cache.flush_many([('bank1', 'key1')])
+        modules['fake_driver.flush_many'].assert_called_once_with([('bank1', 'key1')])
+        modules['fake_driver.flush'].assert_not_called()
+
+
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 class MemCacheTest(TestCase):
     '''
@@ -217,3 +282,38 @@ class MemCacheTest(TestCase):
         # Check debug data
         self.assertEqual(self.cache.call, 6)
         self.assertEqual(self.cache.hit, 3)
+
+    @patch('salt.cache.Cache.store')
+    @patch('salt.cache.Cache.fetch_many')
+    @patch('salt.loader.cache', return_value={})
+    def test_fetch_many(self, loader_mock, cache_fetch_many_mock, cache_store_mock):
+        cache_fetch_many_mock.return_value = {('bank', 'key2'): 'fake_data2'}
+        with patch('time.time', return_value=0):
+            self.cache.store('bank', 'key1', 'fake_data1')
+        # Only the keys missing from memory are fetched from the driver
+        with patch('time.time', return_value=1):
+            ret = self.cache.fetch_many([('bank', 'key1'), ('bank', 'key2')])
+        self.assertEqual(ret, {('bank', 'key1'): 'fake_data1',
+                               ('bank', 'key2'): 'fake_data2'})
+        cache_fetch_many_mock.assert_called_once_with([('bank', 'key2')])
+        self.assertDictEqual(salt.cache.MemCache.data['fake_driver'], {
+            ('bank', 'key1'): [1, 'fake_data1'],
+            ('bank', 'key2'): [1, 'fake_data2'],
+            })
+
+    @patch('salt.cache.Cache.flush_many')
+    @patch('salt.cache.Cache.store_many')
+    @patch('salt.loader.cache', return_value={})
+    def test_store_flush_many(self, loader_mock, cache_store_many_mock, cache_flush_many_mock):
+        with patch('time.time', return_value=0):
+            self.cache.store_many({('bank', 'key1'): 'fake_data1',
+                                   ('bank', 'key2'): 'fake_data2'})
+        self.assertDictEqual(salt.cache.MemCache.data['fake_driver'], {
+            ('bank', 'key1'): [0, 'fake_data1'],
+            ('bank', 'key2'): [0, 'fake_data2'],
+            })
+        self.cache.flush_many([('bank', 'key1')])
+        cache_flush_many_mock.assert_called_once_with([('bank', 'key1')])
+        self.assertDictEqual(salt.cache.MemCache.data['fake_driver'], {
+            ('bank', 'key2'): [0, 'fake_data2'],
+            })
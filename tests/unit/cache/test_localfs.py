@@ -140,6 +140,32 @@ class LocalFSTest(TestCase, LoaderModuleMockMixin):
             with patch.dict(localfs.__context__, {'serial': serializer}):
                 self.assertIn('payload data', localfs.fetch(bank='bank', key='key', cachedir=tmp_dir))
 
+    # 'fetch_many' function tests: 1
+
+    def _close_pool(self):
+        pool = localfs._POOL.pop('pool', None)
+        localfs._POOL.clear()
+        if pool is not None:
+            pool.terminate()
+
+    def test_fetch_many_success(self):
+        '''
+        Tests that fetch_many reads several cache files and reports the missing ones.
+        '''
+        tmp_dir = tempfile.mkdtemp(dir=TMP)
+        serializer = salt.payload.Serial(self)
+        self._create_tmp_cache_file(tmp_dir, serializer)
+        self.addCleanup(self._close_pool)
+
+        with patch.dict(localfs.__opts__, {'cachedir': tmp_dir, 'localfs_cache_threads': 2}):
+            with patch.dict(localfs.__context__, {'serial': serializer}):
+                localfs.store(bank='bank2', key='key', data='other data', cachedir=tmp_dir)
+                ret = localfs.fetch_many([('bank', 'key'), ('bank2', 'key'), ('bank3', 'key')],
+                                         cachedir=tmp_dir)
+        self.assertEqual(ret, {('bank', 'key'): 'payload data',
+                               ('bank2', 'key'): 'other data',
+                               ('bank3', 'key'): {}})
+
     # 'updated' function tests: 3
 
     def test_updated_return_when_cache_file_does_not_exist(self):
@@ -4,7 +4,7 @@
 '''
 
 # Import python libs
-
+import collections
 
 # Import Salt Libs
 from salt.cli.batch import Batch
@@ -73,3 +73,137 @@ class BatchTestCase(TestCase):
         '''
         ret = Batch.get_bnum(self.batch)
         self.assertEqual(ret, None)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class BatchRunTestCase(TestCase):
+    '''
+    Unit Tests for running batches from the job events
+    '''
+
+    def setUp(self):
+        self.opts = {'batch': '1',
+                     'conf_file': {},
+                     'tgt': '*',
+                     'fun': 'test.version',
+                     'arg': [],
+                     'timeout': 0.2,
+                     'gather_job_timeout': 0.2}
+        self.events = collections.deque()
+        self.published = []
+        self.local = MagicMock()
+        self.local.auto_reconnect = False
+        self.local.opts = {'order_masters': False}
+        self.local.event.cpub = False
+        self.local.event.get_event = self._get_event
+        self.local.run_job = self._run_job
+
+    def tearDown(self):
+        del self.opts
+        del self.events
+        del self.published
+        del self.local
+
+    def _get_event(self, **kwargs):
+        if self.events:
+            return self.events.popleft()
+        return None
+
+    def _return(self, jid, minion, ret):
+        self.events.append({'tag': 'salt/job/{0}/ret/{1}'.format(jid, minion),
+                            'data': {'jid': jid, 'id': minion, 'return': ret, 'retcode': 0}})
+
+    def _run_job(self, tgt, fun, arg, tgt_type, **kwargs):
+        jid = str(len(self.published))
+        self.published.append((tgt, fun, arg))
+        if fun == 'test.ping':
+            for minion in ('foo', 'bar'):
+                self._return(jid, minion, True)
+            return {'jid': jid, 'minions': ['foo', 'bar', 'baz']}
+        if fun == 'test.version':
+            for minion in tgt:
+                if minion != 'bar':
+                    self._return(jid, minion, '2019.2.0')
+        return {'jid': jid, 'minions': tgt}
+
+    def test_run(self):
+        '''
+        Tests that the job is sent to the next minion as soon as a minion
+        returns, and that minions which do not return time out
+        '''
+        batch = Batch(self.opts, quiet=True, local=self.local)
+        self.assertEqual(batch.minions, ['foo', 'bar', 'baz'])
+        ret = list(batch.run())
+        self.assertEqual(ret, [{'foo': '2019.2.0'}, {'bar': {}}])
+        self.assertEqual(batch.down_minions, set(['baz']))
+        self.assertEqual(
+            [pub[:2] for pub in self.published],
+            [('*', 'test.ping'),
+             (['foo'], 'test.version'),
+             (['bar'], 'test.version'),
+             (['bar'], 'saltutil.find_job')])
+        self.assertEqual(self.published[3][2], ['2'])
+        self.local.event.close_pub.assert_called_once_with()
+
+    def test_run_find_job(self):
+        '''
+        Tests that minions still running the job are waited for
+        '''
+        def _run_job(tgt, fun, arg, tgt_type, **kwargs):
+            pub_data = self._run_job(tgt, fun, arg, tgt_type, **kwargs)
+            if fun == 'saltutil.find_job':
+                if len(self.published) == 3:
+                    self._return(pub_data['jid'], 'bar', {'jid': arg[0]})
+                else:
+                    self._return(arg[0], 'bar', '2019.2.0')
+            return pub_data
+        self.local.run_job = _run_job
+        self.opts['batch'] = '100%'
+        batch = Batch(self.opts, quiet=True, local=self.local)
+        ret = list(batch.run())
+        self.assertEqual(ret, [{'foo': '2019.2.0'}, {'bar': '2019.2.0'}])
+        self.assertEqual(
+            [pub[:2] for pub in self.published],
+            [('*', 'test.ping'),
+             (['foo', 'bar'], 'test.version'),
+             (['bar'], 'saltutil.find_job'),
+             (['bar'], 'saltutil.find_job')])
+
+    def test_run_syndic_minions(self):
+        '''
+        Tests that the minions answering the ping which the master did not
+        expect, behind a syndic, are added to the batch
+        '''
+        def _run_job(tgt, fun, arg, tgt_type, **kwargs):
+            pub_data = self._run_job(tgt, fun, arg, tgt_type, **kwargs)
+            if fun == 'test.ping':
+                pub_data['minions'] = []
+            return pub_data
+        self.local.run_job = _run_job
+        self.local.opts['order_masters'] = True
+        self.opts['batch'] = '50%'
+        batch = Batch(self.opts, quiet=True, local=self.local)
+        self.assertEqual(batch.minions, [])
+        ret = list(batch.run())
+        self.assertEqual(ret, [{'foo': '2019.2.0'}, {'bar': {}}])
+        self.assertEqual(batch.minions, ['foo', 'bar'])
+        self.assertEqual(batch.down_minions, set())
+        self.assertEqual(
+            [pub[:2] for pub in self.published[:3]],
+            [('*', 'test.ping'),
+             (['foo'], 'test.version'),
+             (['bar'], 'test.version')])
+
+    def test_run_show_jid(self):
+        '''
+        Tests that the jid of the batch jobs is shown with show_jid
+        '''
+        parser = MagicMock(show_jid=True, verbose=False)
+        batch = Batch(self.opts, quiet=False, parser=parser, local=self.local)
+        with patch('salt.utils.stringutils.print_cli') as print_cli, \
+                patch('salt.output.display_output'):
+            ret = list(batch.run())
+        self.assertEqual(ret, [{'foo': '2019.2.0'}, {'bar': {}}])
+        printed = [call[0][0] for call in print_cli.call_args_list]
+        self.assertIn('jid: 1', printed)
+        self.assertIn('jid: 2', printed)
@@ -6,7 +6,9 @@
 # Import Python libs
 
 import copy
+import io
 import os
+import time
 import tempfile
 
 # Import Salt Testing libs
@@ -14,12 +16,15 @@ from tests.integration import AdaptedConfigurationTestCaseMixin
 from tests.support.mixins import LoaderModuleMockMixin
 from tests.support.paths import BASE_FILES, TMP, TMP_STATE_TREE
 from tests.support.unit import TestCase, skipIf
-from tests.support.mock import patch, NO_MOCK, NO_MOCK_REASON
+from tests.support.mock import patch, MagicMock, NO_MOCK, NO_MOCK_REASON
 
 # Import Salt libs
 import salt.fileserver.roots as roots
 import salt.fileclient
+import salt.fileserver
+import salt.utils.delta
 import salt.utils.files
+import salt.utils.gzip_util
 import salt.utils.hashutils
 import salt.utils.platform
 
@@ -196,3 +201,191 @@ class RootsTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderModuleMockMix
         self.assertEqual('dynamo.sls', ret1['rel'])
         self.assertIn('top.sls', ret2)
         self.assertIn('dynamo.sls', ret2)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class RootsIndexTest(TestCase, LoaderModuleMockMixin):
+    '''
+    Test the roots fileserver index
+    '''
+    def setup_loader_modules(self):
+        self.tmp_cachedir = tempfile.mkdtemp(dir=TMP)
+        self.roots = [tempfile.mkdtemp(dir=TMP), tempfile.mkdtemp(dir=TMP)]
+        self.opts = {
+            'cachedir': self.tmp_cachedir,
+            'file_roots': {'base': self.roots},
+            'file_ignore_regex': [],
+            'file_ignore_glob': [],
+            'fileserver_events': False,
+            'fileserver_followsymlinks': True,
+            'fileserver_ignoresymlinks': False,
+            'fileserver_list_cache_time': 20,
+            'fileserver_roots_index': True,
+            'hash_type': 'sha256',
+            'roots_update_interval': 60,
+        }
+        return {roots: {'__opts__': self.opts}}
+
+    def setUp(self):
+        self._write(self.roots[0], 'top.sls', 'base: {}\n')
+        self._write(self.roots[1], 'top.sls', 'shadowed\n')
+        self._write(self.roots[1], os.path.join('sub', 'init.sls'), 'foo: {}\n')
+
+    def tearDown(self):
+        for path in self.roots + [self.tmp_cachedir]:
+            salt.utils.files.rm_rf(path)
+        roots._INDEX_CONNS.clear()
+        del self.opts
+
+    @staticmethod
+    def _write(root, rel, data):
+        path = os.path.join(root, rel)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write(data)
+        return path
+
+    def _index(self):
+        conn = roots._index_conn('base')
+        return dict((row[0], row[1:])
+                    for row in conn.execute('SELECT rel, path, hsum FROM files'))
+
+    def test_update_index(self):
+        roots.update()
+        top = os.path.join(self.roots[0], 'top.sls')
+        sub = os.path.join(self.roots[1], 'sub', 'init.sls')
+        self.assertEqual(
+            self._index(),
+            {'top.sls': (top, salt.utils.hashutils.get_hash(top, 'sha256')),
+             os.path.join('sub', 'init.sls'):
+                 (sub, salt.utils.hashutils.get_hash(sub, 'sha256'))})
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_cachedir, 'roots', 'hash')))
+
+        # Only the changed files are hashed again
+        os.remove(sub)
+        new = self._write(self.roots[0], 'new.sls', 'bar: {}\n')
+        with patch('salt.utils.hashutils.get_hash',
+                   side_effect=salt.utils.hashutils.get_hash) as get_hash:
+            roots.update()
+        get_hash.assert_called_once_with(new, 'sha256')
+        self.assertEqual(sorted(self._index()), ['new.sls', 'top.sls'])
+
+    def test_find_file(self):
+        roots.update()
+        with patch('os.path.isfile') as isfile:
+            ret = roots.find_file(os.path.join('sub', 'init.sls'))
+        isfile.assert_not_called()
+        self.assertEqual(ret['path'], os.path.join(self.roots[1], 'sub', 'init.sls'))
+        self.assertEqual(ret['rel'], os.path.join('sub', 'init.sls'))
+        self.assertIn('stat', ret)
+        self.assertEqual(roots.find_file('top.sls')['path'],
+                         os.path.join(self.roots[0], 'top.sls'))
+
+        # Files added or removed since the last update are still found
+        self._write(self.roots[0], 'new.sls', 'bar: {}\n')
+        self.assertEqual(roots.find_file('new.sls')['rel'], 'new.sls')
+        os.remove(os.path.join(self.roots[0], 'top.sls'))
+        self.assertEqual(roots.find_file('top.sls')['path'],
+                         os.path.join(self.roots[1], 'top.sls'))
+
+    def test_file_hash(self):
+        roots.update()
+        fnd = roots.find_file('top.sls')
+        load = {'saltenv': 'base', 'path': 'top.sls'}
+        with patch('salt.utils.hashutils.get_hash') as get_hash:
+            ret = roots.file_hash(load, fnd)
+        get_hash.assert_not_called()
+        self.assertEqual(
+            ret,
+            {'hash_type': 'sha256',
+             'hsum': salt.utils.hashutils.get_hash(fnd['path'], 'sha256')})
+
+        # A file changed since the last update is hashed again
+        self._write(self.roots[0], 'top.sls', 'changed\n')
+        os.utime(fnd['path'], (0, 0))
+        self.assertEqual(
+            roots.file_hash(load, fnd)['hsum'],
+            salt.utils.hashutils.get_hash(fnd['path'], 'sha256'))
+
+        # The index is rebuilt when the hash_type changes
+        with patch.dict(roots.__opts__, {'hash_type': 'md5'}):
+            self.assertIsNone(roots._index_lookup('base', 'top.sls'))
+            roots.update()
+            self.assertEqual(
+                roots.file_hash(load, fnd)['hsum'],
+                salt.utils.hashutils.get_hash(fnd['path'], 'md5'))
+
+    def test_file_list(self):
+        self.assertIsNone(roots._index_file_list('base'))
+        roots.update()
+        with patch('salt.utils.path.os_walk') as os_walk:
+            ret = roots.file_list({'saltenv': 'base'})
+        os_walk.assert_not_called()
+        self.assertEqual(ret, ['sub/init.sls', 'top.sls'])
+
+        # The ignored files are matched by their relative path
+        with patch.dict(roots.__opts__, {'file_ignore_glob': ['sub/*']}):
+            self.assertEqual(roots.file_list({'saltenv': 'base'}), ['top.sls'])
+
+        # An index which was not updated for a while is not used
+        with patch('time.time', return_value=time.time() + 81):
+            self.assertIsNone(roots._index_file_list('base'))
+
+    def test_serve_file_chunk_cache(self):
+        self._write(self.roots[0], 'big.txt', 'x' * 100)
+        fnd = roots.find_file('big.txt')
+        load = {'saltenv': 'base', 'path': 'big.txt', 'loc': 0, 'gzip': 6}
+        opts = {'fileserver_chunk_cache': True, 'file_buffer_size': 64}
+        with patch.dict(roots.__opts__, opts):
+            ret = roots.serve_file(dict(load), fnd)
+            self.assertEqual(ret['gzip'], 6)
+            self.assertEqual(salt.utils.gzip_util.uncompress(ret['data']), b'x' * 64)
+
+            # Served from the cache without reading or compressing the file
+            with patch('salt.utils.gzip_util.compress') as compress:
+                self.assertEqual(roots.serve_file(dict(load), fnd), ret)
+            compress.assert_not_called()
+
+            ret = roots.serve_file(dict(load, loc=64), fnd)
+            self.assertEqual(salt.utils.gzip_util.uncompress(ret['data']), b'x' * 36)
+            self.assertEqual(roots.serve_file(dict(load, loc=100), fnd),
+                             {'data': b'', 'dest': 'big.txt'})
+
+            hsum = roots.file_hash(load, fnd)['hsum']
+            chunk_dir = os.path.join(self.tmp_cachedir, 'roots', 'chunks', 'sha256', hsum)
+            self.assertEqual(sorted(os.listdir(chunk_dir)), ['64-6-0', '64-6-64'])
+
+            # Changed contents are cached under their new hash
+            self._write(self.roots[0], 'big.txt', 'y' * 100)
+            os.utime(fnd['path'], (0, 0))
+            ret = roots.serve_file(dict(load), fnd)
+            self.assertEqual(salt.utils.gzip_util.uncompress(ret['data']), b'y' * 64)
+
+            # Expired chunks are reaped by the fileserver update
+            os.utime(chunk_dir, (0, 0))
+            roots.update()
+            self.assertFalse(os.path.exists(chunk_dir))
+
+    def test_serve_file_delta(self):
+        old = os.urandom(10000)
+        new = old[:3000] + b'changed' + old[3000:]
+        path = self._write(self.roots[0], 'big.bin', '')
+        with salt.utils.files.fopen(path, 'wb') as fp_:
+            fp_.write(new)
+        opts = dict(self.opts, fileserver_backend=['roots'], file_buffer_size=262144)
+        servers = {'roots.envs': roots.envs,
+                   'roots.find_file': roots.find_file,
+                   'roots.serve_file': roots.serve_file}
+        with patch('salt.loader.fileserver', MagicMock(return_value=servers)):
+            fs_ = salt.fileserver.Fileserver(opts)
+        bsize = salt.utils.delta.block_size(len(old))
+        load = {'saltenv': 'base', 'path': 'big.bin', 'loc': 0,
+                'block_size': bsize,
+                'signatures': salt.utils.delta.signatures(io.BytesIO(old), bsize)}
+        ret = fs_.serve_file_delta(load)
+        self.assertIsNone(ret['loc'])
+        self.assertEqual(
+            b''.join(salt.utils.delta.patch(io.BytesIO(old), ret['ops'], bsize)), new)
+        self.assertEqual(fs_.serve_file_delta(dict(load, path='missing')), {})
+        self.assertEqual(fs_.serve_file_delta(dict(load, block_size=0)), {})
@@ -17,7 +17,8 @@ from tests.support.mock import (
 )
 
 # Import Salt libs
-from salt.exceptions import SaltException
+from salt.exceptions import CommandExecutionError, SaltException
+import salt.loader
 import salt.modules.grains as grainsmod
 import salt.utils.dictupdate as dictupdate
 
@@ -630,3 +631,19 @@ class GrainsModuleTestCase(TestCase, LoaderModuleMockMixin):
             self.assertTrue(res)
             res = grainsmod.equals('b:z', 'aval')
             self.assertFalse(res)
+
+    def test_profile(self):
+        cachedir = grainsmod.__opts__['cachedir']
+        path = os.path.join(cachedir, 'grains.profile.p')
+        if os.path.exists(path):
+            os.remove(path)
+        self.assertRaises(CommandExecutionError, grainsmod.profile)
+
+        salt.loader._write_grains_file(grainsmod.__opts__, 'grains.profile.p', {
+            'core.os_data': {'duration': 0.2, 'status': 'ok'},
+            'core.fqdns': {'duration': 20.0, 'status': 'timeout'},
+            'core.cpu_data': {'duration': 0.0, 'status': 'cached'}})
+        self.addCleanup(os.remove, path)
+        ret = grainsmod.profile()
+        self.assertEqual(list(ret), ['core.fqdns', 'core.os_data', 'core.cpu_data'])
+        self.assertEqual(ret['core.fqdns'], {'duration': 20.0, 'status': 'timeout'})
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+'''
+Unit tests for the packed local job cache (local_packed_cache).
+'''
+
+# Import Python libs
+import contextlib
+import datetime
+import os
+import shutil
+import tempfile
+
+# Import Salt Testing libs
+from tests.support.mixins import LoaderModuleMockMixin
+from tests.support.paths import TMP
+from tests.support.unit import TestCase, skipIf
+from tests.support.mock import patch, MagicMock
+
+# Import Salt libs
+import salt.utils.files
+import salt.utils.jid
+import salt.returners.local_packed_cache as local_packed_cache
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+
+class LocalPackedCacheTestCase(TestCase, LoaderModuleMockMixin):
+    '''
+    Tests for the local_packed_cache returner
+    '''
+    def setup_loader_modules(self):
+        self.cachedir = tempfile.mkdtemp(dir=TMP)
+        return {local_packed_cache: {'__opts__': {'cachedir': self.cachedir,
+                                                  'keep_jobs': 24}}}
+
+    def tearDown(self):
+        shutil.rmtree(self.cachedir, ignore_errors=True)
+        local_packed_cache._INDEXES.clear()
+
+    def _files(self):
+        return sorted(os.listdir(os.path.join(self.cachedir, 'packed_jobs')))
+
+    def test_job_round_trip(self):
+        '''
+        Loads, minion lists and returns of a job are read back
+        '''
+        jid = local_packed_cache.prep_jid()
+        load = {'jid': jid, 'fun': 'test.ping', 'arg': [], 'tgt': 'web*',
+                'tgt_type': 'glob', 'user': 'root'}
+        local_packed_cache.save_load(jid, load, minions=['web1', 'web2'])
+        local_packed_cache.save_minions(jid, ['web3'], syndic_id='syndic1')
+        for minion_id in ('web1', 'web2'):
+            local_packed_cache.returner({'jid': jid, 'id': minion_id,
+                                         'return': True, 'retcode': 0,
+                                         'success': True, 'out': 'nested'})
+
+        ret = local_packed_cache.get_load(jid)
+        self.assertEqual(ret['fun'], 'test.ping')
+        self.assertEqual(ret['Minions'], ['web1', 'web2', 'web3'])
+        self.assertEqual(
+            local_packed_cache.get_jid(jid),
+            {'web1': {'return': True, 'retcode': 0, 'success': True, 'out': 'nested'},
+             'web2': {'return': True, 'retcode': 0, 'success': True, 'out': 'nested'}})
+        # All the records of the hour share one segment and one index
+        self.assertEqual(self._files(), [jid[:10] + '.idx', jid[:10] + '.seg'])
+
+    def test_extra_return_dropped(self):
+        '''
+        A second return from the same minion is dropped
+        '''
+        jid = local_packed_cache.prep_jid()
+        ret = {'jid': jid, 'id': 'web1', 'return': 'first'}
+        self.assertIsNone(local_packed_cache.returner(ret))
+        ret['return'] = 'second'
+        self.assertFalse(local_packed_cache.returner(ret))
+        self.assertEqual(local_packed_cache.get_jid(jid),
+                         {'web1': {'return': 'first'}})
+
+    def test_nocache(self):
+        '''
+        Returns of nocache jobs are not stored
+        '''
+        jid = local_packed_cache.prep_jid(nocache=True)
+        local_packed_cache.returner({'jid': jid, 'id': 'web1', 'return': True})
+        self.assertEqual(local_packed_cache.get_jid(jid), {})
+
+    def test_prep_jid_collision(self):
+        '''
+        A new jid is generated if the generated one is already in use
+        '''
+        jid = local_packed_cache.prep_jid()
+        with patch('salt.utils.jid.gen_jid',
+                   side_effect=[jid, '20190101000000000001']):
+            self.assertEqual(local_packed_cache.prep_jid(), '20190101000000000001')
+        self.assertEqual(local_packed_cache.prep_jid(passed_jid=jid), jid)
+
+    def test_get_jids_filter(self):
+        '''
+        Jobs are listed from their loads, most recent last
+        '''
+        jids = ['20190101000000000001', '20190101000000000002', '20190102000000000003']
+        for jid, fun in zip(jids, ('test.ping', 'saltutil.find_job', 'test.echo')):
+            local_packed_cache.save_load(jid, {'jid': jid, 'fun': fun})
+        ret = local_packed_cache.get_jids_filter(5)
+        self.assertEqual([job['JID'] for job in ret], [jids[0], jids[2]])
+        ret = local_packed_cache.get_jids_filter(1, filter_find_job=False)
+        self.assertEqual([job['JID'] for job in ret], [jids[2]])
+        self.assertEqual(sorted(local_packed_cache.get_jids()), jids)
+
+    def test_endtime(self):
+        '''
+        The most recent end time is returned
+        '''
+        jid = local_packed_cache.prep_jid()
+        self.assertFalse(local_packed_cache.get_endtime(jid))
+        local_packed_cache.update_endtime(jid, 'first')
+        local_packed_cache.update_endtime(jid, 'second')
+        self.assertEqual(local_packed_cache.get_endtime(jid), 'second')
+
+    def test_clean_old_jobs(self):
+        '''
+        Buckets older than keep_jobs are removed as a whole
+        '''
+        old = '{0:%Y%m%d%H%M%S%f}'.format(
+            datetime.datetime.now() - datetime.timedelta(hours=26))
+        new = salt.utils.jid.gen_jid({})
+        for jid in (old, new):
+            local_packed_cache.save_load(jid, {'jid': jid, 'fun': 'test.ping'})
+        local_packed_cache.clean_old_jobs()
+        self.assertEqual(self._files(), [new[:10] + '.idx', new[:10] + '.seg'])
+        self.assertEqual(local_packed_cache.get_load(old), {})
+        self.assertEqual(local_packed_cache.get_load(new)['fun'], 'test.ping')
+
+    def test_clean_old_jobs_utc_jid(self):
+        '''
+        With utc_jid the buckets are expired on the UTC time of their jids
+        '''
+        local_packed_cache.__opts__['utc_jid'] = True
+        self.addCleanup(local_packed_cache.__opts__.pop, 'utc_jid')
+        utcnow = datetime.datetime(2019, 1, 2, 12)
+        old = '{0:%Y%m%d%H%M%S%f}'.format(utcnow - datetime.timedelta(hours=25))
+        new = '{0:%Y%m%d%H%M%S%f}'.format(utcnow - datetime.timedelta(hours=23))
+        for jid in (old, new):
+            local_packed_cache.save_load(jid, {'jid': jid, 'fun': 'test.ping'})
+        mock_datetime = MagicMock(wraps=datetime.datetime)
+        mock_datetime.utcnow.return_value = utcnow
+        # Local time ahead of UTC
+        mock_datetime.now.return_value = utcnow + datetime.timedelta(hours=5)
+        with patch('datetime.datetime', mock_datetime):
+            local_packed_cache.clean_old_jobs()
+        self.assertEqual(self._files(), [new[:10] + '.idx', new[:10] + '.seg'])
+        self.assertNotIn(os.path.join(self.cachedir, 'packed_jobs', old[:10] + '.idx'),
+                         local_packed_cache._INDEXES)
+
+    @skipIf(not HAS_FCNTL, 'fcntl is not available')
+    def test_append_removed_bucket(self):
+        '''
+        A record written to a bucket removed while the writer waited for its
+        lock goes to the new bucket
+        '''
+        jid = salt.utils.jid.gen_jid({})
+        local_packed_cache.save_load(jid, {'jid': jid, 'fun': 'test.ping'})
+        flopen = salt.utils.files.flopen
+        raced = []
+
+        @contextlib.contextmanager
+        def racing_flopen(path, mode, *args, **kwargs):
+            if mode != 'ab+' or raced:
+                with flopen(path, mode, *args, **kwargs) as fh_:
+                    yield fh_
+                return
+            raced.append(path)
+            # The bucket is removed after the writer opened the index and
+            # before it got the lock
+            with salt.utils.files.fopen(path, mode) as fh_:
+                local_packed_cache._remove_bucket(jid[:10])
+                fcntl.flock(fh_.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield fh_
+                finally:
+                    fcntl.flock(fh_.fileno(), fcntl.LOCK_UN)
+
+        with patch('salt.utils.files.flopen', racing_flopen):
+            local_packed_cache.update_endtime(jid, 'end')
+        self.assertTrue(raced)
+        self.assertEqual(self._files(), [jid[:10] + '.idx', jid[:10] + '.seg'])
+        self.assertEqual(local_packed_cache.get_endtime(jid), 'end')
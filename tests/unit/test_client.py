@@ -9,7 +9,7 @@
 # Import Salt Testing libs
 import tests.integration as integration
 from tests.support.unit import TestCase, skipIf
-from tests.support.mock import patch, NO_MOCK, NO_MOCK_REASON
+from tests.support.mock import patch, MagicMock, NO_MOCK, NO_MOCK_REASON
 
 # Import Salt libs
 from salt import client
@@ -18,6 +18,10 @@ from salt.exceptions import (
     EauthAuthenticationError, SaltInvocationError, SaltClientError, SaltReqTimeoutError
 )
 
+# Import 3rd-party libs
+import tornado.gen
+import tornado.ioloop
+
 
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 class LocalClientTestCase(TestCase,
@@ -126,3 +130,99 @@ class LocalClientTestCase(TestCase,
                 self.assertRaises(SaltInvocationError,
                                   self.client.pub,
                                   'non_existent_group', 'test.ping', tgt_type='nodegroup')
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class AsyncLocalClientTestCase(TestCase):
+    '''
+    Test the AsyncLocalClient against a mocked publish and event bus
+    '''
+    def setUp(self):
+        self.io_loop = tornado.ioloop.IOLoop()
+        self.demux = client.JobEventDemux.__new__(client.JobEventDemux)
+        self.demux.io_loop = self.io_loop
+        self.demux.jobs = {}
+        self.demux.event = MagicMock()
+        self.demux.event.unpack.side_effect = lambda raw, serial: raw
+        self.demux.event.subscriber.connected.return_value = True
+        self.client = client.AsyncLocalClient.__new__(client.AsyncLocalClient)
+        self.client.io_loop = self.io_loop
+        self.client.demux = self.demux
+        self.client.opts = {'gather_job_timeout': 1,
+                            'syndic_wait': 0,
+                            'order_masters': False,
+                            'timeout': 0.2}
+        self.client.local = MagicMock()
+        self.client.local._get_timeout.side_effect = lambda timeout: timeout or 0.2
+        # fun -> callable(jid, tgt) returning the minions which return
+        self.returns = {}
+        self.published = []
+
+        @tornado.gen.coroutine
+        def run_job_async(tgt, fun, arg, tgt_type, ret, timeout, jid, **kwargs):
+            self.published.append((fun, jid, tgt))
+            for id_, ret in self.returns.get(fun, lambda jid, tgt: {})(arg, tgt).items():
+                self.io_loop.add_callback(
+                    self.demux._handle_event,
+                    ('salt/job/{0}/ret/{1}'.format(jid, id_),
+                     {'id': id_, 'jid': jid, 'return': ret, 'retcode': 0}))
+            minions = tgt if isinstance(tgt, list) else ['m1', 'm2']
+            raise tornado.gen.Return({'jid': jid, 'minions': minions})
+        self.client.local.run_job_async.side_effect = run_job_async
+
+    def tearDown(self):
+        self.io_loop.close()
+        del self.io_loop
+        del self.client
+        del self.demux
+        del self.returns
+        del self.published
+
+    def test_concurrent_cmd(self):
+        '''
+        Concurrent jobs get their own returns from the shared subscription
+        '''
+        self.returns['test.echo'] = lambda arg, tgt: {'m1': arg[0], 'm2': arg[0]}
+        self.returns['saltutil.find_job'] = lambda arg, tgt: {}
+
+        @tornado.gen.coroutine
+        def run():
+            rets = yield [self.client.cmd('*', 'test.echo', [idx]) for idx in range(5)]
+            raise tornado.gen.Return(rets)
+        rets = self.io_loop.run_sync(run)
+        self.assertEqual(rets, [{'m1': idx, 'm2': idx} for idx in range(5)])
+        self.assertEqual(len(set(jid for _, jid, _ in self.published)), 5)
+        self.assertEqual(self.demux.jobs, {})
+
+    def test_iter_returns_timeout(self):
+        '''
+        A minion which doesn't return fails after the job is found finished
+        '''
+        self.returns['test.ping'] = lambda arg, tgt: {'m1': True}
+        self.returns['saltutil.find_job'] = lambda arg, tgt: {}
+
+        @tornado.gen.coroutine
+        def run():
+            pub_data = yield self.client.run_job('*', 'test.ping')
+            returns = self.client.iter_returns(pub_data['jid'],
+                                               pub_data['minions'],
+                                               timeout=0.1,
+                                               expect_minions=True)
+            rets = []
+            while not returns.done():
+                ret = yield returns.next()
+                if ret:
+                    rets.append(ret)
+            raise tornado.gen.Return(rets)
+        rets = self.io_loop.run_sync(run)
+        self.assertEqual(rets, [{'m1': {'ret': True, 'retcode': 0, 'jid': self.published[0][1]}},
+                                {'m2': {'failed': True}}])
+        self.assertEqual([fun for fun, _, _ in self.published], ['test.ping', 'saltutil.find_job'])
+        self.assertEqual(self.published[1][2], ['m2'])
+        self.assertEqual(self.demux.jobs, {})
+
+    def test_gather_job_info(self):
+        self.returns['saltutil.find_job'] = lambda arg, tgt: {'m1': {'jid': arg[0]}, 'm2': {}}
+        ret = self.io_loop.run_sync(
+            lambda: self.client.gather_job_info('1234', '*', 'glob'))
+        self.assertEqual(ret, {'m1': {'jid': '1234'}})
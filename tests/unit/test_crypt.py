@@ -20,6 +20,7 @@ from tests.support.mock import (
 # salt libs
 from salt.ext import six
 import salt.utils.files
+import salt.utils.stringutils
 from salt import crypt
 
 # third-party libs
@@ -313,3 +314,100 @@ class TestM2CryptoRegression47124(TestCase):
         with patch('salt.crypt.get_rsa_key', return_value=key):
             signature = salt.crypt.sign_message('/keydir/keyname.pem', message, passphrase='password')
         self.assertEqual(signature, self.SIGNATURE)
+
+
+class AuthSessionTestCase(TestCase):
+    '''
+    Test resuming auth sessions between a minion and the master
+    '''
+    def setUp(self):
+        import salt.config
+        import salt.master
+        import salt.transport.mixins.auth
+        self.tmpdir = tempfile.mkdtemp()
+        master_opts = salt.config.DEFAULT_MASTER_OPTS.copy()
+        master_opts.update({
+            'pki_dir': os.path.join(self.tmpdir, 'master'),
+            'cachedir': os.path.join(self.tmpdir, 'cache'),
+            'sock_dir': self.tmpdir,
+            'auth_session_ttl': 3600,
+        })
+        minion_opts = salt.config.DEFAULT_MINION_OPTS.copy()
+        minion_opts.update({
+            'id': 'minion',
+            'pki_dir': os.path.join(self.tmpdir, 'minion'),
+            'master_uri': 'tcp://127.0.0.1:4506',
+            '__role': 'minion',
+        })
+        for path in ('minions', 'minions_pre', 'minions_rejected', 'minions_denied'):
+            os.makedirs(os.path.join(master_opts['pki_dir'], path))
+        os.makedirs(minion_opts['pki_dir'])
+        crypt.gen_keys(master_opts['pki_dir'], 'master', 2048)
+        crypt.gen_keys(minion_opts['pki_dir'], 'minion', 2048)
+        shutil.copy(os.path.join(master_opts['pki_dir'], 'master.pub'),
+                    os.path.join(minion_opts['pki_dir'], 'minion_master.pub'))
+        shutil.copy(os.path.join(minion_opts['pki_dir'], 'minion.pub'),
+                    os.path.join(master_opts['pki_dir'], 'minions', 'minion'))
+
+        self.server = salt.transport.mixins.auth.AESReqServerMixin()
+        self.server.opts = master_opts
+        with patch.dict(salt.master.SMaster.secrets, {}), \
+                patch('salt.utils.event.get_master_event', MagicMock()):
+            salt.master.SMaster.secrets.pop('aes', None)
+            self.server.pre_fork(None)
+            self.server.post_fork(None, None)
+            self.aes = salt.master.SMaster.secrets['aes']
+        self.auth = crypt.SAuth(minion_opts)
+        self.channel = MagicMock()
+        self.channel.send.side_effect = lambda load, **kwargs: self.server._auth(load)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        crypt.SAuth.instances.clear()
+        del self.tmpdir
+        del self.server
+        del self.aes
+        del self.auth
+        del self.channel
+
+    def _sign_in(self):
+        import salt.master
+        with patch.dict(salt.master.SMaster.secrets, {'aes': self.aes}):
+            return self.auth.sign_in(channel=self.channel)
+
+    def test_resume_session(self):
+        '''
+        Test that a minion which signed in gets the AES key from its session
+        when it signs in again, including after the key was rotated
+        '''
+        aes = salt.utils.stringutils.to_str(self.aes['secret'].value)
+        creds = self._sign_in()
+        self.assertEqual(creds['aes'], aes)
+        self.assertIsNotNone(self.auth._session)
+        self.assertTrue(os.path.isfile(os.path.join(self.tmpdir, 'master', 'auth_session.key')))
+
+        self.aes['secret'].value = salt.utils.stringutils.to_bytes(crypt.Crypticle.generate_key_string())
+        with patch.object(crypt, 'private_encrypt', MagicMock()) as private_encrypt:
+            creds = self._sign_in()
+            private_encrypt.assert_not_called()
+        self.assertEqual(creds['aes'], salt.utils.stringutils.to_str(self.aes['secret'].value))
+
+    def test_resume_session_key_changed(self):
+        '''
+        Test that a minion whose key was deleted can not resume its session,
+        and that a forged session reply is not accepted
+        '''
+        self._sign_in()
+        os.remove(os.path.join(self.tmpdir, 'master', 'minions', 'minion'))
+        load = self.auth.minion_sign_in_payload()
+        self.assertIn('session', load)
+        self.assertNotIn('session_aes', self.server._auth(load))
+
+        session = self.auth._session
+        load['session_proof'] = crypt.Crypticle(
+            {}, crypt.Crypticle.generate_key_string()).dumps({'id': 'minion'})
+        self.assertIsNone(self.server._resume_session(load))
+        self.assertIsNone(self.auth.resume_session(
+            {'session': session['id'],
+             'session_aes': crypt.Crypticle({}, crypt.Crypticle.generate_key_string()).dumps({})}))
+        self.assertIsNone(self.auth._session)
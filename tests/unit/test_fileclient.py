@@ -9,6 +9,7 @@ import errno
 import logging
 import os
 import shutil
+import tempfile
 
 # Import Salt Testing libs
 from tests.integration import AdaptedConfigurationTestCaseMixin
@@ -17,8 +18,14 @@ from tests.support.mock import patch, Mock, MagicMock, NO_MOCK, NO_MOCK_REASON
 from tests.support.paths import TMP
 from tests.support.unit import TestCase, skipIf
 
+# Import 3rd-party libs
+import tornado.concurrent
+
 # Import Salt libs
+import salt.utils.delta
 import salt.utils.files
+import salt.utils.hashutils
+from salt.exceptions import SaltReqTimeoutError
 from salt.ext.six.moves import range
 from salt import fileclient
 from salt.ext import six
@@ -408,3 +415,166 @@ class FileclientCacheTest(TestCase, AdaptedConfigurationTestCaseMixin, LoaderMod
                 log.debug('cache_loc = %s', cache_loc)
                 log.debug('content = %s', content)
                 self.assertTrue(saltenv in content)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class RemoteClientPipelineTest(TestCase, AdaptedConfigurationTestCaseMixin):
+    '''
+    Test the pipelined chunk transfer of RemoteClient.get_file
+    '''
+    chunk_size = 4
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=TMP)
+        self.source = os.path.join(self.tmp_dir, 'source')
+        with salt.utils.files.fopen(self.source, 'wb') as fp_:
+            fp_.write(b''.join(six.int2byte(idx) * self.chunk_size for idx in range(10)) + b'end')
+        self.opts = self.get_temp_config('minion')
+        self.opts['cachedir'] = os.path.join(self.tmp_dir, 'cache')
+        self.opts['file_transfer_window'] = 3
+        self.served = []
+        self.in_flight = []
+        self.delta_support = True
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        del self.opts
+        del self.served
+        del self.in_flight
+
+    def _serve(self, load):
+        if load['cmd'] == '_file_hash':
+            return {'hsum': salt.utils.hashutils.get_hash(self.source, 'sha256'),
+                    'hash_type': 'sha256'}
+        if load['cmd'] == '_file_find':
+            return {'path': self.source, 'rel': 'source',
+                    'stat': list(os.stat(self.source))}
+        if load['cmd'] == '_serve_file_delta':
+            self.served.append(('delta', load['loc']))
+            if self.delta_support == 'timeout':
+                raise SaltReqTimeoutError('Message timed out')
+            if not self.delta_support:
+                return False
+            with salt.utils.files.fopen(self.source, 'rb') as fp_:
+                ops, loc = salt.utils.delta.delta(
+                    fp_, load['signatures'], load['block_size'],
+                    loc=load['loc'], max_literal=self.chunk_size)
+            return {'ops': ops, 'loc': loc}
+        self.served.append(load['loc'])
+        with salt.utils.files.fopen(self.source, 'rb') as fp_:
+            fp_.seek(load['loc'])
+            return {'data': fp_.read(self.chunk_size), 'dest': 'source'}
+
+    def _client(self):
+        test = self
+
+        class SyncChannel(object):
+            def send(self, load, raw=False, **kwargs):
+                return test._serve(load)
+
+            def close(self):
+                pass
+
+        class AsyncChannel(object):
+            def __init__(self, opts, **kwargs):
+                self.pending = []
+                test.pool_size = opts['sock_pool_size']
+
+            def send(self, load, raw=False, **kwargs):
+                # Answer the requests once the window is full
+                future = tornado.concurrent.Future()
+                self.pending.append((future, load))
+                test.in_flight.append(len(self.pending))
+                if len(self.pending) == test.opts['file_transfer_window'] \
+                        or load['loc'] + test.chunk_size >= os.path.getsize(test.source):
+                    for pending, pending_load in self.pending:
+                        pending.set_result(test._serve(pending_load))
+                    self.pending = []
+                return future
+
+            def close(self):
+                pass
+
+        patcher = patch('salt.transport.client.AsyncReqChannel.factory', AsyncChannel)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with patch('salt.transport.client.ReqChannel.factory',
+                   MagicMock(return_value=SyncChannel())):
+            return fileclient.RemoteClient(self.opts)
+
+    def test_get_file_pipelined(self):
+        client = self._client()
+        dest = os.path.join(self.tmp_dir, 'dest')
+        self.assertEqual(client.get_file('salt://source', dest), dest)
+        with salt.utils.files.fopen(self.source, 'rb') as src, \
+                salt.utils.files.fopen(dest, 'rb') as dst:
+            self.assertEqual(src.read(), dst.read())
+        # The first chunk gives the chunk size, the rest is requested three at
+        # a time, then the end of the file is confirmed
+        size = os.path.getsize(self.source)
+        self.assertEqual(self.served,
+                         list(range(0, size, self.chunk_size)) + [size])
+        self.assertEqual(max(self.in_flight), 3)
+        self.assertEqual(self.pool_size, 3)
+
+    def test_get_file_not_pipelined(self):
+        self.opts['file_transfer_window'] = 1
+        client = self._client()
+        dest = os.path.join(self.tmp_dir, 'dest')
+        self.assertEqual(client.get_file('salt://source', dest), dest)
+        self.assertEqual(self.in_flight, [])
+        with salt.utils.files.fopen(self.source, 'rb') as src, \
+                salt.utils.files.fopen(dest, 'rb') as dst:
+            self.assertEqual(src.read(), dst.read())
+
+    def _write_outdated(self, dest):
+        # An outdated copy, with a changed block and data inserted
+        with salt.utils.files.fopen(self.source, 'rb') as fp_:
+            data = bytearray(fp_.read() * 200)
+        with salt.utils.files.fopen(self.source, 'wb') as fp_:
+            fp_.write(bytes(data))
+        data[5000:5010] = b'x' * 10
+        with salt.utils.files.fopen(dest, 'wb') as fp_:
+            fp_.write(bytes(data[:3000] + data[3100:]))
+
+    def test_get_file_delta(self):
+        self.opts['file_delta_sync'] = True
+        client = self._client()
+        dest = os.path.join(self.tmp_dir, 'dest')
+        self._write_outdated(dest)
+        self.assertEqual(client.get_file('salt://source', dest), dest)
+        with salt.utils.files.fopen(self.source, 'rb') as src, \
+                salt.utils.files.fopen(dest, 'rb') as dst:
+            self.assertEqual(src.read(), dst.read())
+        # Only delta pages were requested, each with up to chunk_size bytes
+        # of changes
+        self.assertEqual(set(loc[0] for loc in self.served), set(['delta']))
+        self.assertLess(len(self.served), 5000)
+
+    def test_get_file_delta_unsupported(self):
+        self.opts['file_delta_sync'] = True
+        self.opts['file_transfer_window'] = 1
+        self.delta_support = False
+        client = self._client()
+        dest = os.path.join(self.tmp_dir, 'dest')
+        self._write_outdated(dest)
+        self.assertEqual(client.get_file('salt://source', dest), dest)
+        with salt.utils.files.fopen(self.source, 'rb') as src, \
+                salt.utils.files.fopen(dest, 'rb') as dst:
+            self.assertEqual(src.read(), dst.read())
+        self.assertEqual(self.served[0], ('delta', 0))
+        self.assertEqual(self.served[1], 0)
+
+    def test_get_file_delta_timeout(self):
+        self.opts['file_delta_sync'] = True
+        self.opts['file_transfer_window'] = 1
+        self.delta_support = 'timeout'
+        client = self._client()
+        dest = os.path.join(self.tmp_dir, 'dest')
+        self._write_outdated(dest)
+        self.assertEqual(client.get_file('salt://source', dest), dest)
+        with salt.utils.files.fopen(self.source, 'rb') as src, \
+                salt.utils.files.fopen(dest, 'rb') as dst:
+            self.assertEqual(src.read(), dst.read())
+        self.assertEqual(self.served[0], ('delta', 0))
+        self.assertEqual(self.served[1], 0)
@@ -19,6 +19,7 @@ import shutil
 import sys
 import tempfile
 import textwrap
+import time
 
 # Import Salt Testing libs
 from tests.support.case import ModuleCase
@@ -29,6 +30,7 @@ from tests.support.paths import TMP
 # Import Salt libs
 import salt.config
 import salt.loader
+import salt.payload
 import salt.utils.files
 import salt.utils.stringutils
 # pylint: disable=import-error,no-name-in-module,redefined-builtin
@@ -1242,3 +1244,220 @@ class LazyLoaderOptimizationOrderTest(TestCase):
         basename = os.path.basename(filename)
         expected = 'lazyloadertest.py' if six.PY3 else 'lazyloadertest.pyc'
         assert basename == expected, basename
+
+
+class GrainsTest(TestCase):
+    '''
+    Test running the grains functions
+    '''
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.opts = {'cachedir': self.tmp_dir,
+                     'grains_workers': 4,
+                     'grains_profile': True}
+        self.calls = collections.Counter()
+
+        def _slow(key, value):
+            def _grain():
+                self.calls[key] += 1
+                time.sleep(0.5)
+                return {key: value}
+            return _grain
+
+        def _sum(grains):
+            return {'sum': grains['os'] + grains['cpus']}
+
+        def _hang():
+            time.sleep(2)
+            return {'hang': True}
+
+        self.funcs = collections.OrderedDict([
+            ('core.os_data', _slow('os', 1)),
+            ('core.cpu_data', _slow('cpus', 2)),
+            ('custom.sum', _sum),
+            ('custom.fqdns', _slow('fqdns', ['minion'])),
+            ('custom.hang', _hang),
+        ])
+
+    def tearDown(self):
+        del self.opts
+        del self.calls
+        del self.funcs
+
+    def _grains(self):
+        with patch('salt.loader.grain_funcs', return_value=self.funcs):
+            return salt.loader.grains(self.opts)
+
+    def test_grains_workers(self):
+        '''
+        The grains functions run at the same time, the functions taking the
+        grains after the functions before them
+        '''
+        self.opts['grains_timeout'] = 1
+        start = time.time()
+        grains = self._grains()
+        self.assertLess(time.time() - start, 2)
+        self.assertEqual(grains, {'os': 1, 'cpus': 2, 'sum': 3, 'fqdns': ['minion']})
+
+        profile_path = os.path.join(self.tmp_dir, 'grains.profile.p')
+        with salt.utils.files.fopen(profile_path, 'rb') as fp_:
+            profile = salt.payload.Serial(self.opts).load(fp_)
+        self.assertEqual(dict((key, val['status']) for key, val in six.iteritems(profile)),
+                         {'core.os_data': 'ok', 'core.cpu_data': 'ok', 'custom.sum': 'ok',
+                          'custom.fqdns': 'ok', 'custom.hang': 'timeout'})
+        self.assertGreaterEqual(profile['core.os_data']['duration'], 0.5)
+
+    def test_grains_timeout_single_worker(self):
+        '''
+        A function which timed out does not keep the next functions from
+        running with a single worker
+        '''
+        self.opts.update({'grains_workers': 1, 'grains_timeout': 1})
+        funcs = collections.OrderedDict([('custom.hang', self.funcs.pop('custom.hang'))])
+        funcs.update(self.funcs)
+        self.funcs = funcs
+        self.assertEqual(self._grains(), {'os': 1, 'cpus': 2, 'sum': 3, 'fqdns': ['minion']})
+
+        profile_path = os.path.join(self.tmp_dir, 'grains.profile.p')
+        with salt.utils.files.fopen(profile_path, 'rb') as fp_:
+            profile = salt.payload.Serial(self.opts).load(fp_)
+        self.assertEqual(profile['custom.hang']['status'], 'timeout')
+        self.assertEqual(profile['custom.fqdns']['status'], 'ok')
+
+    def test_grains_function_cache(self):
+        '''
+        The returns of the functions in grains_function_cache are reused until
+        their TTL expires
+        '''
+        self.funcs.pop('custom.hang')
+        self.opts['grains_function_cache'] = {'custom.fqdns': 60, 'core.cpu_data': 0}
+        expected = {'os': 1, 'cpus': 2, 'sum': 3, 'fqdns': ['minion']}
+        self.assertEqual(self._grains(), expected)
+        self.assertEqual(self._grains(), expected)
+        self.assertEqual(self.calls, {'os': 2, 'cpus': 2, 'fqdns': 1})
+
+
+rejected_module_template = '''
+__virtual_cache__ = {cache}
+
+with open({marker!r}, 'a') as fp_:
+    fp_.write('x')
+
+
+def __virtual__():
+    return (False, 'not on this platform')
+
+
+def test():
+    return True
+'''
+
+
+class LoaderCacheTest(TestCase):
+    '''
+    Test the cache of the file mappings and __virtual__ rejections
+    '''
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.mod_dir = os.path.join(self.tmp_dir, 'modules')
+        os.makedirs(self.mod_dir)
+        self.opts = {'cachedir': os.path.join(self.tmp_dir, 'cache'),
+                     'optimization_order': [0, 1, 2]}
+        self.write_module('first', 'def test():\n    return 1\n')
+        for patcher in (patch.dict(salt.loader._LOADER_CACHE, {}, clear=True),
+                        patch.object(sys, 'dont_write_bytecode', True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        del self.tmp_dir
+        del self.mod_dir
+        del self.opts
+
+    def write_module(self, name, contents, age=60):
+        '''
+        Write a module, dating it and its directory ``age`` seconds back so
+        they can be cached
+        '''
+        path = os.path.join(self.mod_dir, '{0}.py'.format(name))
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write(contents)
+        mtime = time.time() - age
+        for dated in (path, self.mod_dir):
+            os.utime(dated, (mtime, mtime))
+
+    def loader(self, fresh=False):
+        '''
+        Return a new loader, which reads the cache from the cachedir if
+        ``fresh`` is True
+        '''
+        if fresh:
+            salt.loader._LOADER_CACHE.clear()
+        return salt.loader.LazyLoader([self.mod_dir], self.opts, tag='module')
+
+    def test_file_mapping_cached(self):
+        '''
+        The file mapping is only built again when the directories change
+        '''
+        mapping = self.loader().file_mapping
+        self.assertEqual(list(mapping), ['first'])
+        self.assertEqual(len(os.listdir(os.path.join(self.opts['cachedir'], 'loader'))), 1)
+
+        with patch('os.listdir', side_effect=os.listdir) as listdir:
+            self.assertEqual(self.loader().file_mapping, mapping)
+            self.assertEqual(self.loader(fresh=True).file_mapping, mapping)
+            self.assertEqual(self.loader(fresh=True)['first.test'](), 1)
+        self.assertEqual(listdir.call_count, 0)
+
+        self.write_module('second', 'def test():\n    return 2\n', age=30)
+        loader = self.loader(fresh=True)
+        self.assertEqual(list(loader.file_mapping), ['first', 'second'])
+        self.assertEqual(loader['second.test'](), 2)
+
+    def test_recent_changes_not_cached(self):
+        '''
+        Directories which changed in the last seconds are listed every time
+        '''
+        self.write_module('second', 'def test():\n    return 2\n', age=0)
+        loader = self.loader()
+        self.assertEqual(list(loader.file_mapping), ['first', 'second'])
+        self.assertIsNone(salt.loader._LOADER_CACHE[loader._loader_cache_key]['mapping'])
+
+        os.remove(os.path.join(self.mod_dir, 'second.py'))
+        loader.clear()
+        self.assertEqual(list(loader.file_mapping), ['first'])
+
+    def test_loader_cache_disabled(self):
+        self.opts['loader_cache'] = False
+        self.assertEqual(list(self.loader().file_mapping), ['first'])
+        self.assertEqual(salt.loader._LOADER_CACHE, {})
+        self.assertFalse(os.path.exists(self.opts['cachedir']))
+
+    def test_virtual_cache(self):
+        '''
+        Modules which declare __virtual_cache__ are not imported again after
+        __virtual__ rejected them, until they change
+        '''
+        marker = os.path.join(self.tmp_dir, 'imported')
+        for name, cache in (('cached', True), ('uncached', False)):
+            self.write_module(
+                name, rejected_module_template.format(cache=cache, marker=marker + name))
+
+        for fresh in (False, True, True):
+            loader = self.loader(fresh=fresh)
+            self.assertNotIn('cached.test', loader)
+            self.assertNotIn('uncached.test', loader)
+            self.assertEqual(loader.missing_modules['cached'], 'not on this platform')
+        with salt.utils.files.fopen(marker + 'cached') as fp_:
+            self.assertEqual(fp_.read(), 'x')
+        with salt.utils.files.fopen(marker + 'uncached') as fp_:
+            self.assertEqual(fp_.read(), 'xxx')
+
+        self.write_module(
+            'cached', rejected_module_template.format(cache=False, marker=marker + 'cached'),
+            age=30)
+        self.assertNotIn('cached.test', self.loader(fresh=True))
+        with salt.utils.files.fopen(marker + 'cached') as fp_:
+            self.assertEqual(fp_.read(), 'xx')
@@ -127,6 +127,7 @@ class TransportMethodsTest(TestCase):
             '__sizeof__',
             '__str__',
             '__subclasshook__',
+            '_get_pub_channels',
             '_prep_auth_info',
             '_prep_jid',
             '_prep_pub',
@@ -15,7 +15,10 @@ from tests.support.mixins import AdaptedConfigurationTestCaseMixin
 from tests.support.helpers import skip_if_not_root
 # Import salt libs
 import salt.minion
+import salt.payload
 import salt.utils.event as event
+import salt.utils.gzip_util
+import salt.utils.stringutils
 from salt.exceptions import SaltSystemExit, SaltMasterUnresolvableError
 import salt.syspaths
 import tornado
@@ -193,7 +196,7 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
         with patch('salt.minion.Minion.ctx', MagicMock(return_value={})), \
                 patch('salt.utils.process.SignalHandlingMultiprocessingProcess.start', MagicMock(return_value=True)), \
                 patch('salt.utils.process.SignalHandlingMultiprocessingProcess.join', MagicMock(return_value=True)), \
-                patch('salt.utils.minion.running', MagicMock(return_value=[])), \
+                patch('salt.utils.minion.RunningJobs.running', MagicMock(return_value=[])), \
                 patch('tornado.gen.sleep', MagicMock(return_value=tornado.concurrent.Future())):
             process_count_max = 10
             mock_opts = salt.config.DEFAULT_MINION_OPTS
@@ -217,7 +220,7 @@ class MinionTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
                     io_loop.run_sync(lambda data=mock_data: minion._handle_decoded_payload(data))
                     self.assertEqual(salt.utils.process.SignalHandlingMultiprocessingProcess.start.call_count, i + 1)
                     self.assertEqual(len(minion.jid_queue), i + 1)
-                    salt.utils.minion.running.return_value += [i]
+                    salt.utils.minion.RunningJobs.running.return_value += [i]
 
                 # above process_count_max: gen.sleep does get called, JIDs are created but no new processes are started
                 mock_data = {'fun': 'foo.bar',
@@ -367,3 +370,97 @@ class MinionAsyncTestCase(TestCase, AdaptedConfigurationTestCaseMixin, tornado.t
             except SaltSystemExit:
                 result = False
         self.assertTrue(result)
+
+
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class SyndicManagerTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
+    '''
+    Test the aggregation of the returns and events a syndic forwards
+    '''
+    def setUp(self):
+        opts = self.get_config('minion', from_scratch=True)
+        opts.update({'syndic_forward_max_returns': 2,
+                     'syndic_forward_max_bytes': 0,
+                     'syndic_event_forward_hwm': 2,
+                     'syndic_jid_forward_cache_hwm': 100,
+                     'master_job_cache': 'local_cache'})
+        with patch('salt.minion.MasterMinion'):
+            self.manager = salt.minion.SyndicManager(opts, io_loop=MagicMock())
+        self.manager.mminion.returners = {'local_cache.get_load': MagicMock(return_value={})}
+        self.manager.local = MagicMock()
+        self.manager.local.event.unpack = event.SaltEvent.unpack
+        self.manager.local.event.serial = salt.payload.Serial('msgpack')
+        self.manager._return_pub_syndic = MagicMock(return_value=True)
+
+    def tearDown(self):
+        del self.manager
+
+    def _event(self, tag, data):
+        self.manager._process_event(
+            salt.utils.stringutils.to_bytes(tag + event.TAGEND) +
+            self.manager.local.event.serial.dumps(data))
+
+    def _return(self, minion, jid='20190101120000123456'):
+        self._event(
+            'salt/job/{0}/ret/{1}'.format(jid, minion),
+            {'jid': jid, 'id': minion, 'fun': 'test.ping', 'return': True, 'retcode': 0})
+
+    def test_forward_max_returns(self):
+        self._return('minion1')
+        self.assertFalse(self.manager._return_pub_syndic.called)
+        self._return('minion2', jid='20190101120000123457')
+        self.manager._return_pub_syndic.assert_called_once()
+        values = self.manager._return_pub_syndic.call_args[0][0]
+        self.assertEqual(sorted(ret['__jid__'] for ret in values),
+                         ['20190101120000123456', '20190101120000123457'])
+        self.assertEqual(self.manager.job_rets, {})
+        self.assertEqual(self.manager.stats['forwarded'], 2)
+        self.assertEqual(self.manager.stats['size_flushes'], 1)
+
+    def test_forward_max_returns_sending(self):
+        # The returns keep being gathered while the previous ones are sent
+        future = MagicMock()
+        future.done.return_value = False
+        self.manager.pub_futures[None] = (future, [])
+        for idx in range(4):
+            self._return('minion{0}'.format(idx))
+        self.assertFalse(self.manager._return_pub_syndic.called)
+        self.assertEqual(self.manager.job_ret_sizes[None][0], 4)
+        future.done.return_value = True
+        self.manager._forward_events()
+        self.manager._return_pub_syndic.assert_called_once()
+        self.assertEqual(len(self.manager._return_pub_syndic.call_args[0][0]), 4)
+
+    def test_event_forward_hwm(self):
+        for idx in range(3):
+            self._event('custom/{0}'.format(idx), {})
+        self.assertEqual([evt['tag'] for evt in self.manager.raw_events], ['custom/1', 'custom/2'])
+        self.assertEqual(self.manager.stats['dropped_events'], 1)
+
+    def test_fire_stats(self):
+        self._return('minion1')
+        self.manager._fire_stats()
+        data, tag = self.manager.local.event.fire_event.call_args[0]
+        self.assertEqual(tag, 'salt/syndic/{0}/stats'.format(self.manager.opts['id']))
+        self.assertEqual(data['pending']['None']['returns'], 1)
+        self.assertEqual(data['sending'], [])
+        self.assertEqual(self.manager.stats['forwarded'], 0)
+
+    def test_forward_compress(self):
+        mock_opts = self.get_config('minion', from_scratch=True)
+        mock_opts.update({'syndic_forward_compress': True, 'multiprocessing': False})
+        io_loop = tornado.ioloop.IOLoop()
+        io_loop.make_current()
+        minion = salt.minion.Minion(mock_opts, io_loop=io_loop)
+        try:
+            rets = [{'__jid__': '20190101120000123456', '__fun__': 'test.ping',
+                     'minion1': {'return': True}}]
+            with patch.object(minion, '_send_req_sync', MagicMock()) as send:
+                minion._return_pub_multi(rets, '_syndic_return')
+            load = send.call_args[0][0]
+            self.assertNotIn('load', load)
+            loads = salt.payload.Serial(mock_opts).loads(
+                salt.utils.gzip_util.uncompress(load['zload']))
+            self.assertEqual(loads[0]['return'], {'minion1': {'return': True}})
+        finally:
+            minion.destroy()
@@ -23,6 +23,7 @@ from salt.utils import immutabletypes
 from salt.utils.odict import OrderedDict
 import salt.exceptions
 import salt.payload
+import salt.transport.frame
 
 # Import 3rd-party libs
 import zmq
@@ -153,6 +154,61 @@ class PayloadTestCase(TestCase):
         odata = payload.loads(sdata)
         self.assertEqual(edata, odata)
 
+    def _slow_loads(self, sdata):
+        '''
+        Unpack the way Serial.loads did before its fast path
+        '''
+        odata = salt.payload.msgpack.loads(sdata,
+                                           use_list=True,
+                                           ext_hook=salt.payload._ext_type_decoder,
+                                           raw=True)
+        return salt.transport.frame.decode_embedded_strs(odata)
+
+    @skipIf(not salt.payload._FAST_LOADS, 'The fast loads path is not available')
+    def test_fast_loads_same_as_walk(self):
+        '''
+        Test the fast path returns what unpacking raw strings and walking them did
+        '''
+        payload = salt.payload.Serial('msgpack')
+        dtvalue = datetime.datetime(2001, 2, 3, 4, 5, 6, 7)
+        idata = {'fun': 'state.highstate',
+                 'return': {'file_|-/etc/motd_|-/etc/motd_|-managed': {
+                     'result': True, 'changes': {}, 'duration': 1.5,
+                     '__run_num__': 0, 'comment': u'ünïcode'}},
+                 'when': dtvalue,
+                 'binary': b'\xff\xfe\x00',
+                 'text_bytes': b'clean'}
+        for sdata in (payload.dumps(idata),
+                      payload.dumps(idata, use_bin_type=True),
+                      payload.dumps({'clean': ['a', 1, {'b': None}]}),
+                      payload.dumps({'empty': b''}, use_bin_type=True),
+                      payload.dumps({'ext': salt.payload.msgpack.ExtType(5, b'data')})):
+            self.assertEqual(payload.loads(sdata), self._slow_loads(sdata))
+
+    def test_loads_memoryview(self):
+        '''
+        Test buffers are unpacked like bytes
+        '''
+        payload = salt.payload.Serial('msgpack')
+        idata = {'jid': '20190101000000000000', 'return': [1, 2, {'a': 'b'}]}
+        sdata = payload.dumps(idata)
+        self.assertEqual(payload.loads(memoryview(sdata)), idata)
+        self.assertEqual(payload.loads(bytearray(sdata)), idata)
+
+    def test_dumps_reuses_packer(self):
+        '''
+        Test the packer of the thread is reused and left clean after an error
+        '''
+        payload = salt.payload.Serial('msgpack')
+        packer = salt.payload._get_packer(False)
+        if packer is None:
+            self.skipTest('msgpack does not provide reusable packers')
+        self.assertIs(salt.payload._get_packer(False), packer)
+        self.assertIsNot(salt.payload._get_packer(True), packer)
+        with self.assertRaises(TypeError):
+            payload.dumps({'obj': object()})
+        self.assertEqual(payload.loads(payload.dumps({'a': 'b'})), {'a': 'b'})
+
 
 class SREQTestCase(TestCase):
     port = 8845  # TODO: dynamically assign a port?
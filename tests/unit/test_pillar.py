@@ -371,6 +371,80 @@ class PillarTestCase(TestCase):
         finally:
             shutil.rmtree(tempdir, ignore_errors=True)
 
+    def test_ext_pillar_sources(self):
+        '''
+        test the ext_pillar_sources run in the thread pool and are cached
+        '''
+        opts = {
+            'optimization_order': [0, 1, 2],
+            'renderer': 'json',
+            'renderer_blacklist': [],
+            'renderer_whitelist': [],
+            'state_top': '',
+            'pillar_roots': {'base': []},
+            'file_roots': {'base': []},
+            'extension_modules': '',
+            'ext_pillar': [{'independent': {'url': 'http://pillar'}},
+                           {'dependent': 'arg'}],
+            'ext_pillar_workers': 2,
+            'ext_pillar_sources': {'independent': {'ttl': 60, 'inputs': ['grains:os']}},
+        }
+        calls = []
+
+        def independent(minion_id, pillar, url):
+            calls.append(minion_id)
+            return {'url': url, 'seen': sorted(pillar)}
+
+        def dependent(minion_id, pillar, arg):
+            return {'dependent': [minion_id, arg, pillar['url']]}
+
+        self.addCleanup(salt.pillar._EXT_PILLAR_CACHE.clear)
+        self.addCleanup(salt.pillar._POOL.clear)
+        for minion_id, os_ in (('minion1', 'Ubuntu'), ('minion2', 'Ubuntu'), ('minion3', 'Fedora')):
+            with patch('salt.loader.pillars',
+                       MagicMock(return_value={'independent': independent,
+                                               'dependent': dependent})):
+                pillar = salt.pillar.Pillar(opts, {'os': os_}, minion_id, 'base')
+            ret, errors = pillar.ext_pillar({'top': True})
+            self.assertEqual(errors, [])
+            self.assertEqual(ret, {'top': True,
+                                   'url': 'http://pillar',
+                                   'seen': ['top'],
+                                   'dependent': [minion_id, 'arg', 'http://pillar']})
+            self.assertIn('dependent', pillar.ext_pillar_timing)
+        # minion2 has the same os grain as minion1
+        self.assertEqual(calls, ['minion1', 'minion3'])
+
+    def test_ext_pillar_sources_error(self):
+        '''
+        test the errors of the ext_pillar_sources are reported and not cached
+        '''
+        opts = {
+            'optimization_order': [0, 1, 2],
+            'renderer': 'json',
+            'renderer_blacklist': [],
+            'renderer_whitelist': [],
+            'state_top': '',
+            'pillar_roots': {'base': []},
+            'file_roots': {'base': []},
+            'extension_modules': '',
+            'ext_pillar': [{'failing': 'arg'}],
+            'ext_pillar_workers': 2,
+            'ext_pillar_sources': {'failing': {'ttl': 60}},
+        }
+        failing = MagicMock(side_effect=Exception('unreachable'))
+        self.addCleanup(salt.pillar._EXT_PILLAR_CACHE.clear)
+        self.addCleanup(salt.pillar._POOL.clear)
+        with patch('salt.loader.pillars', MagicMock(return_value={'failing': failing})), \
+                patch('salt.utils.args.get_function_argspec',
+                      MagicMock(return_value=MagicMock(args=[]))):
+            pillar = salt.pillar.Pillar(opts, {}, 'minion1', 'base')
+            for _ in range(2):
+                ret, errors = pillar.ext_pillar({})
+                self.assertEqual(ret, {})
+                self.assertEqual(errors, ['Failed to load ext_pillar failing: unreachable'])
+        self.assertEqual(failing.call_count, 2)
+
     def test_dynamic_pillarenv(self):
         opts = {
             'optimization_order': [0, 1, 2],
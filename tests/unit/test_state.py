@@ -5,9 +5,11 @@
 
 # Import Python libs
 
+import copy
 import os
 import shutil
 import tempfile
+import time
 
 # Import Salt Testing libs
 import tests.integration as integration
@@ -23,6 +25,7 @@ from tests.support.paths import BASE_FILES
 # Import Salt libs
 import salt.exceptions
 import salt.state
+import salt.utils.files
 from salt.utils.odict import OrderedDict
 from salt.utils.decorators import state as statedecorators
 
@@ -172,6 +175,73 @@ class HighStateTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
         self.assertEqual(ret, [('somestuff', 'cmd')])
 
 
+@skipIf(NO_MOCK, NO_MOCK_REASON)
+class CompiledStateCacheTestCase(TestCase):
+    '''
+    TestCase for the compiled state cache of the HighState
+    '''
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(dir=integration.TMP)
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.sls_path = os.path.join(self.tmp_dir, 'cached.sls')
+        self.highstate = salt.state.BaseHighState.__new__(salt.state.BaseHighState)
+        self.highstate.opts = {'cachedir': self.tmp_dir,
+                               'grains': {'id': 'minion'},
+                               'state_compile_cache': True,
+                               'state_auto_order': True}
+        self.highstate.iorder = 10000
+        self.highstate.avail = {'base': ['cached']}
+        self.highstate._compile_cache_inputs = None
+        self.highstate.client = MagicMock()
+        self.highstate.client.get_state.return_value = {'dest': self.sls_path}
+        self.highstate.state = MagicMock()
+        self.highstate.state.opts = {'pillar': {'role': 'web'},
+                                     'renderer': 'yaml',
+                                     'renderer_blacklist': [],
+                                     'renderer_whitelist': []}
+
+    def tearDown(self):
+        del self.highstate
+
+    def _write_sls(self, content):
+        with salt.utils.files.fopen(self.sls_path, 'w') as fp_:
+            fp_.write(content)
+
+    def _render(self):
+        return self.highstate.render_state('cached', 'base', set(), None)
+
+    def test_compiled_state_cache(self):
+        '''
+        Rendered SLS files are reused until the file, pillar or grains change
+        '''
+        self._write_sls('foo')
+        rendered = OrderedDict([('foo', OrderedDict([('test.succeed_without_changes', [])]))])
+        compile_template = MagicMock(side_effect=lambda *args, **kwargs: copy.deepcopy(rendered))
+        with patch('salt.state.compile_template', compile_template):
+            first, errors = self._render()
+            self.assertEqual(errors, [])
+            second, errors = self._render()
+            self.assertEqual(errors, [])
+            self.assertEqual(compile_template.call_count, 1)
+            self.assertEqual(list(first), list(second))
+            self.assertIsInstance(second['foo'], OrderedDict)
+
+            self._write_sls('bar')
+            self._render()
+            self.assertEqual(compile_template.call_count, 2)
+
+            self.highstate.opts['grains']['role'] = 'db'
+            self.highstate._compile_cache_inputs = None
+            self._render()
+            self.assertEqual(compile_template.call_count, 3)
+            self._render()
+            self.assertEqual(compile_template.call_count, 3)
+
+            self.highstate.opts['state_compile_cache'] = False
+            self._render()
+            self.assertEqual(compile_template.call_count, 4)
+
+
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 @skipIf(pytest is None, 'PyTest is missing')
 class StateReturnsTestCase(TestCase):
@@ -360,3 +430,199 @@ class StateFormatSlotsTestCase(TestCase, AdaptedConfigurationTestCaseMixin):
             self.state_obj.format_slots(cdata)
         mock.assert_not_called()
         self.assertEqual(cdata, sls_data)
+
+
+class RequisiteIndexTestCase(TestCase):
+    '''
+    TestCase for the indexes the requisites are looked up in
+    '''
+    def setUp(self):
+        self.high = OrderedDict([
+            ('nginx', OrderedDict([('pkg', ['installed', {'name': 'nginx-full'}]),
+                                   ('service', ['running', {'enable': True}]),
+                                   ('__sls__', 'web'),
+                                   ('__env__', 'base')])),
+            ('/etc/nginx/nginx.conf', {'__sls__': 'web.config', '__env__': 'base',
+                                       'file': ['managed', {'source': 'salt://nginx.conf'}]}),
+            ('mysql', {'__sls__': 'db', '__env__': 'base',
+                       'pkg': ['installed', {'name': 'mysql-server'}]}),
+            ('__exclude__', []),
+        ])
+
+    def tearDown(self):
+        del self.high
+
+    def test_find_name_index(self):
+        '''
+        Looking names and sls files up in the index of the high data finds the
+        same ids as scanning the high data
+        '''
+        index = salt.state.index_high(self.high)
+        for name, state in (('nginx-full', 'pkg'), ('salt://nginx.conf', 'file'),
+                            ('mysql', 'pkg'), ('missing', 'pkg'),
+                            ('nginx-full', 'file')):
+            self.assertEqual(salt.state.find_name(name, state, self.high, index),
+                             salt.state.find_name(name, state, self.high))
+        self.assertEqual(salt.state.find_name('nginx-full', 'pkg', self.high, index),
+                         [('nginx', 'pkg')])
+        self.assertEqual(salt.state.find_name('web', 'sls', self.high, index),
+                         [('nginx', 'pkg')])
+        for sls in ('web', 'web.config', 'db', 'missing'):
+            self.assertEqual(salt.state.find_sls_ids(sls, self.high, index),
+                             salt.state.find_sls_ids(sls, self.high))
+        self.assertEqual(salt.state.find_sls_ids('web', self.high, index),
+                         [('nginx', 'pkg'), ('nginx', 'service')])
+        self.assertEqual(index['name']['mysql-server'], [('mysql', 'pkg')])
+
+    def test_find_chunks(self):
+        '''
+        Requisites match the chunks by sls, id and name globs, in the order of
+        the chunks
+        '''
+        state_obj = salt.state.State.__new__(salt.state.State)
+        state_obj._chunk_index = None
+        chunks = [{'state': 'pkg', '__id__': 'nginx', 'name': 'nginx-full', '__sls__': 'web'},
+                  {'state': 'service', '__id__': 'nginx', 'name': 'nginx', '__sls__': 'web'},
+                  {'state': 'file', '__id__': '/etc/nginx/nginx.conf',
+                   'name': '/etc/nginx/nginx.conf', '__sls__': 'web.config'},
+                  {'state': 'pkg', '__id__': 'mysql', 'name': 'mysql-server', '__sls__': 'db'}]
+        find = state_obj._find_chunks
+        self.assertEqual(find('id', 'nginx', chunks), chunks[:2])
+        self.assertEqual(find('pkg', 'nginx', chunks), chunks[:1])
+        self.assertEqual(find('pkg', 'nginx-full', chunks), chunks[:1])
+        self.assertEqual(find('service', 'nginx-full', chunks), [])
+        self.assertEqual(find('pkg', '*', chunks), [chunks[0], chunks[3]])
+        self.assertEqual(find('file', '/etc/nginx/*', chunks), chunks[2:3])
+        self.assertEqual(find('sls', 'web', chunks), chunks[:2])
+        self.assertEqual(find('sls', 'web*', chunks), chunks[:3])
+        self.assertEqual(find('id', 'missing', chunks), [])
+
+        # The index is built again for other chunks
+        self.assertEqual(find('id', 'nginx', chunks[1:]), chunks[1:2])
+
+
+def _sleep_state(name, seconds=0.5, result=True):
+    time.sleep(seconds)
+    return {'name': name,
+            'result': result,
+            'changes': {'slept': seconds} if result else {},
+            'comment': 'Slept'}
+
+
+class StateConcurrencyTestCase(TestCase):
+    '''
+    TestCase for running the states following their requisites with
+    state_concurrency
+    '''
+    def setUp(self):
+        self.state_obj = salt.state.State.__new__(salt.state.State)
+        self.state_obj.opts = {'failhard': False,
+                               'test': False,
+                               'local': True,
+                               'grains': {},
+                               'state_concurrency': 4}
+        self.state_obj.jid = None
+        self.state_obj.states = {'test.sleep': _sleep_state}
+        self.state_obj.functions = {'config.option': MagicMock(return_value=False)}
+        self.state_obj.mod_init = set(['test'])
+        self.state_obj.active = set()
+        self.state_obj.pre = {}
+        self.state_obj._chunk_index = None
+        self.state_obj._State__run_num = 0
+        self.calls = []
+        patcher = patch.object(salt.state.State, 'call', self._call)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        del self.state_obj
+        del self.calls
+
+    def _call(self, low, chunks=None, running=None):
+        self.calls.append((low['__id__'], low.get('parallel', False),
+                           sorted(tag for tag in running if 'proc' not in running[tag])))
+        cdata = {'full': 'test.sleep', 'args': [low['name']], 'kwargs': low['kwargs']}
+        if low.get('parallel'):
+            ret = self.state_obj.call_parallel(cdata, low)
+        else:
+            ret = _sleep_state(low['name'], **low['kwargs'])
+        ret['__run_num__'] = len(self.calls) - 1
+        return ret
+
+    @staticmethod
+    def _chunk(id_, **kwargs):
+        low = {'state': 'test', 'fun': 'sleep', '__id__': id_, 'name': id_,
+               '__sls__': 'sleep', '__env__': 'base', 'order': 10000,
+               'kwargs': kwargs.pop('kwargs', {})}
+        low.update(kwargs)
+        return low
+
+    def test_call_chunks_concurrent(self):
+        '''
+        Independent states run at the same time, the states requiring them
+        once they returned
+        '''
+        chunks = [self._chunk('sleep{0}'.format(idx)) for idx in range(4)]
+        chunks.append(self._chunk('done', require=[{'test': 'sleep*'}], kwargs={'seconds': 0}))
+        start = time.time()
+        ret = self.state_obj.call_chunks(chunks)
+        self.assertLess(time.time() - start, 1.5)
+
+        self.assertEqual(len(ret), 5)
+        for low in chunks:
+            tag = salt.state._gen_tag(low)
+            self.assertTrue(ret[tag]['result'])
+            self.assertNotIn('proc', ret[tag])
+        self.assertEqual(ret[salt.state._gen_tag(chunks[0])]['changes'], {'slept': 0.5})
+        self.assertEqual([call[:2] for call in self.calls[:4]],
+                         [('sleep{0}'.format(idx), True) for idx in range(4)])
+        self.assertEqual(self.calls[4][0], 'done')
+        self.assertEqual(self.calls[4][2], sorted(salt.state._gen_tag(low) for low in chunks[:4]))
+        self.assertEqual(self.state_obj._requisite_graph(chunks)[salt.state._gen_tag(chunks[4])],
+                         set(salt.state._gen_tag(low) for low in chunks[:4]))
+
+    def test_call_chunks_concurrent_requisite_failure(self):
+        '''
+        States requiring a failed state running in a separate process fail
+        '''
+        chunks = [self._chunk('broken', kwargs={'seconds': 0, 'result': False}),
+                  self._chunk('after', require=[{'id': 'broken'}])]
+        ret = self.state_obj.call_chunks(chunks)
+        self.assertFalse(ret[salt.state._gen_tag(chunks[0])]['result'])
+        after = ret[salt.state._gen_tag(chunks[1])]
+        self.assertFalse(after['result'])
+        self.assertIn('One or more requisite failed', after['comment'])
+        self.assertEqual([call[:2] for call in self.calls], [('broken', True)])
+
+    def test_call_chunks_concurrent_order(self):
+        '''
+        The states with an order set run after the states of the lower orders
+        returned, and the states sharing an order at the same time
+        '''
+        chunks = [self._chunk('one', order=1, kwargs={'seconds': 0.2}),
+                  self._chunk('two', order=2, kwargs={'seconds': 0.1}),
+                  self._chunk('two_too', order=2, kwargs={'seconds': 0.1}),
+                  self._chunk('auto', kwargs={'seconds': 0})]
+        ret = self.state_obj.call_chunks(chunks)
+        self.assertTrue(all(ret[salt.state._gen_tag(low)]['result'] for low in chunks))
+        tags = [salt.state._gen_tag(low) for low in chunks]
+        self.assertEqual([call[:2] for call in self.calls],
+                         [('one', True), ('two', True), ('two_too', True), ('auto', True)])
+        self.assertEqual(self.calls[1][2], tags[:1])
+        self.assertEqual(self.calls[2][2], tags[:1])
+        self.assertEqual(self.calls[3][2], sorted(tags[:3]))
+
+    def test_call_chunks_concurrent_failhard(self):
+        '''
+        A state with failhard runs after the states ordered before it and stops
+        the run when it fails
+        '''
+        chunks = [self._chunk('first', kwargs={'seconds': 0.1}),
+                  self._chunk('broken', failhard=True, kwargs={'seconds': 0, 'result': False}),
+                  self._chunk('never', kwargs={'seconds': 0})]
+        ret = self.state_obj.call_chunks(chunks)
+        self.assertEqual([call[:2] for call in self.calls],
+                         [('first', True), ('broken', False)])
+        self.assertEqual(self.calls[1][2], [salt.state._gen_tag(chunks[0])])
+        self.assertEqual(sorted(ret), sorted(salt.state._gen_tag(low) for low in chunks[:2]))
+        self.assertTrue(ret[salt.state._gen_tag(chunks[0])]['result'])
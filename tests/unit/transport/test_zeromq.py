@@ -6,6 +6,8 @@
 # Import python libs
 
 import os
+import shutil
+import tempfile
 import time
 import threading
 import multiprocessing
@@ -35,6 +37,8 @@ import salt.utils.platform
 import salt.transport.server
 import salt.transport.client
 import salt.exceptions
+import salt.transport.mixins.auth
+import salt.transport.zeromq
 from salt.ext.six.moves import range
 from salt.transport.zeromq import AsyncReqMessageClientPool
 
@@ -682,3 +686,175 @@ class PubServerChannel(TestCase, AdaptedConfigurationTestCaseMixin):
         gather.join()
         server_channel.pub_close()
         assert len(results) == send_num, (len(results), set(expect).difference(results))
+
+
+class PubServerChannelCryptTest(TestCase):
+    '''
+    Test the publish payloads are encrypted and signed with the keys kept
+    loaded by the channel
+    '''
+    def setUp(self):
+        self.opts = {'sign_pub_messages': True,
+                     'pki_dir': '/pki',
+                     'zmq_filtering': False}
+        salt.transport.mixins.auth.AESPubServerMixin._pub_crypticle = None
+        salt.transport.mixins.auth.AESPubServerMixin._pub_signing_keys = {}
+        self.secrets = salt.master.SMaster.secrets.get('aes')
+        self._set_aes_key(salt.crypt.Crypticle.generate_key_string())
+        with patch('salt.utils.minions.CkMinions'):
+            self.channel = salt.transport.zeromq.ZeroMQPubServerChannel(self.opts)
+        self.channel._sock_data.sock = MagicMock()
+
+    def tearDown(self):
+        del self.channel._sock_data.sock
+        if self.secrets is None:
+            salt.master.SMaster.secrets.pop('aes', None)
+        else:
+            salt.master.SMaster.secrets['aes'] = self.secrets
+        salt.transport.mixins.auth.AESPubServerMixin._pub_crypticle = None
+        salt.transport.mixins.auth.AESPubServerMixin._pub_signing_keys = {}
+        del self.channel
+
+    def _set_aes_key(self, key_string):
+        salt.master.SMaster.secrets['aes'] = {
+            'secret': multiprocessing.Array(ctypes.c_char, six.b(key_string)),
+        }
+
+    def _sent_loads(self):
+        serial = salt.payload.Serial(self.opts)
+        crypticle = salt.crypt.Crypticle(self.opts, salt.master.SMaster.secrets['aes']['secret'].value)
+        ret = []
+        for call in self.channel.pub_sock.send.call_args_list:
+            payload = serial.loads(serial.loads(call[0][0])['payload'])
+            self.assertEqual(payload['sig'], 'sig')
+            ret.append(crypticle.loads(payload['load']))
+        return ret
+
+    def test_publish_signing_key(self):
+        with patch('salt.crypt.get_rsa_key', MagicMock(return_value='key')) as get_key, \
+                patch('salt.crypt.sign_message_with_key', MagicMock(return_value='sig')) as sign:
+            for jid in range(4):
+                self.channel.publish({'tgt_type': 'glob', 'tgt': '*', 'jid': jid})
+        get_key.assert_called_once_with(os.path.join('/pki', 'master.pem'), None)
+        self.assertEqual(sign.call_count, 4)
+        self.assertEqual([load['jid'] for load in self._sent_loads()], [0, 1, 2, 3])
+
+    def test_publish_aes_rotation(self):
+        load = {'tgt_type': 'glob', 'tgt': '*', 'jid': 1}
+        with patch('salt.crypt.get_rsa_key', MagicMock(return_value='key')), \
+                patch('salt.crypt.sign_message_with_key', MagicMock(return_value='sig')):
+            self.channel.publish(load)
+            crypticle = salt.transport.mixins.auth.AESPubServerMixin._pub_crypticle
+            self.channel.publish(load)
+            self.assertIs(salt.transport.mixins.auth.AESPubServerMixin._pub_crypticle, crypticle)
+            self._set_aes_key(salt.crypt.Crypticle.generate_key_string())
+            self.channel.pub_sock.send.reset_mock()
+            self.channel.publish(load)
+        self.assertIsNot(salt.transport.mixins.auth.AESPubServerMixin._pub_crypticle, crypticle)
+        self.assertEqual(self._sent_loads(), [load])
+
+    def test_publish_filtering(self):
+        self.opts['zmq_filtering'] = True
+        serial = salt.payload.Serial(self.opts)
+        load = {'tgt_type': 'grain', 'tgt': 'os:Ubuntu', 'jid': 1}
+        with patch('salt.crypt.get_rsa_key', MagicMock(return_value='key')), \
+                patch('salt.crypt.sign_message_with_key', MagicMock(return_value='sig')):
+            self.channel.ckminions.pub_minions.return_value = ['web1', 'new']
+            self.channel.publish(load)
+            self.channel.ckminions.pub_minions.return_value = None
+            self.channel.publish(dict(load, tgt_type='list', tgt=['web1']))
+        self.channel.ckminions.pub_minions.assert_any_call(
+            'os:Ubuntu', tgt_type='grain', delimiter=':')
+        sent = [serial.loads(call[0][0]) for call in self.channel.pub_sock.send.call_args_list]
+        self.assertEqual(sent[0]['topic_lst'], ['web1', 'new'])
+        self.assertNotIn('topic_lst', sent[1])
+
+
+class ReqServerWorkerPoolsTest(TestCase):
+    '''
+    Test the requests are handed to the MWorker pools of their commands
+    '''
+    def setUp(self):
+        self.sock_dir = tempfile.mkdtemp()
+        self.opts = {'sock_dir': self.sock_dir,
+                     'ipc_mode': 'ipc',
+                     'serial': 'msgpack',
+                     'master_stats': False,
+                     'worker_pools': {'pillar': {'worker_threads': 2,
+                                                 'commands': ['_pillar']},
+                                      'auth': {'worker_threads': 1,
+                                               'commands': ['_auth']}}}
+        self.channel = salt.transport.zeromq.ZeroMQReqServerChannel(self.opts)
+        self.serial = salt.payload.Serial(self.opts)
+
+    def tearDown(self):
+        shutil.rmtree(self.sock_dir, ignore_errors=True)
+        del self.channel
+        del self.serial
+
+    def test_worker_uri(self):
+        self.assertEqual(self.channel._worker_uri(),
+                         'ipc://{0}'.format(os.path.join(self.sock_dir, 'workers.ipc')))
+        self.assertEqual(self.channel._worker_uri('pillar'),
+                         'ipc://{0}'.format(os.path.join(self.sock_dir, 'workers-pillar.ipc')))
+        self.opts['ipc_mode'] = 'tcp'
+        self.assertEqual(self.channel._worker_uri(), 'tcp://127.0.0.1:4515')
+        self.assertEqual(self.channel._worker_uri('auth'), 'tcp://127.0.0.1:4516')
+        self.assertEqual(self.channel._worker_uri('pillar'), 'tcp://127.0.0.1:4517')
+
+    def test_worker_pool(self):
+        routes = {'_pillar': 'pillar', '_auth': 'auth'}
+        self.channel.serial = self.serial
+        self.assertEqual(
+            self.channel._worker_pool(routes, self.serial.dumps(
+                {'enc': 'aes', 'load': 'crypted', 'cmd': '_pillar'})),
+            'pillar')
+        self.assertEqual(
+            self.channel._worker_pool(routes, self.serial.dumps(
+                {'enc': 'clear', 'load': {'cmd': '_auth'}})),
+            'auth')
+        self.assertIsNone(
+            self.channel._worker_pool(routes, self.serial.dumps(
+                {'enc': 'aes', 'load': 'crypted', 'cmd': '_return'})))
+        # Payloads from minions which do not send the command in the clear
+        self.assertIsNone(
+            self.channel._worker_pool(routes, self.serial.dumps({'enc': 'aes', 'load': 'crypted'})))
+        self.assertIsNone(self.channel._worker_pool(routes, b'garbage'))
+
+    def test_route_pools(self):
+        context = zmq.Context()
+        self.channel.context = context
+        self.channel.clients = context.socket(zmq.ROUTER)
+        self.channel.clients.bind('inproc://clients')
+        self.channel.workers = context.socket(zmq.DEALER)
+        self.channel.workers.bind(self.channel._worker_uri())
+        router = threading.Thread(target=self.channel._route_pools,
+                                  args=(self.opts['worker_pools'],))
+        router.start()
+        workers = {}
+        try:
+            for pool in (None, 'pillar', 'auth'):
+                workers[pool] = context.socket(zmq.REP)
+                workers[pool].connect(self.channel._worker_uri(pool))
+            client = context.socket(zmq.REQ)
+            client.connect('inproc://clients')
+            for cmd, pool in (('_pillar', 'pillar'), ('_return', None), ('_auth', 'auth')):
+                if cmd == '_auth':
+                    payload = {'enc': 'clear', 'load': {'cmd': cmd}}
+                else:
+                    payload = {'enc': 'aes', 'load': 'crypted', 'cmd': cmd}
+                client.send(self.serial.dumps(payload))
+                self.assertTrue(workers[pool].poll(5000))
+                self.assertEqual(self.serial.loads(workers[pool].recv()), payload)
+                workers[pool].send(self.serial.dumps(pool))
+                self.assertTrue(client.poll(5000))
+                self.assertEqual(self.serial.loads(client.recv()), pool)
+            client.close()
+        finally:
+            self.channel._closing = True
+            router.join()
+            for sock in workers.values():
+                sock.close()
+            self.channel.clients.close()
+            self.channel.workers.close()
+            context.term()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+import io
+import random
+import zlib
+
+# Import Salt Testing libs
+from tests.support.unit import TestCase
+
+# Import Salt libs
+import salt.utils.delta
+
+
+class DeltaTestCase(TestCase):
+
+    def setUp(self):
+        rand = random.Random(0)
+        self.old = bytes(bytearray(rand.getrandbits(8) for _ in range(100000)))
+        self.bsize = salt.utils.delta.block_size(len(self.old))
+        self.sigs = salt.utils.delta.signatures(io.BytesIO(self.old), self.bsize)
+        self.random = rand
+
+    def _delta(self, new, max_literal=1048576):
+        ops = []
+        loc = 0
+        while loc is not None:
+            page, loc = salt.utils.delta.delta(
+                io.BytesIO(new), self.sigs, self.bsize, loc=loc,
+                max_literal=max_literal)
+            ops.extend(page)
+        self.assertEqual(
+            b''.join(salt.utils.delta.patch(io.BytesIO(self.old), ops, self.bsize)),
+            new)
+        return ops
+
+    @staticmethod
+    def _literal(ops):
+        return sum(len(op) for op in ops if isinstance(op, bytes))
+
+    def test_block_size(self):
+        self.assertEqual(salt.utils.delta.block_size(0), 2048)
+        self.assertEqual(salt.utils.delta.block_size(2048 * 4096), 4096)
+        self.assertEqual(salt.utils.delta.block_size(2 ** 40), 2 ** 24)
+
+    def test_signatures(self):
+        self.assertEqual(len(self.sigs), len(self.old) // self.bsize)
+        self.assertEqual(self.sigs[1][0], zlib.adler32(self.old[self.bsize:2 * self.bsize]))
+
+    def test_unchanged(self):
+        ops = self._delta(self.old)
+        self.assertEqual(ops[:-1], list(range(len(self.sigs))))
+        # The partial last block is sent as is
+        self.assertEqual(self._literal(ops), len(self.old) % self.bsize)
+
+    def test_changed_in_place(self):
+        new = self.old[:5000] + b'x' * 10 + self.old[5010:]
+        self.assertEqual(self._literal(self._delta(new)),
+                         self.bsize + len(self.old) % self.bsize)
+
+    def test_insertion(self):
+        # Blocks are matched again past an insertion
+        new = self.old[:5000] + b'inserted' + self.old[5000:] + b'appended'
+        self.assertLess(self._literal(self._delta(new)), 2 * self.bsize + 16)
+
+    def test_changed_entirely(self):
+        new = bytes(bytearray(self.random.getrandbits(8) for _ in range(50000)))
+        ops = self._delta(new)
+        self.assertEqual(ops, [new])
+
+    def test_pages(self):
+        new = bytes(bytearray(self.random.getrandbits(8) for _ in range(10000))) + self.old
+        ops, loc = salt.utils.delta.delta(
+            io.BytesIO(new), self.sigs, self.bsize, max_literal=4096)
+        self.assertEqual(loc, 2 * self.bsize)
+        self.assertEqual(ops, [new[:loc]])
+        self._delta(new, max_literal=4096)
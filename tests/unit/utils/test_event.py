@@ -341,6 +341,73 @@ class TestSaltEvent(TestCase):
             self.assertGotEvent(evt, {'data': data, 'tag': 'test_master', 'events': None, 'pretag': None})
 
 
+class TestTagTrie(TestCase):
+
+    def test_match(self):
+        trie = salt.utils.event.TagTrie()
+        trie.add('', 'all')
+        trie.add('salt/job/', 'jobs')
+        trie.add('salt/job/123', 'job123')
+        trie.add('salt/job/1234', 'job1234')
+        self.assertEqual(trie.match('salt/job/123/ret/m1'), set(['all', 'jobs', 'job123']))
+        self.assertEqual(trie.match('salt/job/1234/new'), set(['all', 'jobs', 'job123', 'job1234']))
+        self.assertEqual(trie.match('salt/auth'), set(['all']))
+        trie.remove('salt/job/123', 'job123')
+        self.assertEqual(trie.match('salt/job/1234/new'), set(['all', 'jobs', 'job1234']))
+        trie.remove('salt/job/1234', 'job1234')
+        trie.remove('salt/job/', 'jobs')
+        trie.remove('', 'all')
+        self.assertEqual(trie.root, ({}, set()))
+
+
+@skipIf(NO_LONG_IPC, "This system does not support long IPC paths. Skipping event tests!")
+class TestEventMultiplexer(TestCase):
+    def setUp(self):
+        if not os.path.exists(SOCK_DIR):
+            os.makedirs(SOCK_DIR)
+        self.opts = {'event_multiplexer': True, 'event_multiplexer_queue_size': 100}
+
+    def test_shared_subscription(self):
+        '''Test the events are dispatched to the listeners by tag prefix'''
+        with eventpublisher_process():
+            me1 = salt.utils.event.MasterEvent(SOCK_DIR, opts=self.opts, listen=True)
+            me2 = salt.utils.event.MasterEvent(SOCK_DIR, opts=self.opts, listen=True)
+            self.assertIs(me1.subscriber.mux, me2.subscriber.mux)
+            me2.subscribe('salt/job/2')
+            self.assertIsNone(me1.get_event(tag='salt/job/1', wait=0.1))
+            self.assertIsNone(me2.get_event(tag='salt/job/3', wait=0.1))
+            me1.fire_event({'data': 'foo1'}, 'salt/job/1/ret')
+            me1.fire_event({'data': 'foo2'}, 'salt/job/2/ret')
+            me1.fire_event({'data': 'foo3'}, 'salt/job/3/ret')
+            self.assertEqual(me1.get_event(tag='salt/job/1')['data'], 'foo1')
+            self.assertEqual(me2.get_event(tag='salt/job/3')['data'], 'foo3')
+            self.assertEqual(me2.get_event(tag='salt/job/2')['data'], 'foo2')
+            # The events of the other jobs were not dispatched to them
+            self.assertEqual(list(me1.subscriber._queue), [])
+            self.assertEqual(list(me2.subscriber._queue), [])
+            me1.destroy()
+            me2.destroy()
+
+    def test_bounded_queue(self):
+        '''Test the oldest events are dropped when a listener falls behind'''
+        with eventpublisher_process():
+            me = salt.utils.event.MasterEvent(SOCK_DIR, opts=self.opts, listen=True)
+            me.get_event(tag='testevents', wait=0.1)
+            for i in range(150):
+                me.fire_event({'data': '{0}'.format(i)}, 'testevents')
+            # Wait for the multiplexer to dispatch all the events, the last
+            # 50 pushing the oldest ones out
+            deadline = time.time() + 30
+            while me.subscriber._dropped < 50 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(me.subscriber._dropped, 50)
+            for i in range(50, 150):
+                evt = me.get_event(tag='testevents')
+                self.assertEqual(evt['data'], '{0}'.format(i))
+            self.assertIsNone(me.get_event(tag='testevents', wait=0.1))
+            me.destroy()
+
+
 class TestAsyncEventPublisher(AsyncTestCase):
     def get_new_ioloop(self):
         return zmq.eventloop.ioloop.ZMQIOLoop()
@@ -37,6 +37,7 @@ from salt.utils.jinja import (
     tojson
 )
 from salt.utils.odict import OrderedDict
+import salt.utils.templates
 from salt.utils.templates import JINJA, render_jinja_tmpl
 
 # dateutils is needed so that the strftime jinja filter is loaded
@@ -337,6 +338,78 @@ class TestGetTemplate(TestCase):
             self.assertEqual(out, 'Hey world !Hi Salt !' + os.linesep)
             self.assertEqual(fc.requests[0]['path'], 'salt://macro')
 
+    def _render_import(self, **kwargs):
+        opts = {'cachedir': self.tempdir, 'file_client': 'remote',
+                'file_roots': self.local_opts['file_roots'],
+                'pillar_roots': self.local_opts['pillar_roots'],
+                'jinja_bytecode_cache': True}
+        filename = os.path.join(self.template_dir, 'hello_import')
+        with salt.utils.files.fopen(filename) as fp_:
+            return render_jinja_tmpl(
+                salt.utils.stringutils.to_unicode(fp_.read()),
+                dict(opts=opts, saltenv='test', salt=self.local_salt, **kwargs),
+                tmplpath=filename)
+
+    def test_bytecode_cache(self):
+        '''
+        The compiled templates are kept in the cachedir and are not compiled
+        again by the next render
+        '''
+        fc = MockFileClient()
+        with patch.object(SaltCacheLoader, 'file_client', MagicMock(return_value=fc)):
+            self.assertEqual(self._render_import(a='Hi', b='Salt'), 'Hey world !Hi Salt !' + os.linesep)
+            # The template and the imported macro
+            self.assertEqual(len(os.listdir(os.path.join(self.tempdir, 'jinja'))), 2)
+
+            with patch.object(Environment, 'compile', autospec=True,
+                              side_effect=Environment.compile) as compile_:
+                self.assertEqual(self._render_import(a='Hi', b='Salt'), 'Hey world !Hi Salt !' + os.linesep)
+            self.assertFalse(compile_.called)
+
+    def test_bytecode_cache_settings(self):
+        '''
+        The code compiled with other settings of the environment is not
+        reused
+        '''
+        tmplstr = '{% if True %}\nA\n{% endif %}\nB\n'
+        for trim_blocks, expected in ((False, '\nA\n\nB\n'), (True, 'A\nB\n'), (False, '\nA\n\nB\n')):
+            opts = {'cachedir': self.tempdir, 'jinja_bytecode_cache': True,
+                    'jinja_trim_blocks': trim_blocks}
+            self.assertEqual(render_jinja_tmpl(tmplstr, dict(opts=opts, saltenv=None)), expected)
+        self.assertEqual(len(os.listdir(os.path.join(self.tempdir, 'jinja'))), 2)
+
+    def test_bytecode_cache_relative_import(self):
+        '''
+        The templates importing a template of the same relative name from
+        different directories each get their own
+        '''
+        opts = {'cachedir': self.tempdir, 'file_client': 'remote',
+                'file_roots': self.local_opts['file_roots'],
+                'pillar_roots': self.local_opts['pillar_roots'],
+                'jinja_bytecode_cache': True}
+        for name in ('foo', 'bar'):
+            os.makedirs(os.path.join(self.template_dir, name))
+            with salt.utils.files.fopen(os.path.join(self.template_dir, name, 'map.jinja'), 'w') as fp_:
+                fp_.write("{{% set v = '{0}' %}}".format(name.upper()))
+        tmplstr = '{% from "./map.jinja" import v %}{{ v }}'
+        fc = MockFileClient()
+
+        def make_globals(self, d):
+            # Jinja 2 renders the templates with the globals of the
+            # environment, the loader takes tpldir from them
+            return self.globals if not d else dict(self.globals, **d)
+
+        with patch.object(SaltCacheLoader, 'file_client', MagicMock(return_value=fc)), \
+                patch.object(Environment, 'make_globals', make_globals):
+            for _ in range(2):
+                for name in ('foo', 'bar'):
+                    out = render_jinja_tmpl(
+                        tmplstr,
+                        dict(opts=opts, saltenv='test', salt=self.local_salt,
+                             tpldir=name, sls='{0}.init'.format(name)),
+                        tmplpath=os.path.join(self.template_dir, name, 'init.sls'))
+                    self.assertEqual(out, name.upper())
+
     def test_macro_additional_log_for_generalexc(self):
         '''
         If we failed in a macro because of e.g. a TypeError, get
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+# Import python libs
+import os
+import shutil
+import tempfile
+import time
+
+# Import Salt Libs
+import salt.payload
+import salt.utils.files
+import salt.utils.minion
+
+# Import Salt Testing Libs
+from tests.support.paths import TMP
+from tests.support.unit import TestCase
+from tests.support.mock import (
+    patch,
+    MagicMock,
+)
+
+
+class RunningJobsTestCase(TestCase):
+    '''
+    Test the running jobs kept by the minion process
+    '''
+    def setUp(self):
+        if not os.path.isdir(TMP):
+            os.makedirs(TMP)
+        self.cachedir = tempfile.mkdtemp(dir=TMP)
+        self.addCleanup(shutil.rmtree, self.cachedir, ignore_errors=True)
+        self.proc_dir = os.path.join(self.cachedir, 'proc')
+        os.makedirs(self.proc_dir)
+        self.opts = {'cachedir': self.cachedir, 'multiprocessing': True}
+        self.running_jobs = salt.utils.minion.RunningJobs(self.opts)
+
+    def tearDown(self):
+        del self.cachedir
+        del self.proc_dir
+        del self.opts
+        del self.running_jobs
+
+    def write_proc_file(self, jid, pid, age=60):
+        '''
+        Write the proc file of a job, dating the proc directory ``age``
+        seconds back
+        '''
+        with salt.utils.files.fopen(os.path.join(self.proc_dir, jid), 'w+b') as fp_:
+            fp_.write(salt.payload.Serial(self.opts).dumps({'jid': jid, 'pid': pid, 'fun': 'test.sleep'}))
+        mtime = time.time() - age
+        os.utime(self.proc_dir, (mtime, mtime))
+
+    def test_added_jobs(self):
+        '''
+        The jobs started by this process are running as long as their process
+        is alive, their proc file is not read
+        '''
+        process = MagicMock(pid=1234)
+        process.is_alive.return_value = True
+        self.running_jobs.add({'jid': '20190101120000000001', 'fun': 'test.sleep'}, process)
+        self.write_proc_file('20190101120000000001', 1234)
+
+        with patch.object(salt.utils.minion, '_read_proc_file') as read_proc_file:
+            self.assertEqual(self.running_jobs.running(),
+                             [{'jid': '20190101120000000001', 'fun': 'test.sleep', 'pid': 1234}])
+        self.assertEqual(read_proc_file.call_count, 0)
+
+        # The proc file left by the job is removed once it stopped
+        process.is_alive.return_value = False
+        self.assertEqual(self.running_jobs.running(), [])
+        self.assertEqual(os.listdir(self.proc_dir), [])
+
+    def test_journal(self):
+        '''
+        The proc files of the jobs started by other processes are only read
+        when the proc directory changed
+        '''
+        pid = os.getppid()
+        self.write_proc_file('20190101120000000001', pid)
+        read_proc_file = MagicMock(side_effect=salt.utils.minion._read_proc_file)
+        self.running_jobs.read_proc_file = read_proc_file
+        with patch.object(salt.utils.minion, '_check_cmdline', MagicMock(return_value=True)):
+            for _ in range(2):
+                self.assertEqual([job['jid'] for job in self.running_jobs.running()],
+                                 ['20190101120000000001'])
+            self.assertEqual(read_proc_file.call_count, 1)
+
+            self.write_proc_file('20190101120000000002', pid, age=30)
+            self.assertEqual(sorted(job['jid'] for job in self.running_jobs.running()),
+                             ['20190101120000000001', '20190101120000000002'])
+            self.assertEqual(read_proc_file.call_count, 2)
+
+            os.remove(os.path.join(self.proc_dir, '20190101120000000001'))
+            self.assertEqual([job['jid'] for job in self.running_jobs.running()],
+                             ['20190101120000000002'])
+
+        # Jobs whose process is gone are dropped
+        with patch('salt.utils.process.os_is_running', MagicMock(return_value=False)):
+            self.assertEqual(self.running_jobs.running(), [])
+        self.assertEqual(os.listdir(self.proc_dir), [])
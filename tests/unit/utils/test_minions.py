@@ -2,12 +2,20 @@
 
 # Import python libs
 
+import os
+import shutil
 import sys
+import tempfile
+import time
 
 # Import Salt Libs
+import salt.utils.data
+import salt.utils.files
 import salt.utils.minions
+from salt._compat import ipaddress
 
 # Import Salt Testing Libs
+from tests.support.paths import TMP
 from tests.support.unit import TestCase, skipIf
 from tests.support.mock import (
     patch,
@@ -377,6 +385,254 @@ class CkMinionsTestCase(TestCase):
 
 
 @skipIf(sys.version_info < (2, 7), 'Python 2.7 needed for dictionary equality assertions')
+class MinionDataIndexTestCase(TestCase):
+    '''
+    TestCase for salt.utils.minions.MinionDataIndex class
+    '''
+    DATA = {
+        'web1': {'grains': {'os': 'Ubuntu',
+                            'ipv4': ['10.0.0.1', '127.0.0.1'],
+                            'roles': ['web', 'db'],
+                            'disks': [{'name': 'sda', 'size': 10}, {'name': 'sdb'}],
+                            'nested': {'level': {'deep': 'Value:With:Colons'}},
+                            'num_cpus': 4},
+                 'pillar': {'role': 'web', 'app': {'version': 2}}},
+        'web2': {'grains': {'os': 'CentOS',
+                            'ipv4': ['10.0.1.7'],
+                            'roles': ['web'],
+                            'disks': [],
+                            'nested': {},
+                            'num_cpus': 2},
+                 'pillar': {'role': 'db'}},
+        'db1': {'grains': {'os': 'ubuntu', 'ipv4': ['192.168.0.3'], 'Empty': {}},
+                'pillar': {}},
+    }
+
+    def setUp(self):
+        cache = MagicMock()
+        cache.list.return_value = list(self.DATA)
+        cache.fetch.side_effect = lambda bank, key: self.DATA[bank.split('/')[1]]
+        cache.fetch_many.side_effect = lambda bank_keys: dict(
+            (bank_key, cache.fetch(*bank_key)) for bank_key in bank_keys)
+        cache.updated.return_value = None
+        self.index = salt.utils.minions.MinionDataIndex({}, cache)
+        self.index.refresh(force=True)
+
+    def tearDown(self):
+        del self.index
+
+    def _scan(self, search_type, expr, **kwargs):
+        return set(id_ for id_, mdata in self.DATA.items()
+                   if salt.utils.data.subdict_match(mdata.get(search_type), expr, **kwargs))
+
+    def test_match_same_as_subdict_match(self):
+        '''
+        The index must resolve targets exactly like subdict_match does
+        '''
+        exprs = ['os:Ubuntu', 'os:ubuntu', 'OS:Ubuntu', 'os:Ubu*', 'os:*',
+                 'roles:web', 'roles:db', 'roles:0:web', 'roles:1:web',
+                 'disks:name:sdb', 'disks:name:sd?', 'disks:size:10',
+                 'disks:1:name:sdb', 'disks:*', 'disks:name',
+                 'nested:level:deep:value:with:colons', 'nested:level',
+                 'nested:*', 'nested:level:*', 'num_cpus:4', 'num_cpus:[24]',
+                 'ipv4:10.0.0.1', 'Empty:*', 'os', 'missing:key']
+        for expr in exprs:
+            for kwargs in ({}, {'exact_match': True}):
+                self.assertEqual(self.index.match('grains', expr, **kwargs),
+                                 self._scan('grains', expr, **kwargs),
+                                 expr)
+        for expr in ['os:ubu.*', 'os:(centos|ubuntu)', 'roles:w.b', 'os:[']:
+            self.assertEqual(self.index.match('grains', expr, regex_match=True),
+                             self._scan('grains', expr, regex_match=True),
+                             expr)
+        for expr in ['role:web', 'app:version:2', 'app:version', 'role:*']:
+            self.assertEqual(self.index.match('pillar', expr),
+                             self._scan('pillar', expr),
+                             expr)
+
+    def test_match_fallback(self):
+        '''
+        Expressions which the index cannot answer exactly return None
+        '''
+        self.assertIsNone(self.index.match('grains', '*:Ubuntu'))
+        self.assertIsNone(self.index.match('grains', 'nested:*:deep'))
+        self.assertIsNone(self.index.match('grains', 'roles:-1:db'))
+        self.assertIsNone(self.index.match('grains', 'os|Ubuntu', delimiter='|'))
+
+    def test_match_ipcidr(self):
+        '''
+        Test ipcidr lookups against addresses and networks
+        '''
+        self.assertEqual(self.index.match_ipcidr(ipaddress.ip_address('10.0.0.1')),
+                         set(['web1']))
+        self.assertEqual(self.index.match_ipcidr(ipaddress.ip_network('10.0.0.0/16')),
+                         set(['web1', 'web2']))
+
+    def test_update_and_remove(self):
+        '''
+        Updating a minion replaces its old entries
+        '''
+        self.index.update('web2', {'grains': {'os': 'Ubuntu'}, 'pillar': {}})
+        self.assertEqual(self.index.match('grains', 'os:ubuntu'),
+                         set(['web1', 'web2', 'db1']))
+        self.assertEqual(self.index.match('grains', 'os:centos'), set())
+        self.index.update('web2', None)
+        self.assertNotIn('web2', self.index.ids)
+        self.assertIn('web2', self.index.missing)
+        self.index.remove('web1')
+        self.assertEqual(self.index.match('grains', 'os:ubuntu'), set(['db1']))
+        self.assertEqual(self.index.match('grains', 'roles:web'), set())
+
+    def test_check_cache_minions(self):
+        '''
+        CkMinions resolves grain targets through the index when enabled
+        '''
+        opts = {'minion_data_cache': True, 'minion_data_index': True,
+                'pki_dir': '/pki', 'cachedir': '/cache', 'transport': 'zeromq',
+                'accepted_key_cache': ''}
+        ckminions = salt.utils.minions.CkMinions(opts)
+        ckminions.cache = self.index.cache
+        with patch.dict(salt.utils.minions._MINION_DATA_INDEXES,
+                        {('localfs', '/cache'): self.index}), \
+                patch('os.listdir', MagicMock(return_value=['web1', 'web2', 'db1', 'new'])), \
+                patch('os.path.isfile', MagicMock(return_value=True)):
+            self.index.cache.fetch.reset_mock()
+            ret = ckminions._check_cache_minions('os:ubuntu', ':', True, 'grains')
+            self.assertEqual(sorted(ret['minions']), ['db1', 'new', 'web1'])
+            ret = ckminions._check_cache_minions('os:ubuntu', ':', False, 'grains')
+            self.assertEqual(sorted(ret['minions']), ['db1', 'web1'])
+            ret = ckminions._check_ipcidr_minions('10.0.0.0/8', False)
+            self.assertEqual(sorted(ret['minions']), ['web1', 'web2'])
+            self.index.cache.fetch.assert_not_called()
+
+    def test_pub_minions(self):
+        '''
+        Publish targets resolve to the matched minions plus the minions
+        without cached data, or None for a broadcast
+        '''
+        opts = {'minion_data_cache': True, 'minion_data_index': True,
+                'pki_dir': '/pki', 'cachedir': '/cache', 'transport': 'zeromq',
+                'accepted_key_cache': ''}
+        ckminions = salt.utils.minions.CkMinions(opts)
+        ckminions.cache = self.index.cache
+        accepted = MagicMock(return_value=['db1', 'new', 'web1', 'web2'])
+        with patch.dict(salt.utils.minions._MINION_DATA_INDEXES,
+                        {('localfs', '/cache'): self.index}), \
+                patch.object(ckminions, '_accepted_minions', accepted), \
+                patch.object(ckminions, '_pki_minions', accepted):
+            self.assertEqual(sorted(ckminions.pub_minions('os:ubuntu', 'grain')),
+                             ['db1', 'new', 'web1'])
+            self.assertEqual(sorted(ckminions.pub_minions('web* and not G@os:centos', 'compound')),
+                             ['new', 'web1'])
+            self.assertEqual(sorted(ckminions.pub_minions('web*')), ['web1', 'web2'])
+            self.assertEqual(ckminions.pub_minions('web1,db1', 'list'), ['web1', 'db1'])
+            self.assertIsNone(ckminions.pub_minions('foo', 'unknown'))
+            opts['minion_data_cache'] = False
+            self.assertIsNone(ckminions.pub_minions('os:ubuntu', 'grain'))
+            self.assertEqual(sorted(ckminions.pub_minions('web*')), ['web1', 'web2'])
+
+
+class AcceptedKeysTestCase(TestCase):
+    '''
+    TestCase for salt.utils.minions.AcceptedKeys class
+    '''
+    def setUp(self):
+        self.pki_dir = tempfile.mkdtemp(dir=TMP)
+        self.acc_dir = os.path.join(self.pki_dir, 'minions')
+        os.makedirs(self.acc_dir)
+        for minion_id in ('beta', 'Alpha', '.key_cache'):
+            self._touch(minion_id)
+        os.makedirs(os.path.join(self.acc_dir, 'notakey'))
+
+    def tearDown(self):
+        shutil.rmtree(self.pki_dir, ignore_errors=True)
+        for path in list(salt.utils.minions._ACCEPTED_KEYS):
+            if path.startswith(self.pki_dir):
+                del salt.utils.minions._ACCEPTED_KEYS[path]
+
+    def _touch(self, minion_id):
+        with salt.utils.files.fopen(os.path.join(self.acc_dir, minion_id), 'w') as fp_:
+            fp_.write('key')
+
+    def _age(self):
+        '''
+        Age the key directory past the racy window
+        '''
+        old = time.time() - 10
+        os.utime(self.acc_dir, (old, old))
+
+    def test_poll_reuses_listing(self):
+        '''
+        The directory is only listed again once it changes
+        '''
+        self._age()
+        accepted = salt.utils.minions.AcceptedKeys(self.acc_dir)
+        self.assertEqual(accepted.minions(), ['Alpha', 'beta'])
+        with patch('os.listdir', MagicMock(side_effect=OSError)):
+            self.assertEqual(accepted.minions(), ['Alpha', 'beta'])
+        self._touch('gamma')
+        self.assertEqual(accepted.minions(), ['Alpha', 'beta', 'gamma'])
+
+    def test_poll_racy_listing(self):
+        '''
+        A listing taken right after a change is not trusted
+        '''
+        accepted = salt.utils.minions.AcceptedKeys(self.acc_dir)
+        accepted.minions()
+        mock_listdir = MagicMock(return_value=['beta'])
+        with patch('os.listdir', mock_listdir):
+            self.assertEqual(accepted.minions(), ['beta'])
+        mock_listdir.assert_called_once_with(self.acc_dir)
+
+    def test_refresh_minion(self):
+        '''
+        Single minions are checked against their key file
+        '''
+        self._age()
+        accepted = salt.utils.minions.AcceptedKeys(self.acc_dir)
+        accepted.minions()
+        os.remove(os.path.join(self.acc_dir, 'beta'))
+        self._age()
+        accepted.refresh_minion('beta')
+        accepted.refresh_minion('notakey')
+        self.assertEqual(accepted.minions(), ['Alpha'])
+
+    def test_key_event(self):
+        '''
+        Key events are applied to the accepted keys cache of the process
+        '''
+        opts = {'pki_dir': self.pki_dir, 'accepted_key_cache': 'poll'}
+        self._age()
+        accepted = salt.utils.minions.get_accepted_keys(opts)
+        self.assertIs(accepted, salt.utils.minions.get_accepted_keys(opts))
+        self.assertEqual(accepted.minions(), ['Alpha', 'beta'])
+        self._touch('gamma')
+        self._age()
+        salt.utils.minions.key_event(opts, {'act': 'accept', 'id': 'gamma'})
+        self.assertEqual(accepted.minions(), ['Alpha', 'beta', 'gamma'])
+
+    def test_disabled(self):
+        '''
+        No cache is used when accepted_key_cache is disabled
+        '''
+        opts = {'pki_dir': self.pki_dir, 'accepted_key_cache': ''}
+        self.assertIsNone(salt.utils.minions.get_accepted_keys(opts))
+        ckminions = salt.utils.minions.CkMinions(dict(opts, transport='zeromq'))
+        self.assertEqual(ckminions._accepted_minions(), ['Alpha', 'beta'])
+
+    @skipIf(not salt.utils.minions.HAS_PYINOTIFY, 'pyinotify is not installed')
+    def test_inotify(self):
+        '''
+        Changes are picked up from inotify events without listing again
+        '''
+        accepted = salt.utils.minions.AcceptedKeys(self.acc_dir, mode='inotify')
+        self.assertEqual(accepted.minions(), ['Alpha', 'beta'])
+        self._touch('gamma')
+        os.remove(os.path.join(self.acc_dir, 'beta'))
+        with patch('os.listdir', MagicMock(side_effect=OSError)):
+            self.assertEqual(accepted.minions(), ['Alpha', 'gamma'])
+
+
 class TargetParseTestCase(TestCase):
 
     def test_parse_grains_target(self):
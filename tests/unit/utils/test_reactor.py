@@ -5,6 +5,8 @@ import codecs
 import glob
 import logging
 import os
+import shutil
+import tempfile
 import textwrap
 
 import salt.loader
@@ -13,6 +15,7 @@ import salt.utils.files
 import salt.utils.reactor as reactor
 import salt.utils.yaml
 
+from tests.support.runtests import RUNTIME_VARS
 from tests.support.unit import TestCase, skipIf
 from tests.support.mixins import AdaptedConfigurationTestCaseMixin
 from tests.support.mock import (
@@ -461,6 +464,90 @@ class TestReactor(TestCase, AdaptedConfigurationTestCaseMixin):
                                     )
                                     self.assertEqual(reactions, LOW_CHUNKS[tag])
 
+    def test_reactor_map_reload(self):
+        '''
+        Ensure that a reactor map file is only read again once it changed
+        '''
+        tmpdir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        path = os.path.join(tmpdir, 'reactor.conf')
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write('- foo/*:\n  - /srv/reactor/foo.sls\n')
+        rtr = reactor.Reactor(dict(self.opts, reactor=path))
+        self.assertEqual(rtr.list_reactors('foo/bar'), ['/srv/reactor/foo.sls'])
+        with patch.object(salt.utils.yaml, 'safe_load', MagicMock()) as safe_load:
+            self.assertEqual(rtr.list_reactors('foo/baz'), ['/srv/reactor/foo.sls'])
+            safe_load.assert_not_called()
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write('- bar/*:\n  - /srv/reactor/bar.sls\n')
+        os.utime(path, (0, 0))
+        self.assertEqual(rtr.list_reactors('foo/bar'), [])
+        self.assertEqual(rtr.list_reactors('bar/foo'), ['/srv/reactor/bar.sls'])
+
+    def test_render_reaction_cache(self):
+        '''
+        Ensure that reactor files are rendered with the event data every time
+        but only read again once they changed
+        '''
+        tmpdir = tempfile.mkdtemp(dir=RUNTIME_VARS.TMP)
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        path = os.path.join(tmpdir, 'reaction.sls')
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write(textwrap.dedent('''\
+                touch:
+                  local.file.touch:
+                    - tgt: {{ data['id'] }}
+                '''))
+        rtr = reactor.Reactor(self.opts)
+        res = rtr.render_reaction(path, 'foo', {'id': 'web1'})
+        self.assertEqual(res['touch']['__sls__'], path)
+        self.assertIn({'tgt': 'web1'}, res['touch']['local'])
+        with patch.object(codecs, 'open', MagicMock()) as copen:
+            res = rtr.render_reaction(path, 'foo', {'id': 'web2'})
+            copen.assert_not_called()
+        self.assertIn({'tgt': 'web2'}, res['touch']['local'])
+        with salt.utils.files.fopen(path, 'w') as fp_:
+            fp_.write(textwrap.dedent('''\
+                touch:
+                  local.file.touch:
+                    - tgt: {{ data['id'] }}-new
+                '''))
+        os.utime(path, (0, 0))
+        res = rtr.render_reaction(path, 'foo', {'id': 'web3'})
+        self.assertIn({'tgt': 'web3-new'}, res['touch']['local'])
+
+
+class TestReactorRouter(TestCase):
+    '''
+    Tests for matching event tags against the compiled reactor map
+    '''
+    def test_match(self):
+        '''
+        Ensure that exact tags, prefix globs and other globs all match like
+        fnmatch and that the reactors are returned in the order of the map
+        '''
+        router = reactor.ReactorRouter([
+            {'salt/minion/*/start': '/srv/reactor/start.sls'},
+            {'salt/auth': ['/srv/reactor/auth.sls']},
+            {'salt/*': ['/srv/reactor/all.sls']},
+            {'salt/job/2019*/ret/[ab]?': '/srv/reactor/ret.sls'},
+            {'salt/auth': '/srv/reactor/auth2.sls'},
+            {'invalid': 1},
+            'invalid',
+        ])
+        self.assertEqual(
+            router.match('salt/auth'),
+            ['/srv/reactor/auth.sls', '/srv/reactor/all.sls', '/srv/reactor/auth2.sls'])
+        self.assertEqual(
+            router.match('salt/minion/web1/start'),
+            ['/srv/reactor/start.sls', '/srv/reactor/all.sls'])
+        self.assertEqual(
+            router.match('salt/job/20190101/ret/a1'),
+            ['/srv/reactor/all.sls', '/srv/reactor/ret.sls'])
+        self.assertEqual(router.match('salt/job/20190101/ret/c1'), ['/srv/reactor/all.sls'])
+        self.assertEqual(router.match('salt'), [])
+        self.assertEqual(router.match('invalid'), [])
+
 
 @skipIf(NO_MOCK, NO_MOCK_REASON)
 class TestReactWrap(TestCase, AdaptedConfigurationTestCaseMixin):
@@ -9,6 +9,7 @@ import copy
 import datetime
 import logging
 import os
+import threading
 
 # Import Salt Testing Libs
 from tests.support.unit import skipIf, TestCase
@@ -376,3 +377,36 @@ class ScheduleTestCase(TestCase):
                 patch('sys.platform', 'linux2'):
                 self.schedule.handle_func(False, 'test.ping', data)
                 self.assertTrue(log_mock.exception.called)
+
+    def test_run_job_running_jobs(self):
+        '''
+        Test that the scheduled jobs are kept track of in memory to enforce
+        maxrunning
+        '''
+        self.schedule.opts['multiprocessing'] = False
+        data = {'function': 'test.true',
+                'name': 'testjob',
+                'run': True,
+                'jid_include': True,
+                'maxrunning': 1}
+        started = threading.Event()
+        finish = threading.Event()
+
+        def handle_func(multiprocessing_enabled, func, data, jid=None):
+            started.set()
+            finish.wait(10)
+
+        with patch.object(self.schedule, 'handle_func', handle_func):
+            self.schedule._run_job('test.true', data)
+            started.wait(10)
+            try:
+                jobs = self.schedule.running_jobs.running()
+                self.assertEqual([(job['schedule'], job['fun'], job['pid']) for job in jobs],
+                                 [('testjob', 'test.true', os.getpid())])
+                ret = self.schedule._check_max_running('test.true', dict(data), self.schedule.opts,
+                                                       datetime.datetime.now())
+                self.assertEqual(ret['_skip_reason'], 'maxrunning')
+            finally:
+                finish.set()
+            self.schedule._subprocess_list.processes[-1].join(10)
+        self.assertEqual(self.schedule.running_jobs.running(), [])